@@ -0,0 +1,3 @@
+"""
+Gateway building blocks for the FastAPI proxy in server.py
+"""
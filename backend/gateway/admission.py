@@ -0,0 +1,146 @@
+"""
+Admission control for proxied routes
+
+Each configured route prefix is a bulkhead: at most `limit` requests run
+against Node at once, up to `max_queue` more wait (FIFO) for at most
+`queue_wait` seconds, and everything beyond that is shed immediately:
+- queue full      -> 429 + Retry-After
+- waited too long -> 503 + Retry-After
+Because admin/batch prefixes have their own small bulkheads, they can
+saturate only their own slots and never starve interactive reads.
+
+Per-route upstream timeouts replace the single global 60s.
+"""
+import asyncio
+import math
+from collections import deque
+from typing import Optional
+
+from .config import env_float, env_route_map, match_route
+
+DEFAULT_ROUTE_LIMITS = "/api/admin=4:16:2,/api/v4/twitter=8:32:5,/api/graph=16:64:5"
+DEFAULT_ROUTE_TIMEOUTS = "/api/admin=120,/api/v4/twitter=30,/api/graph=30"
+
+
+class Shed(Exception):
+    """Request rejected by admission control"""
+
+    def __init__(self, status_code: int, retry_after: int, route: str, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.route = route
+        self.reason = reason
+
+
+class RouteGate:
+    def __init__(self, prefix: str, limit: int, max_queue: int, queue_wait: float):
+        self.prefix = prefix
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.queue_wait = queue_wait
+        self.active = 0
+        self._waiters: deque = deque()
+
+        self.admitted = 0
+        self.queued = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.queue_wait))
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.shed_queue_full += 1
+            raise Shed(429, self.retry_after, self.prefix, "Too many queued requests")
+
+        self.queued += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            # release() hands its slot over by resolving the future
+            await asyncio.wait_for(future, self.queue_wait)
+            self.admitted += 1
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just as we gave up; pass it on
+                self.release()
+            if isinstance(e, asyncio.TimeoutError):
+                self.shed_timeout += 1
+                raise Shed(503, self.retry_after, self.prefix, "Timed out waiting for capacity") from None
+            raise
+        finally:
+            try:
+                self._waiters.remove(future)
+            except ValueError:
+                pass
+
+    def release(self) -> None:
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "queue_wait": self.queue_wait,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+        }
+
+
+def parse_limit(value: str) -> tuple:
+    """'4:16:2' -> (limit, max_queue, queue_wait); queue and wait are optional"""
+    parts = value.split(":")
+    limit = int(parts[0])
+    max_queue = int(parts[1]) if len(parts) > 1 else limit * 4
+    queue_wait = float(parts[2]) if len(parts) > 2 else 5.0
+    return limit, max_queue, queue_wait
+
+
+class AdmissionController:
+    def __init__(self, gates: list, timeouts: list, default_timeout: float = 60.0):
+        self.gates = gates
+        self.timeouts = timeouts
+        self.default_timeout = default_timeout
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """
+        GATEWAY_ROUTE_LIMITS="/api/admin/*=4:16:2,..." (concurrency:queue:wait_s)
+        GATEWAY_ROUTE_TIMEOUTS="/api/admin/*=120,..." (upstream read timeout, s)
+        """
+        limits = env_route_map("GATEWAY_ROUTE_LIMITS", parse_limit, DEFAULT_ROUTE_LIMITS)
+        return cls(
+            gates=[(prefix, RouteGate(prefix, *spec)) for prefix, spec in limits],
+            timeouts=env_route_map("GATEWAY_ROUTE_TIMEOUTS", float, DEFAULT_ROUTE_TIMEOUTS),
+            default_timeout=env_float("GATEWAY_UPSTREAM_READ_TIMEOUT", 60.0),
+        )
+
+    def gate_for(self, path: str) -> Optional[RouteGate]:
+        return match_route(self.gates, path)
+
+    def timeout_for(self, path: str) -> float:
+        return match_route(self.timeouts, path, self.default_timeout)
+
+    def stats(self) -> dict:
+        return {
+            "routes": {prefix: gate.stats() for prefix, gate in self.gates},
+            "timeouts": dict(self.timeouts),
+            "default_timeout": self.default_timeout,
+        }
+
@@ -0,0 +1,295 @@
+"""
+In-process response cache for hot GET endpoints
+
+Python counterpart of src/infra/cache/cache.service.ts:
+- SWR: serve stale entries immediately, refresh in background
+- Single-flight: concurrent misses for one key share a single upstream call
+- LRU eviction bounded by entry count and total bytes
+- Weak ETags so clients can revalidate with If-None-Match (one per
+  entry, shared by its identity and compressed variants)
+
+Route config mirrors getOrStaleThenRefresh(key, ttl, staleTtl): ttl is how
+long an entry is fresh, staleTtl is its total lifetime (fresh + stale).
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional, Tuple
+from urllib.parse import urlencode
+
+from .config import env_bool, env_int, env_str, match_route
+
+# Default hot dashboard reads: "prefix=ttl:staleTtl" (seconds)
+DEFAULT_CACHE_ROUTES = (
+    "/api/graph=15:120,"
+    "/api/system-alerts/summary=10:60,"
+    "/api/watchlist/summary/realtime=5:30,"
+    "/api/v2/zones=30:300"
+)
+
+# Query params that only bust browser caches and never change the payload
+IGNORED_QUERY_PARAMS = {"_", "_t", "ts", "cb", "nocache"}
+
+
+class CachedResponse:
+    """Fully buffered upstream response"""
+
+    __slots__ = (
+        "status_code", "headers", "body", "etag", "created_at", "ttl", "stale_ttl", "cacheable", "variants",
+    )
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: list,
+        body: bytes,
+        ttl: float = 0,
+        stale_ttl: float = 0,
+        cacheable: bool = True,
+        etag: Optional[str] = None,
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.cacheable = cacheable
+        self.etag = etag or make_etag(body)
+        self.created_at = time.monotonic()
+        # encoding -> compressed body, filled on first request per encoding
+        self.variants: dict = {}
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.age <= self.ttl
+
+    @property
+    def is_servable(self) -> bool:
+        return self.age <= max(self.stale_ttl, self.ttl)
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def encoded(self, encoding: str, compress: Callable[[bytes, str], bytes]) -> bytes:
+        """Body in the given content-encoding, compressed once per entry"""
+        body = self.variants.get(encoding)
+        if body is None:
+            body = self.variants[encoding] = compress(self.body, encoding)
+        return body
+
+
+def make_etag(body: bytes) -> str:
+    return 'W/"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 weak comparison, as used for If-None-Match"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def parse_cache_routes(raw: str) -> list:
+    """'/api/graph=15:120,...' -> [(prefix, (ttl, stale_ttl))], longest first"""
+    routes = []
+    for item in raw.split(","):
+        prefix, sep, value = item.strip().partition("=")
+        prefix = prefix.strip().rstrip("*")
+        if not sep or not prefix:
+            continue
+        ttl_s, _, stale_s = value.partition(":")
+        try:
+            ttl = float(ttl_s)
+            stale = float(stale_s) if stale_s else ttl
+        except ValueError:
+            print(f"[Cache] Ignoring bad route entry: {item!r}")
+            continue
+        if ttl > 0:
+            routes.append((prefix, (ttl, max(stale, ttl))))
+    routes.sort(key=lambda r: len(r[0]), reverse=True)
+    return routes
+
+
+def make_cache_key(method: str, path: str, query_items: Iterable[Tuple[str, str]]) -> str:
+    """Normalize param order and drop cache-busting params; re-encoded so a="1&2" != a=1&2="""
+    params = sorted((k, v) for k, v in query_items if k not in IGNORED_QUERY_PARAMS)
+    query = urlencode(params)
+    return f"{method.upper()} {path}?{query}"
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        routes: list,
+        max_entries: int = 512,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 8 * 1024 * 1024,
+        enabled: bool = True,
+    ):
+        self.routes = routes
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict = {}
+        self._tasks: set = set()
+
+        self.counters = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "coalesced": 0,
+            "revalidations": 0,
+            "revalidation_errors": 0,
+            "not_modified": 0,
+            "bypass": 0,
+            "uncacheable": 0,
+            "evictions": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            routes=parse_cache_routes(env_str("GATEWAY_CACHE_ROUTES", DEFAULT_CACHE_ROUTES)),
+            max_entries=env_int("GATEWAY_CACHE_MAX_ENTRIES", 512),
+            max_bytes=env_int("GATEWAY_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+            max_entry_bytes=env_int("GATEWAY_CACHE_MAX_ENTRY_BYTES", 8 * 1024 * 1024),
+            enabled=env_bool("GATEWAY_CACHE_ENABLED", True),
+        )
+
+    def policy_for(self, method: str, path: str, headers) -> Optional[Tuple[float, float]]:
+        """(ttl, stale_ttl) when this request may be served from cache"""
+        if not self.enabled or method != "GET":
+            return None
+        policy = match_route(self.routes, path)
+        if policy is None:
+            return None
+        # Per-user (token or session cookie) or explicitly uncached requests go straight to Node
+        if "authorization" in headers or "cookie" in headers or "no-cache" in headers.get("cache-control", ""):
+            self.counters["bypass"] += 1
+            return None
+        return policy
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        ttl: float,
+        stale_ttl: float,
+        fetch: Callable[[], Awaitable[CachedResponse]],
+    ) -> Tuple[CachedResponse, str]:
+        """Returns (entry, status) with status HIT / STALE / MISS / COALESCED"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.is_fresh:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return entry, "HIT"
+            if entry.is_servable:
+                self._entries.move_to_end(key)
+                self.counters["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._start_refresh(key, ttl, stale_ttl, fetch)
+                return entry, "STALE"
+            self._remove(key)
+
+        if key in self._inflight:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(self._inflight[key]), "COALESCED"
+
+        self.counters["misses"] += 1
+        # Shielded so a disconnecting leader does not cancel the shared fetch
+        return await asyncio.shield(self._spawn_fill(key, ttl, stale_ttl, fetch)), "MISS"
+
+    def _spawn_fill(self, key, ttl, stale_ttl, fetch) -> asyncio.Task:
+        async def fill() -> CachedResponse:
+            try:
+                entry = await fetch()
+                entry.ttl = ttl
+                entry.stale_ttl = stale_ttl
+                self._store(key, entry)
+                return entry
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.create_task(fill())
+        self._inflight[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._fill_done)
+        return task
+
+    def _fill_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        # Always retrieve the exception so unawaited fills do not warn
+        if not task.cancelled():
+            task.exception()
+
+    def _start_refresh(self, key, ttl, stale_ttl, fetch) -> None:
+        self.counters["revalidations"] += 1
+
+        def done(task: asyncio.Task) -> None:
+            if task.cancelled():
+                return
+            error = task.exception()
+            if error is not None:
+                # Keep serving the stale copy until it expires
+                self.counters["revalidation_errors"] += 1
+                print(f"[Cache] Background refresh failed for {key}: {error}")
+
+        self._spawn_fill(key, ttl, stale_ttl, fetch).add_done_callback(done)
+
+    def _store(self, key: str, entry: CachedResponse) -> None:
+        if not entry.cacheable or entry.size > self.max_entry_bytes:
+            self.counters["uncacheable"] += 1
+            return
+        self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.counters["evictions"] += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate(self, prefix: str = "") -> int:
+        """Drop entries whose key path starts with prefix (all when empty)"""
+        keys = [k for k in self._entries if k.split(" ", 1)[1].startswith(prefix)]
+        for k in keys:
+            self._remove(k)
+        return len(keys)
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["stale_hits"] + self.counters["misses"] + self.counters["coalesced"]
+        served = lookups - self.counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "inflight": len(self._inflight),
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            "routes": {prefix: {"ttl": ttl, "stale_ttl": stale} for prefix, (ttl, stale) in self.routes},
+            **self.counters,
+        }
@@ -0,0 +1,179 @@
+"""
+Response compression for the proxy route
+
+Node sends identity-encoded JSON, so the gateway compresses on the way
+out, negotiated per client from Accept-Encoding (br > gzip). Rules:
+- bodies Node already encoded are passed through untouched (no decode /
+  re-encode); the client's Accept-Encoding is forwarded upstream as-is
+- only textual content types, and only above min_bytes when the length
+  is known; event streams and no-transform responses are never touched
+- brotli is optional: used when the 'brotli' package is importable
+"""
+import zlib
+from typing import AsyncIterator, Optional
+
+from .config import env_bool, env_int
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+NEVER_COMPRESS_TYPES = ("text/event-stream",)
+
+
+def parse_accept_encoding(header: Optional[str]) -> dict:
+    """'gzip, br;q=0.8' -> {'gzip': 1.0, 'br': 0.8}"""
+    weights = {}
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+class CompressionPolicy:
+    def __init__(
+        self,
+        enabled: bool = True,
+        min_bytes: int = 1024,
+        gzip_level: int = 5,
+        br_quality: int = 4,
+        use_brotli: bool = True,
+    ):
+        self.enabled = enabled
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.br_quality = br_quality
+        self.encodings = ("br", "gzip") if use_brotli and brotli is not None else ("gzip",)
+
+        self.counters = {"compressed": 0, "passthrough": 0, "bytes_in": 0, "bytes_out": 0}
+
+    @classmethod
+    def from_env(cls) -> "CompressionPolicy":
+        return cls(
+            enabled=env_bool("GATEWAY_COMPRESS", True),
+            min_bytes=env_int("GATEWAY_COMPRESS_MIN_BYTES", 1024),
+            gzip_level=env_int("GATEWAY_COMPRESS_GZIP_LEVEL", 5),
+            br_quality=env_int("GATEWAY_COMPRESS_BR_QUALITY", 4),
+            use_brotli=env_bool("GATEWAY_COMPRESS_BROTLI", True),
+        )
+
+    def choose(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Best encoding we support that the client accepts, None for identity"""
+        if not self.enabled:
+            return None
+        weights = parse_accept_encoding(accept_encoding)
+        best, best_q = None, 0.0
+        for coding in self.encodings:
+            q = weights.get(coding, weights.get("*", 0.0))
+            if q > best_q:
+                best, best_q = coding, q
+        return best
+
+    def applies(self, status_code: int, headers, length: Optional[int] = None) -> bool:
+        """Whether a response (httpx.Headers or dict) is worth compressing"""
+        if status_code < 200 or status_code in (204, 206, 304):
+            return False
+        if headers.get("content-encoding", "identity").lower() != "identity":
+            self.counters["passthrough"] += 1
+            return False
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return False
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith(NEVER_COMPRESS_TYPES) or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        if length is None:
+            try:
+                length = int(headers["content-length"])
+            except (KeyError, ValueError):
+                return True  # unknown length: worth it for streamed JSON
+        return length >= self.min_bytes
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            out = brotli.compress(body, quality=self.br_quality)
+        else:
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+            out = compressor.compress(body) + compressor.flush()
+        self._count(len(body), len(out))
+        return out
+
+    async def compress_stream(self, chunks: AsyncIterator[bytes], encoding: str) -> AsyncIterator[bytes]:
+        """Compress a relayed body chunk by chunk; memory stays per-chunk"""
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.br_quality)
+            step, finish = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+            step, finish = compressor.compress, compressor.flush
+        size_in = size_out = 0
+        try:
+            async for chunk in chunks:
+                size_in += len(chunk)
+                out = step(chunk)
+                if out:
+                    size_out += len(out)
+                    yield out
+            out = finish()
+            size_out += len(out)
+            yield out
+        finally:
+            self._count(size_in, size_out)
+
+    def _count(self, size_in: int, size_out: int) -> None:
+        self.counters["compressed"] += 1
+        self.counters["bytes_in"] += size_in
+        self.counters["bytes_out"] += size_out
+
+    def stats(self) -> dict:
+        ratio = self.counters["bytes_out"] / self.counters["bytes_in"] if self.counters["bytes_in"] else None
+        return {
+            "enabled": self.enabled,
+            "encodings": list(self.encodings),
+            "min_bytes": self.min_bytes,
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            **self.counters,
+        }
+
+
+def encoded_headers(raw_headers: list, encoding: str, length: Optional[int] = None) -> list:
+    """Rewrite raw ASGI headers for a body we encoded ourselves"""
+    out = [
+        (k, v) for k, v in raw_headers
+        if k not in (b"content-length", b"content-encoding", b"accept-ranges")
+    ]
+    out.append((b"content-encoding", encoding.encode("latin-1")))
+    if length is not None:
+        out.append((b"content-length", str(length).encode("latin-1")))
+    return with_vary(out)
+
+
+def with_vary(raw_headers: list, value: bytes = b"accept-encoding") -> list:
+    """Add a token to Vary (once), keeping any upstream Vary values"""
+    for i, (k, v) in enumerate(raw_headers):
+        if k == b"vary":
+            tokens = [t.strip().lower() for t in v.split(b",")]
+            if value not in tokens and b"*" not in tokens:
+                raw_headers[i] = (k, v + b", " + value)
+            return raw_headers
+    raw_headers.append((b"vary", value))
+    return raw_headers
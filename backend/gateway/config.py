@@ -0,0 +1,61 @@
+"""
+Environment helpers for gateway settings
+All gateway knobs are plain env vars with sane defaults
+"""
+import os
+
+
+def env_str(name: str, default: str) -> str:
+    value = os.environ.get(name)
+    return value.strip() if value and value.strip() else default
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_route_map(name: str, cast=str, default: str = "") -> list:
+    """
+    Parse "prefix=value,prefix=value" into [(prefix, value)], longest prefix first
+    e.g. GATEWAY_STREAM_ROUTE_CHUNK_BYTES="/api/graph=262144,/api/admin/*=1048576"
+    A trailing "*" is accepted and ignored (prefixes always match subpaths).
+    default is used when the variable is unset (set it empty to disable).
+    """
+    raw = os.environ.get(name, default)
+    routes = []
+    for item in raw.split(","):
+        prefix, sep, value = item.strip().partition("=")
+        prefix = prefix.strip().rstrip("*")
+        if not sep or not prefix:
+            continue
+        try:
+            routes.append((prefix, cast(value.strip())))
+        except (TypeError, ValueError):
+            print(f"[Gateway] Ignoring bad {name} entry: {item!r}")
+    routes.sort(key=lambda r: len(r[0]), reverse=True)
+    return routes
+
+
+def match_route(routes: list, path: str, default=None):
+    """Return the value of the longest prefix matching path"""
+    for prefix, value in routes:
+        if path.startswith(prefix):
+            return value
+    return default
@@ -0,0 +1,334 @@
+"""
+Prometheus text-format metrics for the gateway
+
+No client library: counters, gauges and histograms are plain dicts keyed
+by label tuples, so the hot path is a few dict lookups and a bisect.
+Everything expensive (process sampling, rate snapshots) happens at scrape
+time only.
+"""
+import os
+import re
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds; tuned for a local proxy hop up to slow graph/ML calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONNECT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+_ID_SEGMENT = re.compile(
+    r"^(\d+|0x[0-9a-fA-F]{6,}|[0-9a-fA-F]{12,}|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27,}|@?[A-Za-z0-9_]*\d[A-Za-z0-9_]{15,})$"
+)
+
+
+OTHER_ROUTE = "other"
+
+
+def route_label(path: str, max_segments: int = 4) -> str:
+    """/api/actors/0xabc.../graph -> /api/actors/:id/graph (bounded cardinality)"""
+    segments = [s for s in path.split("/") if s][:max_segments]
+    return "/" + "/".join(":id" if _ID_SEGMENT.match(s) else s for s in segments)
+
+
+class RouteLabels:
+    """
+    route_label() with a hard cap. The gateway proxies a catch-all, so there
+    is no route template to label from, and short slugs (/api/tokens/<symbol>,
+    /api/actors/<handle>) look like paths. Past max_routes distinct labels,
+    new ones are counted as OTHER_ROUTE.
+    """
+
+    def __init__(self, max_routes: int = 200):
+        self.max_routes = max_routes
+        self.overflow = 0
+        self._seen: set = set()
+
+    def __call__(self, path: str) -> str:
+        label = route_label(path)
+        if label in self._seen:
+            return label
+        if len(self._seen) >= self.max_routes:
+            self.overflow += 1
+            return OTHER_ROUTE
+        self._seen.add(label)
+        return label
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_
+        self.labels = labels
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{_labels(self.labels, key)} {_fmt(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, *label_values, value: float) -> None:
+        self.values[label_values] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_: str, labels: Tuple[str, ...] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self.values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, *label_values, value: float) -> None:
+        row = self.values.get(label_values)
+        if row is None:
+            row = self.values[label_values] = [0] * (len(self.buckets) + 2)
+        row[bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, row in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += count
+                le = 'le="' + _fmt(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {_fmt(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_fmt(row[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {_fmt(cumulative)}")
+        return lines
+
+
+class RateTracker:
+    """Per-second rate of a counter between scrapes (>= min_interval apart)"""
+
+    def __init__(self, min_interval: float = 1.0):
+        self.min_interval = min_interval
+        self._snapshots: Dict[str, Tuple[float, float, float]] = {}
+
+    def rate(self, key: str, total: float) -> float:
+        now = time.monotonic()
+        prev = self._snapshots.get(key)
+        if prev is None:
+            self._snapshots[key] = (now, total, 0.0)
+            return 0.0
+        prev_t, prev_total, prev_rate = prev
+        if now - prev_t < self.min_interval:
+            return prev_rate
+        rate = max(0.0, (total - prev_total) / (now - prev_t))
+        self._snapshots[key] = (now, total, rate)
+        return rate
+
+
+# ---------- /proc sampling (Linux) ----------
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _read_stat(pid: int) -> Optional[List[str]]:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces; fields resume after the closing paren
+    return raw[raw.rfind(")") + 2:].split()
+
+
+def process_tree(pid: int) -> List[int]:
+    """pid plus all descendants (npx -> node, etc.)"""
+    children: Dict[int, List[int]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return [pid]
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        fields = _read_stat(int(entry))
+        if fields:
+            children.setdefault(int(fields[1]), []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, ()))
+    return tree
+
+
+def process_usage(pid: int) -> Optional[Dict[str, float]]:
+    """RSS bytes and CPU seconds for a process tree, None if gone"""
+    rss = 0
+    cpu_ticks = 0
+    found = False
+    for member in process_tree(pid):
+        fields = _read_stat(member)
+        if not fields:
+            continue
+        found = True
+        # utime=14, stime=15, rss=24 (1-based in proc(5)); -3 after pid/comm
+        cpu_ticks += int(fields[11]) + int(fields[12])
+        rss += int(fields[21]) * _PAGE_SIZE
+    if not found:
+        return None
+    return {"rss_bytes": rss, "cpu_seconds": cpu_ticks / _CLK_TCK}
+
+
+class GatewayMetrics:
+    def __init__(self, max_routes: int = 200):
+        self.route = RouteLabels(max_routes)
+        self.requests = Counter(
+            "gateway_http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status")
+        )
+        self.latency = Histogram(
+            "gateway_http_request_duration_seconds", "Request latency through the gateway (full body)", ("route",)
+        )
+        self.errors = Counter(
+            "gateway_http_errors_total", "5xx responses, with 503 (shed/unavailable) split out", ("kind",)
+        )
+        self.bytes_in = Counter("gateway_http_request_bytes_total", "Request body bytes received", ("route",))
+        self.bytes_out = Counter("gateway_http_response_bytes_total", "Response body bytes sent", ("route",))
+        self.upstream_connect = Histogram(
+            "gateway_upstream_connect_seconds", "TCP connect time to Node.js (new connections only)",
+            buckets=CONNECT_BUCKETS,
+        )
+        self.upstream_response = Histogram(
+            "gateway_upstream_response_seconds", "Time from upstream send to response headers", ("route",)
+        )
+        self.rates = RateTracker()
+        # Scrape-time collectors returning pre-rendered lines
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    # ---------- hot path ----------
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float, bytes_in: int, bytes_out: int) -> None:
+        self.requests.inc(route, method, str(status))
+        self.latency.observe(route, value=seconds)
+        if bytes_in:
+            self.bytes_in.inc(route, amount=bytes_in)
+        if bytes_out:
+            self.bytes_out.inc(route, amount=bytes_out)
+        if status >= 500:
+            self.errors.inc("5xx")
+            if status == 503:
+                self.errors.inc("503")
+
+    def observe_upstream(self, route: str, seconds: float) -> None:
+        self.upstream_response.observe(self.route(route), value=seconds)
+
+    def observe_connect(self, seconds: float) -> None:
+        self.upstream_connect.observe(value=seconds)
+
+    # ---------- scrape ----------
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in (
+            self.requests, self.latency, self.errors, self.bytes_in, self.bytes_out,
+            self.upstream_connect, self.upstream_response,
+        ):
+            lines.extend(metric.render())
+        lines.extend(gauge_lines(
+            "gateway_route_label_overflow_total", f'Requests labelled route="{OTHER_ROUTE}" (label cap reached)',
+            [({}, self.route.overflow)], kind="counter",
+        ))
+        for collector in self.collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                lines.append(f"# collector error: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, help_: str, samples: Iterable[Tuple[dict, float]], kind: str = "gauge") -> List[str]:
+    """Render scrape-time samples: [({label: value}, number)]"""
+    lines = [f"# HELP {name} {help_}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if value is None:
+            continue
+        names = tuple(labels)
+        lines.append(f"{name}{_labels(names, tuple(labels[n] for n in names))} {_fmt(value)}")
+    return lines
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: times each HTTP request until the last body chunk
+    and counts bytes in both directions. WebSocket scopes pass through.
+    """
+
+    def __init__(self, app, metrics: GatewayMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        state = {"status": 500, "in": 0, "out": 0, "started": False, "done": False}
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["in"] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["started"] = True
+            elif message["type"] == "http.response.body":
+                state["out"] += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    state["done"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            status = state["status"]
+            if state["started"] and not state["done"]:
+                status = 499  # client went away mid-body
+            self.metrics.observe_request(
+                self.metrics.route(scope.get("path", "")),
+                scope.get("method", ""),
+                status,
+                time.perf_counter() - started,
+                state["in"],
+                state["out"],
+            )
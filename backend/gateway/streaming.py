@@ -0,0 +1,102 @@
+"""
+Streaming helpers for the proxy route
+
+Request and response bodies are relayed chunk by chunk so memory per
+request stays bounded by the per-route chunk size, whatever the payload.
+Backpressure is implicit: chunks are pulled from the client/upstream only
+as fast as the other side consumes them.
+"""
+from typing import AsyncIterator, Mapping, Optional
+
+from .config import env_int, env_route_map, match_route
+
+# Headers that describe a single hop and must not be forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+class BodyTooLarge(Exception):
+    """Raised when a request body exceeds the per-route limit"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Request body exceeds {limit} bytes")
+        self.limit = limit
+
+
+class StreamPolicy:
+    """Per-route chunk size and request body limits"""
+
+    def __init__(
+        self,
+        chunk_bytes: int = 64 * 1024,
+        max_request_bytes: int = 0,
+        route_chunk_bytes: Optional[list] = None,
+        route_max_request_bytes: Optional[list] = None,
+    ):
+        self.chunk_bytes = chunk_bytes
+        self.max_request_bytes = max_request_bytes
+        self.route_chunk_bytes = route_chunk_bytes or []
+        self.route_max_request_bytes = route_max_request_bytes or []
+
+    @classmethod
+    def from_env(cls) -> "StreamPolicy":
+        return cls(
+            chunk_bytes=env_int("GATEWAY_STREAM_CHUNK_BYTES", 64 * 1024),
+            max_request_bytes=env_int("GATEWAY_MAX_REQUEST_BYTES", 0),
+            route_chunk_bytes=env_route_map("GATEWAY_STREAM_ROUTE_CHUNK_BYTES", int),
+            route_max_request_bytes=env_route_map("GATEWAY_ROUTE_MAX_REQUEST_BYTES", int),
+        )
+
+    def chunk_size_for(self, path: str) -> int:
+        return match_route(self.route_chunk_bytes, path, self.chunk_bytes)
+
+    def max_request_bytes_for(self, path: str) -> int:
+        """0 means unlimited"""
+        return match_route(self.route_max_request_bytes, path, self.max_request_bytes)
+
+
+def has_request_body(headers: Mapping[str, str]) -> bool:
+    if "transfer-encoding" in headers:
+        return True
+    try:
+        return int(headers.get("content-length", "0")) > 0
+    except ValueError:
+        return False
+
+
+async def limited_body(chunks: AsyncIterator[bytes], limit: int) -> AsyncIterator[bytes]:
+    """Pass chunks through, raising BodyTooLarge once limit is crossed"""
+    received = 0
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        received += len(chunk)
+        if limit and received > limit:
+            raise BodyTooLarge(limit)
+        yield chunk
+
+
+def forward_request_headers(headers: Mapping[str, str]) -> dict:
+    out = {k: v for k, v in headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+    out.pop("host", None)
+    return out
+
+
+def raw_response_headers(headers) -> list:
+    """
+    Upstream httpx.Headers -> ASGI raw header list. Uses multi_items() so
+    repeated headers such as Set-Cookie survive the hop.
+    """
+    return [
+        (k.lower().encode("latin-1"), v.encode("latin-1"))
+        for k, v in headers.multi_items()
+        if k.lower() not in HOP_BY_HOP_HEADERS
+    ]
@@ -0,0 +1,244 @@
+"""
+App-scoped upstream HTTP client for the Node.js backend
+
+One httpx.AsyncClient is created on startup and reused by every proxied
+request, so connections to Node stay alive between calls instead of paying
+for a fresh TCP handshake (and an ephemeral port) each time.
+"""
+import time
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+
+from .config import env_bool, env_float, env_int
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class UpstreamPool:
+    """Long-lived keep-alive client plus saturation counters"""
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 200,
+        max_keepalive: int = 50,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        pool_timeout: float = 10.0,
+        http2: bool = False,
+    ):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_timeout = pool_timeout
+        self.http2 = http2
+        self._client: Optional[httpx.AsyncClient] = None
+        self._held: dict = {}
+
+        # Saturation counters
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_total = 0
+        self.pool_timeouts = 0
+        self.connect_errors = 0
+        self.started_at: Optional[float] = None
+
+        # Optional instrumentation hooks (set by the metrics layer)
+        self.on_response: Optional[Callable[[str, float], None]] = None
+        self.on_connect: Optional[Callable[[float], None]] = None
+
+    @classmethod
+    def from_env(cls, base_url: str) -> "UpstreamPool":
+        return cls(
+            base_url,
+            max_connections=env_int("GATEWAY_UPSTREAM_MAX_CONNECTIONS", 200),
+            max_keepalive=env_int("GATEWAY_UPSTREAM_MAX_KEEPALIVE", 50),
+            keepalive_expiry=env_float("GATEWAY_UPSTREAM_KEEPALIVE_EXPIRY", 30.0),
+            connect_timeout=env_float("GATEWAY_UPSTREAM_CONNECT_TIMEOUT", 5.0),
+            read_timeout=env_float("GATEWAY_UPSTREAM_READ_TIMEOUT", 60.0),
+            pool_timeout=env_float("GATEWAY_UPSTREAM_POOL_TIMEOUT", 10.0),
+            http2=env_bool("GATEWAY_UPSTREAM_HTTP2", False),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Upstream pool is not started")
+        return self._client
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+
+        http2 = self.http2
+        if http2 and not _http2_available():
+            print("[Upstream] HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http1=True,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            timeout=self.timeout(),
+            follow_redirects=False,
+        )
+        self.http2 = http2
+        self.started_at = time.time()
+        print(
+            f"[Upstream] Pool ready -> {self.base_url} "
+            f"(max={self.max_connections}, keepalive={self.max_keepalive}, http2={http2})"
+        )
+
+    def timeout(self, read: Optional[float] = None) -> httpx.Timeout:
+        """Pool timeouts, optionally with a per-route read timeout"""
+        return httpx.Timeout(
+            self.read_timeout if read is None else read,
+            connect=self.connect_timeout,
+            pool=self.pool_timeout,
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _instrument(self, request: httpx.Request) -> None:
+        if self.on_connect is None:
+            return
+        on_connect = self.on_connect
+        started = {}
+
+        # httpcore trace hook; only fires when a new connection is opened
+        async def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.started":
+                started["t"] = time.perf_counter()
+            elif event_name == "connection.connect_tcp.complete" and "t" in started:
+                on_connect(time.perf_counter() - started["t"])
+
+        request.extensions["trace"] = trace
+
+    def _observe(self, request: httpx.Request, started: float) -> None:
+        if self.on_response is not None:
+            self.on_response(request.url.path, time.perf_counter() - started)
+
+    async def send(self, request: httpx.Request, stream: bool = False) -> httpx.Response:
+        """Send through the shared client while tracking in-flight load"""
+        self._enter()
+        self._instrument(request)
+        started = time.perf_counter()
+        try:
+            response = await self.client.send(request, stream=stream)
+            self._observe(request, started)
+            return response
+        except httpx.PoolTimeout:
+            self.pool_timeouts += 1
+            raise
+        except httpx.ConnectError:
+            self.connect_errors += 1
+            raise
+        finally:
+            self._leave()
+
+    async def open_stream(
+        self,
+        request: httpx.Request,
+        on_close: Optional[Callable[[], None]] = None,
+    ) -> httpx.Response:
+        """
+        Send with a streamed response body. The request stays counted as
+        in-flight until the body is fully relayed or release() is called;
+        on_close runs exactly once at that point (or on send failure).
+        """
+        self._enter()
+        self._instrument(request)
+        started = time.perf_counter()
+        try:
+            response = await self.client.send(request, stream=True)
+            self._observe(request, started)
+        except BaseException as e:
+            if isinstance(e, httpx.PoolTimeout):
+                self.pool_timeouts += 1
+            elif isinstance(e, httpx.ConnectError):
+                self.connect_errors += 1
+            self._leave()
+            if on_close is not None:
+                on_close()
+            raise
+        self._held[response] = on_close
+        return response
+
+    async def relay(self, response: httpx.Response, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield raw (still encoded) upstream body chunks, then release"""
+        try:
+            async for chunk in response.aiter_raw(chunk_size):
+                yield chunk
+        finally:
+            await self.release(response)
+
+    async def release(self, response: httpx.Response) -> None:
+        if response in self._held:
+            on_close = self._held.pop(response)
+            self._leave()
+            if on_close is not None:
+                on_close()
+        if not response.is_closed:
+            await response.aclose()
+
+    def _enter(self) -> None:
+        self.requests_total += 1
+        self.in_flight += 1
+        if self.in_flight > self.peak_in_flight:
+            self.peak_in_flight = self.in_flight
+
+    def _leave(self) -> None:
+        self.in_flight -= 1
+
+    def _connection_counts(self) -> dict:
+        # httpcore does not expose pool state publicly; best effort only
+        transport = getattr(self._client, "_transport", None)
+        pool = getattr(transport, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {"open": None, "idle": None}
+        idle = 0
+        for conn in connections:
+            try:
+                if conn.is_idle():
+                    idle += 1
+            except Exception:
+                pass
+        return {"open": len(connections), "idle": idle}
+
+    def stats(self) -> dict:
+        conns = self._connection_counts()
+        return {
+            "base_url": self.base_url,
+            "started": self._client is not None,
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "saturation": round(self.in_flight / self.max_connections, 4) if self.max_connections else 0.0,
+            "connections_open": conns["open"],
+            "connections_idle": conns["idle"],
+            "requests_total": self.requests_total,
+            "pool_timeouts": self.pool_timeouts,
+            "connect_errors": self.connect_errors,
+        }
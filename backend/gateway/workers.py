@@ -0,0 +1,434 @@
+"""
+Supervised pool of Node.js backend workers
+
+N `server-minimal` processes run on consecutive ports. HTTP requests go to
+the healthy worker with the fewest outstanding requests; WebSocket sessions
+are pinned with rendezvous hashing so a client keeps hitting the same worker
+and a restart only remaps the sessions of the worker that went away.
+Crashed workers are restarted one at a time so capacity never drops by more
+than one worker.
+
+Readiness is an async HTTP probe retried with exponential backoff, and
+requests that arrive before any worker is ready wait in a bounded queue
+(acquire_wait) instead of failing fast with 503.
+
+rolling_restart() replaces workers blue/green style: each slot gets a new
+process on a spare port, traffic switches once it is ready, and the old
+process is drained before it is stopped.
+"""
+import asyncio
+import hashlib
+import socket
+import subprocess
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from .config import env_float, env_int
+
+
+class NodeWorker:
+    def __init__(self, index: int, port: int, host: str = "127.0.0.1"):
+        self.index = index
+        self.port = port
+        self.host = host
+        self.process: Optional[subprocess.Popen] = None
+        self.healthy = False
+        self.restarting = False
+        self.outstanding = 0
+        self.served = 0
+        self.ws_sessions = 0
+        self.restarts = 0
+        self.failures = 0
+        self.started_at: Optional[float] = None
+        self.last_exit_code: Optional[int] = None
+        # Startup phase timings of the latest launch (ms)
+        self.spawn_ms: Optional[float] = None
+        self.ready_ms: Optional[float] = None
+        self.draining = False
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process else None
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def stats(self) -> dict:
+        return {
+            "index": self.index,
+            "port": self.port,
+            "pid": self.pid,
+            "healthy": self.healthy,
+            "restarting": self.restarting,
+            "draining": self.draining,
+            "outstanding": self.outstanding,
+            "served": self.served,
+            "ws_sessions": self.ws_sessions,
+            "restarts": self.restarts,
+            "last_exit_code": self.last_exit_code,
+            "uptime_sec": round(time.time() - self.started_at, 1) if self.started_at and self.alive() else 0,
+            "spawn_ms": self.spawn_ms,
+            "ready_ms": self.ready_ms,
+        }
+
+
+class WorkerPool:
+    def __init__(
+        self,
+        spawn: Callable[[NodeWorker], subprocess.Popen],
+        is_ready: Callable[[NodeWorker], Awaitable[bool]],
+        size: int = 1,
+        base_port: int = 8003,
+        ready_timeout: float = 60.0,
+        check_interval: float = 2.0,
+        restart_backoff: float = 1.0,
+        probe_initial: float = 0.05,
+        probe_max: float = 1.0,
+        queue_timeout: float = 30.0,
+        queue_max: int = 1000,
+    ):
+        self.spawn = spawn
+        self.is_ready = is_ready
+        self.size = max(1, size)
+        self.base_port = base_port
+        self.ready_timeout = ready_timeout
+        self.check_interval = check_interval
+        self.restart_backoff = restart_backoff
+        self.probe_initial = probe_initial
+        self.probe_max = probe_max
+        self.queue_timeout = queue_timeout
+        self.queue_max = queue_max
+        self.workers: List[NodeWorker] = [NodeWorker(i, base_port + i) for i in range(self.size)]
+
+        self._restart_lock: Optional[asyncio.Lock] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._supervisor: Optional[asyncio.Task] = None
+        self._rr = 0
+        self.queued = 0
+        self.queue_rejected = 0
+        self.queue_timeouts = 0
+        self.rolling = False
+        self.last_rollout: Optional[dict] = None
+
+    @classmethod
+    def from_env(cls, spawn, is_ready, base_port: int = 8003) -> "WorkerPool":
+        return cls(
+            spawn,
+            is_ready,
+            size=env_int("GATEWAY_NODE_WORKERS", 1),
+            base_port=env_int("GATEWAY_NODE_BASE_PORT", base_port),
+            ready_timeout=env_float("GATEWAY_NODE_READY_TIMEOUT", 60.0),
+            check_interval=env_float("GATEWAY_NODE_CHECK_INTERVAL", 2.0),
+            restart_backoff=env_float("GATEWAY_NODE_RESTART_BACKOFF", 1.0),
+            probe_initial=env_float("GATEWAY_NODE_PROBE_INITIAL", 0.05),
+            probe_max=env_float("GATEWAY_NODE_PROBE_MAX", 1.0),
+            queue_timeout=env_float("GATEWAY_STARTUP_QUEUE_TIMEOUT", 30.0),
+            queue_max=env_int("GATEWAY_STARTUP_QUEUE_MAX", 1000),
+        )
+
+    @property
+    def ports(self) -> List[int]:
+        return [w.port for w in self.workers]
+
+    @property
+    def all_ports(self) -> List[int]:
+        """Blue and green port ranges (rollouts alternate between them)"""
+        return list(range(self.base_port, self.base_port + 2 * self.size))
+
+    # ---------- lifecycle ----------
+
+    def _ready_event(self) -> asyncio.Event:
+        # Created lazily so the pool can be built at import time
+        if self._ready is None:
+            self._ready = asyncio.Event()
+            if self.healthy_workers():
+                self._ready.set()
+        return self._ready
+
+    def set_healthy(self, worker: NodeWorker, healthy: bool) -> None:
+        worker.healthy = healthy
+        if healthy:
+            self._ready_event().set()
+        elif not self.healthy_workers():
+            self._ready_event().clear()
+
+    async def start(self) -> None:
+        await asyncio.gather(*(self._launch(w) for w in self.workers))
+        if self._supervisor is None:
+            self._supervisor = asyncio.create_task(self._supervise())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            self._supervisor = None
+        for worker in self.workers:
+            self.set_healthy(worker, False)
+            if worker.alive():
+                print(f"[Workers] Terminating worker {worker.index} (PID {worker.pid})")
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            try:
+                await asyncio.to_thread(worker.process.wait, timeout)
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+
+    async def wait_ready(self, worker: NodeWorker, timeout: float) -> bool:
+        """Probe with exponential backoff until ready, dead, or timed out"""
+        deadline = time.monotonic() + timeout
+        delay = self.probe_initial
+        while time.monotonic() < deadline:
+            if not worker.alive():
+                return False
+            if await self.is_ready(worker):
+                return True
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 2, self.probe_max)
+        return False
+
+    async def _launch(self, worker: NodeWorker) -> bool:
+        self.set_healthy(worker, False)
+        t0 = time.perf_counter()
+        try:
+            worker.process = self.spawn(worker)
+        except Exception as e:
+            print(f"[Workers] Failed to spawn worker {worker.index}: {e}")
+            worker.process = None
+            return False
+        worker.started_at = time.time()
+        worker.spawn_ms = round((time.perf_counter() - t0) * 1000, 1)
+
+        ready = await self.wait_ready(worker, self.ready_timeout)
+        worker.ready_ms = round((time.perf_counter() - t0) * 1000, 1)
+        if ready:
+            self.set_healthy(worker, True)
+            worker.failures = 0
+            print(f"[Workers] Worker {worker.index} ready on port {worker.port} (PID {worker.pid}) after {worker.ready_ms}ms")
+            return True
+        print(f"[Workers] WARNING: worker {worker.index} on port {worker.port} did not become ready (PID {worker.pid})")
+        return False
+
+    async def _supervise(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            for worker in self.workers:
+                if worker.restarting:
+                    continue
+                if worker.alive():
+                    # Late starter: became ready after _launch gave up waiting
+                    if not worker.healthy and await self.is_ready(worker):
+                        self.set_healthy(worker, True)
+                    continue
+                self.set_healthy(worker, False)
+                worker.last_exit_code = worker.process.returncode if worker.process else None
+                asyncio.create_task(self._restart(worker))
+
+    async def _restart(self, worker: NodeWorker) -> None:
+        worker.restarting = True
+        if self._restart_lock is None:
+            self._restart_lock = asyncio.Lock()
+        try:
+            # One restart at a time keeps N-1 workers serving
+            async with self._restart_lock:
+                # A rollout that held the lock may have replaced this slot;
+                # relaunching the retired worker would orphan it on its old port
+                if worker not in self.workers:
+                    print(f"[Workers] Worker {worker.index} on port {worker.port} was retired by a rollout, not restarting")
+                    return
+                print(f"[Workers] Worker {worker.index} exited (code {worker.last_exit_code}), restarting...")
+                await asyncio.sleep(min(self.restart_backoff * 2 ** worker.failures, 30.0))
+                worker.restarts += 1
+                worker.failures += 1
+                await self._launch(worker)
+        finally:
+            worker.restarting = False
+
+    # ---------- rolling restart ----------
+
+    def _spare_port(self, worker: NodeWorker) -> int:
+        """Blue/green: slot i alternates between base+i and base+size+i"""
+        blue = self.base_port + worker.index
+        green = self.base_port + self.size + worker.index
+        return green if worker.port == blue else blue
+
+    async def rolling_restart(self, drain_timeout: float = 30.0) -> dict:
+        """
+        Replace every worker without dropping traffic, one slot at a time:
+        start on spare port -> wait ready -> switch routing -> drain old -> stop old.
+        A replacement that never becomes ready is discarded and the old
+        worker keeps serving.
+        """
+        if self.rolling:
+            return {"ok": False, "error": "rollout already in progress"}
+        if self._restart_lock is None:
+            self._restart_lock = asyncio.Lock()
+
+        self.rolling = True
+        started = time.perf_counter()
+        slots = []
+        try:
+            # Shares the lock with crash restarts so they never overlap
+            async with self._restart_lock:
+                for i, old in enumerate(list(self.workers)):
+                    slots.append(await self._replace_slot(i, old, drain_timeout))
+        finally:
+            self.rolling = False
+
+        self.last_rollout = {
+            "ok": all(slot["ok"] for slot in slots),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "finished_at": time.time(),
+            "slots": slots,
+        }
+        return self.last_rollout
+
+    async def _replace_slot(self, i: int, old: NodeWorker, drain_timeout: float) -> dict:
+        spare = self._spare_port(old)
+        if _port_in_use(old.host, spare):
+            print(f"[Workers] Spare port {spare} busy, skipping slot {i}")
+            return {"index": i, "ok": False, "error": f"spare port {spare} in use", "port": old.port}
+
+        new = NodeWorker(old.index, spare, old.host)
+        print(f"[Workers] Rollout slot {i}: starting replacement on port {spare}")
+        if not await self._launch(new):
+            if new.alive():
+                new.process.kill()
+            return {"index": i, "ok": False, "error": "replacement not ready", "port": old.port}
+
+        # Atomic switch: new picks only ever see the replacement
+        new.restarts = old.restarts
+        self.workers[i] = new
+        old.draining = True
+        self.set_healthy(old, False)
+
+        t = time.perf_counter()
+        deadline = time.monotonic() + drain_timeout
+        while (old.outstanding or old.ws_sessions) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        drained = not (old.outstanding or old.ws_sessions)
+        drain_ms = round((time.perf_counter() - t) * 1000, 1)
+        if not drained:
+            print(
+                f"[Workers] Slot {i}: drain timed out with {old.outstanding} requests "
+                f"and {old.ws_sessions} WebSocket sessions still open"
+            )
+
+        await self._stop_worker(old)
+        print(f"[Workers] Rollout slot {i}: port {old.port} -> {new.port} (drained in {drain_ms}ms)")
+        return {
+            "index": i,
+            "ok": True,
+            "old_port": old.port,
+            "new_port": new.port,
+            "old_pid": old.pid,
+            "new_pid": new.pid,
+            "ready_ms": new.ready_ms,
+            "drain_ms": drain_ms,
+            "drained": drained,
+        }
+
+    async def _stop_worker(self, worker: NodeWorker, timeout: float = 10.0) -> None:
+        if not worker.alive():
+            return
+        # SIGTERM lets Fastify close gracefully (server-minimal shutdown hook)
+        worker.process.terminate()
+        try:
+            await asyncio.to_thread(worker.process.wait, timeout)
+        except subprocess.TimeoutExpired:
+            worker.process.kill()
+
+    # ---------- routing ----------
+
+    def healthy_workers(self) -> List[NodeWorker]:
+        return [w for w in self.workers if w.healthy]
+
+    def pick(self) -> Optional[NodeWorker]:
+        """Least outstanding requests; round-robin among ties"""
+        candidates = self.healthy_workers()
+        if not candidates:
+            return None
+        least = min(w.outstanding for w in candidates)
+        tied = [w for w in candidates if w.outstanding == least]
+        self._rr = (self._rr + 1) % len(tied)
+        return tied[self._rr]
+
+    def pick_sticky(self, key: str) -> Optional[NodeWorker]:
+        """Rendezvous hash: stable worker per key while that worker is healthy"""
+        candidates = self.healthy_workers()
+        if not candidates:
+            return None
+
+        def weight(worker: NodeWorker) -> int:
+            digest = hashlib.blake2b(f"{key}|{worker.index}".encode(), digest_size=8).digest()
+            return int.from_bytes(digest, "big")
+
+        return max(candidates, key=weight)
+
+    def acquire(self) -> Optional[NodeWorker]:
+        worker = self.pick()
+        if worker is not None:
+            worker.outstanding += 1
+            worker.served += 1
+        return worker
+
+    async def acquire_wait(self, timeout: Optional[float] = None) -> Optional[NodeWorker]:
+        """
+        acquire(), but while no worker is ready (cold start, all restarting)
+        wait up to timeout in a bounded queue. None means shed with 503.
+        """
+        worker = self.acquire()
+        if worker is not None:
+            return worker
+        if self.queued >= self.queue_max:
+            self.queue_rejected += 1
+            return None
+
+        timeout = self.queue_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        self.queued += 1
+        try:
+            while worker is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.queue_timeouts += 1
+                    return None
+                try:
+                    await asyncio.wait_for(self._ready_event().wait(), remaining)
+                except asyncio.TimeoutError:
+                    self.queue_timeouts += 1
+                    return None
+                worker = self.acquire()
+            return worker
+        finally:
+            self.queued -= 1
+
+    def release(self, worker: Optional[NodeWorker]) -> None:
+        if worker is not None and worker.outstanding > 0:
+            worker.outstanding -= 1
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "healthy": len(self.healthy_workers()),
+            "outstanding": sum(w.outstanding for w in self.workers),
+            "queued": self.queued,
+            "queue_rejected": self.queue_rejected,
+            "queue_timeouts": self.queue_timeouts,
+            "rolling": self.rolling,
+            "last_rollout": self.last_rollout,
+            "workers": [w.stats() for w in self.workers],
+        }
+
+
+def _port_in_use(host: str, port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        return s.connect_ex((host, port)) == 0
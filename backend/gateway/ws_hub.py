@@ -0,0 +1,362 @@
+"""
+WebSocket fan-out hub
+
+Instead of one upstream socket per browser, the hub keeps a single
+multiplexed connection to Node per path and speaks the WS gateway protocol
+(src/core/websocket/ws-gateway.ts) on the clients' behalf:
+
+- each client gets its own {"type": "connected", "clientId"} welcome from
+  the hub; Node's welcome on the shared socket is dropped
+- client {"type": "hello", "subscriptions"} / {"type": "subscribe" |
+  "unsubscribe", "category"} only change that client's categories; the
+  upstream is told the union (or everything, while any client has no
+  categories - Node's "no subscriptions means all events" rule)
+- client {"type": "ping"} is answered locally with {"type": "pong"}
+- upstream events are fanned out to the clients whose categories match
+  the event type (same mapping as getEventCategory), so Node serializes
+  and sends each event once; frames that are not events go to everyone
+
+Each client has a bounded send queue drained by its own task; a client
+that falls queue_size frames behind is evicted (close 1013) instead of
+buffering without limit. Upstream keepalive uses websocket ping/pong
+frames; client keepalive is handled by uvicorn (--ws-ping-interval).
+"""
+import asyncio
+import json
+import secrets
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+
+from fastapi import WebSocket
+
+Frame = Union[str, bytes]
+
+# Close code for slow consumers: "try again later"
+CLOSE_SLOW_CONSUMER = 1013
+
+
+# getEventCategory() in ws-gateway.ts: event type prefix -> category
+EVENT_CATEGORIES = (
+    ("bootstrap.", "bootstrap"),
+    ("resolver.", "resolver"),
+    ("attribution.", "attribution"),
+    ("alert.", "alerts"),
+    ("signal.", "signals"),
+)
+DEFAULT_CATEGORY = "resolver"
+
+
+def event_category(event_type: str) -> str:
+    for prefix, category in EVENT_CATEGORIES:
+        if event_type.startswith(prefix):
+            return category
+    return DEFAULT_CATEGORY
+
+
+def _ms_now() -> int:
+    # Node stamps frames with Date.now()
+    return int(time.time() * 1000)
+
+
+def gateway_frame(type_: str, **fields) -> str:
+    """Control frame, same shape ws-gateway.ts sends"""
+    return json.dumps({"type": type_, **fields, "timestamp": _ms_now()})
+
+
+class HubClient:
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: "asyncio.Queue[Frame]" = asyncio.Queue(maxsize=queue_size)
+        self.client_id = f"ws_{_ms_now()}_{secrets.token_hex(3)}"
+        # Empty means every event, as in ws-gateway.ts
+        self.categories: Set[str] = set()
+        self.evicted = False
+        self.sent = 0
+        self.connected_at = time.time()
+
+    def offer(self, frame: Frame) -> bool:
+        """Non-blocking enqueue; False means the client is too slow"""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def wants(self, category: str) -> bool:
+        return not self.categories or category in self.categories
+
+
+class WsHub:
+    def __init__(
+        self,
+        path: str,
+        connect: Callable[[str], Awaitable[Tuple[object, object]]],
+        queue_size: int = 256,
+        reconnect_max: float = 10.0,
+        worker_check_interval: float = 2.0,
+    ):
+        """
+        connect(path) -> (upstream websocket, worker). The worker is only
+        used for ws_sessions accounting and to move off a worker that stops
+        being healthy (e.g. during a rolling restart); it may be None.
+        """
+        self.path = path
+        self.connect = connect
+        self.queue_size = queue_size
+        self.reconnect_max = reconnect_max
+        self.worker_check_interval = worker_check_interval
+
+        self.clients: Set[HubClient] = set()
+        self._upstream = None
+        # Categories the upstream socket is subscribed to; () is everything
+        self._upstream_categories: Tuple[str, ...] = ()
+        self._upstream_task: Optional[asyncio.Task] = None
+
+        self.counters = {
+            "messages_from_clients": 0,
+            "messages_from_upstream": 0,
+            "messages_to_upstream": 0,
+            "frames_to_clients": 0,
+            "bytes_from_upstream": 0,
+            "bytes_to_upstream": 0,
+            "evictions": 0,
+            "upstream_connects": 0,
+            "upstream_errors": 0,
+        }
+
+    # ---------- client side ----------
+
+    async def serve(self, websocket: WebSocket) -> None:
+        """Run one accepted client until it disconnects or is evicted"""
+        client = HubClient(websocket, self.queue_size)
+        self.clients.add(client)
+        client.offer(gateway_frame("connected", clientId=client.client_id))
+        await self._sync_upstream()
+        self._ensure_upstream()
+        sender = asyncio.create_task(self._sender(client))
+        try:
+            while not client.evicted:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                self.counters["messages_from_clients"] += 1
+                if message.get("text") is not None:
+                    await self._on_client_text(client, message["text"])
+                elif message.get("bytes") is not None:
+                    # Node parses binary frames as JSON text too
+                    await self._on_client_text(client, message["bytes"].decode("utf-8", "replace"))
+        except Exception as e:
+            if not client.evicted:
+                print(f"[WS Hub {self.path}] Client error: {e}")
+        finally:
+            sender.cancel()
+            await self._drop_client(client)
+
+    async def _on_client_text(self, client: HubClient, text: str) -> None:
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(message, dict):
+            return
+        type_ = message.get("type")
+        category = message.get("category")
+        if not isinstance(category, str):
+            category = None
+
+        if type_ == "hello":
+            if isinstance(message.get("subscriptions"), list):
+                client.categories = {str(c) for c in message["subscriptions"]}
+        elif type_ == "subscribe" and category:
+            client.categories.add(category)
+        elif type_ == "unsubscribe" and category:
+            client.categories.discard(category)
+        elif type_ == "ping":
+            client.offer(gateway_frame("pong"))
+            return
+        else:
+            # ws-gateway.ts only logs unknown types; nothing to forward
+            return
+        await self._sync_upstream()
+
+    def _wanted_categories(self) -> Tuple[str, ...]:
+        """Union of client categories; () while any client wants everything"""
+        wanted: Set[str] = set()
+        for client in self.clients:
+            if not client.categories:
+                return ()
+            wanted |= client.categories
+        return tuple(sorted(wanted))
+
+    async def _sync_upstream(self) -> None:
+        if not self.clients:
+            return
+        wanted = self._wanted_categories()
+        if wanted == self._upstream_categories or self._upstream is None:
+            return
+        # Recorded before the await so concurrent syncs cannot reorder it;
+        # a failed send drops the upstream, and reconnecting resyncs
+        self._upstream_categories = wanted
+        await self._send_upstream(json.dumps({"type": "hello", "subscriptions": list(wanted)}))
+
+    async def _drop_client(self, client: HubClient) -> None:
+        if client not in self.clients:
+            return
+        self.clients.discard(client)
+        if not self.clients:
+            await self._close_upstream()
+        else:
+            await self._sync_upstream()
+
+    async def _sender(self, client: HubClient) -> None:
+        websocket = client.websocket
+        try:
+            while True:
+                frame = await client.queue.get()
+                if isinstance(frame, bytes):
+                    await websocket.send_bytes(frame)
+                else:
+                    await websocket.send_text(frame)
+                client.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Socket gone; the receive loop notices and cleans up
+            pass
+
+    def _evict(self, client: HubClient) -> None:
+        if client.evicted:
+            return
+        client.evicted = True
+        self.counters["evictions"] += 1
+        print(f"[WS Hub {self.path}] Evicting slow consumer ({client.queue.qsize()} frames queued)")
+
+        async def close():
+            try:
+                await client.websocket.close(code=CLOSE_SLOW_CONSUMER)
+            except Exception:
+                pass
+            await self._drop_client(client)
+
+        asyncio.create_task(close())
+
+    # ---------- upstream side ----------
+
+    def _ensure_upstream(self) -> None:
+        if self._upstream_task is None or self._upstream_task.done():
+            self._upstream_task = asyncio.create_task(self._run_upstream())
+
+    async def _run_upstream(self) -> None:
+        delay = 0.1
+        while self.clients:
+            worker = None
+            try:
+                ws, worker = await self.connect(self.path)
+            except Exception as e:
+                self.counters["upstream_errors"] += 1
+                print(f"[WS Hub {self.path}] Upstream connect failed: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.reconnect_max)
+                continue
+
+            self._upstream = ws
+            # A fresh Node connection starts with no subscriptions (everything)
+            self._upstream_categories = ()
+            self.counters["upstream_connects"] += 1
+            if worker is not None:
+                worker.ws_sessions += 1
+            watchdog = asyncio.create_task(self._watch_worker(ws, worker))
+            try:
+                # Re-establish the union of categories after (re)connect
+                await self._sync_upstream()
+                delay = 0.1
+                async for frame in ws:
+                    self._dispatch(frame)
+            except Exception as e:
+                self.counters["upstream_errors"] += 1
+                print(f"[WS Hub {self.path}] Upstream error: {e}")
+            finally:
+                watchdog.cancel()
+                self._upstream = None
+                if worker is not None:
+                    worker.ws_sessions -= 1
+                try:
+                    await ws.close()
+                except Exception:
+                    pass
+            if self.clients:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.reconnect_max)
+
+    async def _watch_worker(self, ws, worker) -> None:
+        """Close the upstream when its worker is drained, so we move on"""
+        if worker is None or not hasattr(worker, "healthy"):
+            return
+        while True:
+            await asyncio.sleep(self.worker_check_interval)
+            if not worker.healthy:
+                print(f"[WS Hub {self.path}] Worker left rotation, reconnecting")
+                await ws.close()
+                return
+
+    async def _send_upstream(self, frame: Frame) -> None:
+        ws = self._upstream
+        if ws is None:
+            return
+        try:
+            await ws.send(frame)
+            self.counters["messages_to_upstream"] += 1
+            self.counters["bytes_to_upstream"] += len(frame)
+        except Exception as e:
+            self.counters["upstream_errors"] += 1
+            print(f"[WS Hub {self.path}] Upstream send failed: {e}")
+
+    async def _close_upstream(self) -> None:
+        task, self._upstream_task = self._upstream_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def _dispatch(self, frame: Frame) -> None:
+        self.counters["messages_from_upstream"] += 1
+        self.counters["bytes_from_upstream"] += len(frame)
+
+        category = None
+        if isinstance(frame, str):
+            try:
+                message = json.loads(frame)
+            except ValueError:
+                message = None
+            if isinstance(message, dict) and isinstance(message.get("type"), str):
+                if message["type"] in ("connected", "pong"):
+                    # Replies to the hub's own socket; clients got local ones
+                    return
+                category = event_category(message["type"])
+
+        for client in list(self.clients):
+            if client.evicted:
+                continue
+            if category is not None and not client.wants(category):
+                continue
+            if client.offer(frame):
+                self.counters["frames_to_clients"] += 1
+            else:
+                self._evict(client)
+
+    def stats(self) -> dict:
+        categories: Dict[str, int] = {}
+        for client in self.clients:
+            for category in client.categories:
+                categories[category] = categories.get(category, 0) + 1
+        return {
+            "path": self.path,
+            "clients": len(self.clients),
+            "categories": categories,
+            "upstream_categories": list(self._upstream_categories),
+            "upstream_connected": self._upstream is not None,
+            "max_queue_depth": max((c.queue.qsize() for c in self.clients), default=0),
+            **self.counters,
+        }
@@ -0,0 +1,4 @@
+"""
+Load and latency benchmarks against the API the tests/ suites exercise
+Run: python -m loadtest --profile closed:16 --duration 30
+"""
@@ -0,0 +1,62 @@
+"""
+python -m loadtest [--base-url URL] [--profile closed:16] [--duration 30]
+                   [--endpoint graph_7d --endpoint ...] [--out DIR] [--list]
+                   [--save [--label iteration_13]]
+
+The base URL defaults to REACT_APP_BACKEND_URL, like the API suites.
+The report is printed and written to test_reports/load_<timestamp>.json.
+--save also keeps the raw latencies in the benchmark store, for
+python -m loadtest.compare.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from loadtest.catalog import CATALOG, select
+from loadtest.benchmarks import BenchmarkStore
+from loadtest.harness import ProfileError, Recorder, parse_profile, run_load, write_report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Async load / latency run")
+    parser.add_argument("--base-url", default=os.environ.get("REACT_APP_BACKEND_URL", "http://localhost:8001"))
+    parser.add_argument("--profile", default="closed:8", help="closed:<n> | rate:<rps> | poisson:<rps> | ramp:<a>-<b>")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--endpoint", action="append", default=[], help="catalog name, repeatable (default: all)")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="reports dir (default: test_reports/)")
+    parser.add_argument("--list", action="store_true", help="print the endpoint catalog and exit")
+    parser.add_argument("--save", action="store_true", help="store the run for python -m loadtest.compare")
+    parser.add_argument("--label", default=None, help="label of the stored run")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for e in CATALOG:
+            print(f"{e.name:26} {e.method:5} {e.path}  ({e.suite})")
+        return 0
+    try:
+        profile = parse_profile(args.profile)
+        endpoints = select(args.endpoint)
+    except (ProfileError, KeyError) as e:
+        parser.error(str(e))
+
+    recorder = Recorder()
+    report = asyncio.run(run_load(
+        endpoints, profile, args.duration, base_url=args.base_url.rstrip("/"),
+        timeout=args.timeout, max_in_flight=args.max_in_flight, seed=args.seed, recorder=recorder,
+    ))
+    path = write_report(report, args.out)
+    print(json.dumps(report, indent=2))
+    print(f"[loadtest] report written to {path}", file=sys.stderr)
+    if args.save:
+        run_id = BenchmarkStore().save(report, recorder.latencies, args.label)
+        print(f"[loadtest] stored benchmark run {run_id}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
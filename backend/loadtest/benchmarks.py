@@ -0,0 +1,245 @@
+"""
+Benchmark store and regression comparison
+
+Each stored run is a directory under test_reports/benchmarks/<run id>/:
+- report.json     the load report (loadtest.harness.build_report) + label
+- latencies.npz   raw per-endpoint latencies (ms), float32
+
+A run is compared against a baseline: the pinned run (BASELINE file) if
+any, else the run stored just before it. For each endpoint and latency
+percentile, the current / baseline ratio gets a bootstrap confidence
+interval, resampling both runs independently. A change counts only when
+the whole interval clears the tolerance band:
+- regression    CI low  > 1 + tolerance  (confidently at least that much slower)
+- improvement   CI high < 1 - tolerance
+so a noisy p99 from a short run widens its interval instead of flapping.
+Error rate is compared as an absolute difference. Only hot endpoints
+(named explicitly, or at least HOT_SHARE of the run's requests) gate.
+"""
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from loadtest.harness import default_reports_dir
+
+PERCENTILES = (50, 95, 99)
+DEFAULT_TOLERANCE = 0.10
+ERROR_RATE_TOLERANCE = 0.01
+CONFIDENCE = 0.95
+N_BOOT = 1000
+MAX_SAMPLES = 4000
+MIN_SAMPLES = 30
+HOT_SHARE = 0.10
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class BenchmarkError(ValueError):
+    pass
+
+
+class BenchmarkRun:
+    __slots__ = ("id", "report", "latencies")
+
+    def __init__(self, run_id: str, report: dict, latencies: Dict[str, np.ndarray]):
+        self.id = run_id
+        self.report = report
+        self.latencies = latencies
+
+    @property
+    def label(self) -> Optional[str]:
+        return self.report.get("label")
+
+
+def default_store_dir() -> str:
+    return os.environ.get("BENCH_STORE_DIR") or os.path.join(default_reports_dir(), "benchmarks")
+
+
+class BenchmarkStore:
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or default_store_dir()
+
+    def _baseline_file(self) -> str:
+        return os.path.join(self.root, "BASELINE")
+
+    def save(self, report: dict, latencies: Dict[str, Sequence[float]], label: Optional[str] = None) -> str:
+        stamp = datetime.fromisoformat(report["startedAt"]).strftime("%Y%m%dT%H%M%S%fZ")
+        run_id = stamp + (f"_{_SAFE_NAME.sub('_', label)}" if label else "")
+        path = os.path.join(self.root, run_id)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "report.json"), "w") as f:
+            json.dump({**report, "runId": run_id, "label": label}, f, indent=2)
+            f.write("\n")
+        arrays = {name: np.asarray(values, dtype=np.float32) for name, values in latencies.items()}
+        np.savez_compressed(os.path.join(path, "latencies.npz"), **arrays)
+        return run_id
+
+    def runs(self) -> List[str]:
+        """Run ids, oldest first (ids start with the UTC start time)"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            e for e in os.listdir(self.root) if os.path.isfile(os.path.join(self.root, e, "report.json"))
+        )
+
+    def resolve(self, ref: str) -> str:
+        """Run id, unique id prefix, label, or 'latest'"""
+        runs = self.runs()
+        if ref == "latest" and runs:
+            return runs[-1]
+        matches = [r for r in runs if r == ref or r.startswith(ref) or r.endswith(f"_{ref}")]
+        if len(matches) == 1 or ref in matches:
+            return ref if ref in matches else matches[0]
+        raise BenchmarkError(f"No single run matches {ref!r} ({len(matches)} found)")
+
+    def load(self, ref: str) -> BenchmarkRun:
+        run_id = self.resolve(ref)
+        path = os.path.join(self.root, run_id)
+        with open(os.path.join(path, "report.json")) as f:
+            report = json.load(f)
+        with np.load(os.path.join(path, "latencies.npz"), allow_pickle=False) as data:
+            latencies = {name: data[name] for name in data.files}
+        return BenchmarkRun(run_id, report, latencies)
+
+    def pin_baseline(self, ref: str) -> str:
+        run_id = self.resolve(ref)
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._baseline_file(), "w") as f:
+            f.write(run_id + "\n")
+        return run_id
+
+    def baseline_for(self, run_id: str) -> Optional[str]:
+        """Pinned baseline (unless it is run_id itself), else the run before run_id"""
+        if os.path.exists(self._baseline_file()):
+            with open(self._baseline_file()) as f:
+                pinned = f.read().strip()
+            if pinned and pinned != run_id and pinned in self.runs():
+                return pinned
+        earlier = [r for r in self.runs() if r < run_id]
+        return earlier[-1] if earlier else None
+
+
+def bootstrap_ratio(
+    baseline: np.ndarray,
+    current: np.ndarray,
+    percentile: float,
+    rng: np.random.Generator,
+    n_boot: int = N_BOOT,
+    confidence: float = CONFIDENCE,
+) -> Tuple[float, float, float]:
+    """(point, ci low, ci high) of percentile(current) / percentile(baseline)"""
+
+    def cap(x):
+        x = np.asarray(x, dtype=np.float64)
+        return rng.choice(x, MAX_SAMPLES, replace=False) if x.size > MAX_SAMPLES else x
+
+    baseline, current = cap(baseline), cap(current)
+    q = percentile / 100.0
+    point = float(np.quantile(current, q) / max(np.quantile(baseline, q), 1e-9))
+    ratios = np.empty(n_boot)
+    chunk = 200
+    for start in range(0, n_boot, chunk):
+        n = min(chunk, n_boot - start)
+        b = np.quantile(baseline[rng.integers(0, baseline.size, (n, baseline.size))], q, axis=1)
+        c = np.quantile(current[rng.integers(0, current.size, (n, current.size))], q, axis=1)
+        ratios[start:start + n] = c / np.maximum(b, 1e-9)
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(ratios, [tail, 1 - tail])
+    return point, float(low), float(high)
+
+
+def hot_endpoints(run: BenchmarkRun, names: Optional[Iterable[str]] = None, share: float = HOT_SHARE) -> set:
+    if names:
+        return set(names)
+    total = sum(len(v) for v in run.latencies.values())
+    return {name for name, v in run.latencies.items() if total and len(v) / total >= share}
+
+
+def compare_runs(
+    baseline: BenchmarkRun,
+    current: BenchmarkRun,
+    tolerance: float = DEFAULT_TOLERANCE,
+    hot: Optional[Iterable[str]] = None,
+    seed: int = 0,
+) -> List[dict]:
+    """One row per (endpoint, metric) present in both runs"""
+    rng = np.random.default_rng(seed)
+    hot_set = hot_endpoints(current, hot)
+    rows = []
+    for name in sorted(set(baseline.latencies) & set(current.latencies)):
+        base, cur = baseline.latencies[name], current.latencies[name]
+        for p in PERCENTILES:
+            row = {"endpoint": name, "metric": f"p{p}", "hot": name in hot_set}
+            if base.size < MIN_SAMPLES or cur.size < MIN_SAMPLES:
+                rows.append({**row, "status": "insufficient", "baseline": None, "current": None,
+                             "ratio": None, "ciLow": None, "ciHigh": None})
+                continue
+            point, low, high = bootstrap_ratio(base, cur, p, rng)
+            status = "regression" if low > 1 + tolerance else "improvement" if high < 1 - tolerance else "unchanged"
+            rows.append({
+                **row,
+                "status": status,
+                "baseline": round(float(np.percentile(base, p)), 2),
+                "current": round(float(np.percentile(cur, p)), 2),
+                "ratio": round(point, 4),
+                "ciLow": round(low, 4),
+                "ciHigh": round(high, 4),
+            })
+
+        base_rate = baseline.report["endpoints"].get(name, {}).get("errorRate") or 0.0
+        cur_rate = current.report["endpoints"].get(name, {}).get("errorRate") or 0.0
+        delta = cur_rate - base_rate
+        rows.append({
+            "endpoint": name,
+            "metric": "errorRate",
+            "hot": name in hot_set,
+            "status": "regression" if delta > ERROR_RATE_TOLERANCE else
+                      "improvement" if delta < -ERROR_RATE_TOLERANCE else "unchanged",
+            "baseline": base_rate,
+            "current": cur_rate,
+            "ratio": None,
+            "ciLow": None,
+            "ciHigh": None,
+        })
+    return rows
+
+
+def gate_failures(rows: List[dict]) -> List[dict]:
+    return [r for r in rows if r["hot"] and r["status"] == "regression"]
+
+
+def _severity(row: dict) -> tuple:
+    """Error-rate changes first, then by how far the ratio moved"""
+    if row["metric"] == "errorRate":
+        return (1, abs(row["current"] - row["baseline"]))
+    return (0, abs(np.log(row["ratio"])))
+
+
+def format_report(baseline: BenchmarkRun, current: BenchmarkRun, rows: List[dict], top: int = 10) -> str:
+    def throughput(run, name):
+        value = run.report["endpoints"].get(name, {}).get("throughputRps")
+        return "-" if value is None else f"{value:.1f}"
+
+    def line(r):
+        mark = "*" if r["hot"] else " "
+        if r["metric"] == "errorRate":
+            change = f"{r['baseline']:.2%} -> {r['current']:.2%}"
+        else:
+            change = (f"{r['baseline']:.1f}ms -> {r['current']:.1f}ms  x{r['ratio']:.2f} "
+                      f"[{r['ciLow']:.2f}, {r['ciHigh']:.2f}]")
+        rps = f"{throughput(baseline, r['endpoint'])} -> {throughput(current, r['endpoint'])} rps"
+        return f" {mark} {r['endpoint']:26} {r['metric']:9} {change:44} {rps}"
+
+    out = [f"baseline {baseline.id}  vs  current {current.id}  (* = hot, CI {CONFIDENCE:.0%})"]
+    for status, title in (("regression", "Top regressions"), ("improvement", "Top improvements")):
+        picked = sorted((r for r in rows if r["status"] == status), key=_severity, reverse=True)[:top]
+        out.append(f"{title} ({sum(r['status'] == status for r in rows)}):")
+        out.extend(line(r) for r in picked)
+        if not picked:
+            out.append("   none")
+    failures = gate_failures(rows)
+    out.append(f"Gate: {'FAIL' if failures else 'PASS'} ({len(failures)} hot regressions)")
+    return "\n".join(out)
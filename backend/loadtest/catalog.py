@@ -0,0 +1,67 @@
+"""
+Endpoint catalog for load runs
+
+The same requests the API suites in tests/ make (test_graph_api.py,
+test_realtime_monitoring.py, test_twitter_runtime_layer.py, ...), minus
+the assertions. Only read-only or idempotent calls are listed, so a load
+run never creates data the correctness suites would trip over.
+"""
+from typing import Dict, Iterable, List, Optional
+
+
+class Endpoint:
+    __slots__ = ("name", "method", "path", "params", "json", "weight", "suite")
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, str]] = None,
+        json: Optional[dict] = None,
+        weight: float = 1.0,
+        suite: str = "",
+    ):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.params = params
+        self.json = json
+        self.weight = weight
+        self.suite = suite
+
+    def info(self) -> dict:
+        return {"method": self.method, "path": self.path, "params": self.params, "suite": self.suite}
+
+
+CATALOG: List[Endpoint] = [
+    Endpoint("graph_7d", "GET", "/api/graph", params={"window": "7d"}, weight=2, suite="test_graph_api.py"),
+    Endpoint("graph_24h", "GET", "/api/graph", params={"window": "24h"}, suite="test_graph_api.py"),
+    Endpoint("watchlist_realtime", "GET", "/api/watchlist/summary/realtime", weight=3,
+             suite="test_realtime_monitoring.py"),
+    Endpoint("watchlist_changes", "GET", "/api/watchlist/events/changes", suite="test_realtime_monitoring.py"),
+    Endpoint("watchlist_count", "GET", "/api/watchlist/events/count", suite="test_realtime_monitoring.py"),
+    Endpoint("watchlist_actors", "GET", "/api/watchlist/actors", suite="test_watchlist_actors.py"),
+    Endpoint("twitter_runtime_search", "POST", "/api/v4/twitter/runtime/search",
+             json={"keyword": "BTC", "limit": 5}, weight=2, suite="test_twitter_runtime_layer.py"),
+    Endpoint("twitter_runtime_status", "GET", "/api/v4/twitter/execution/detailed-status",
+             suite="test_twitter_runtime_layer.py"),
+    Endpoint("system_alerts_summary", "GET", "/api/system-alerts/summary", suite="test_system_alerts_v2.py"),
+    Endpoint("labels", "GET", "/api/labels", suite="test_address_labels.py"),
+    Endpoint("exchanges", "GET", "/api/exchanges", suite="test_address_labels.py"),
+    Endpoint("ml_mode_state", "GET", "/api/ml/mode/state", suite="test_ml_modes_phase6.py"),
+    Endpoint("health", "GET", "/api/health", suite="test_p0_p1_fixes.py"),
+]
+
+
+def select(names: Optional[Iterable[str]] = None, catalog: Optional[List[Endpoint]] = None) -> List[Endpoint]:
+    """Catalog entries by name (all when names is empty); unknown names raise KeyError"""
+    catalog = CATALOG if catalog is None else catalog
+    names = [n for n in (names or []) if n]
+    if not names:
+        return list(catalog)
+    by_name = {e.name: e for e in catalog}
+    missing = [n for n in names if n not in by_name]
+    if missing:
+        raise KeyError(f"Unknown endpoints: {', '.join(missing)} (known: {', '.join(by_name)})")
+    return [by_name[n] for n in names]
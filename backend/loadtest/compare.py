@@ -0,0 +1,65 @@
+"""
+python -m loadtest.compare [RUN] [--baseline RUN] [--top 10] [--tolerance 0.10]
+                           [--hot name,name] [--store DIR] [--json]
+python -m loadtest.compare --list
+python -m loadtest.compare --pin RUN
+
+RUN defaults to the latest stored run; the baseline to the pinned run,
+else the run before RUN. Exits 1 when a hot endpoint regressed.
+"""
+import argparse
+import json
+import sys
+
+from loadtest.benchmarks import (
+    DEFAULT_TOLERANCE,
+    BenchmarkError,
+    BenchmarkStore,
+    compare_runs,
+    format_report,
+    gate_failures,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.compare", description="Compare benchmark runs")
+    parser.add_argument("run", nargs="?", default="latest")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--hot", default="", help="comma-separated hot endpoints (default: by request share)")
+    parser.add_argument("--store", default=None)
+    parser.add_argument("--json", action="store_true", help="print the comparison rows as JSON")
+    parser.add_argument("--list", action="store_true", help="list stored runs")
+    parser.add_argument("--pin", default=None, help="pin RUN as the baseline and exit")
+    args = parser.parse_args(argv)
+
+    store = BenchmarkStore(args.store)
+    try:
+        if args.list:
+            for run_id in store.runs():
+                print(run_id)
+            return 0
+        if args.pin:
+            print(f"baseline pinned: {store.pin_baseline(args.pin)}")
+            return 0
+        current = store.load(args.run)
+        baseline_ref = args.baseline or store.baseline_for(current.id)
+        if not baseline_ref:
+            print(f"{current.id}: no baseline to compare with", file=sys.stderr)
+            return 0
+        baseline = store.load(baseline_ref)
+    except BenchmarkError as e:
+        parser.error(str(e))
+
+    hot = [n.strip() for n in args.hot.split(",") if n.strip()]
+    rows = compare_runs(baseline, current, args.tolerance, hot or None)
+    if args.json:
+        print(json.dumps({"baseline": baseline.id, "current": current.id, "rows": rows}, indent=2))
+    else:
+        print(format_report(baseline, current, rows, top=args.top))
+    return 1 if gate_failures(rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,552 @@
+"""
+Synthetic on-chain + social data at production scale
+
+Streams raw_transfers, actors, entity_addresses, token_registry and
+twitter_results (same fields and indexes as the Mongoose models) into
+MongoDB with unordered bulk inserts, from 10^3 to 10^8 transfers.
+
+Shape of the data:
+- address activity is Pareto (alpha ~1.16, the 80/20 rule): a few
+  addresses carry most transfers, the long tail is touched once or twice
+- exchange actors are hubs: HUB_SHARE of transfers have one side on an
+  exchange address (deposits / withdrawals)
+- actor sizes (addresses per actor) and token popularity are Zipf
+- time is bursty: hourly intensity = diurnal cycle x a two-state regime
+  (calm / burst, bursts 3-15x for a few hours); during a burst half the
+  transfers and tweets are about one "hot" token
+- transfer USD is lognormal, larger when an exchange is involved
+
+Everything is derived from (seed, hour), never from earlier rows, so a
+run is reproducible and --workers N partitions hours across processes
+with identical output. Addresses and hashes are hashed from indices,
+so memory is O(addresses) floats, not O(rows).
+
+    python -m loadtest.datagen --transfers 1e7 [--uri URI] [--drop] [--workers 4]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MIN_ROWS = 10 ** 3
+MAX_ROWS = 10 ** 8
+HUB_SHARE = 0.3
+PARETO_ALPHA = 1.16
+TOKEN_ZIPF = 1.1
+BURST_START_P = 0.02
+BURST_END_P = 0.3
+BLOCK_TIME_SEC = 12
+GENESIS_BLOCK = 18_000_000
+DEFAULT_URI = "mongodb://127.0.0.1:27017/blockview_bench"
+
+ACTOR_TYPES = ("exchange", "fund", "market_maker", "whale", "trader", "protocol", "infra")
+# Non-exchange actor mix
+ACTOR_TYPE_P = (0.08, 0.07, 0.25, 0.45, 0.1, 0.05)
+BASE_TOKENS = (
+    ("0xdac17f958d2ee523a2206206994597c13d831ec7", "USDT", "Tether USD", 6, 1.0),
+    ("0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48", "USDC", "USD Coin", 6, 1.0),
+    ("0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2", "WETH", "Wrapped Ether", 18, 3000.0),
+)
+
+COLLECTIONS = ("raw_transfers", "actors", "entity_addresses", "token_registry", "twitter_results")
+
+# Same indexes the Mongoose models declare, created after the bulk load
+INDEXES = {
+    "raw_transfers": [
+        ([("chain", 1), ("txHash", 1), ("logIndex", 1)], {"unique": True}),
+        ([("chain", 1), ("blockTime", -1)], {}),
+        ([("chain", 1), ("from", 1), ("blockTime", -1)], {}),
+        ([("chain", 1), ("to", 1), ("blockTime", -1)], {}),
+        ([("chain", 1), ("token", 1), ("blockTime", -1)], {}),
+        ([("blockNumber", 1)], {}),
+        ([("blockTime", 1)], {}),
+    ],
+    "actors": [
+        ([("id", 1)], {"unique": True}),
+        ([("type", 1), ("sourceLevel", 1)], {}),
+        ([("coverage.score", -1)], {}),
+        ([("addresses", 1)], {}),
+    ],
+    "entity_addresses": [
+        ([("entityId", 1), ("chain", 1), ("address", 1)], {"unique": True}),
+        ([("address", 1), ("chain", 1)], {}),
+    ],
+    "token_registry": [
+        ([("address", 1), ("chain", 1)], {"unique": True}),
+        ([("symbol", 1)], {}),
+    ],
+    "twitter_results": [
+        ([("ownerUserId", 1), ("tweetId", 1)], {"unique": True, "sparse": True}),
+        ([("ownerType", 1), ("ownerUserId", 1), ("keyword", 1), ("createdAt", -1)], {}),
+        ([("tweetId", 1)], {}),
+        ([("likes", -1)], {}),
+    ],
+}
+
+
+def parse_count(value: str) -> int:
+    """'1e6' / '10^6' / '2M' / '250k' / '1_000_000' -> int in [10^3, 10^8]"""
+    text = str(value).strip().lower().replace("_", "").replace(",", "")
+    match = re.fullmatch(r"10\^(\d+)", text)
+    if match:
+        count = 10 ** int(match[1])
+    else:
+        scale = {"k": 10 ** 3, "m": 10 ** 6}.get(text[-1:], 1)
+        count = int(float(text[:-1] if scale > 1 else text) * scale)
+    if not MIN_ROWS <= count <= MAX_ROWS:
+        raise ValueError(f"{value!r} is outside 10^3..10^8")
+    return count
+
+
+class Scale:
+    """Row counts; everything but transfers is derived unless given"""
+
+    def __init__(
+        self,
+        transfers: int,
+        addresses: Optional[int] = None,
+        actors: Optional[int] = None,
+        tokens: Optional[int] = None,
+        tweets: Optional[int] = None,
+        days: int = 30,
+    ):
+        self.transfers = int(transfers)
+        self.addresses = int(addresses or max(1000, self.transfers // 20))
+        self.actors = int(actors or max(50, self.addresses // 40))
+        self.tokens = int(tokens or min(5000, max(20, int(self.transfers ** 0.5) // 10)))
+        self.tweets = int(self.transfers // 20 if tweets is None else tweets)
+        self.days = int(days)
+
+    @property
+    def hours(self) -> int:
+        return self.days * 24
+
+    def info(self) -> dict:
+        return {k: getattr(self, k) for k in ("transfers", "addresses", "actors", "tokens", "tweets", "days")}
+
+
+# ---------- hashing (index -> hex) ----------
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, vectorized"""
+    with np.errstate(over="ignore"):
+        z = x.astype(np.uint64) + _GOLDEN
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _words(ids: np.ndarray, salt: int, n: int) -> List[np.ndarray]:
+    base = _mix(np.asarray(ids, dtype=np.uint64) ^ _mix(np.array([salt], dtype=np.uint64)))
+    words = [base]
+    for _ in range(n - 1):
+        words.append(_mix(words[-1]))
+    return words
+
+
+def hex_ids(ids: np.ndarray, salt: int, hex_chars: int) -> List[str]:
+    """Deterministic 0x-prefixed hex strings (40 chars = address, 64 = tx hash)"""
+    words = _words(ids, salt, (hex_chars + 15) // 16)
+    columns = [w.tolist() for w in words]
+    return [("0x" + "".join(f"{w:016x}" for w in row))[: 2 + hex_chars] for row in zip(*columns)]
+
+
+# ---------- universe (addresses, actors, tokens) ----------
+
+class Universe:
+    """Everything shared by all hours; rebuilt identically from the seed in each worker"""
+
+    def __init__(self, scale: Scale, seed: int = 0, chain: str = "ethereum", start: Optional[datetime] = None):
+        self.scale = scale
+        self.seed = seed
+        self.chain = chain
+        self.start = start or (datetime.now(timezone.utc) - timedelta(days=scale.days)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        rng = np.random.default_rng([seed, 0])
+
+        # Actor sizes: Zipf; exchanges are the largest actors
+        n_actors = scale.actors
+        n_exchanges = max(1, n_actors // 100)
+        sizes = np.minimum(rng.zipf(1.8, n_actors), 500)
+        sizes[:n_exchanges] = np.maximum(sizes[:n_exchanges], rng.integers(20, 200, n_exchanges))
+        owned = min(int(sizes.sum()), scale.addresses // 2)
+        self.actor_types = np.concatenate([
+            np.zeros(n_exchanges, dtype=np.int64),
+            1 + rng.choice(len(ACTOR_TYPE_P), n_actors - n_exchanges, p=ACTOR_TYPE_P),
+        ])
+        self.actor_of = np.full(scale.addresses, -1, dtype=np.int64)
+        self.actor_of[:owned] = np.repeat(np.arange(n_actors), sizes)[:owned]
+
+        # Activity: Pareto weights, exchange addresses handled by the hub draw
+        self.weights = rng.pareto(PARETO_ALPHA, scale.addresses) + 1.0
+        self._cum = np.cumsum(self.weights)
+        exchange = np.flatnonzero((self.actor_of >= 0) & (self.actor_of < n_exchanges))
+        self.exchange_addresses = exchange if exchange.size else np.arange(1)
+        self._hub_cum = np.cumsum(self.weights[self.exchange_addresses])
+
+        # Tokens: Zipf popularity, the first ones are the real majors
+        ranks = np.arange(1, scale.tokens + 1, dtype=np.float64)
+        self.token_p = ranks ** -TOKEN_ZIPF
+        self.token_p /= self.token_p.sum()
+        self.token_addresses = [t[0] for t in BASE_TOKENS] + hex_ids(
+            np.arange(len(BASE_TOKENS), scale.tokens), seed * 31 + 2, 40
+        )
+        self.token_symbols = [t[1] for t in BASE_TOKENS] + [f"SYN{i}" for i in range(len(BASE_TOKENS), scale.tokens)]
+        self.token_decimals = np.array([t[3] for t in BASE_TOKENS] + [18] * (scale.tokens - len(BASE_TOKENS)))
+        self.token_price = np.concatenate([
+            [t[4] for t in BASE_TOKENS], rng.lognormal(0, 2.5, max(0, scale.tokens - len(BASE_TOKENS)))
+        ])[: scale.tokens]
+
+        self.intensity, self.hot_token = self._time_profile(rng)
+
+    def _time_profile(self, rng) -> Tuple[np.ndarray, np.ndarray]:
+        hours = self.scale.hours
+        hour_of_day = (self.start.hour + np.arange(hours)) % 24
+        diurnal = 1.0 + 0.5 * np.sin(2 * np.pi * (hour_of_day - 9) / 24)
+        regime = np.ones(hours)
+        hot = np.full(hours, -1, dtype=np.int64)
+        burst, level, token = False, 1.0, -1
+        for h in range(hours):
+            if burst and rng.random() < BURST_END_P:
+                burst = False
+            elif not burst and rng.random() < BURST_START_P:
+                burst, level = True, float(rng.uniform(3, 15))
+                token = int(rng.choice(self.scale.tokens, p=self.token_p))
+            if burst:
+                regime[h], hot[h] = level, token
+        return diurnal * regime, hot
+
+    def address_hex(self, idx: np.ndarray) -> List[str]:
+        return hex_ids(idx, self.seed * 31 + 1, 40)
+
+    def sample_addresses(self, rng, n: int) -> np.ndarray:
+        return np.searchsorted(self._cum, rng.random(n) * self._cum[-1])
+
+    def sample_hubs(self, rng, n: int) -> np.ndarray:
+        return self.exchange_addresses[np.searchsorted(self._hub_cum, rng.random(n) * self._hub_cum[-1])]
+
+    def hour_counts(self, total: int, salt: int) -> np.ndarray:
+        rng = np.random.default_rng([self.seed, salt])
+        return rng.multinomial(total, self.intensity / self.intensity.sum())
+
+
+# ---------- row generators ----------
+
+def transfer_docs(u: Universe, hour: int, count: int, offset: int, batch_size: int) -> Iterator[List[dict]]:
+    """raw_transfers of one hour, in batches; `offset` = global row id of the first row"""
+    if count == 0:
+        return
+    rng = np.random.default_rng([u.seed, 1, hour])
+    n = count
+    frm, to = u.sample_addresses(rng, n), u.sample_addresses(rng, n)
+    hub = rng.random(n) < HUB_SHARE
+    deposit = rng.random(n) < 0.5
+    hubs = u.sample_hubs(rng, int(hub.sum()))
+    to[hub & deposit] = hubs[deposit[hub]]
+    frm[hub & ~deposit] = hubs[~deposit[hub]]
+    to = np.where(to == frm, (to + 1) % u.scale.addresses, to)
+
+    tokens = rng.choice(u.scale.tokens, n, p=u.token_p)
+    if u.hot_token[hour] >= 0:
+        tokens[rng.random(n) < 0.5] = u.hot_token[hour]
+    usd = rng.lognormal(6.5, 2.0, n) * np.where(hub, 3.0, 1.0)
+    amount = usd / u.token_price[tokens]
+    seconds = np.sort(rng.random(n) * 3600)
+    log_index = rng.integers(0, 300, n)
+    hour_start = u.start + timedelta(hours=hour)
+    base_block = GENESIS_BLOCK + hour * 3600 // BLOCK_TIME_SEC
+
+    for lo in range(0, n, batch_size):
+        hi = min(n, lo + batch_size)
+        ids = np.arange(offset + lo, offset + hi)
+        tx = hex_ids(ids, u.seed * 31 + 3, 64)
+        from_hex, to_hex = u.address_hex(frm[lo:hi]), u.address_hex(to[lo:hi])
+        created = datetime.now(timezone.utc)
+        docs = []
+        for i, j in enumerate(range(lo, hi)):
+            token = int(tokens[j])
+            decimals = int(u.token_decimals[token])
+            docs.append({
+                "chain": u.chain,
+                "txHash": tx[i],
+                "logIndex": int(log_index[j]),
+                "blockNumber": base_block + int(seconds[j]) // BLOCK_TIME_SEC,
+                "blockTime": hour_start + timedelta(seconds=float(seconds[j])),
+                "from": from_hex[i],
+                "to": to_hex[i],
+                "token": u.token_addresses[token],
+                "amountRaw": str(int(amount[j] * 10 ** min(decimals, 6)) * 10 ** max(decimals - 6, 0)),
+                "amountUsd": round(float(usd[j]), 2),
+                "decimals": decimals,
+                "symbol": u.token_symbols[token],
+                "source": "indexer",
+                "createdAt": created,
+            })
+        yield docs
+
+
+def tweet_docs(u: Universe, hour: int, count: int, offset: int, batch_size: int) -> Iterator[List[dict]]:
+    if count == 0:
+        return
+    rng = np.random.default_rng([u.seed, 2, hour])
+    n = count
+    n_authors = max(100, u.scale.tweets // 50)
+    authors = np.minimum(rng.zipf(1.5, n), n_authors) - 1
+    followers = (1e6 / (authors + 1) ** 1.2).astype(np.int64) + rng.integers(0, 500, n)
+    tokens = rng.choice(u.scale.tokens, n, p=u.token_p)
+    if u.hot_token[hour] >= 0:
+        tokens[rng.random(n) < 0.5] = u.hot_token[hour]
+    reach = np.log1p(followers)
+    likes = (rng.lognormal(0, 1.2, n) * reach ** 2 / 4).astype(np.int64)
+    seconds = np.sort(rng.random(n) * 3600)
+    hour_start = u.start + timedelta(hours=hour)
+
+    for lo in range(0, n, batch_size):
+        hi = min(n, lo + batch_size)
+        created = datetime.now(timezone.utc)
+        docs = []
+        for j in range(lo, hi):
+            symbol = u.token_symbols[int(tokens[j])]
+            username = f"synth_{int(authors[j])}"
+            tweet_id = str(10 ** 18 + offset + j)
+            docs.append({
+                "ownerType": "SYSTEM",
+                "source": "SEARCH",
+                "query": symbol,
+                "keyword": symbol,
+                "tweetId": tweet_id,
+                "text": f"${symbol} flows look {'heavy' if likes[j] > 200 else 'quiet'} today #{symbol.lower()}",
+                "username": username,
+                "displayName": username.replace("_", " ").title(),
+                "likes": int(likes[j]),
+                "reposts": int(likes[j] // 5),
+                "replies": int(likes[j] // 12),
+                "views": int(likes[j] * 40 + followers[j] // 10),
+                "author": {"id": str(int(authors[j])), "username": username, "followers": int(followers[j])},
+                "tweetedAt": hour_start + timedelta(seconds=float(seconds[j])),
+                "parsedAt": created,
+                "url": f"https://x.com/{username}/status/{tweet_id}",
+                "createdAt": created,
+                "updatedAt": created,
+            })
+        yield docs
+
+
+def reference_docs(u: Universe, batch_size: int) -> Iterator[Tuple[str, List[dict]]]:
+    """token_registry, actors and entity_addresses (small next to transfers)"""
+    now = datetime.now(timezone.utc)
+    yield "token_registry", [
+        {"address": addr, "chain": u.chain, "symbol": u.token_symbols[i],
+         "name": BASE_TOKENS[i][2] if i < len(BASE_TOKENS) else f"Synthetic {i}",
+         "decimals": int(u.token_decimals[i]), "verified": i < len(BASE_TOKENS), "source": "manual",
+         "lastUpdated": now, "createdAt": now, "updatedAt": now}
+        for i, addr in enumerate(u.token_addresses)
+    ]
+
+    owned = np.flatnonzero(u.actor_of >= 0)
+    owners = u.actor_of[owned]
+    order = np.argsort(owners, kind="stable")
+    owned, owners = owned[order], owners[order]
+    bounds = np.searchsorted(owners, np.arange(u.scale.actors + 1))
+    rng = np.random.default_rng([u.seed, 3])
+    levels = rng.choice(("verified", "attributed", "behavioral"), u.scale.actors, p=(0.2, 0.5, 0.3))
+
+    actors, addresses = [], []
+    for actor in range(u.scale.actors):
+        idx = owned[bounds[actor]:bounds[actor + 1]]
+        hexes = u.address_hex(idx)
+        kind = ACTOR_TYPES[int(u.actor_types[actor])]
+        score = int(rng.integers(20, 100))
+        actor_id = f"synth-{kind}-{actor}"
+        actors.append({
+            "id": actor_id,
+            "type": kind,
+            "name": f"Synthetic {kind.replace('_', ' ').title()} {actor}",
+            "sourceLevel": str(levels[actor]),
+            "addresses": hexes[:100],
+            "addressStats": {"verifiedCount": 0, "attributedCount": len(hexes), "behavioralCount": 0,
+                             "totalCount": len(hexes)},
+            "coverage": {"score": score, "band": "High" if score >= 70 else "Medium" if score >= 40 else "Low",
+                         "lastUpdated": now},
+            "labels": ["synthetic"],
+            "createdAt": now,
+            "updatedAt": now,
+        })
+        for address in hexes:
+            addresses.append({
+                "entityId": actor_id, "chain": u.chain, "address": address,
+                "role": "hot" if kind == "exchange" else "unknown", "confidence": "attributed",
+                "source": "manual", "labelConfidence": score, "tags": ["synthetic"],
+                "firstSeen": u.start, "lastSeen": now, "createdAt": now, "updatedAt": now,
+            })
+        if len(actors) >= batch_size:
+            yield "actors", actors
+            actors = []
+        while len(addresses) >= batch_size:
+            yield "entity_addresses", addresses[:batch_size]
+            addresses = addresses[batch_size:]
+    if actors:
+        yield "actors", actors
+    if addresses:
+        yield "entity_addresses", addresses
+
+
+def generate(
+    u: Universe, batch_size: int = 10_000, hours: Optional[range] = None, reference: bool = True
+) -> Iterator[Tuple[str, List[dict]]]:
+    """(collection, docs) batches; `hours` restricts to a partition (workers)"""
+    if reference:
+        yield from reference_docs(u, batch_size)
+    transfer_counts = u.hour_counts(u.scale.transfers, 10)
+    tweet_counts = np.roll(u.hour_counts(u.scale.tweets, 11), 1)  # chatter lags flows by an hour
+    transfer_offsets = np.concatenate([[0], np.cumsum(transfer_counts)])
+    tweet_offsets = np.concatenate([[0], np.cumsum(tweet_counts)])
+    for h in hours if hours is not None else range(u.scale.hours):
+        for docs in transfer_docs(u, h, int(transfer_counts[h]), int(transfer_offsets[h]), batch_size):
+            yield "raw_transfers", docs
+        for docs in tweet_docs(u, h, int(tweet_counts[h]), int(tweet_offsets[h]), batch_size):
+            yield "twitter_results", docs
+
+
+# ---------- sinks ----------
+
+class MongoSink:
+    def __init__(self, uri: str, db: Optional[str] = None):
+        from pymongo import MongoClient  # only needed when actually writing
+
+        self.client = MongoClient(uri)
+        self.db = self.client[db] if db else self.client.get_default_database(default="blockview_bench")
+
+    def drop(self) -> None:
+        for name in COLLECTIONS:
+            self.db.drop_collection(name)
+
+    def write(self, collection: str, docs: List[dict]) -> None:
+        self.db[collection].insert_many(docs, ordered=False, bypass_document_validation=True)
+
+    def create_indexes(self) -> None:
+        for collection, indexes in INDEXES.items():
+            for keys, options in indexes:
+                self.db[collection].create_index(keys, **options)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class CountingSink:
+    """--dry-run: generate and count, write nothing"""
+
+    def write(self, collection: str, docs: List[dict]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+# ---------- driver ----------
+
+def _run_partition(args) -> Dict[str, int]:
+    scale_info, seed, chain, start, uri, db, batch_size, hours, reference, dry_run = args
+    u = Universe(Scale(**scale_info), seed, chain, start)
+    sink = CountingSink() if dry_run else MongoSink(uri, db)
+    counts: Dict[str, int] = {}
+    try:
+        for collection, docs in generate(u, batch_size, hours, reference):
+            sink.write(collection, docs)
+            counts[collection] = counts.get(collection, 0) + len(docs)
+    finally:
+        sink.close()
+    return counts
+
+
+def run(
+    scale: Scale,
+    uri: str = DEFAULT_URI,
+    db: Optional[str] = None,
+    seed: int = 0,
+    chain: str = "ethereum",
+    batch_size: int = 10_000,
+    workers: int = 1,
+    drop: bool = False,
+    indexes: bool = True,
+    dry_run: bool = False,
+) -> dict:
+    started = time.perf_counter()
+    start = (datetime.now(timezone.utc) - timedelta(days=scale.days)).replace(minute=0, second=0, microsecond=0)
+    if not dry_run and drop:
+        sink = MongoSink(uri, db)
+        sink.drop()
+        sink.close()
+
+    workers = max(1, min(workers, scale.hours))
+    parts = [range(i, scale.hours, workers) for i in range(workers)]
+    jobs = [(scale.info(), seed, chain, start, uri, db, batch_size, part, i == 0, dry_run)
+            for i, part in enumerate(parts)]
+    counts: Dict[str, int] = {}
+    if workers == 1:
+        results = [_run_partition(jobs[0])]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_run_partition, jobs))
+    for result in results:
+        for collection, n in result.items():
+            counts[collection] = counts.get(collection, 0) + n
+    load_sec = time.perf_counter() - started
+
+    if not dry_run and indexes:
+        sink = MongoSink(uri, db)
+        sink.create_indexes()
+        sink.close()
+    total = sum(counts.values())
+    return {
+        "scale": scale.info(),
+        "seed": seed,
+        "counts": counts,
+        "loadSec": round(load_sec, 2),
+        "totalSec": round(time.perf_counter() - started, 2),
+        "rowsPerSec": round(total / load_sec) if load_sec > 0 else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.datagen", description="Synthetic data for scale tests")
+    parser.add_argument("--transfers", default="1e5", help="10^3..10^8, e.g. 1e6, 10^7, 250k")
+    parser.add_argument("--addresses", type=int, default=None)
+    parser.add_argument("--actors", type=int, default=None)
+    parser.add_argument("--tokens", type=int, default=None)
+    parser.add_argument("--tweets", type=int, default=None)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--uri", default=os.environ.get("LOCAL_STACK_MONGO_URI", DEFAULT_URI))
+    parser.add_argument("--db", default=None, help="database (default: from the URI, else blockview_bench)")
+    parser.add_argument("--chain", default="ethereum")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--drop", action="store_true", help=f"drop {', '.join(COLLECTIONS)} first")
+    parser.add_argument("--no-indexes", action="store_true")
+    parser.add_argument("--dry-run", action="store_true", help="generate without writing")
+    args = parser.parse_args(argv)
+
+    try:
+        scale = Scale(parse_count(args.transfers), args.addresses, args.actors, args.tokens, args.tweets, args.days)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"[datagen] {scale.info()} -> {'dry run' if args.dry_run else args.uri}", file=sys.stderr)
+    result = run(scale, args.uri, args.db, args.seed, args.chain, args.batch_size, args.workers,
+                 args.drop, not args.no_indexes, args.dry_run)
+    print(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
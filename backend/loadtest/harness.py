@@ -0,0 +1,257 @@
+"""
+Async load harness
+
+Profiles (parse_profile):
+- closed:<n>          n workers, each sends its next request as soon as
+                      the previous one answers (throughput at fixed concurrency)
+- rate:<rps>          open loop, evenly spaced arrivals
+- poisson:<rps>       open loop, exponential inter-arrival times
+- ramp:<from>-<to>    open loop, rate rising linearly over the run
+
+Open-loop latency is measured from the scheduled send time, not from when
+the request actually left, so a backed-up server shows up in p99 instead
+of silently lowering the offered rate (coordinated omission). Arrivals
+that find max_in_flight requests outstanding are counted as dropped.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from loadtest.catalog import Endpoint
+
+PERCENTILES = (50, 95, 99)
+
+
+class ProfileError(ValueError):
+    pass
+
+
+class Profile:
+    __slots__ = ("kind", "concurrency", "rate", "rate_end")
+
+    def __init__(self, kind: str, concurrency: int = 0, rate: float = 0.0, rate_end: Optional[float] = None):
+        self.kind = kind
+        self.concurrency = concurrency
+        self.rate = rate
+        self.rate_end = rate if rate_end is None else rate_end
+
+    @property
+    def open_loop(self) -> bool:
+        return self.kind != "closed"
+
+    def arrivals(self, duration: float, rng: random.Random) -> List[float]:
+        """Send offsets (seconds from start) for an open-loop run"""
+        if self.kind == "rate":
+            return [i / self.rate for i in range(1, int(np.ceil(duration * self.rate)))]
+        times, t = [], 0.0
+        while True:
+            if self.kind == "ramp":
+                rate = self.rate + (self.rate_end - self.rate) * min(t / duration, 1.0)
+            else:
+                rate = self.rate
+            step = rng.expovariate(rate) if self.kind == "poisson" else 1.0 / rate
+            t += step
+            if t >= duration:
+                return times
+            times.append(t)
+
+    def info(self) -> dict:
+        if self.kind == "closed":
+            return {"kind": "closed", "concurrency": self.concurrency}
+        if self.kind == "ramp":
+            return {"kind": "ramp", "rateFrom": self.rate, "rateTo": self.rate_end}
+        return {"kind": self.kind, "rate": self.rate}
+
+
+def parse_profile(spec: str) -> Profile:
+    kind, _, value = spec.strip().partition(":")
+    try:
+        if kind == "closed":
+            profile = Profile("closed", concurrency=int(value))
+            valid = profile.concurrency > 0
+        elif kind in ("rate", "poisson"):
+            profile = Profile(kind, rate=float(value))
+            valid = profile.rate > 0
+        elif kind == "ramp":
+            start, _, end = value.partition("-")
+            profile = Profile("ramp", rate=float(start), rate_end=float(end))
+            valid = profile.rate > 0 and profile.rate_end > 0
+        else:
+            valid = False
+    except ValueError:
+        valid = False
+    if not valid:
+        raise ProfileError(f"Bad profile {spec!r}, use closed:<n>, rate:<rps>, poisson:<rps> or ramp:<from>-<to>")
+    return profile
+
+
+class Recorder:
+    """Latencies and outcomes per endpoint name"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.outcomes: Dict[str, Dict[str, int]] = {}
+        self.errors: Dict[str, int] = {}
+        self.dropped: Dict[str, int] = {}
+
+    def record(self, name: str, latency_ms: float, outcome: str, error: bool) -> None:
+        self.latencies.setdefault(name, []).append(latency_ms)
+        counts = self.outcomes.setdefault(name, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+        if error:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def drop(self, name: str) -> None:
+        self.dropped[name] = self.dropped.get(name, 0) + 1
+
+    def summary(self, name: str, elapsed: float) -> dict:
+        latencies = np.asarray(self.latencies.get(name, []), dtype=np.float64)
+        requests = int(latencies.size)
+        errors = self.errors.get(name, 0)
+        out = {
+            "requests": requests,
+            "errors": errors,
+            "dropped": self.dropped.get(name, 0),
+            "errorRate": round(errors / requests, 4) if requests else None,
+            "throughputRps": round(requests / elapsed, 2) if elapsed > 0 else None,
+            "outcomes": dict(sorted(self.outcomes.get(name, {}).items())),
+        }
+        if requests:
+            values = np.percentile(latencies, PERCENTILES)
+            out["latencyMs"] = {
+                **{f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, values)},
+                "mean": round(float(latencies.mean()), 2),
+                "max": round(float(latencies.max()), 2),
+            }
+        else:
+            out["latencyMs"] = None
+        return out
+
+
+async def _send(client: httpx.AsyncClient, endpoint: Endpoint, recorder: Recorder, started: float) -> None:
+    try:
+        response = await client.request(endpoint.method, endpoint.path, params=endpoint.params, json=endpoint.json)
+        await response.aread()
+        outcome, error = str(response.status_code), response.status_code >= 400
+    except httpx.HTTPError as e:
+        outcome, error = f"error:{type(e).__name__}", True
+    recorder.record(endpoint.name, (time.perf_counter() - started) * 1000, outcome, error)
+
+
+async def run_load(
+    endpoints: Sequence[Endpoint],
+    profile: Profile,
+    duration: float,
+    base_url: str = "",
+    client: Optional[httpx.AsyncClient] = None,
+    timeout: float = 10.0,
+    max_in_flight: int = 1000,
+    seed: int = 0,
+    recorder: Optional[Recorder] = None,
+) -> dict:
+    """
+    Drive `endpoints` (picked at random by weight) with `profile` for
+    `duration` seconds and return the report (see build_report).
+    Pass `client` to run against an in-process app (httpx.ASGITransport),
+    and `recorder` to keep the raw latencies (loadtest.benchmarks stores them).
+    """
+    if not endpoints:
+        raise ValueError("No endpoints to load")
+    rng = random.Random(seed)
+    weights = [e.weight for e in endpoints]
+
+    def pick() -> Endpoint:
+        return rng.choices(endpoints, weights)[0]
+
+    own_client = client is None
+    if own_client:
+        limits = httpx.Limits(max_connections=max(profile.concurrency, max_in_flight))
+        client = httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits)
+
+    recorder = Recorder() if recorder is None else recorder
+    started_at = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    try:
+        if profile.open_loop:
+            in_flight = set()
+            for offset in profile.arrivals(duration, rng):
+                delay = t0 + offset - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                endpoint = pick()
+                if len(in_flight) >= max_in_flight:
+                    recorder.drop(endpoint.name)
+                    continue
+                task = asyncio.ensure_future(_send(client, endpoint, recorder, t0 + offset))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if in_flight:
+                await asyncio.gather(*in_flight)
+        else:
+            deadline = t0 + duration
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await _send(client, pick(), recorder, time.perf_counter())
+
+            await asyncio.gather(*(worker() for _ in range(profile.concurrency)))
+    finally:
+        if own_client:
+            await client.aclose()
+
+    elapsed = time.perf_counter() - t0
+    return build_report(endpoints, profile, recorder, started_at, elapsed, base_url)
+
+
+def build_report(
+    endpoints: Sequence[Endpoint], profile: Profile, recorder: Recorder, started_at: datetime, elapsed: float,
+    base_url: str = "",
+) -> dict:
+    per_endpoint = {}
+    for endpoint in endpoints:
+        if endpoint.name not in per_endpoint:
+            per_endpoint[endpoint.name] = {**endpoint.info(), **recorder.summary(endpoint.name, elapsed)}
+
+    total = Recorder()
+    for name, latencies in recorder.latencies.items():
+        total.latencies.setdefault("all", []).extend(latencies)
+        for outcome, count in recorder.outcomes[name].items():
+            total.outcomes.setdefault("all", {})
+            total.outcomes["all"][outcome] = total.outcomes["all"].get(outcome, 0) + count
+    total.errors["all"] = sum(recorder.errors.values())
+    total.dropped["all"] = sum(recorder.dropped.values())
+
+    return {
+        "type": "load",
+        "startedAt": started_at.isoformat(),
+        "baseUrl": base_url,
+        "profile": profile.info(),
+        "durationSec": round(elapsed, 3),
+        "total": total.summary("all", elapsed),
+        "endpoints": per_endpoint,
+    }
+
+
+def default_reports_dir() -> str:
+    """<repo>/test_reports, where the iteration_*.json reports live"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    return os.environ.get("LOAD_REPORTS_DIR") or os.path.join(here, "..", "..", "test_reports")
+
+
+def write_report(report: dict, reports_dir: Optional[str] = None) -> str:
+    """test_reports/load_<UTC timestamp>.json; returns the path"""
+    reports_dir = reports_dir or default_reports_dir()
+    os.makedirs(reports_dir, exist_ok=True)
+    stamp = datetime.fromisoformat(report["startedAt"]).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(reports_dir, f"load_{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    return os.path.normpath(path)
@@ -0,0 +1,318 @@
+"""
+Mock upstream services for the local stack, with latency injection
+
+- parser     twitter parser (5001): /health, POST /search/<kw>, /profile/<u>,
+             /tweets/<u>, /warmth/ping - deterministic fake tweets
+- sentiment  sentiment service (8015): /health, POST /predict, /predict-batch
+- ml         ML service (8002): /health, /api/p35/status, POST
+             /api/p35/predict/market|actor scored with the baseline models
+             from ml_service.models (same math as the real service)
+
+Plain http.server on a thread per connection, so a mock needs nothing
+beyond the stdlib and can sleep to inject latency without blocking the
+others. Latency is per path prefix (longest match):
+
+    LOCAL_STACK_LATENCY="parser:/search=120+40,sentiment=15,ml:/api/p35/predict=3+2!0.01"
+
+reads "<service>[:<prefix>]=<base ms>[+<mean jitter ms>][!<error rate>]";
+jitter is exponential. A running mock can be retuned with
+POST /__mock/latency {"prefix", "baseMs", "jitterMs", "errorRate"};
+GET /__mock/stats returns request counts per route.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from ml_service.models import baseline_actor_model, baseline_market_model, score_actor, score_market
+
+_SPEC = re.compile(r"^(?P<service>\w+)(?::(?P<prefix>/\S*))?=(?P<base>[\d.]+)(?:\+(?P<jitter>[\d.]+))?(?:!(?P<err>[\d.]+))?$")
+
+
+class Latency:
+    __slots__ = ("base_ms", "jitter_ms", "error_rate", "error_status")
+
+    def __init__(self, base_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, error_status: int = 503):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    def sample(self, rng: random.Random) -> float:
+        """Seconds to sleep"""
+        jitter = rng.expovariate(1.0 / self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return (self.base_ms + jitter) / 1000.0
+
+    def info(self) -> dict:
+        return {"baseMs": self.base_ms, "jitterMs": self.jitter_ms, "errorRate": self.error_rate}
+
+
+def parse_latency_spec(spec: str) -> Dict[str, List[Tuple[str, Latency]]]:
+    """LOCAL_STACK_LATENCY -> {service: [(prefix, Latency)]}"""
+    table: Dict[str, List[Tuple[str, Latency]]] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        match = _SPEC.match(item)
+        if not match:
+            raise ValueError(f"Bad latency entry {item!r}, use service[:/prefix]=base[+jitter][!errorRate]")
+        latency = Latency(float(match["base"]), float(match["jitter"] or 0), float(match["err"] or 0))
+        table.setdefault(match["service"], []).append((match["prefix"] or "/", latency))
+    return table
+
+
+Handler = Callable[[re.Match, dict, dict], Tuple[int, dict]]
+
+
+class MockService:
+    """Routes are (method, regex over the path) -> handler(match, query, body) -> (status, json)"""
+
+    def __init__(self, name: str, routes: List[Tuple[str, str, Handler]], seed: int = 0):
+        self.name = name
+        self.routes = [(method, pattern, re.compile(f"^{pattern}$"), handler) for method, pattern, handler in routes]
+        self.latencies: List[Tuple[str, Latency]] = []
+        self.counts: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- latency ----------
+
+    def set_latency(self, prefix: str, latency: Latency) -> None:
+        with self._lock:
+            self.latencies = [(p, l) for p, l in self.latencies if p != prefix] + [(prefix, latency)]
+            self.latencies.sort(key=lambda r: len(r[0]), reverse=True)
+
+    def latency_for(self, path: str) -> Optional[Latency]:
+        for prefix, latency in self.latencies:
+            if path.startswith(prefix):
+                return latency
+        return None
+
+    # ---------- lifecycle ----------
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1] if self._server else 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, port: int = 0) -> "MockService":
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name=f"mock-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ---------- dispatch ----------
+
+    def handle(self, method: str, raw_path: str, body: bytes) -> Tuple[int, dict]:
+        parts = urlsplit(raw_path)
+        path, query = parts.path, {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"ok": False, "error": "invalid JSON"}
+
+        if path == "/__mock/latency" and method == "POST":
+            latency = Latency(float(payload.get("baseMs", 0)), float(payload.get("jitterMs", 0)),
+                              float(payload.get("errorRate", 0)))
+            self.set_latency(payload.get("prefix", "/"), latency)
+            return 200, {"ok": True, "latency": {p: l.info() for p, l in self.latencies}}
+        if path == "/__mock/stats":
+            return 200, {"ok": True, "service": self.name, "counts": dict(self.counts)}
+
+        for route_method, route, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if route_method == method and match:
+                with self._lock:
+                    self.counts[route] = self.counts.get(route, 0) + 1
+                    latency = self.latency_for(path)
+                    delay = latency.sample(self._rng) if latency else 0.0
+                    fail = latency is not None and self._rng.random() < latency.error_rate
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    return latency.error_status, {"ok": False, "error": "injected failure"}
+                return handler(match, query, payload)
+        return 404, {"ok": False, "error": f"{self.name} mock has no route {method} {path}"}
+
+
+def _make_handler(service: MockService):
+    class RequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _dispatch(self, method: str):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            status, payload = service.handle(method, self.path, body)
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def log_message(self, *args):
+            pass
+
+    return RequestHandler
+
+
+# ---------- parser (5001) ----------
+
+def _seed(*parts) -> int:
+    return int(hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:8], 16)
+
+
+def fake_tweets(key: str, limit: int) -> List[dict]:
+    rng = random.Random(_seed(key))
+    base = 1_767_225_600_000  # 2026-01-01, fixed so responses are reproducible
+    return [
+        {
+            "id": str(_seed(key, i)),
+            "text": f"{key} update #{i}",
+            "createdAt": base - i * 60_000,
+            "likes": rng.randint(0, 500),
+            "reposts": rng.randint(0, 100),
+            "replies": rng.randint(0, 50),
+            "views": rng.randint(100, 50_000),
+            "author": {"username": f"user{rng.randint(1, 999)}", "name": "Mock User", "verified": rng.random() < 0.1},
+        }
+        for i in range(limit)
+    ]
+
+
+def parser_service(seed: int = 0) -> MockService:
+    def health(m, q, b):
+        return 200, {"ok": True, "status": "ok", "mock": True}
+
+    def search(m, q, b):
+        return 200, {"ok": True, "data": {"tweets": fake_tweets(m["key"], int(b.get("limit", 20)))}}
+
+    def profile(m, q, b):
+        rng = random.Random(_seed("profile", m["key"]))
+        return 200, {"ok": True, "data": {
+            "username": m["key"], "name": m["key"].title(), "followers": rng.randint(10, 1_000_000),
+            "following": rng.randint(10, 5000), "verified": False,
+        }}
+
+    def tweets(m, q, b):
+        return 200, {"ok": True, "data": {"tweets": fake_tweets("@" + m["key"], int(b.get("limit", 20)))}}
+
+    return MockService("parser", [
+        ("GET", "/health", health),
+        ("POST", "/search/(?P<key>[^/]+)", search),
+        ("POST", "/profile/(?P<key>[^/]+)", profile),
+        ("POST", "/tweets/(?P<key>[^/]+)", tweets),
+        ("POST", "/warmth/ping", health),
+    ], seed)
+
+
+# ---------- sentiment (8015) ----------
+
+_POSITIVE = ("bull", "moon", "up", "pump", "good", "great")
+_NEGATIVE = ("bear", "dump", "down", "rug", "bad", "scam")
+
+
+def fake_sentiment(text: str) -> Tuple[str, float]:
+    words = (text or "").lower()
+    score = sum(w in words for w in _POSITIVE) - sum(w in words for w in _NEGATIVE)
+    if score > 0:
+        return "POSITIVE", min(0.5 + 0.15 * score, 0.99)
+    if score < 0:
+        return "NEGATIVE", min(0.5 - 0.15 * score, 0.99)
+    return "NEUTRAL", 0.5
+
+
+def sentiment_service(seed: int = 0) -> MockService:
+    meta = {"modelVersion": "mock", "mock": True}
+
+    def health(m, q, b):
+        return 200, {"status": "READY", "modelVersion": "mock", "modelPath": None, "tokenizerPath": None,
+                     "loaded": True, "error": None, "mock": True}
+
+    def predict(m, q, b):
+        label, score = fake_sentiment(b.get("text", ""))
+        return 200, {"label": label, "score": score, "meta": {**meta, "latencyMs": 0}}
+
+    def batch(m, q, b):
+        results = []
+        for item in b.get("items", []):
+            label, score = fake_sentiment(item.get("text", ""))
+            results.append({"id": item.get("id"), "label": label, "score": score, "error": None})
+        return 200, {"results": results, "meta": {**meta, "totalItems": len(results), "latencyMs": 0}}
+
+    return MockService("sentiment", [
+        ("GET", "/health", health),
+        ("POST", "/predict", predict),
+        ("POST", "/predict-batch", batch),
+    ], seed)
+
+
+# ---------- ML (8002) ----------
+
+def ml_service(seed: int = 0) -> MockService:
+    market, actor = baseline_market_model(), baseline_actor_model()
+
+    def status(m, q, b):
+        return 200, {"ok": True, "mock": True, "models": {"market": market.info(), "actor": actor.info()}}
+
+    def predict_market(m, q, b):
+        features = b.get("features", {})
+        s = score_market(market, np.array([[float(features.get(f, 0.0)) for f in market.features]]))
+        return 200, {
+            "network": b.get("network"),
+            "timeBucket": b["timeBucket"] if b.get("timeBucket") is not None else int(time.time()) // 3600 * 3600,
+            "pUp": float(s["pUp"][0]),
+            "pDown": float(s["pDown"][0]),
+            "confidence": float(s["confidence"][0]),
+            "mlSignal": {1: "BUY", -1: "SELL", 0: "NEUTRAL"}[int(s["signal"][0])],
+            "modelVersion": market.version,
+        }
+
+    def predict_actor(m, q, b):
+        features = b.get("features", {})
+        s = score_actor(actor, np.array([[float(features.get(f, 0.0)) for f in actor.features]]))
+        return 200, {
+            "network": b.get("network"),
+            "actorId": b.get("actorId"),
+            "label": actor.classes[int(s["label"][0])],
+            "probabilities": {c: float(s["probs"][0, j]) for j, c in enumerate(actor.classes)},
+            "confidence": float(s["confidence"][0]),
+            "modelVersion": actor.version,
+        }
+
+    return MockService("ml", [
+        ("GET", "/health", status),
+        ("GET", "/api/p35/status", status),
+        ("POST", "/api/p35/predict/market", predict_market),
+        ("POST", "/api/p35/predict/actor", predict_actor),
+    ], seed)
+
+
+MOCKS = {"parser": parser_service, "sentiment": sentiment_service, "ml": ml_service}
+DEFAULT_PORTS = {"parser": 5001, "sentiment": 8015, "ml": 8002}
@@ -0,0 +1,119 @@
+"""
+Pytest integration for the benchmark gate
+
+Tests hand their load runs to the session-scoped `benchmarks` fixture:
+
+    def test_hot_endpoints(benchmarks):
+        recorder = Recorder()
+        report = asyncio.run(run_load(endpoints, profile, 20, base_url=BASE_URL, recorder=recorder))
+        benchmarks.add(report, recorder)
+
+At session end the runs are merged, stored (loadtest.benchmarks), compared
+with the baseline, and the session fails if a hot endpoint regressed.
+Sessions that never use the fixture are not affected.
+
+Options: --bench-store DIR, --bench-baseline RUN, --bench-label NAME,
+--bench-tolerance 0.10, --bench-hot name,name
+
+Hermetic stack fixtures (loadtest.stack):
+- mock_services   parser / sentiment / ML mocks on free ports, per test
+- local_stack     mocks + mongo stand-in + gateway + Node for the session;
+                  skipped when a piece cannot run here (StackError)
+"""
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import pytest
+
+from loadtest.benchmarks import DEFAULT_TOLERANCE, BenchmarkStore, compare_runs, format_report, gate_failures
+from loadtest.stack import LocalStack, StackError
+
+
+class BenchmarkSession:
+    def __init__(self):
+        self.reports: List[dict] = []
+        self.latencies: Dict[str, List[float]] = {}
+
+    def add(self, report: dict, recorder) -> None:
+        self.reports.append(report)
+        for name, values in recorder.latencies.items():
+            self.latencies.setdefault(name, []).extend(values)
+
+    def merged_report(self) -> dict:
+        """Endpoint summaries of every run (a later run of the same endpoint wins)"""
+        endpoints = {}
+        for report in self.reports:
+            endpoints.update(report["endpoints"])
+        return {
+            "type": "benchmark",
+            "startedAt": self.reports[0]["startedAt"] if self.reports else datetime.now(timezone.utc).isoformat(),
+            "runs": [{"profile": r["profile"], "durationSec": r["durationSec"], "total": r["total"]}
+                     for r in self.reports],
+            "endpoints": endpoints,
+        }
+
+
+_SESSION = pytest.StashKey[BenchmarkSession]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks", "load benchmark regression gate")
+    group.addoption("--bench-store", default=None, help="benchmark store dir (default test_reports/benchmarks)")
+    group.addoption("--bench-baseline", default=None, help="run id / label to compare with")
+    group.addoption("--bench-label", default=None, help="label for the stored run, e.g. iteration_13")
+    group.addoption("--bench-tolerance", type=float, default=DEFAULT_TOLERANCE)
+    group.addoption("--bench-hot", default="", help="comma-separated hot endpoints (default: by request share)")
+
+
+@pytest.fixture(scope="session")
+def benchmarks(pytestconfig) -> BenchmarkSession:
+    return pytestconfig.stash.setdefault(_SESSION, BenchmarkSession())
+
+
+@pytest.fixture
+def mock_services(tmp_path):
+    """{name: MockService}; latency via service.set_latency(prefix, Latency(...))"""
+    stack = LocalStack(str(tmp_path / "stack"), latency="", canonical_ports=False)
+    try:
+        yield stack.start_mocks()
+    finally:
+        stack.stop()
+
+
+@pytest.fixture(scope="session")
+def local_stack(tmp_path_factory):
+    """Started LocalStack; requests go to local_stack.base_url"""
+    stack = LocalStack(str(tmp_path_factory.mktemp("local_stack")))
+    try:
+        stack.start()
+    except StackError as e:
+        pytest.skip(f"local stack unavailable: {e}")
+    try:
+        yield stack
+    finally:
+        stack.stop()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    bench = session.config.stash.get(_SESSION, None)
+    if bench is None or not bench.reports:
+        return
+    config = session.config
+    store = BenchmarkStore(config.getoption("--bench-store"))
+    run_id = store.save(bench.merged_report(), bench.latencies, config.getoption("--bench-label"))
+    baseline_ref = config.getoption("--bench-baseline") or store.baseline_for(run_id)
+
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    write = reporter.write_line if reporter else print
+    write(f"[benchmarks] stored run {run_id}")
+    if not baseline_ref:
+        write("[benchmarks] no baseline yet, nothing to compare")
+        return
+
+    baseline, current = store.load(baseline_ref), store.load(run_id)
+    hot = [n.strip() for n in config.getoption("--bench-hot").split(",") if n.strip()]
+    rows = compare_runs(baseline, current, config.getoption("--bench-tolerance"), hot or None)
+    for line in format_report(baseline, current, rows).splitlines():
+        write(line)
+    if gate_failures(rows) and session.exitstatus == 0:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
@@ -0,0 +1,275 @@
+"""
+Concurrent runner for API regression checks
+
+A check is `async def check(ctx)` that asserts on responses from
+ctx.client (one pooled httpx.AsyncClient for the whole run). Checks
+belong to groups:
+- parallel groups   (default) independent read-only checks, all in flight
+                    at once, bounded by `concurrency`
+- ordered groups    stateful flows (create -> update -> delete); steps run
+                    one after another and share ctx.state. After a failed
+                    step the rest are skipped, except `always=True` steps
+                    (cleanup)
+
+All groups run concurrently. Groups with the same `lock` (e.g. anything
+that flips the global ML mode) never overlap. Shared setup such as an
+admin login is a resource: computed once per run on first
+`await ctx.use(name)`.
+
+The result has each check's outcome and duration and each group's
+wall-clock time (first start to last finish), so a slow group stands out
+instead of disappearing into the total.
+"""
+import asyncio
+import json
+import os
+import time
+import traceback
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+import httpx
+
+from loadtest.harness import default_reports_dir
+
+CheckFn = Callable[["Context"], Awaitable[None]]
+
+
+class Check:
+    __slots__ = ("name", "fn", "group", "always")
+
+    def __init__(self, name: str, fn: CheckFn, group: "Group", always: bool = False):
+        self.name = name
+        self.fn = fn
+        self.group = group
+        self.always = always
+
+
+class Group:
+    __slots__ = ("name", "ordered", "lock", "checks")
+
+    def __init__(self, name: str, ordered: bool = False, lock: Optional[str] = None):
+        self.name = name
+        self.ordered = ordered
+        self.lock = lock
+        self.checks: List[Check] = []
+
+    def check(self, name: Optional[str] = None, always: bool = False):
+        """Decorator; ordered groups run checks in declaration order"""
+
+        def register(fn: CheckFn) -> CheckFn:
+            self.checks.append(Check(name or fn.__name__, fn, self, always))
+            return fn
+
+        return register
+
+
+class Suite:
+    def __init__(self, name: str):
+        self.name = name
+        self.groups: Dict[str, Group] = {}
+        self.resources: Dict[str, CheckFn] = {}
+
+    def group(self, name: str, ordered: bool = False, lock: Optional[str] = None) -> Group:
+        if name in self.groups:
+            raise ValueError(f"Duplicate group {name!r}")
+        self.groups[name] = Group(name, ordered, lock)
+        return self.groups[name]
+
+    def resource(self, name: Optional[str] = None):
+        """Decorator for shared setup: `async def admin_token(ctx) -> value`"""
+
+        def register(fn):
+            self.resources[name or fn.__name__] = fn
+            return fn
+
+        return register
+
+    def select(self, patterns: Optional[Iterable[str]] = None) -> List[Group]:
+        """Groups whose name equals a pattern or starts with '<pattern>.'"""
+        if not patterns:
+            return list(self.groups.values())
+        patterns = list(patterns)
+        picked = [g for g in self.groups.values() if any(g.name == p or g.name.startswith(p + ".") for p in patterns)]
+        unknown = [p for p in patterns if not any(g.name == p or g.name.startswith(p + ".") for g in picked)]
+        if unknown:
+            raise KeyError(f"Unknown group(s): {', '.join(unknown)}; known: {', '.join(self.groups)}")
+        return picked
+
+
+class Context:
+    """What a check sees: the shared client, per-group state, run-wide resources"""
+
+    def __init__(self, client: httpx.AsyncClient, state: dict, run: "_Run"):
+        self.client = client
+        self.state = state
+        self._run = run
+
+    async def use(self, name: str):
+        return await self._run.resource(name, self)
+
+
+class _Run:
+    def __init__(self, suite: Suite, concurrency: int):
+        self.suite = suite
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.resources: Dict[str, asyncio.Task] = {}
+        self.t0 = time.perf_counter()
+
+    def lock_for(self, group: Group) -> Optional[asyncio.Lock]:
+        return self.locks.setdefault(group.lock, asyncio.Lock()) if group.lock else None
+
+    async def resource(self, name: str, ctx: Context):
+        if name not in self.resources:
+            if name not in self.suite.resources:
+                raise KeyError(f"Unknown resource {name!r}")
+            fresh = Context(ctx.client, {}, self)
+            self.resources[name] = asyncio.ensure_future(self.suite.resources[name](fresh))
+        return await asyncio.shield(self.resources[name])
+
+    def now(self) -> float:
+        return time.perf_counter() - self.t0
+
+
+async def _run_check(check: Check, ctx: Context, run: _Run) -> dict:
+    async with run.semaphore:
+        start = run.now()
+        try:
+            await check.fn(ctx)
+            status, message = "passed", None
+        except AssertionError as e:
+            status, message = "failed", str(e).split("\n")[0] or _assert_line(e)
+        except Exception as e:  # a check that blows up is an error, not a crash of the run
+            status, message = "error", f"{type(e).__name__}: {e}"
+        end = run.now()
+    return {"name": check.name, "status": status, "message": message,
+            "startSec": round(start, 4), "durationMs": round((end - start) * 1000, 2)}
+
+
+def _assert_line(e: AssertionError) -> str:
+    frames = traceback.extract_tb(e.__traceback__)
+    return f"assert at {os.path.basename(frames[-1].filename)}:{frames[-1].lineno}" if frames else "assertion failed"
+
+
+def _skipped(check: Check) -> dict:
+    return {"name": check.name, "status": "skipped", "message": "an earlier step failed",
+            "startSec": None, "durationMs": None}
+
+
+async def _run_group(group: Group, client: httpx.AsyncClient, run: _Run, serial: bool) -> dict:
+    lock = run.lock_for(group)
+    if lock:
+        await lock.acquire()
+    try:
+        start = run.now()
+        state: dict = {}
+        if group.ordered or serial:
+            results, broken = [], False
+            for check in group.checks:
+                if broken and group.ordered and not check.always:
+                    results.append(_skipped(check))
+                    continue
+                result = await _run_check(check, Context(client, state, run), run)
+                broken = broken or result["status"] in ("failed", "error")
+                results.append(result)
+        else:
+            results = list(await asyncio.gather(
+                *(_run_check(c, Context(client, state, run), run) for c in group.checks)
+            ))
+        end = run.now()
+    finally:
+        if lock:
+            lock.release()
+    counts = {s: sum(r["status"] == s for r in results) for s in ("passed", "failed", "error", "skipped")}
+    return {
+        "name": group.name,
+        "ordered": group.ordered,
+        "lock": group.lock,
+        "startSec": round(start, 4),
+        "wallMs": round((end - start) * 1000, 2),
+        "sumMs": round(sum(r["durationMs"] or 0 for r in results), 2),
+        **counts,
+        "checks": results,
+    }
+
+
+async def run_suite(
+    suite: Suite,
+    groups: Optional[Iterable[str]] = None,
+    base_url: str = "",
+    client: Optional[httpx.AsyncClient] = None,
+    concurrency: int = 16,
+    timeout: float = 30.0,
+    serial: bool = False,
+) -> dict:
+    """
+    Run the selected groups and return the report. `serial=True` runs
+    every check one at a time (the old scripts' behaviour) for comparison.
+    Pass `client` to run against an in-process app (httpx.ASGITransport).
+    """
+    selected = suite.select(groups)
+    own_client = client is None
+    if own_client:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        client = httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits)
+
+    run = _Run(suite, 1 if serial else concurrency)
+    started_at = datetime.now(timezone.utc)
+    try:
+        if serial:
+            results = [await _run_group(g, client, run, serial=True) for g in selected]
+        else:
+            results = list(await asyncio.gather(*(_run_group(g, client, run, serial=False) for g in selected)))
+    finally:
+        for task in run.resources.values():
+            task.cancel()
+        if own_client:
+            await client.aclose()
+
+    wall = run.now()
+    totals = {s: sum(g[s] for g in results) for s in ("passed", "failed", "error", "skipped")}
+    return {
+        "type": "api",
+        "suite": suite.name,
+        "startedAt": started_at.isoformat(),
+        "baseUrl": base_url,
+        "mode": "serial" if serial else "concurrent",
+        "concurrency": 1 if serial else concurrency,
+        "wallMs": round(wall * 1000, 2),
+        "sumMs": round(sum(g["sumMs"] for g in results), 2),
+        "total": {"checks": sum(len(g["checks"]) for g in results), **totals},
+        "ok": totals["failed"] == 0 and totals["error"] == 0,
+        "groups": results,
+    }
+
+
+def format_report(report: dict, verbose: bool = False) -> str:
+    icons = {"passed": "ok", "failed": "FAIL", "error": "ERR", "skipped": "skip"}
+    out = [f"{report['suite']} against {report['baseUrl'] or '(in-process)'}  [{report['mode']}]"]
+    for g in sorted(report["groups"], key=lambda g: -g["wallMs"]):
+        kind = "ordered" if g["ordered"] else "parallel"
+        lock = f" lock={g['lock']}" if g["lock"] else ""
+        out.append(f"  {g['name']:28} {g['wallMs']:9.0f}ms wall {g['sumMs']:9.0f}ms sum  "
+                   f"{g['passed']}/{len(g['checks'])} passed  ({kind}{lock})")
+        for c in g["checks"]:
+            if verbose or c["status"] != "passed":
+                took = "" if c["durationMs"] is None else f" {c['durationMs']:.0f}ms"
+                note = f"  {c['message']}" if c["message"] else ""
+                out.append(f"      {icons[c['status']]:4} {c['name']}{took}{note}")
+    t = report["total"]
+    out.append(f"Total: {t['passed']}/{t['checks']} passed, {t['failed']} failed, {t['error']} errors, "
+               f"{t['skipped']} skipped in {report['wallMs']:.0f}ms wall ({report['sumMs']:.0f}ms of checks)")
+    return "\n".join(out)
+
+
+def write_report(report: dict, reports_dir: Optional[str] = None) -> str:
+    """test_reports/api_<UTC timestamp>.json; returns the path"""
+    reports_dir = reports_dir or default_reports_dir()
+    os.makedirs(reports_dir, exist_ok=True)
+    stamp = datetime.fromisoformat(report["startedAt"]).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(reports_dir, f"api_{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    return os.path.normpath(path)
@@ -0,0 +1,265 @@
+"""
+Hermetic local stack: gateway + Node + MongoDB stand-in + mock upstreams
+
+Everything binds to 127.0.0.1 and nothing reads /app/backend/.env, so a
+benchmark measures this box and this code, not a remote preview URL:
+
+- mocks      parser / sentiment / ML (loadtest.mocks) on 5001 / 8015 / 8002,
+             or free ports when those are taken; latency from LOCAL_STACK_LATENCY
+- mongo      LOCAL_STACK_MONGO_URI if set, else a throwaway mongod on a
+             free port with its dbpath in the stack's work dir
+- gateway    `uvicorn server:app` on a free port; it spawns the Node
+             workers itself (GATEWAY_NODE_*), pointed at the mocks and mongo
+             through a generated env file
+
+StackError means a piece cannot run on this box (no mongod, no
+node_modules, no uvicorn); the pytest fixtures turn it into a skip.
+
+    python -m loadtest.stack [--latency SPEC] [--no-gateway]
+
+starts the stack, prints REACT_APP_BACKEND_URL for the API suites and
+python -m loadtest, and runs until interrupted.
+"""
+import argparse
+import importlib.util
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from loadtest.mocks import DEFAULT_PORTS, MOCKS, MockService, parse_latency_spec
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MONGO_DB = "blockview_bench"
+
+
+class StackError(RuntimeError):
+    pass
+
+
+def port_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        return s.connect_ex(("127.0.0.1", port)) != 0
+
+
+def free_port(preferred: int = 0) -> int:
+    """preferred if nothing listens there, else any free port"""
+    if preferred and port_free(preferred):
+        return preferred
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def free_port_range(count: int, start: int = 20000, end: int = 40000) -> int:
+    """First port of `count` consecutive free ports (Node workers use base..base+2n)"""
+    for base in range(start, end, count):
+        if all(port_free(p) for p in range(base, base + count)):
+            return base
+    raise StackError(f"No {count} consecutive free ports in {start}-{end}")
+
+
+def wait_until(check: Callable[[], bool], timeout: float, what: str, interval: float = 0.1) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return
+        except (OSError, httpx.HTTPError):
+            pass
+        time.sleep(interval)
+    raise StackError(f"Timed out after {timeout:.0f}s waiting for {what}")
+
+
+def _stop_process(process: Optional[subprocess.Popen], timeout: float = 10.0) -> None:
+    if process is None or process.poll() is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.wait()
+
+
+class MongoStandIn:
+    def __init__(self, workdir: str, uri: Optional[str] = None):
+        self.workdir = workdir
+        self.uri = uri or os.environ.get("LOCAL_STACK_MONGO_URI") or None
+        self.external = self.uri is not None
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, timeout: float = 30.0) -> str:
+        if self.external:
+            return self.uri
+        mongod = shutil.which("mongod")
+        if not mongod:
+            raise StackError("mongod is not on PATH and LOCAL_STACK_MONGO_URI is not set")
+        port = free_port()
+        dbpath = os.path.join(self.workdir, "mongo")
+        os.makedirs(dbpath, exist_ok=True)
+        log = open(os.path.join(self.workdir, "mongod.log"), "a")
+        self.process = subprocess.Popen(
+            [mongod, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1",
+             "--wiredTigerCacheSizeGB", "0.25", "--nounixsocket", "--quiet"],
+            stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+        )
+        wait_until(lambda: self.process.poll() is None and not port_free(port), timeout, f"mongod on {port}")
+        self.uri = f"mongodb://127.0.0.1:{port}/{MONGO_DB}"
+        return self.uri
+
+    def stop(self) -> None:
+        _stop_process(self.process)
+        self.process = None
+
+
+class LocalStack:
+    def __init__(
+        self,
+        workdir: str,
+        latency: Optional[str] = None,
+        node_workers: int = 1,
+        canonical_ports: bool = True,
+        seed: int = 0,
+    ):
+        self.workdir = workdir
+        self.latency = parse_latency_spec(os.environ.get("LOCAL_STACK_LATENCY", "") if latency is None else latency)
+        self.node_workers = node_workers
+        self.canonical_ports = canonical_ports
+        self.seed = seed
+        self.mocks: Dict[str, MockService] = {}
+        self.mongo = MongoStandIn(workdir)
+        self.gateway: Optional[subprocess.Popen] = None
+        self.gateway_port = 0
+        os.makedirs(workdir, exist_ok=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.gateway_port}"
+
+    # ---------- pieces ----------
+
+    def start_mocks(self) -> Dict[str, MockService]:
+        for name, factory in MOCKS.items():
+            service = factory(self.seed)
+            for prefix, latency in self.latency.get(name, []):
+                service.set_latency(prefix, latency)
+            service.start(free_port(DEFAULT_PORTS[name] if self.canonical_ports else 0))
+            self.mocks[name] = service
+        return self.mocks
+
+    def node_env(self) -> Dict[str, str]:
+        """What Node needs to talk to the stand-ins instead of real services"""
+        parser, sentiment, ml = (self.mocks[n].url for n in ("parser", "sentiment", "ml"))
+        env = {
+            "NODE_ENV": "test",
+            "TWITTER_PARSER_URL": parser,
+            "TWITTER_PARSER_V2_URL": parser,
+            "PARSER_HEALTH_URL": f"{parser}/health",
+            "SENTIMENT_URL": sentiment,
+            "ML_SERVICE_URL": ml,
+        }
+        if self.mongo.uri:
+            env["MONGODB_URI"] = env["MONGO_URL"] = self.mongo.uri
+        return env
+
+    def start_gateway(self, timeout: float = 120.0) -> str:
+        if importlib.util.find_spec("uvicorn") is None:
+            raise StackError("uvicorn is not installed (pip install -r requirements.txt)")
+        if not os.path.isdir(os.path.join(BACKEND_DIR, "node_modules")):
+            raise StackError(f"Node dependencies are missing in {BACKEND_DIR} (yarn install)")
+
+        env_file = os.path.join(self.workdir, "node.env")
+        with open(env_file, "w") as f:
+            for key, value in self.node_env().items():
+                f.write(f"{key}={value}\n")
+
+        self.gateway_port = free_port()
+        env = {
+            **os.environ,
+            **self.node_env(),
+            "GATEWAY_ENV_FILE": env_file,
+            "GATEWAY_NODE_DIR": BACKEND_DIR,
+            "GATEWAY_NODE_LOG_DIR": self.workdir,
+            "GATEWAY_NODE_WORKERS": str(self.node_workers),
+            "GATEWAY_NODE_BASE_PORT": str(free_port_range(2 * self.node_workers)),
+        }
+        log = open(os.path.join(self.workdir, "gateway.log"), "a")
+        self.gateway = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(self.gateway_port)],
+            cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+        )
+
+        def ready() -> bool:
+            if self.gateway.poll() is not None:
+                raise StackError(f"gateway exited with {self.gateway.returncode}, see {self.workdir}/gateway.log")
+            health = httpx.get(f"{self.base_url}/health", timeout=2.0).json()
+            return health.get("node_backend") == "connected"
+
+        wait_until(ready, timeout, "gateway + Node workers", interval=0.5)
+        return self.base_url
+
+    # ---------- whole stack ----------
+
+    def start(self, gateway: bool = True) -> "LocalStack":
+        try:
+            self.start_mocks()
+            self.mongo.start()
+            if gateway:
+                self.start_gateway()
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    def stop(self) -> None:
+        _stop_process(self.gateway)
+        self.gateway = None
+        self.mongo.stop()
+        for service in self.mocks.values():
+            service.stop()
+        self.mocks = {}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.stack", description="Run the hermetic local stack")
+    parser.add_argument("--workdir", default=None, help="logs and mongo data (default: a temp dir)")
+    parser.add_argument("--latency", default=None, help="LOCAL_STACK_LATENCY spec")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--no-gateway", action="store_true", help="mocks and mongo only")
+    args = parser.parse_args(argv)
+
+    stack = LocalStack(args.workdir or tempfile.mkdtemp(prefix="local_stack_"), args.latency, args.workers)
+    try:
+        stack.start(gateway=not args.no_gateway)
+    except StackError as e:
+        print(f"[stack] {e}", file=sys.stderr)
+        return 1
+    for name, service in stack.mocks.items():
+        print(f"[stack] {name:9} {service.url}")
+    print(f"[stack] mongo     {stack.mongo.uri}")
+    if stack.gateway:
+        print(f"export REACT_APP_BACKEND_URL={stack.base_url}")
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stack.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,991 @@
+"""
+Python ML service behind ML_SERVICE_URL (port 8002)
+Run: uvicorn ml_server:app --host 0.0.0.0 --port 8002
+
+Models live in a hot-swappable registry (ml_service/registry.py) and are
+scored as whole NumPy batches:
+- POST /api/p35/predict/market, /api/p35/predict/actor: one row (ml_python_client.ts)
+- POST /api/p35/predict/market/batch, /api/p35/predict/actor/batch: thousands
+  of rows per call, columnar JSON or application/x-ml-batch (see ml_service/batch.py)
+- POST /api/p35/reload: re-resolve versions from disk, or switch/roll back one kind
+- GET /api/drift/<kind>: PSI / KL / KS per feature between two time ranges,
+  from hourly histogram sketches fed by every scored row (ml_service/drift.py);
+  POST /api/drift/<kind>/observe feeds rows that are not scored here
+- GET /api/p35/models/<kind>/export: active model as portable JSON for
+  in-process scoring in Node (ETag = model hash)
+- POST /api/p35/predict/<kind>/dual: active + every registered shadow model on
+  one feature batch, per-model latency (ml_service/shadow.py). The /batch
+  endpoints also score registered shadows on the rows they serve, so the
+  disagreement stats follow live traffic without a second request
+- POST/GET /api/p35/shadows, DELETE /api/p35/shadows/<kind>/<modelId>: shadow set
+- GET /api/p35/shadows/stats: rolling active-vs-shadow disagreement (1h..14d)
+
+v3 shadow training (never touches the served models):
+- POST /api/v3/datasets: upload a labelled dataset (columnar JSON or MLB1)
+- POST /api/v3/evaluate/batch: model ids x dataset ids, memoized per
+  (model hash, dataset hash); POST /api/v3/evaluate is the 1 x 1 case
+- POST /api/v3/datasets/<id>/materialize, GET /api/v3/datasets/<id>[/export]:
+  datasets are kept as memory-mapped columns keyed by content hash
+  (ml_service/columnar.py), so repeat runs never re-read Mongo or JSON
+- POST /api/v3/train: one feature pack / seed (training_executor.service.ts)
+- POST /api/v3/train/batch: feature packs x seeds on a process pool sharing
+  one copy of the dataset; NDJSON, one line per variant as it finishes
+
+Feature engine (ml_service/features.py):
+- POST /api/features/market/bulk: CEX pressure v3 for a whole bucket range
+  in one pass, from posted events or one Mongo scan; optional bulk upsert
+  into feature_market_timeseries
+
+Training jobs (ml_service/jobs.py): submit returns 202 + jobId, then poll
+GET /api/jobs/<id> or stream GET /api/jobs/<id>/events. Results are cached
+by dataset hash + config hash. /train-etap5 and /api/v3/train still answer
+synchronously, but go through the same queue and cache.
+- POST /api/jobs/train-etap5, POST /api/v3/train/jobs: submit
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+from ml_service.batch import BINARY_CONTENT_TYPE, BatchFormatError, decode_binary, decode_json, encode_binary
+from ml_service.models import SIGNAL_NAMES, score_actor, score_market
+from ml_service.columnar import ColumnarCache
+from ml_service.config import env_int, env_str
+from ml_service.datasets import Dataset, DatasetNotFound, DatasetStore
+from ml_service.drift import SketchStore, compare_sketches, drift_level
+from ml_service.evaluation import EvaluationMemo, ModelResolver, evaluate_models, model_hash
+from ml_service.features import FeatureFrameError, exchange_pressure_frame, load_transfers, write_cex_pressure
+from ml_service.jobs import DONE, JobNotFound, QueueFull, TrainingJob, TrainingJobQueue, config_hash
+from ml_service.parallel import ParallelTrainer
+from ml_service.registry import ModelNotFound, ModelRegistry, save_version
+from ml_service.shadow import WINDOWS, DisagreementStats, ShadowError, ShadowSet, compare, score_models, union_features
+from ml_service.training import ETAP5_TRAINER, TrainingError, pack_features, train_etap5, train_variant
+
+ML_MODEL_DIR = env_str("ML_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+ML_MAX_BATCH_ROWS = env_int("ML_MAX_BATCH_ROWS", 200_000)
+ML_MAX_RESIDENT = env_int("ML_MAX_RESIDENT_VERSIONS", 3)
+ML_TRAIN_WORKERS = env_int("ML_TRAIN_WORKERS", os.cpu_count() or 1)
+ML_TRAIN_ITERATIONS = env_int("ML_TRAIN_ITERATIONS", 300)
+ML_DATASET_CACHE_BYTES = env_int("ML_DATASET_CACHE_BYTES", 512 * 1024 * 1024)
+ML_DATASET_DIR = env_str("ML_DATASET_DIR", os.path.join(ML_MODEL_DIR, "datasets"))
+# v3 shadow artifacts: <ML_MODEL_DIR>/v3/<network>/<task>/<version>, outside the registry's view
+ML_SHADOW_DIR = os.path.join(ML_MODEL_DIR, "v3")
+ML_ETAP5_DIR = os.path.join(ML_MODEL_DIR, "etap5")
+ML_FEATURE_MAX_BUCKETS = env_int("ML_FEATURE_MAX_BUCKETS", 50_000)
+ML_FEATURE_VERSION = "V3.0.0-py"
+ML_DRIFT_DIR = env_str("ML_DRIFT_DIR", os.path.join(ML_MODEL_DIR, "drift"))
+ML_JOB_WORKERS = env_int("ML_JOB_WORKERS", 2)
+ML_JOB_QUEUE_DEPTH = env_int("ML_JOB_QUEUE_DEPTH", 32)
+
+app = FastAPI(title="ML Service")
+
+registry = ModelRegistry(ML_MODEL_DIR, max_resident=ML_MAX_RESIDENT)
+datasets = DatasetStore(
+    max_bytes=ML_DATASET_CACHE_BYTES,
+    mongo_uri=os.environ.get("MONGODB_URI"),
+    cache=ColumnarCache(ML_DATASET_DIR),
+)
+trainer = ParallelTrainer(max_workers=ML_TRAIN_WORKERS)
+evaluations = EvaluationMemo(os.path.join(ML_MODEL_DIR, "evaluations"))
+# Shadow models (v3/<network>/<task>/<id>) first, then registry versions
+model_resolver = ModelResolver([os.path.join(ML_SHADOW_DIR, "*"), ML_MODEL_DIR])
+jobs = TrainingJobQueue(os.path.join(ML_MODEL_DIR, "jobs"), workers=ML_JOB_WORKERS, max_depth=ML_JOB_QUEUE_DEPTH)
+sketches = SketchStore(ML_DRIFT_DIR)
+shadows = ShadowSet(os.path.join(ML_MODEL_DIR, "shadow"), model_resolver)
+disagreement = DisagreementStats(os.path.join(ML_MODEL_DIR, "shadow", "disagreement.json"))
+stats = {"single_requests": 0, "batch_requests": 0, "rows_scored": 0, "started_at": time.time()}
+
+
+class MarketPredictRequest(BaseModel):
+    network: str
+    features: Dict[str, float]
+    timeBucket: Optional[int] = None
+
+
+class ActorPredictRequest(BaseModel):
+    network: str
+    actorId: str
+    features: Dict[str, float]
+
+
+class ReloadRequest(BaseModel):
+    kind: Optional[str] = None
+    version: Optional[str] = None
+    rollback: bool = False
+
+
+class ShadowRequest(BaseModel):
+    kind: str
+    modelId: str
+
+
+class TrainRequest(BaseModel):
+    task: str
+    network: str
+    datasetId: str
+    featurePack: str
+    seed: int = 42
+    iterations: Optional[int] = None
+
+
+class EvaluateRequest(BaseModel):
+    task: str
+    modelId: str
+    datasetId: str
+
+
+class EvaluateBatchRequest(BaseModel):
+    task: str
+    modelIds: List[str]
+    datasetIds: List[str]
+
+
+class MarketFeaturesRequest(BaseModel):
+    network: str
+    start: int
+    end: int
+    cexAddresses: List[str]
+    bucketSec: int = 300
+    # {"timestamp": [unix s], "from": [...], "to": [...], "amount"?: [...]}; omitted -> read transfers from Mongo
+    events: Optional[Dict[str, list]] = None
+    write: bool = False
+
+
+class TrainBatchRequest(BaseModel):
+    task: str
+    network: str
+    datasetId: str
+    featurePacks: List[str]
+    seeds: List[int] = [42]
+    iterations: Optional[int] = None
+
+
+@app.on_event("startup")
+async def startup_event():
+    # Serve real artifacts from the first request, not baselines
+    print(f"[ML] Models: {await registry.reload()}")
+    dropped = await asyncio.to_thread(shadows.restore, {kind: registry.active(kind) for kind in ("market", "actor")})
+    print(f"[ML] Shadows: {shadows.ids()}" + (f", dropped {dropped}" if dropped else ""))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await jobs.close()
+    disagreement.flush()
+    if _sketch_writer is not None:
+        await asyncio.gather(_sketch_writer, return_exceptions=True)
+    sketches.flush()
+
+
+def feature_row(features: Dict[str, float], names) -> np.ndarray:
+    # Missing features score as 0, same as the Node feature extractors
+    return np.array([[features.get(name, 0.0) for name in names]], dtype=np.float64)
+
+
+async def read_batch(request: Request):
+    raw = await request.body()
+    if request.headers.get("content-type", "").startswith(BINARY_CONTENT_TYPE):
+        batch = decode_binary(raw)
+    else:
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            raise BatchFormatError("Body is not valid JSON") from None
+        batch = decode_json(payload)
+    return batch
+
+
+def wants_binary(request: Request) -> bool:
+    return BINARY_CONTENT_TYPE in request.headers.get("accept", "")
+
+
+def batch_error(e: Exception) -> JSONResponse:
+    return JSONResponse(status_code=422, content={"ok": False, "error": "BAD_BATCH", "message": str(e)})
+
+
+def too_large(rows: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=413,
+        content={"ok": False, "error": "BATCH_TOO_LARGE", "rows": rows, "limit": ML_MAX_BATCH_ROWS},
+    )
+
+
+def observe_features(kind: str, network: Optional[str], features, X: np.ndarray) -> None:
+    """Scored rows feed the drift sketches of <kind>.<network>"""
+    if sketches.observe(f"{kind}.{network or 'all'}", features, X):
+        persist_sketches()
+
+
+_sketch_writer: Optional[asyncio.Task] = None
+
+
+def persist_sketches() -> None:
+    """Write due sketch windows in a thread; at most one writer at a time"""
+    global _sketch_writer
+    if _sketch_writer is None or _sketch_writer.done():
+        _sketch_writer = asyncio.get_running_loop().create_task(asyncio.to_thread(sketches.persist))
+
+
+def record_shadows(kind: str, active, batch) -> None:
+    """
+    Compare every registered shadow with the active model on a served
+    batch. No-op without shadows; shadows needing a column the batch lacks
+    are skipped, since this must never fail the serving request.
+    """
+    usable = [m for m in shadows.models(kind) if all(f in batch.columns for f in m.features)]
+    if not usable:
+        return
+    models = [active, *usable]
+    features = union_features(models)
+    X = np.nan_to_num(batch.matrix(features), nan=0.0, posinf=0.0, neginf=0.0)
+    scored = score_models(models, X, features)
+    active_probs = scored[0][0]
+    for model, (probs, _) in zip(usable, scored[1:]):
+        disagreement.record(kind, active.version, model.version, compare(active_probs, probs))
+
+
+def model_info() -> dict:
+    return {kind: registry.active(kind).info() for kind in ("market", "actor")}
+
+
+def training_error(status: int, error: str, e: Exception) -> JSONResponse:
+    return JSONResponse(status_code=status, content={"ok": False, "error": error, "message": str(e)})
+
+
+def shadow_version(pack: str, seed: int) -> str:
+    # Same shape as the Node fallback in training_executor.registerModel
+    return f"v3.0_{pack.lower()}_s{seed}_{int(time.time() * 1000)}"
+
+
+async def load_dataset(dataset_id: str) -> Dataset:
+    """From the store, or from Mongo in a thread on first use"""
+    return await asyncio.to_thread(datasets.get, dataset_id)
+
+
+def publish_shadow(network: str, featurePack: str, result: dict) -> dict:
+    """Save a trained variant as a SHADOW artifact (blocking) and build the train response"""
+    model = result["model"]
+    path = save_version(model, os.path.join(ML_SHADOW_DIR, network))
+    return {
+        "modelId": model.version,
+        "version": model.version,
+        "featurePack": featurePack,
+        "metrics": result["metrics"],
+        "confusion": result["confusion"],
+        "featureCount": len(model.features),
+        "features": list(model.features),
+        "trainRows": result["trainRows"],
+        "testRows": result["testRows"],
+        "trainMs": result["trainMs"],
+        "artifactPath": path,
+    }
+
+
+@app.get("/health")
+async def health():
+    return {"service": "python-ml", "status": "ok", "models": model_info()}
+
+
+@app.get("/api/p35/status")
+async def status():
+    return {
+        "ok": True,
+        "models": model_info(),
+        "registry": registry.stats(),
+        "datasets": datasets.stats(),
+        "training": trainer.stats(),
+        "jobs": jobs.stats(),
+        "evaluations": evaluations.stats(),
+        "drift": sketches.stats(),
+        "shadows": {"models": shadows.ids(), "disagreement": disagreement.stats()},
+        "stats": stats,
+    }
+
+
+@app.post("/api/p35/reload")
+async def reload_models(body: Optional[ReloadRequest] = None):
+    """No body: re-read ACTIVE pointers / newest versions for every kind"""
+    body = body or ReloadRequest()
+    try:
+        if body.kind and body.rollback:
+            models = {body.kind: await registry.rollback(body.kind)}
+        elif body.kind and body.version:
+            models = {body.kind: await registry.activate(body.kind, body.version)}
+        else:
+            models = await registry.reload(body.kind)
+    except ModelNotFound as e:
+        return JSONResponse(status_code=404, content={"ok": False, "error": "MODEL_NOT_FOUND", "message": str(e)})
+    return {"ok": True, "models": models}
+
+
+@app.post("/api/p35/predict/market")
+async def predict_market(body: MarketPredictRequest):
+    model = registry.active("market")
+    X = feature_row(body.features, model.features)
+    scores = score_market(model, X)
+    observe_features("market", body.network, model.features, X)
+    stats["single_requests"] += 1
+    stats["rows_scored"] += 1
+    return {
+        "network": body.network,
+        "timeBucket": body.timeBucket if body.timeBucket is not None else int(time.time()) // 3600 * 3600,
+        "pUp": float(scores["pUp"][0]),
+        "pDown": float(scores["pDown"][0]),
+        "confidence": float(scores["confidence"][0]),
+        "mlSignal": SIGNAL_NAMES[int(scores["signal"][0])],
+        "modelVersion": model.version,
+    }
+
+
+@app.post("/api/p35/predict/actor")
+async def predict_actor(body: ActorPredictRequest):
+    model = registry.active("actor")
+    X = feature_row(body.features, model.features)
+    scores = score_actor(model, X)
+    observe_features("actor", body.network, model.features, X)
+    stats["single_requests"] += 1
+    stats["rows_scored"] += 1
+    probs = scores["probs"][0]
+    return {
+        "network": body.network,
+        "actorId": body.actorId,
+        "label": model.classes[int(scores["label"][0])],
+        "probabilities": {cls: float(p) for cls, p in zip(model.classes, probs)},
+        "confidence": float(scores["confidence"][0]),
+        "modelVersion": model.version,
+    }
+
+
+@app.post("/api/p35/predict/market/batch")
+async def predict_market_batch(request: Request):
+    model = registry.active("market")
+    try:
+        batch = await read_batch(request)
+        if batch.rows > ML_MAX_BATCH_ROWS:
+            return too_large(batch.rows)
+        X = batch.matrix(model.features)
+        scores = score_market(model, X)
+    except BatchFormatError as e:
+        return batch_error(e)
+    stats["batch_requests"] += 1
+    stats["rows_scored"] += batch.rows
+
+    network = batch.meta.get("network")
+    observe_features("market", network, model.features, X)
+    record_shadows("market", model, batch)
+    if wants_binary(request):
+        meta = {"network": network, "modelVersion": model.version, "signals": SIGNAL_NAMES}
+        return Response(encode_binary(scores, batch.ids, meta), media_type=BINARY_CONTENT_TYPE)
+    return {
+        "network": network,
+        "count": batch.rows,
+        "modelVersion": model.version,
+        "ids": batch.ids,
+        "pUp": scores["pUp"].tolist(),
+        "pDown": scores["pDown"].tolist(),
+        "confidence": scores["confidence"].tolist(),
+        "mlSignal": [SIGNAL_NAMES[s] for s in scores["signal"].tolist()],
+    }
+
+
+@app.post("/api/p35/predict/actor/batch")
+async def predict_actor_batch(request: Request):
+    model = registry.active("actor")
+    try:
+        batch = await read_batch(request)
+        if batch.rows > ML_MAX_BATCH_ROWS:
+            return too_large(batch.rows)
+        X = batch.matrix(model.features)
+        scores = score_actor(model, X)
+    except BatchFormatError as e:
+        return batch_error(e)
+    stats["batch_requests"] += 1
+    stats["rows_scored"] += batch.rows
+
+    network = batch.meta.get("network")
+    observe_features("actor", network, model.features, X)
+    record_shadows("actor", model, batch)
+    probs = scores["probs"]
+    if wants_binary(request):
+        columns = {f"p_{cls}": probs[:, j] for j, cls in enumerate(model.classes)}
+        columns["confidence"] = scores["confidence"]
+        columns["label"] = scores["label"]
+        meta = {"network": network, "modelVersion": model.version, "classes": list(model.classes)}
+        return Response(encode_binary(columns, batch.ids, meta), media_type=BINARY_CONTENT_TYPE)
+    classes = np.array(model.classes)
+    return {
+        "network": network,
+        "count": batch.rows,
+        "modelVersion": model.version,
+        "classes": list(model.classes),
+        "ids": batch.ids,
+        "label": classes[scores["label"]].tolist(),
+        "probabilities": {cls: probs[:, j].tolist() for j, cls in enumerate(model.classes)},
+        "confidence": scores["confidence"].tolist(),
+    }
+
+
+@app.post("/api/drift/{kind}/observe")
+async def drift_observe(kind: str, request: Request):
+    """Rows scored elsewhere (e.g. Node fallbacks) still count towards drift"""
+    try:
+        batch = await read_batch(request)
+        if batch.rows > ML_MAX_BATCH_ROWS:
+            return too_large(batch.rows)
+        features = list(batch.columns)
+        observe_features(kind, batch.meta.get("network"), features, batch.matrix(features))
+    except BatchFormatError as e:
+        return batch_error(e)
+    return {"ok": True, "rows": batch.rows}
+
+
+def parse_duration(value: str) -> int:
+    """'90m' / '24h' / '7d' -> seconds"""
+    units = {"m": 60, "h": 3600, "d": 86400}
+    if len(value) < 2 or value[-1] not in units or not value[:-1].isdigit():
+        raise ValueError(f"Bad duration {value!r}, use e.g. 24h or 7d")
+    return int(value[:-1]) * units[value[-1]]
+
+
+@app.get("/api/drift/{kind}")
+async def drift_report(
+    kind: str,
+    network: Optional[str] = None,
+    window: str = "24h",
+    baseline: str = "7d",
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    baselineStart: Optional[int] = None,
+    baselineEnd: Optional[int] = None,
+):
+    """
+    Current range vs reference range, merged from window sketches. Default:
+    the last <window> vs the <baseline> before it; explicit unix bounds win.
+    """
+    try:
+        now = int(time.time())
+        end = end if end is not None else now
+        start = start if start is not None else end - parse_duration(window)
+        baselineEnd = baselineEnd if baselineEnd is not None else start
+        baselineStart = baselineStart if baselineStart is not None else baselineEnd - parse_duration(baseline)
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"ok": False, "error": "BAD_RANGE", "message": str(e)})
+
+    stream = f"{kind}.{network or 'all'}"
+    reference, ref_windows = await asyncio.to_thread(sketches.merged, stream, baselineStart, baselineEnd)
+    current, cur_windows = await asyncio.to_thread(sketches.merged, stream, start, end)
+    features = compare_sketches(reference, current) if reference is not None and current is not None else {}
+    psis = [m["psi"] for m in features.values() if m["psi"] is not None]
+    return {
+        "ok": True,
+        "stream": stream,
+        "current": {"start": start, "end": end, "windows": cur_windows, "rows": current.rows if current else 0},
+        "reference": {
+            "start": baselineStart, "end": baselineEnd, "windows": ref_windows, "rows": reference.rows if reference else 0,
+        },
+        "maxPsi": max(psis) if psis else None,
+        "level": drift_level(max(psis)) if psis else None,
+        "features": features,
+    }
+
+
+@app.get("/api/p35/models/{kind}/export")
+async def export_model(kind: str, request: Request):
+    if kind not in ("market", "actor"):
+        return JSONResponse(status_code=404, content={"ok": False, "error": "UNKNOWN_KIND", "message": kind})
+    model = registry.active(kind)
+    etag = f'"{model_hash(model)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse({**model.to_portable(), "hash": etag.strip('"')}, headers={"ETag": etag})
+
+
+def probability_columns(classes, probs: np.ndarray) -> dict:
+    return {cls: np.round(probs[:, j], 4).tolist() for j, cls in enumerate(classes)}
+
+
+@app.post("/api/p35/predict/{kind}/dual")
+async def predict_dual(kind: str, request: Request):
+    """Active model + every registered shadow on one batch"""
+    if kind not in ("market", "actor"):
+        return JSONResponse(status_code=404, content={"ok": False, "error": "UNKNOWN_KIND", "message": kind})
+    # Grab both once: a reload or shadow change mid-request does not mix versions
+    active = registry.active(kind)
+    shadow_models = shadows.models(kind)
+    models = [active, *shadow_models]
+    try:
+        batch = await read_batch(request)
+        if batch.rows > ML_MAX_BATCH_ROWS:
+            return too_large(batch.rows)
+        started = time.perf_counter()
+        features = union_features(models)
+        X = np.nan_to_num(batch.matrix(features), nan=0.0, posinf=0.0, neginf=0.0)
+        feature_ms = (time.perf_counter() - started) * 1000
+    except BatchFormatError as e:
+        return batch_error(e)
+    scored = score_models(models, X, features)
+    observe_features(kind, batch.meta.get("network"), features, X)
+    stats["batch_requests"] += 1
+    stats["rows_scored"] += batch.rows * len(models)
+
+    classes = np.array(active.classes)
+    active_probs, active_ms = scored[0]
+    results = []
+    for model, (probs, latency_ms) in zip(shadow_models, scored[1:]):
+        result = compare(active_probs, probs)
+        disagreement.record(kind, active.version, model.version, result)
+        results.append({
+            "modelVersion": model.version,
+            "latencyMs": round(latency_ms, 3),
+            "label": classes[probs.argmax(axis=1)].tolist(),
+            "probabilities": probability_columns(active.classes, probs),
+            "disagreementRate": round(result["disagree"] / result["rows"], 6) if result["rows"] else 0.0,
+            "meanTvd": round(result["tvdSum"] / result["rows"], 6) if result["rows"] else 0.0,
+        })
+    return {
+        "kind": kind,
+        "network": batch.meta.get("network"),
+        "count": batch.rows,
+        "ids": batch.ids,
+        "classes": list(active.classes),
+        "featureMs": round(feature_ms, 3),
+        "active": {
+            "modelVersion": active.version,
+            "latencyMs": round(active_ms, 3),
+            "label": classes[active_probs.argmax(axis=1)].tolist(),
+            "probabilities": probability_columns(active.classes, active_probs),
+        },
+        "shadows": results,
+    }
+
+
+@app.get("/api/p35/shadows")
+async def list_shadows():
+    return {"ok": True, "shadows": shadows.ids()}
+
+
+@app.post("/api/p35/shadows")
+async def register_shadow(body: ShadowRequest):
+    if body.kind not in ("market", "actor"):
+        return JSONResponse(status_code=404, content={"ok": False, "error": "UNKNOWN_KIND", "message": body.kind})
+    try:
+        model = await asyncio.to_thread(shadows.register, body.kind, body.modelId, registry.active(body.kind))
+    except ModelNotFound as e:
+        return JSONResponse(status_code=404, content={"ok": False, "error": "MODEL_NOT_FOUND", "message": str(e)})
+    except ShadowError as e:
+        return training_error(422, "BAD_SHADOW", e)
+    return {"ok": True, "model": model.info(), "shadows": shadows.ids()}
+
+
+@app.delete("/api/p35/shadows/{kind}/{model_id}")
+async def remove_shadow(kind: str, model_id: str):
+    if not shadows.remove(kind, model_id):
+        return JSONResponse(status_code=404, content={"ok": False, "error": "SHADOW_NOT_FOUND", "message": model_id})
+    return {"ok": True, "shadows": shadows.ids()}
+
+
+@app.get("/api/p35/shadows/stats")
+async def shadow_stats(kind: str = "market", window: Optional[str] = None):
+    """Rolling disagreement per (active, shadow) pair; all windows unless one is named"""
+    if window is None:
+        return {"ok": True, "kind": kind, "windows": disagreement.summary(kind)}
+    if window not in WINDOWS:
+        return JSONResponse(
+            status_code=422, content={"ok": False, "error": "BAD_WINDOW", "message": f"Use one of {list(WINDOWS)}"}
+        )
+    return {"ok": True, "kind": kind, "window": window, "pairs": disagreement.window(kind, WINDOWS[window])}
+
+
+@app.post("/api/v3/datasets")
+async def upload_dataset(request: Request):
+    """Batch body as for /batch predict plus a "label" column; datasetId in the meta or query"""
+    try:
+        batch = await read_batch(request)
+        dataset_id = batch.meta.get("datasetId") or request.query_params.get("datasetId")
+        if not dataset_id:
+            raise BatchFormatError("Missing datasetId (meta or query)")
+        dataset = Dataset.from_batch(str(dataset_id), batch, batch.meta.get("datasetHash"))
+    except BatchFormatError as e:
+        return batch_error(e)
+    await asyncio.to_thread(datasets.put, dataset)
+    return {"ok": True, **dataset.info()}
+
+
+@app.get("/api/v3/datasets/{dataset_id}")
+async def dataset_info(dataset_id: str):
+    try:
+        dataset = await load_dataset(dataset_id)
+    except DatasetNotFound as e:
+        return training_error(404, "DATASET_NOT_FOUND", e)
+    except BatchFormatError as e:
+        return batch_error(e)
+    return {"ok": True, **dataset.info()}
+
+
+@app.post("/api/v3/datasets/{dataset_id}/materialize")
+async def materialize_dataset(dataset_id: str):
+    """Called by the Node dataset builders once a dataset is complete"""
+    started = time.perf_counter()
+    try:
+        dataset = await load_dataset(dataset_id)
+    except DatasetNotFound as e:
+        return training_error(404, "DATASET_NOT_FOUND", e)
+    except BatchFormatError as e:
+        return batch_error(e)
+    return {
+        "ok": True,
+        **dataset.info(),
+        "path": datasets.cache.path(dataset.dataset_hash),
+        "tookMs": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+@app.get("/api/v3/datasets/{dataset_id}/export")
+async def export_dataset(dataset_id: str, format: str = "parquet"):
+    try:
+        dataset = await load_dataset(dataset_id)
+        path = await asyncio.to_thread(datasets.cache.export, dataset.dataset_hash, format)
+    except DatasetNotFound as e:
+        return training_error(404, "DATASET_NOT_FOUND", e)
+    except ValueError as e:
+        # BatchFormatError included
+        return training_error(422, "BAD_EXPORT", e)
+    return FileResponse(path, filename=f"{dataset_id}.{format}", media_type="application/octet-stream")
+
+
+def compute_market_features(body: MarketFeaturesRequest) -> tuple:
+    """Blocking: (frame, rows written)"""
+    mongo_uri = os.environ.get("MONGODB_URI")
+    if body.bucketSec <= 0 or (body.end - body.start) // body.bucketSec > ML_FEATURE_MAX_BUCKETS:
+        raise FeatureFrameError(f"Need bucketSec > 0 and at most {ML_FEATURE_MAX_BUCKETS} buckets")
+    if (body.events is None or body.write) and not mongo_uri:
+        raise FeatureFrameError("MONGODB_URI is not configured")
+    events = body.events
+    if events is None:
+        events = load_transfers(mongo_uri, body.network, body.start, body.end, body.cexAddresses)
+    missing = [k for k in ("timestamp", "from", "to") if k not in events]
+    if missing:
+        raise FeatureFrameError(f"events is missing columns: {missing}")
+    frame = exchange_pressure_frame(
+        events["timestamp"], events["from"], events["to"], body.cexAddresses,
+        body.start, body.end, body.bucketSec, events.get("amount"),
+    )
+    written = write_cex_pressure(mongo_uri, body.network, frame, body.bucketSec, ML_FEATURE_VERSION) if body.write else 0
+    return frame, written
+
+
+@app.post("/api/features/market/bulk")
+async def market_features_bulk(body: MarketFeaturesRequest, request: Request):
+    started = time.perf_counter()
+    try:
+        frame, written = await asyncio.to_thread(compute_market_features, body)
+    except (FeatureFrameError, ValueError, TypeError) as e:
+        return training_error(422, "BAD_FEATURE_REQUEST", e)
+    buckets = frame.index.tolist()
+    if wants_binary(request):
+        meta = {"network": body.network, "bucketSec": body.bucketSec, "written": written}
+        columns = {name: frame[name].to_numpy() for name in frame.columns}
+        return Response(encode_binary(columns, [str(b) for b in buckets], meta), media_type=BINARY_CONTENT_TYPE)
+    return {
+        "ok": True,
+        "network": body.network,
+        "bucketSec": body.bucketSec,
+        "rows": len(frame),
+        "buckets": buckets,
+        "columns": {name: frame[name].tolist() for name in frame.columns},
+        "written": written,
+        "tookMs": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def run_evaluations(task: str, model_ids: List[str], dataset_ids: List[str]) -> dict:
+    """Blocking: resolve, answer from the memo, score the rest one dataset at a time"""
+    started = time.perf_counter()
+    model_ids, dataset_ids = list(dict.fromkeys(model_ids)), list(dict.fromkeys(dataset_ids))
+    models, errors, found = [], [], {}
+    for model_id in model_ids:
+        try:
+            models.append((model_id, *model_resolver.resolve(task, model_id)))
+        except (ModelNotFound, OSError, ValueError, KeyError) as e:
+            errors.append({"modelId": model_id, "error": "MODEL_NOT_FOUND", "message": str(e)})
+
+    computed = 0
+    for dataset_id in dataset_ids:
+        try:
+            dataset = datasets.get(dataset_id)
+        except (DatasetNotFound, BatchFormatError) as e:
+            errors.append({"datasetId": dataset_id, "error": "DATASET_NOT_FOUND", "message": str(e)})
+            continue
+        todo = []
+        for model_id, model, m_hash in models:
+            hit = evaluations.get(m_hash, dataset.dataset_hash)
+            if hit is not None:
+                found[(model_id, dataset_id)] = {**hit, "cached": True}
+            else:
+                todo.append((model_id, model, m_hash))
+        if not todo:
+            continue
+        for (model_id, _, m_hash), result in zip(todo, evaluate_models([m for _, m, _ in todo], dataset)):
+            if "error" in result:
+                errors.append({"modelId": model_id, "datasetId": dataset_id, "error": "BAD_EVALUATION",
+                               "message": result["error"]})
+                continue
+            result = {**result, "modelHash": m_hash, "datasetHash": dataset.dataset_hash}
+            evaluations.put(m_hash, dataset.dataset_hash, result)
+            found[(model_id, dataset_id)] = {**result, "cached": False}
+            computed += 1
+
+    results = [
+        {"modelId": model_id, "datasetId": dataset_id, **found[(model_id, dataset_id)]}
+        for model_id in model_ids
+        for dataset_id in dataset_ids
+        if (model_id, dataset_id) in found
+    ]
+    return {
+        "task": task,
+        "results": results,
+        "errors": errors,
+        "computed": computed,
+        "cached": len(results) - computed,
+        "tookMs": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+@app.post("/api/v3/evaluate")
+async def evaluate(body: EvaluateRequest):
+    """python_ml_v3.client.ts evaluate(): one model on one dataset"""
+    report = await asyncio.to_thread(run_evaluations, body.task, [body.modelId], [body.datasetId])
+    if report["errors"]:
+        error = report["errors"][0]
+        status = 422 if error["error"] == "BAD_EVALUATION" else 404
+        return JSONResponse(status_code=status, content={"ok": False, **error})
+    result = report["results"][0]
+    return {**result, "meta": {"cached": result["cached"], "tookMs": report["tookMs"]}}
+
+
+@app.post("/api/v3/evaluate/batch")
+async def evaluate_batch(body: EvaluateBatchRequest):
+    """Cross product of modelIds x datasetIds; failed pairs are listed in errors"""
+    if not body.modelIds or not body.datasetIds:
+        return training_error(422, "BAD_EVALUATION", ValueError("Need at least one modelId and one datasetId"))
+    return {"ok": True, **await asyncio.to_thread(run_evaluations, body.task, body.modelIds, body.datasetIds)}
+
+
+async def submit_v3_job(body: TrainRequest) -> TrainingJob:
+    dataset = await load_dataset(body.datasetId)
+    features = pack_features(body.featurePack, dataset.feature_names)
+    missing = [f for f in features if f not in dataset.columns]
+    if missing:
+        raise TrainingError(f"Dataset {body.datasetId} is missing features: {missing}")
+    iterations = body.iterations or ML_TRAIN_ITERATIONS
+    cfg = config_hash({
+        "task": body.task, "network": body.network, "featurePack": body.featurePack,
+        "seed": body.seed, "iterations": iterations,
+    })
+
+    def run(report):
+        names = dataset.feature_names
+        result = train_variant(
+            dataset.matrix(names), dataset.labels, names, features, body.seed, body.task,
+            shadow_version(body.featurePack, body.seed), iterations,
+            progress=lambda f: report(0.95 * f, "fitting"),
+        )
+        report(0.97, "saving")
+        return {"ok": True, "seed": body.seed, **publish_shadow(body.network, body.featurePack, result)}
+
+    return jobs.submit("v3", dataset.dataset_hash, cfg, run)
+
+
+def etap5_hashes(payload: dict) -> tuple:
+    """
+    (dataset hash, config hash): taken from the payload when Node sent them.
+    The trainer that really runs is folded into the config hash, so a cached
+    logreg artifact is never served once "lightgbm" means LightGBM.
+    """
+    dataset_hash = payload.get("dataset_hash")
+    if not dataset_hash:
+        digest = hashlib.sha256()
+        for key in ("X_train", "y_train", "sample_weights_train", "X_eval", "y_eval"):
+            digest.update(np.asarray(payload.get(key) or [], dtype=np.float64).tobytes())
+        dataset_hash = digest.hexdigest()
+    cfg = payload.get("config_hash") or config_hash({
+        key: payload.get(key)
+        for key in ("algorithm", "hyperparameters", "class_weight", "horizon", "feature_names")
+    })
+    return dataset_hash, config_hash({"config": cfg, "trainer": ETAP5_TRAINER})
+
+
+async def submit_etap5_job(request: Request) -> TrainingJob:
+    try:
+        payload = json.loads(await request.body())
+    except ValueError:
+        raise TrainingError("Body is not valid JSON") from None
+    if not isinstance(payload, dict):
+        raise TrainingError("Expected a JSON object")
+    missing = [k for k in ("X_train", "y_train", "X_eval", "y_eval", "feature_names") if k not in payload]
+    if missing:
+        raise TrainingError(f"Missing fields: {missing}")
+    dataset_hash, cfg = await asyncio.to_thread(etap5_hashes, payload)
+    return jobs.submit("etap5", dataset_hash, cfg, lambda report: train_etap5(payload, ML_ETAP5_DIR, report))
+
+
+def job_error(e: Exception) -> JSONResponse:
+    if isinstance(e, QueueFull):
+        return JSONResponse(
+            status_code=429,
+            content={"ok": False, "error": "QUEUE_FULL", "message": str(e), "retryAfter": e.retry_after},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    if isinstance(e, (DatasetNotFound, JobNotFound)):
+        return training_error(404, "NOT_FOUND", e)
+    return training_error(422, "BAD_TRAINING_REQUEST", e)
+
+
+def accepted(job: TrainingJob) -> JSONResponse:
+    # Cache hits are already DONE: 200 with the result, otherwise 202 + where to look
+    snapshot = job.snapshot()
+    snapshot.update(ok=True, poll=f"/api/jobs/{job.job_id}", events=f"/api/jobs/{job.job_id}/events")
+    return JSONResponse(status_code=200 if job.status == DONE else 202, content=snapshot)
+
+
+async def finished(job: TrainingJob) -> JSONResponse:
+    job = await jobs.wait(job.job_id)
+    if job.status != DONE:
+        return training_error(500, "TRAINING_FAILED", RuntimeError(job.error))
+    return JSONResponse(content={**job.result, "jobId": job.job_id, "cached": job.cached})
+
+
+@app.post("/api/v3/train")
+async def train(body: TrainRequest):
+    try:
+        job = await submit_v3_job(body)
+    except (DatasetNotFound, TrainingError, BatchFormatError, QueueFull) as e:
+        return job_error(e)
+    return await finished(job)
+
+
+@app.post("/api/v3/train/jobs")
+async def train_job(body: TrainRequest):
+    try:
+        return accepted(await submit_v3_job(body))
+    except (DatasetNotFound, TrainingError, BatchFormatError, QueueFull) as e:
+        return job_error(e)
+
+
+@app.post("/train-etap5")
+async def train_etap5_sync(request: Request):
+    """Legacy blocking call from model_trainer.service.ts"""
+    try:
+        job = await submit_etap5_job(request)
+    except (TrainingError, QueueFull) as e:
+        return job_error(e)
+    return await finished(job)
+
+
+@app.post("/api/jobs/train-etap5")
+async def train_etap5_job(request: Request):
+    try:
+        return accepted(await submit_etap5_job(request))
+    except (TrainingError, QueueFull) as e:
+        return job_error(e)
+
+
+@app.get("/api/jobs")
+async def list_jobs():
+    return {"ok": True, "stats": jobs.stats(), "jobs": [job.snapshot() for job in jobs.recent()]}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    try:
+        return {"ok": True, **jobs.get(job_id).snapshot()}
+    except JobNotFound as e:
+        return job_error(e)
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events: "progress" on every change, then "done" or "failed" """
+    try:
+        jobs.get(job_id)
+    except JobNotFound as e:
+        return job_error(e)
+
+    async def events():
+        async for snapshot in jobs.watch(job_id):
+            name = snapshot["status"].lower() if snapshot["status"] in ("DONE", "FAILED") else "progress"
+            yield f"event: {name}\ndata: {json.dumps(snapshot)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/v3/train/batch")
+async def train_batch(body: TrainBatchRequest):
+    """
+    One NDJSON line per variant in completion order:
+        {"type": "variant", "featurePack", "seed", "ok", ...train response}
+    then {"type": "summary", "variants", "failed", "wallMs", "best"}.
+    Request errors (unknown pack / dataset) fail before streaming starts.
+    """
+    try:
+        dataset = await load_dataset(body.datasetId)
+        specs = [
+            {
+                "featurePack": pack,
+                "features": pack_features(pack, dataset.feature_names),
+                "seed": seed,
+                "version": shadow_version(pack, seed),
+            }
+            for pack in dict.fromkeys(body.featurePacks)
+            for seed in dict.fromkeys(body.seeds)
+        ]
+        if not specs:
+            raise TrainingError("Need at least one feature pack and one seed")
+        missing = sorted({f for spec in specs for f in spec["features"]} - set(dataset.columns))
+        if missing:
+            raise TrainingError(f"Dataset {body.datasetId} is missing features: {missing}")
+    except DatasetNotFound as e:
+        return training_error(404, "DATASET_NOT_FOUND", e)
+    except (TrainingError, BatchFormatError) as e:
+        return training_error(422, "BAD_TRAINING_REQUEST", e)
+
+    async def lines():
+        started = time.perf_counter()
+        best = None
+        failed = 0
+        async for outcome in trainer.run(dataset, specs, body.task, body.iterations or ML_TRAIN_ITERATIONS):
+            spec = outcome["job"]
+            line = {"type": "variant", "featurePack": spec["featurePack"], "seed": spec["seed"]}
+            if "error" in outcome:
+                failed += 1
+                line.update(ok=False, error=outcome["error"])
+            else:
+                line.update(ok=True, **await asyncio.to_thread(
+                    publish_shadow, body.network, spec["featurePack"], outcome["result"],
+                ))
+                if best is None or line["metrics"]["f1"] > best["f1"]:
+                    best = {"modelId": line["modelId"], "featurePack": spec["featurePack"],
+                            "seed": spec["seed"], "f1": line["metrics"]["f1"]}
+            yield json.dumps(line) + "\n"
+        yield json.dumps({
+            "type": "summary",
+            "datasetId": body.datasetId,
+            "datasetHash": dataset.dataset_hash,
+            "variants": len(specs),
+            "failed": failed,
+            "wallMs": round((time.perf_counter() - started) * 1000, 2),
+            "best": best,
+        }) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,4 @@
+"""
+Python ML service (ML_SERVICE_URL, port 8002)
+Vectorized market/actor inference used by src/core/ml/ml_python_client.ts
+"""
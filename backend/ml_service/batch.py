@@ -0,0 +1,128 @@
+"""
+Batch payload codecs for the /batch predict endpoints
+
+Columnar JSON (application/json):
+    {"network": "ethereum", "ids": ["a", "b"],
+     "columns": {"exchangePressure": [0.1, 0.2], ...}}
+
+Compact binary (application/x-ml-batch), little-endian:
+    "MLB1" | u32 rows | u16 cols | u16 flags
+    cols x (u8 name_len, utf-8 name)
+    u32 meta_len, utf-8 JSON meta (e.g. {"network": "ethereum"})
+    cols x rows float32 (column-major; float64 when flags & 2)
+    if flags & 1: u32 ids_len, utf-8 ids joined by "\\n"
+
+Column data is read with np.frombuffer, so decoding a binary batch is a
+header parse plus one zero-copy view. Responses use the same layout.
+"""
+import json
+import struct
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+BINARY_CONTENT_TYPE = "application/x-ml-batch"
+MAGIC = b"MLB1"
+FLAG_IDS = 1
+FLAG_FLOAT64 = 2
+
+_HEADER = struct.Struct("<4sIHH")
+_U32 = struct.Struct("<I")
+
+
+class BatchFormatError(ValueError):
+    """Malformed batch payload (reported as 422)"""
+
+
+class Batch:
+    def __init__(self, columns: Dict[str, np.ndarray], ids: Optional[List[str]] = None, meta: Optional[dict] = None):
+        self.columns = columns
+        self.ids = ids
+        self.meta = meta or {}
+        lengths = {len(v) for v in columns.values()}
+        if len(lengths) > 1:
+            raise BatchFormatError(f"Columns have different lengths: {sorted(lengths)}")
+        self.rows = lengths.pop() if lengths else 0
+        if ids is not None and len(ids) != self.rows:
+            raise BatchFormatError(f"{len(ids)} ids for {self.rows} rows")
+
+    def matrix(self, features: Sequence[str]) -> np.ndarray:
+        """(rows, features) float64 in model column order"""
+        missing = [f for f in features if f not in self.columns]
+        if missing:
+            raise BatchFormatError(f"Missing feature columns: {missing}")
+        X = np.empty((self.rows, len(features)), dtype=np.float64)
+        for j, name in enumerate(features):
+            X[:, j] = self.columns[name]
+        return X
+
+
+def decode_json(payload) -> Batch:
+    if not isinstance(payload, dict) or not isinstance(payload.get("columns"), dict):
+        raise BatchFormatError("Expected {'columns': {name: [values]}}")
+    columns = {}
+    for name, values in payload["columns"].items():
+        try:
+            columns[name] = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise BatchFormatError(f"Column {name!r} is not numeric") from None
+        if columns[name].ndim != 1:
+            raise BatchFormatError(f"Column {name!r} must be a flat list")
+    ids = payload.get("ids")
+    meta = {k: v for k, v in payload.items() if k not in ("columns", "ids")}
+    return Batch(columns, [str(i) for i in ids] if ids is not None else None, meta)
+
+
+def decode_binary(raw: bytes) -> Batch:
+    view = memoryview(raw)
+    try:
+        magic, rows, cols, flags = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise BatchFormatError("Bad magic, expected MLB1")
+        offset = _HEADER.size
+        names = []
+        for _ in range(cols):
+            length = view[offset]
+            offset += 1
+            names.append(bytes(view[offset:offset + length]).decode("utf-8"))
+            offset += length
+        (meta_len,) = _U32.unpack_from(view, offset)
+        offset += _U32.size
+        meta = json.loads(bytes(view[offset:offset + meta_len])) if meta_len else {}
+        offset += meta_len
+
+        dtype = np.dtype("<f8") if flags & FLAG_FLOAT64 else np.dtype("<f4")
+        size = rows * cols * dtype.itemsize
+        if offset + size > len(raw):
+            raise BatchFormatError("Truncated column data")
+        data = np.frombuffer(raw, dtype=dtype, count=rows * cols, offset=offset).reshape(cols, rows)
+        offset += size
+
+        ids = None
+        if flags & FLAG_IDS:
+            (ids_len,) = _U32.unpack_from(view, offset)
+            offset += _U32.size
+            text = bytes(view[offset:offset + ids_len]).decode("utf-8")
+            ids = text.split("\n") if rows else []
+    except BatchFormatError:
+        raise
+    except (struct.error, IndexError, ValueError) as e:
+        raise BatchFormatError(f"Malformed binary batch: {e}") from None
+    return Batch({name: data[j] for j, name in enumerate(names)}, ids, meta)
+
+
+def encode_binary(columns: Dict[str, np.ndarray], ids: Optional[Sequence[str]] = None, meta: Optional[dict] = None) -> bytes:
+    names = list(columns)
+    rows = len(next(iter(columns.values()))) if columns else 0
+    flags = FLAG_IDS if ids is not None else 0
+    parts = [_HEADER.pack(MAGIC, rows, len(names), flags)]
+    for name in names:
+        encoded = name.encode("utf-8")
+        parts.append(bytes([len(encoded)]) + encoded)
+    meta_bytes = json.dumps(meta or {}).encode("utf-8")
+    parts.append(_U32.pack(len(meta_bytes)) + meta_bytes)
+    parts.append(np.stack([np.asarray(columns[n], dtype="<f4") for n in names]).tobytes() if names else b"")
+    if ids is not None:
+        id_bytes = "\n".join(ids).encode("utf-8")
+        parts.append(_U32.pack(len(id_bytes)) + id_bytes)
+    return b"".join(parts)
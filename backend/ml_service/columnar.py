@@ -0,0 +1,148 @@
+"""
+Columnar on-disk cache for training datasets
+
+A dataset is materialized once per content hash:
+    <root>/<dataset_hash>/meta.json      datasetId, rows, features, classes
+    <root>/<dataset_hash>/label.npy      int64 labels
+    <root>/<dataset_hash>/cols/<name>.npy float64, one file per feature
+    <root>/by-id/<datasetId>             holds the hash the id resolves to
+
+Reads open every column with mmap_mode="r": loading a dataset is a few
+page mappings and only the columns a feature pack touches are paged in.
+Raw .npy is kept on purpose, compressed files cannot be mapped. For
+shipping a dataset elsewhere, export() writes Parquet/Feather when
+pyarrow is installed and a compressed .npz otherwise.
+"""
+import json
+import os
+import re
+import shutil
+import time
+from typing import Optional
+
+import numpy as np
+
+from .datasets import Dataset, DatasetNotFound
+
+try:
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+EXPORT_FORMATS = ("parquet", "feather", "npz")
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _safe(name: str) -> str:
+    return _SAFE_NAME.sub("_", name)
+
+
+class ColumnarCache:
+    def __init__(self, root: str):
+        self.root = root
+        self.writes = 0
+        self.reads = 0
+
+    def path(self, dataset_hash: str) -> str:
+        return os.path.join(self.root, _safe(dataset_hash))
+
+    def _pointer(self, dataset_id: str) -> str:
+        return os.path.join(self.root, "by-id", _safe(dataset_id))
+
+    def has(self, dataset_hash: str) -> bool:
+        return os.path.isfile(os.path.join(self.path(dataset_hash), "meta.json"))
+
+    def lookup(self, dataset_id: str) -> Optional[str]:
+        """datasetId -> dataset hash, if it was materialized"""
+        try:
+            with open(self._pointer(dataset_id)) as f:
+                dataset_hash = f.read().strip()
+        except OSError:
+            return None
+        return dataset_hash if dataset_hash and self.has(dataset_hash) else None
+
+    # ---------- write ----------
+
+    def write(self, dataset: Dataset) -> str:
+        """Materialize (no-op when the hash is already on disk) and point the id at it"""
+        path = self.path(dataset.dataset_hash)
+        if not self.has(dataset.dataset_hash):
+            tmp = f"{path}.tmp{os.getpid()}"
+            shutil.rmtree(tmp, ignore_errors=True)
+            os.makedirs(os.path.join(tmp, "cols"))
+            files = {}
+            for name in dataset.feature_names:
+                files[name] = _safe(name) + ".npy"
+                np.save(os.path.join(tmp, "cols", files[name]), np.ascontiguousarray(dataset.columns[name], dtype=np.float64))
+            np.save(os.path.join(tmp, "label.npy"), np.ascontiguousarray(dataset.labels, dtype=np.int64))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({**dataset.info(), "files": files, "writtenAt": time.time()}, f)
+            try:
+                os.replace(tmp, path)
+            except OSError:
+                # Another writer materialized the same hash first; contents are identical
+                shutil.rmtree(tmp, ignore_errors=True)
+            self.writes += 1
+
+        pointer = self._pointer(dataset.dataset_id)
+        os.makedirs(os.path.dirname(pointer), exist_ok=True)
+        with open(pointer + ".tmp", "w") as f:
+            f.write(dataset.dataset_hash)
+        os.replace(pointer + ".tmp", pointer)
+        return path
+
+    # ---------- read ----------
+
+    def read(self, dataset_hash: str, dataset_id: Optional[str] = None) -> Dataset:
+        path = self.path(dataset_hash)
+        try:
+            with open(os.path.join(path, "meta.json")) as f:
+                meta = json.load(f)
+        except OSError:
+            raise DatasetNotFound(f"Dataset {dataset_hash} is not materialized") from None
+        columns = {
+            name: np.load(os.path.join(path, "cols", filename), mmap_mode="r")
+            for name, filename in meta["files"].items()
+        }
+        labels = np.load(os.path.join(path, "label.npy"), mmap_mode="r")
+        self.reads += 1
+        return Dataset(dataset_id or meta["datasetId"], columns, labels, dataset_hash=dataset_hash)
+
+    def read_id(self, dataset_id: str) -> Dataset:
+        dataset_hash = self.lookup(dataset_id)
+        if dataset_hash is None:
+            raise DatasetNotFound(f"Dataset {dataset_id} is not materialized")
+        return self.read(dataset_hash, dataset_id)
+
+    # ---------- export ----------
+
+    def export(self, dataset_hash: str, fmt: str = "parquet") -> str:
+        """Compressed single-file copy next to the columns; returns its path"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if fmt != "npz" and pyarrow is None:
+            raise ValueError(f"{fmt} export needs pyarrow; use npz")
+        dataset = self.read(dataset_hash)
+        target = os.path.join(self.path(dataset_hash), f"dataset.{fmt}")
+        if os.path.isfile(target):
+            return target
+
+        columns = {name: np.asarray(dataset.columns[name]) for name in dataset.feature_names}
+        columns["label"] = np.asarray(dataset.labels)
+        tmp = target + ".tmp"
+        if fmt == "npz":
+            with open(tmp, "wb") as f:
+                np.savez_compressed(f, **columns)
+        else:
+            table = pyarrow.table(columns)
+            if fmt == "parquet":
+                pyarrow.parquet.write_table(table, tmp, compression="zstd")
+            else:
+                pyarrow.feather.write_feather(table, tmp, compression="zstd")
+        os.replace(tmp, target)
+        return target
+
+    def stats(self) -> dict:
+        return {"root": self.root, "writes": self.writes, "reads": self.reads, "pyarrow": pyarrow is not None}
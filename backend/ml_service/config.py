@@ -0,0 +1,17 @@
+"""
+Environment helpers for ML service settings
+All ML service knobs (ML_*) are plain env vars with sane defaults
+"""
+import os
+
+
+def env_str(name: str, default: str) -> str:
+    value = os.environ.get(name)
+    return value.strip() if value and value.strip() else default
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
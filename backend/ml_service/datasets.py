@@ -0,0 +1,171 @@
+"""
+Training datasets for the v3 endpoints
+
+A dataset is a set of numeric feature columns plus an integer label per
+row. They arrive either uploaded (POST /api/v3/datasets, columnar JSON or
+MLB1 with a "label" column) or are read once from Mongo
+(dataset_market_v3, filtered by datasetId) and kept in a small LRU.
+With a ColumnarCache attached, every dataset is also materialized to disk
+by content hash, and later lookups map those files instead of asking
+Mongo again (see columnar.py).
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from .batch import Batch, BatchFormatError
+
+LABEL_COLUMN = "label"
+# dataset_market_v3 fields that are metadata, not features
+NON_FEATURE_FIELDS = {"_id", "network", "bucketTs", "timestamp", "datasetId", "version", "createdAt", "updatedAt", "__v"}
+
+
+class DatasetNotFound(LookupError):
+    """No dataset with that id is loaded or stored"""
+
+
+class Dataset:
+    def __init__(
+        self,
+        dataset_id: str,
+        columns: Dict[str, np.ndarray],
+        labels: np.ndarray,
+        dataset_hash: Optional[str] = None,
+    ):
+        self.dataset_id = dataset_id
+        self.columns = {name: np.asarray(values, dtype=np.float64) for name, values in columns.items()}
+        self.labels = np.asarray(labels)
+        self.rows = len(self.labels)
+        for name, values in self.columns.items():
+            if len(values) != self.rows:
+                raise BatchFormatError(f"Column {name!r} has {len(values)} rows, labels have {self.rows}")
+        self.dataset_hash = dataset_hash or self.content_hash()
+        self.created_at = time.time()
+
+    @classmethod
+    def from_batch(cls, dataset_id: str, batch: Batch, dataset_hash: Optional[str] = None) -> "Dataset":
+        if LABEL_COLUMN not in batch.columns:
+            raise BatchFormatError(f"Dataset needs a {LABEL_COLUMN!r} column")
+        columns = {k: v for k, v in batch.columns.items() if k != LABEL_COLUMN}
+        labels = np.asarray(batch.columns[LABEL_COLUMN])
+        if np.any(labels != np.round(labels)):
+            raise BatchFormatError("Labels must be integer class ids")
+        return cls(dataset_id, columns, labels.astype(np.int64), dataset_hash)
+
+    @property
+    def feature_names(self) -> list:
+        return sorted(self.columns)
+
+    def matrix(self, features: Sequence[str]) -> np.ndarray:
+        missing = [f for f in features if f not in self.columns]
+        if missing:
+            raise BatchFormatError(f"Dataset {self.dataset_id} is missing features: {missing}")
+        return np.column_stack([self.columns[f] for f in features]) if features else np.empty((self.rows, 0))
+
+    def content_hash(self) -> str:
+        digest = hashlib.sha256()
+        for name in self.feature_names:
+            digest.update(name.encode("utf-8"))
+            digest.update(np.ascontiguousarray(self.columns[name]).tobytes())
+        digest.update(np.ascontiguousarray(self.labels, dtype=np.int64).tobytes())
+        return digest.hexdigest()
+
+    def info(self) -> dict:
+        return {
+            "datasetId": self.dataset_id,
+            "datasetHash": self.dataset_hash,
+            "rows": self.rows,
+            "features": self.feature_names,
+            "classes": np.unique(self.labels).tolist(),
+        }
+
+
+def load_mongo_dataset(uri: str, dataset_id: str, label_field: str = LABEL_COLUMN) -> Dataset:
+    """Read dataset_market_v3 rows for datasetId (blocking; call in a thread)"""
+    from pymongo import MongoClient
+
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    try:
+        db = client.get_default_database("test")
+        docs = list(db["dataset_market_v3"].find({"datasetId": dataset_id}).sort("bucketTs", 1))
+    finally:
+        client.close()
+    if not docs:
+        raise DatasetNotFound(f"No rows for datasetId {dataset_id}")
+
+    labelled = [d for d in docs if isinstance(d.get(label_field), (int, float))]
+    if not labelled:
+        raise BatchFormatError(f"Dataset {dataset_id} rows have no numeric {label_field!r} field")
+    names = sorted({
+        k for d in labelled for k, v in d.items()
+        if k not in NON_FEATURE_FIELDS and k != label_field and isinstance(v, (int, float)) and not isinstance(v, bool)
+    })
+    columns = {name: np.array([d.get(name) or 0.0 for d in labelled], dtype=np.float64) for name in names}
+    labels = np.array([int(d[label_field]) for d in labelled], dtype=np.int64)
+    return Dataset(dataset_id, columns, labels)
+
+
+def is_mapped(array: np.ndarray) -> bool:
+    return isinstance(array, np.memmap) or isinstance(array.base, np.memmap)
+
+
+def resident_bytes(array: np.ndarray) -> int:
+    """Heap bytes; memory-mapped columns are page cache, not counted"""
+    return 0 if is_mapped(array) else array.nbytes
+
+
+class DatasetStore:
+    """datasetId -> Dataset, LRU bounded by resident bytes; columnar cache, then Mongo"""
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, mongo_uri: Optional[str] = None, cache=None):
+        self.max_bytes = max_bytes
+        self.mongo_uri = mongo_uri
+        self.cache = cache
+        self._datasets: "OrderedDict[str, Dataset]" = OrderedDict()
+
+    def put(self, dataset: Dataset) -> None:
+        """Blocking when a cache is attached (writes the columns once per hash)"""
+        if self.cache is not None and not is_mapped(dataset.labels):
+            # Serve the mapped copy so the heap copy can be dropped
+            self.cache.write(dataset)
+            dataset = self.cache.read(dataset.dataset_hash, dataset.dataset_id)
+        self._datasets[dataset.dataset_id] = dataset
+        self._datasets.move_to_end(dataset.dataset_id)
+        while len(self._datasets) > 1 and self.bytes > self.max_bytes:
+            self._datasets.popitem(last=False)
+
+    def get(self, dataset_id: str, label_field: str = LABEL_COLUMN) -> Dataset:
+        """Blocking when the dataset has to come from disk or Mongo"""
+        dataset = self._datasets.get(dataset_id)
+        if dataset is not None:
+            self._datasets.move_to_end(dataset_id)
+            return dataset
+        if self.cache is not None:
+            dataset_hash = self.cache.lookup(dataset_id)
+            if dataset_hash is not None:
+                dataset = self.cache.read(dataset_hash, dataset_id)
+                self._datasets[dataset_id] = dataset
+                return dataset
+        if not self.mongo_uri:
+            raise DatasetNotFound(f"Dataset {dataset_id} is not loaded")
+        dataset = load_mongo_dataset(self.mongo_uri, dataset_id, label_field)
+        self.put(dataset)
+        return dataset
+
+    @property
+    def bytes(self) -> int:
+        return sum(
+            sum(resident_bytes(c) for c in d.columns.values()) + resident_bytes(d.labels)
+            for d in self._datasets.values()
+        )
+
+    def stats(self) -> dict:
+        return {
+            "datasets": list(self._datasets),
+            "bytes": self.bytes,
+            "maxBytes": self.max_bytes,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
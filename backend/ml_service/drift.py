@@ -0,0 +1,295 @@
+"""
+Streaming feature drift from mergeable histogram sketches
+
+Every feature row the service scores (or that is posted to
+/api/drift/<kind>/observe) updates a per-feature histogram. The bins are
+fixed and shared by every sketch: 1000 bins of width 0.05 on a signed
+log1p scale over [-25, 25], plus underflow / overflow. On that scale,
+values in [-1, 1] (pressures, scores) get ~40 bins, and USD flows up to
+e^25 stay in range. Because the bins never change, two sketches merge by
+adding their counts.
+
+Sketches are kept per stream (<kind>.<network>) and per hourly window,
+and written as <root>/<stream>/<window start>.npz. Drift over any range
+is answered by summing the windows in it, so memory and time depend on
+the number of windows and features, never on the number of samples.
+
+- PSI and KL use 10 groups cut at the reference deciles
+- KS is the largest CDF gap over the fine bins (accurate to one bin)
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SKETCH_RANGE = 25.0
+SKETCH_BIN_WIDTH = 0.05
+N_BINS = int(round(2 * SKETCH_RANGE / SKETCH_BIN_WIDTH))
+TOTAL_BINS = N_BINS + 2  # [underflow, bins..., overflow]
+WINDOW_SEC = 3600
+FLUSH_INTERVAL_SEC = 60
+PSI_GROUPS = 10
+PSI_MEDIUM = 0.1
+PSI_HIGH = 0.25
+EPSILON = 1e-6
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def bin_index(X: np.ndarray) -> np.ndarray:
+    """Raw values -> sketch bin (0 = underflow, TOTAL_BINS - 1 = overflow); NaN -> -1"""
+    X = np.asarray(X, dtype=np.float64)
+    t = np.sign(X) * np.log1p(np.abs(X))
+    with np.errstate(invalid="ignore"):
+        idx = np.floor((t + SKETCH_RANGE) / SKETCH_BIN_WIDTH) + 1
+        idx = np.clip(idx, 0, TOTAL_BINS - 1)
+    return np.nan_to_num(idx, nan=-1.0).astype(np.int64)
+
+
+class Sketch:
+    """Per-feature fixed-bin histograms plus count / sum / sum of squares"""
+
+    def __init__(self, features: Sequence[str], counts=None, moments=None, missing=None):
+        self.features = tuple(features)
+        n = len(self.features)
+        self.counts = np.zeros((n, TOTAL_BINS), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        # [sum, sum of squares] of the finite values
+        self.moments = np.zeros((n, 2)) if moments is None else np.asarray(moments, dtype=np.float64)
+        self.missing = np.zeros(n, dtype=np.int64) if missing is None else np.asarray(missing, dtype=np.int64)
+
+    @property
+    def rows(self) -> int:
+        return int(self.counts[0].sum() + self.missing[0]) if self.features else 0
+
+    def update(self, X: np.ndarray) -> None:
+        """X: (rows, features) in self.features order"""
+        X = np.asarray(X, dtype=np.float64)
+        n_features = len(self.features)
+        idx = bin_index(X)
+        valid = idx >= 0
+        flat = (idx + np.arange(n_features)[None, :] * TOTAL_BINS)[valid]
+        self.counts += np.bincount(flat, minlength=n_features * TOTAL_BINS).reshape(n_features, TOTAL_BINS)
+        self.missing += (~valid).sum(axis=0)
+        finite = np.where(np.isfinite(X), X, 0.0)
+        self.moments[:, 0] += finite.sum(axis=0)
+        self.moments[:, 1] += (finite * finite).sum(axis=0)
+
+    def copy(self) -> "Sketch":
+        return Sketch(self.features, self.counts.copy(), self.moments.copy(), self.missing.copy())
+
+    def merge(self, other: "Sketch") -> "Sketch":
+        """New sketch over the union of both feature sets"""
+        features = tuple(OrderedDict.fromkeys(self.features + other.features))
+        merged = Sketch(features)
+        for sketch in (self, other):
+            rows = [features.index(f) for f in sketch.features]
+            merged.counts[rows] += sketch.counts
+            merged.moments[rows] += sketch.moments
+            merged.missing[rows] += sketch.missing
+        return merged
+
+    def feature(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        j = self.features.index(name)
+        return self.counts[j], self.moments[j]
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, features=np.array(self.features), counts=self.counts, moments=self.moments, missing=self.missing)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Sketch":
+        with np.load(path, allow_pickle=False) as data:
+            return cls([str(f) for f in data["features"]], data["counts"], data["moments"], data["missing"])
+
+
+def drift_level(psi: float) -> str:
+    return "HIGH" if psi >= PSI_HIGH else "MEDIUM" if psi >= PSI_MEDIUM else "LOW"
+
+
+def compare_counts(reference: np.ndarray, current: np.ndarray) -> dict:
+    """PSI / KL(current || reference) / KS between two histograms on the sketch bins"""
+    ref_total, cur_total = reference.sum(), current.sum()
+    if ref_total == 0 or cur_total == 0:
+        return {"psi": None, "kl": None, "ks": None}
+    ref_cdf = np.cumsum(reference) / ref_total
+    cur_cdf = np.cumsum(current) / cur_total
+    ks = float(np.abs(ref_cdf - cur_cdf).max())
+
+    # Group fine bins at the reference deciles
+    before = np.concatenate([[0.0], ref_cdf[:-1]])
+    group = np.minimum((before * PSI_GROUPS).astype(np.int64), PSI_GROUPS - 1)
+    ref_p = np.bincount(group, weights=reference, minlength=PSI_GROUPS) / ref_total
+    cur_p = np.bincount(group, weights=current, minlength=PSI_GROUPS) / cur_total
+    ref_p, cur_p = np.maximum(ref_p, EPSILON), np.maximum(cur_p, EPSILON)
+    psi = float(((cur_p - ref_p) * np.log(cur_p / ref_p)).sum())
+    kl = float((cur_p * np.log(cur_p / ref_p)).sum())
+    return {"psi": round(psi, 6), "kl": round(kl, 6), "ks": round(ks, 6)}
+
+
+def compare_sketches(reference: Sketch, current: Sketch) -> Dict[str, dict]:
+    """Per feature present in both sketches"""
+    out = {}
+    for name in reference.features:
+        if name not in current.features:
+            continue
+        ref_counts, ref_moments = reference.feature(name)
+        cur_counts, cur_moments = current.feature(name)
+        metrics = compare_counts(ref_counts, cur_counts)
+        ref_rows, cur_rows = int(ref_counts.sum()), int(cur_counts.sum())
+        metrics.update({
+            "referenceRows": ref_rows,
+            "currentRows": cur_rows,
+            "referenceMean": round(float(ref_moments[0] / ref_rows), 6) if ref_rows else None,
+            "currentMean": round(float(cur_moments[0] / cur_rows), 6) if cur_rows else None,
+            "level": drift_level(metrics["psi"]) if metrics["psi"] is not None else None,
+        })
+        out[name] = metrics
+    return out
+
+
+class SketchStore:
+    """
+    Open (current) windows live in memory; closed windows are read back
+    from disk through a small LRU. observe() runs on the scoring path and
+    never touches the disk: ended windows wait in _pending and persist()
+    writes them (and, every FLUSH_INTERVAL_SEC, the open ones) off the
+    event loop. One lock guards the in-memory windows, so readers in other
+    threads get copies instead of arrays that are being updated.
+    """
+
+    def __init__(self, root: str, window_sec: int = WINDOW_SEC, max_cached: int = 256):
+        self.root = root
+        self.window_sec = window_sec
+        self.max_cached = max_cached
+        self._open: Dict[Tuple[str, int], Sketch] = {}
+        self._pending: Dict[Tuple[str, int], Sketch] = {}
+        self._closed: "OrderedDict[Tuple[str, int], Sketch]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._flushed_at = time.time()
+        self.observed_rows = 0
+
+    def _dir(self, stream: str) -> str:
+        return os.path.join(self.root, _SAFE_NAME.sub("_", stream))
+
+    def _path(self, stream: str, window_start: int) -> str:
+        return os.path.join(self._dir(stream), f"{window_start}.npz")
+
+    def observe(self, stream: str, features: Sequence[str], X: np.ndarray, now: Optional[float] = None) -> bool:
+        """Add scored rows; True when windows are due to be written (call persist())"""
+        now = time.time() if now is None else now
+        window_start = int(now) // self.window_sec * self.window_sec
+        key = (stream, window_start)
+        with self._lock:
+            sketch = self._open.get(key)
+            if sketch is not None and sketch.features == tuple(features):
+                sketch.update(X)
+            else:
+                # First rows of the window, or a new feature layout (model switch)
+                part = Sketch(features)
+                part.update(X)
+                self._open[key] = part if sketch is None else sketch.merge(part)
+            self.observed_rows += len(X)
+
+            # Windows of this stream that ended are final: hand them to persist()
+            for old in [k for k in self._open if k[0] == stream and k[1] < window_start]:
+                self._pending[old] = self._open.pop(old)
+            return bool(self._pending) or now - self._flushed_at >= FLUSH_INTERVAL_SEC
+
+    def _write(self, key: Tuple[str, int], sketch: Sketch) -> None:
+        os.makedirs(self._dir(key[0]), exist_ok=True)
+        sketch.save(self._path(*key))
+
+    def persist(self, now: Optional[float] = None, force: bool = False) -> int:
+        """
+        Blocking; run in a thread. Writes ended windows, plus copies of the
+        open ones when the flush interval passed (or force). Returns the
+        number of windows written.
+        """
+        with self._persist_lock:
+            with self._lock:
+                now = time.time() if now is None else now
+                due = dict(self._pending)
+                if force or now - self._flushed_at >= FLUSH_INTERVAL_SEC:
+                    due.update((key, sketch.copy()) for key, sketch in self._open.items())
+                    self._flushed_at = now
+            written = 0
+            for key, sketch in due.items():
+                try:
+                    self._write(key, sketch)
+                except OSError as e:
+                    print(f"[Drift] Failed to write {key[0]}@{key[1]}: {e}")
+                    continue
+                written += 1
+                with self._lock:
+                    if self._pending.get(key) is sketch:
+                        del self._pending[key]
+            return written
+
+    def flush(self, now: Optional[float] = None) -> None:
+        """Write every window now (shutdown, tests)"""
+        self.persist(now, force=True)
+
+    def windows(self, stream: str) -> List[int]:
+        on_disk = set()
+        if os.path.isdir(self._dir(stream)):
+            for entry in os.listdir(self._dir(stream)):
+                name = entry[:-4] if entry.endswith(".npz") else ""
+                if name.isdigit():
+                    on_disk.add(int(name))
+        with self._lock:
+            live = {start for s, start in [*self._open, *self._pending] if s == stream}
+        return sorted(on_disk | live)
+
+    def _window(self, stream: str, window_start: int) -> Optional[Sketch]:
+        key = (stream, window_start)
+        with self._lock:
+            live = self._open.get(key)
+            if live is None:
+                live = self._pending.get(key)
+            if live is not None:
+                return live.copy()
+            sketch = self._closed.get(key)
+            if sketch is not None:
+                self._closed.move_to_end(key)
+                return sketch
+        try:
+            sketch = Sketch.load(self._path(stream, window_start))
+        except (OSError, ValueError, KeyError):
+            return None
+        with self._lock:
+            self._closed[key] = sketch
+            while len(self._closed) > self.max_cached:
+                self._closed.popitem(last=False)
+        return sketch
+
+    def merged(self, stream: str, start: int, end: int) -> Tuple[Optional[Sketch], int]:
+        """(sum of the windows starting in [start, end), number of windows); thread-safe"""
+        merged, used = None, 0
+        for window_start in self.windows(stream):
+            if start <= window_start < end:
+                sketch = self._window(stream, window_start)
+                if sketch is not None:
+                    merged = sketch if merged is None else merged.merge(sketch)
+                    used += 1
+        return merged, used
+
+    def streams(self) -> List[str]:
+        with self._lock:
+            names = {s for s, _ in [*self._open, *self._pending]}
+        if os.path.isdir(self.root):
+            names.update(e for e in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, e)))
+        return sorted(names)
+
+    def stats(self) -> dict:
+        return {
+            "root": self.root,
+            "openWindows": len(self._open),
+            "pendingWindows": len(self._pending),
+            "cachedWindows": len(self._closed),
+            "observedRows": self.observed_rows,
+        }
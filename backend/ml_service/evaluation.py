@@ -0,0 +1,159 @@
+"""
+Batched model evaluation with a persistent memo
+
+evaluate_models() scores many models on one dataset: the feature matrix
+is built once per feature layout, models that share it are stacked into
+one (features, models x classes) weight matrix, and every confusion
+matrix comes out of a single bincount. Rows are processed in chunks so
+memory stays flat on large datasets.
+
+Results are memoized per (model hash, dataset hash) in memory and as one
+JSON file each under <root>/<model hash>/<dataset hash>.json. Both hashes
+are content hashes, so a retrained model or rebuilt dataset never hits
+a stale entry, and the same pair evaluated again costs a file read.
+"""
+import glob
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .datasets import Dataset
+from .models import LinearModel
+from .registry import ModelNotFound, load_version_dir
+from .training import classification_metrics
+
+CHUNK_ROWS = 65536
+
+
+class EvaluationError(ValueError):
+    """Model and dataset cannot be compared (e.g. unknown label classes)"""
+
+
+def model_hash(model: LinearModel) -> str:
+    """Content hash of what determines predictions, not of the file layout"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([list(model.features), list(model.classes)]).encode("utf-8"))
+    for array in (model.weights, model.bias, model.log_scale):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def class_index(labels: np.ndarray, classes: Sequence[str]) -> np.ndarray:
+    """Dataset label values -> model class positions"""
+    lookup = {c: j for j, c in enumerate(classes)}
+    values, inverse = np.unique(np.asarray(labels), return_inverse=True)
+    mapped = np.array([lookup.get(str(v), -1) for v in values.tolist()], dtype=np.int64)
+    if (mapped < 0).any():
+        unknown = [v for v, m in zip(values.tolist(), mapped) if m < 0]
+        raise EvaluationError(f"Labels {unknown} are not classes of the model {list(classes)}")
+    return mapped[inverse]
+
+
+def summarize(cm: np.ndarray) -> dict:
+    result = {"rows": int(cm.sum()), **classification_metrics(cm), "confusionMatrix": cm.tolist()}
+    if cm.shape == (2, 2):
+        result["confusion"] = {
+            "tp": int(cm[1, 1]), "fp": int(cm[0, 1]), "tn": int(cm[0, 0]), "fn": int(cm[1, 0]),
+        }
+    return result
+
+
+def evaluate_models(models: Sequence[LinearModel], dataset: Dataset) -> List[dict]:
+    """One result per model, in order; {"error": str} where a pair cannot be scored"""
+    results: List[Optional[dict]] = [None] * len(models)
+    groups: Dict[tuple, List[int]] = {}
+    for i, model in enumerate(models):
+        groups.setdefault((model.features, model.classes, model.log_scale.tobytes()), []).append(i)
+
+    for (features, classes, _), members in groups.items():
+        try:
+            y = class_index(dataset.labels, classes)
+            X_raw = dataset.matrix(features)
+        except ValueError as e:
+            for i in members:
+                results[i] = {"error": str(e)}
+            continue
+
+        n_models, n_classes = len(members), len(classes)
+        W = np.concatenate([models[i].weights for i in members], axis=1)
+        b = np.concatenate([models[i].bias for i in members])
+        offsets = np.arange(n_models) * n_classes * n_classes
+        counts = np.zeros(n_models * n_classes * n_classes, dtype=np.int64)
+        for start in range(0, dataset.rows, CHUNK_ROWS):
+            X = models[members[0]].transform(X_raw[start:start + CHUNK_ROWS])
+            # argmax of logits == argmax of softmax
+            pred = (X @ W + b).reshape(len(X), n_models, n_classes).argmax(axis=2)
+            cells = offsets[None, :] + y[start:start + CHUNK_ROWS, None] * n_classes + pred
+            counts += np.bincount(cells.ravel(), minlength=len(counts))
+
+        for k, cm in enumerate(counts.reshape(n_models, n_classes, n_classes)):
+            results[members[k]] = summarize(cm)
+    return results
+
+
+class ModelResolver:
+    """
+    modelId -> LinearModel. Looks for <dir>/<task>/<modelId>/ in each search
+    directory (one level of glob allowed, e.g. v3/*). Versions are immutable,
+    so loaded models and their hashes are kept.
+    """
+
+    def __init__(self, search_dirs: Sequence[str]):
+        self.search_dirs = list(search_dirs)
+        self._models: Dict[str, tuple] = {}
+
+    def find(self, task: str, model_id: str) -> str:
+        if os.path.isfile(os.path.join(model_id, "meta.json")):
+            return model_id
+        for base in self.search_dirs:
+            for path in sorted(glob.glob(os.path.join(base, task, glob.escape(model_id)))):
+                if os.path.isfile(os.path.join(path, "meta.json")):
+                    return path
+        raise ModelNotFound(f"No {task} model {model_id}")
+
+    def resolve(self, task: str, model_id: str) -> tuple:
+        """(model, model hash); blocking on first load"""
+        path = self.find(task, model_id)
+        entry = self._models.get(path)
+        if entry is None:
+            model = load_version_dir(path)
+            entry = self._models[path] = (model, model_hash(model))
+        return entry
+
+
+class EvaluationMemo:
+    def __init__(self, root: str):
+        self.root = root
+        self._memory: Dict[tuple, dict] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, m_hash: str, d_hash: str) -> str:
+        return os.path.join(self.root, m_hash, d_hash + ".json")
+
+    def get(self, m_hash: str, d_hash: str) -> Optional[dict]:
+        key = (m_hash, d_hash)
+        result = self._memory.get(key)
+        if result is None:
+            try:
+                with open(self._path(m_hash, d_hash)) as f:
+                    result = self._memory[key] = json.load(f)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+        self.hits += 1
+        return result
+
+    def put(self, m_hash: str, d_hash: str, result: dict) -> None:
+        self._memory[(m_hash, d_hash)] = result
+        path = self._path(m_hash, d_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump(result, f)
+        os.replace(path + ".tmp", path)
+
+    def stats(self) -> dict:
+        return {"root": self.root, "hits": self.hits, "misses": self.misses, "inMemory": len(self._memory)}
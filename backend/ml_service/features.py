@@ -0,0 +1,247 @@
+"""
+Vectorized feature engine over time-bucketed frames
+
+The Node builders (features/market_feature_v3.builder.ts) compute one
+bucket at a time with eight countDocuments per network. Here a whole
+range of buckets is computed from one scan of the transfers:
+
+- events are binned into per-bucket counts with np.bincount
+- trailing windows are differences of one cumulative sum, so every
+  window of every bucket costs O(1)
+- z-scores use pandas rolling mean / std
+- entropy is one groupby over (bucket, counterparty)
+
+Window semantics match the Node builder: the feature at bucketTs covers
+events in [bucketTs - window, bucketTs). Spike thresholds and the
+pressure / delta formulas are the same too, so the columns can be
+written straight into feature_market_timeseries.cexPressureV3.
+"""
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+BUCKET_SEC = 300
+WINDOWS = {"5m": 300, "1h": 3600, "1d": 86400}
+LOOKBACK_SEC = max(WINDOWS.values())
+SPIKE_THRESHOLD_MEDIUM = 0.15
+SPIKE_THRESHOLD_HIGH = 0.30
+ZSCORE_WINDOW_SEC = 86400
+
+SPIKE_LEVELS = ["NONE", "MEDIUM", "HIGH"]
+# Same encoding as dataset_market_v3.builder.ts spikeDirectionToNum
+SPIKE_DIRECTIONS = {1: "BUY", -1: "SELL", 0: None}
+
+
+class FeatureFrameError(ValueError):
+    """Bad bucket range or event columns"""
+
+
+def bucket_range(start: int, end: int, bucket_sec: int = BUCKET_SEC) -> np.ndarray:
+    """Bucket start times covering [start, end)"""
+    first = start // bucket_sec * bucket_sec
+    return np.arange(first, end, bucket_sec, dtype=np.int64)
+
+
+def bucket_counts(ts: np.ndarray, origin: int, n_buckets: int, bucket_sec: int, weights=None) -> np.ndarray:
+    """Events (unix seconds) -> per-bucket totals; events outside the range are dropped"""
+    index = (np.asarray(ts, dtype=np.int64) - origin) // bucket_sec
+    keep = (index >= 0) & (index < n_buckets)
+    w = None if weights is None else np.asarray(weights, dtype=np.float64)[keep]
+    return np.bincount(index[keep], weights=w, minlength=n_buckets).astype(np.float64)
+
+
+def trailing_sum(counts: np.ndarray, window: int, lag: int = 0) -> np.ndarray:
+    """out[i] = counts[i - lag - window : i - lag], clipped at 0 (all windows in one cumsum)"""
+    csum = np.concatenate([[0.0], np.cumsum(counts)])
+    idx = np.arange(len(counts))
+    hi = np.clip(idx - lag, 0, len(counts))
+    lo = np.clip(idx - lag - window, 0, len(counts))
+    return csum[hi] - csum[lo]
+
+
+def pressure(inflow: np.ndarray, outflow: np.ndarray) -> np.ndarray:
+    """(IN - OUT) / (IN + OUT), 0 when there was no flow"""
+    total = inflow + outflow
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, (inflow - outflow) / total, 0.0)
+
+
+def relative_delta(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """(cur - prev) / prev; 1 when prev is 0 and cur is not (Node rule)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(previous > 0, (current - previous) / previous, np.where(current > 0, 1.0, 0.0))
+
+
+def rolling_zscore(values: np.ndarray, window: int, min_periods: int = 2) -> np.ndarray:
+    series = pd.Series(values, dtype=np.float64)
+    rolling = series.rolling(window, min_periods=min_periods)
+    mean, std = rolling.mean(), rolling.std(ddof=0)
+    z = (series - mean) / std.where(std > 0)
+    return z.fillna(0.0).to_numpy()
+
+
+def bucket_entropy(bucket_index: np.ndarray, keys: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Normalized Shannon entropy (0..1) of the key distribution inside each
+    bucket; 0 for empty buckets and buckets with a single key.
+    """
+    if len(keys) == 0:
+        return np.zeros(n_buckets)
+    counts = pd.DataFrame({"b": bucket_index, "k": keys}).groupby(["b", "k"], sort=False).size()
+    totals = counts.groupby(level=0).transform("sum")
+    p = counts / totals
+    frame = pd.DataFrame({"h": -(p * np.log(p)), "n": 1})
+    per_bucket = frame.groupby(level=0).sum()
+    norm = np.log(per_bucket["n"].where(per_bucket["n"] > 1))
+    out = np.zeros(n_buckets)
+    out[per_bucket.index.to_numpy()] = (per_bucket["h"] / norm).fillna(0.0).to_numpy()
+    return out
+
+
+def exchange_pressure_frame(
+    timestamps: np.ndarray,
+    senders: Iterable[str],
+    receivers: Iterable[str],
+    cex_addresses: Iterable[str],
+    start: int,
+    end: int,
+    bucket_sec: int = BUCKET_SEC,
+    amounts: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """
+    CEX pressure v3 for every bucket in [start, end), from raw transfers.
+    Events must cover [start - 1d, end) for the long windows to be complete.
+    Columns use the dataset_market_v3 names (numeric spike level/direction).
+    """
+    if end <= start:
+        raise FeatureFrameError("end must be after start")
+    ts = np.asarray(timestamps, dtype=np.int64)
+    senders = pd.Series(senders, dtype=object).str.lower()
+    receivers = pd.Series(receivers, dtype=object).str.lower()
+    if not (len(ts) == len(senders) == len(receivers)):
+        raise FeatureFrameError("timestamp / from / to columns differ in length")
+    cex = pd.Index({a.lower() for a in cex_addresses})
+
+    buckets = bucket_range(start, end, bucket_sec)
+    # Extra lookback buckets so the first requested bucket has full windows
+    lookback = -(-(LOOKBACK_SEC + 3600) // bucket_sec)
+    origin = int(buckets[0]) - lookback * bucket_sec
+    n = lookback + len(buckets)
+
+    is_in = receivers.isin(cex).to_numpy()
+    is_out = senders.isin(cex).to_numpy()
+    in_counts = bucket_counts(ts[is_in], origin, n, bucket_sec)
+    out_counts = bucket_counts(ts[is_out], origin, n, bucket_sec)
+
+    def window(seconds: int) -> int:
+        return max(1, seconds // bucket_sec)
+
+    cols = {}
+    for name, seconds in WINDOWS.items():
+        w = window(seconds)
+        cols[f"cex_pressure_{name}"] = pressure(trailing_sum(in_counts, w), trailing_sum(out_counts, w))
+
+    hour = window(3600)
+    cols["cex_in_delta"] = relative_delta(trailing_sum(in_counts, hour), trailing_sum(in_counts, hour, lag=hour))
+    cols["cex_out_delta"] = relative_delta(trailing_sum(out_counts, hour), trailing_sum(out_counts, hour, lag=hour))
+
+    deviation = np.abs(cols["cex_pressure_5m"] - cols["cex_pressure_1h"])
+    level = np.where(deviation >= SPIKE_THRESHOLD_HIGH, 2, np.where(deviation >= SPIKE_THRESHOLD_MEDIUM, 1, 0))
+    cols["cex_spike_level"] = level.astype(np.float64)
+    cols["cex_spike_direction"] = np.where(
+        level > 0, np.where(cols["cex_pressure_5m"] < cols["cex_pressure_1h"], 1.0, -1.0), 0.0
+    )
+
+    cols["cex_pressure_1h_z"] = rolling_zscore(cols["cex_pressure_1h"], window(ZSCORE_WINDOW_SEC))
+    flow = in_counts + out_counts
+    cols["cex_flow_1h_z"] = rolling_zscore(trailing_sum(flow, hour), window(ZSCORE_WINDOW_SEC))
+    if amounts is not None:
+        amounts = np.nan_to_num(np.asarray(amounts, dtype=np.float64))
+        cols["cex_in_volume_1h"] = trailing_sum(bucket_counts(ts[is_in], origin, n, bucket_sec, amounts[is_in]), hour)
+        cols["cex_out_volume_1h"] = trailing_sum(bucket_counts(ts[is_out], origin, n, bucket_sec, amounts[is_out]), hour)
+
+    # Which exchange wallets carried the flow: one hub (0) vs spread out (1)
+    touching = is_in | is_out
+    index = (ts[touching] - origin) // bucket_sec
+    wallets = np.where(is_in[touching], receivers.to_numpy()[touching], senders.to_numpy()[touching])
+    keep = (index >= 0) & (index < n)
+    cols["cex_wallet_entropy"] = bucket_entropy(index[keep], wallets[keep], n)
+
+    frame = pd.DataFrame({name: values[lookback:] for name, values in cols.items()})
+    frame.index = pd.Index(buckets, name="bucketTs")
+    return frame.round(6)
+
+
+def cex_pressure_v3_docs(frame: pd.DataFrame) -> list:
+    """Frame rows -> feature_market_timeseries.cexPressureV3 subdocuments"""
+    docs = []
+    for bucket_ts, row in zip(frame.index.tolist(), frame.itertuples(index=False)):
+        docs.append((int(bucket_ts), {
+            "pressure_5m": float(row.cex_pressure_5m),
+            "pressure_1h": float(row.cex_pressure_1h),
+            "pressure_1d": float(row.cex_pressure_1d),
+            "inDelta_1h": float(row.cex_in_delta),
+            "outDelta_1h": float(row.cex_out_delta),
+            "spikeLevel": SPIKE_LEVELS[int(row.cex_spike_level)],
+            "spikeDirection": SPIKE_DIRECTIONS[int(row.cex_spike_direction)],
+        }))
+    return docs
+
+
+# ---------- Mongo I/O (blocking; call in a thread) ----------
+
+def load_transfers(uri: str, network: str, start: int, end: int, cex_addresses: Iterable[str]) -> dict:
+    """One scan of transfers touching an exchange in [start - lookback, end)"""
+    from datetime import datetime, timezone
+
+    from pymongo import MongoClient
+
+    cex = [a.lower() for a in cex_addresses]
+    since = datetime.fromtimestamp(start - LOOKBACK_SEC - 3600, tz=timezone.utc)
+    until = datetime.fromtimestamp(end, tz=timezone.utc)
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    try:
+        cursor = client.get_default_database("test")["transfers"].find(
+            {"chain": network, "timestamp": {"$gte": since, "$lt": until}, "$or": [{"to": {"$in": cex}}, {"from": {"$in": cex}}]},
+            {"_id": 0, "timestamp": 1, "from": 1, "to": 1},
+            batch_size=10000,
+        )
+        docs = list(cursor)
+    finally:
+        client.close()
+    return {
+        "timestamp": np.array([int(d["timestamp"].replace(tzinfo=timezone.utc).timestamp()) for d in docs], dtype=np.int64),
+        "from": [d.get("from", "") for d in docs],
+        "to": [d.get("to", "") for d in docs],
+    }
+
+
+def write_cex_pressure(uri: str, network: str, frame: pd.DataFrame, bucket_sec: int, version: str) -> int:
+    """Upsert cexPressureV3 for every bucket with unordered bulk_write, 1000 ops per round trip"""
+    import time
+
+    from pymongo import MongoClient, UpdateOne
+
+    now = int(time.time())
+    ops = [
+        UpdateOne(
+            {"network": network, "bucketTs": bucket_ts},
+            {
+                "$set": {"cexPressureV3": doc, "meta.computedAtTs": now, "meta.version": version},
+                "$setOnInsert": {"bucketSec": bucket_sec},
+            },
+            upsert=True,
+        )
+        for bucket_ts, doc in cex_pressure_v3_docs(frame)
+    ]
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    written = 0
+    try:
+        collection = client.get_default_database("test")["feature_market_timeseries"]
+        for i in range(0, len(ops), 1000):
+            result = collection.bulk_write(ops[i:i + 1000], ordered=False)
+            written += result.upserted_count + result.modified_count
+    finally:
+        client.close()
+    return written
@@ -0,0 +1,289 @@
+"""
+Asynchronous training jobs
+
+Submitting returns a job id straight away. A fixed number of workers
+drain a bounded FIFO and run each job in a thread. Progress can be read
+by polling GET /api/jobs/<id> or streamed as server-sent events, so no
+caller holds a socket open for the whole training run.
+
+Jobs are keyed by dataset hash + config hash:
+- a key that finished before is answered from the on-disk index
+  (status DONE, cached: true) without training again
+- a key already queued or running returns that job, not a second one
+A full queue raises QueueFull (429 + Retry-After, as in the gateway).
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, Optional
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+FINAL_STATES = (DONE, FAILED)
+
+# run(report) -> result dict; report(fraction, stage) may be called from the worker thread
+JobRunner = Callable[[Callable[[float, str], None]], dict]
+
+
+class QueueFull(Exception):
+    """Training queue is at its depth limit"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Training queue is full")
+        self.retry_after = retry_after
+
+
+class JobNotFound(LookupError):
+    """No job with that id (unknown or already evicted)"""
+
+
+def config_hash(config: dict) -> str:
+    """Same recipe as train_config_hash.util.ts: sorted-key JSON, sha256, 16 hex chars"""
+    raw = json.dumps(config, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def artifact_path(result: dict) -> Optional[str]:
+    return result.get("artifactPath") or result.get("artifact_path")
+
+
+class TrainingJob:
+    def __init__(self, kind: str, key: str, dataset_hash: str, config_hash: str, run: Optional[JobRunner]):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.dataset_hash = dataset_hash
+        self.config_hash = config_hash
+        self.run = run
+        self.status = QUEUED
+        self.progress = 0.0
+        self.stage = "queued"
+        self.cached = False
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Replaced on every change; watchers wait on the one they saw
+        self.changed = asyncio.Event()
+
+    def snapshot(self) -> dict:
+        return {
+            "jobId": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "stage": self.stage,
+            "cached": self.cached,
+            "datasetHash": self.dataset_hash,
+            "configHash": self.config_hash,
+            "submittedAt": self.submitted_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class TrainingJobQueue:
+    def __init__(self, index_dir: str, workers: int = 2, max_depth: int = 32, max_history: int = 256):
+        self.index_dir = index_dir
+        self.workers = max(1, workers)
+        self.max_depth = max(0, max_depth)
+        self.max_history = max(1, max_history)
+        self._jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+        self._inflight: Dict[str, TrainingJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._avg_run_s = 30.0
+
+        self.submitted = 0
+        self.cache_hits = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    # ---------- submit ----------
+
+    def submit(self, kind: str, dataset_hash: str, cfg_hash: str, run: JobRunner) -> TrainingJob:
+        """Must be called on the event loop"""
+        self._ensure_workers()
+        key = f"{kind}:{dataset_hash}:{cfg_hash}"
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.deduplicated += 1
+            return inflight
+
+        cached = self._read_index(key)
+        if cached is not None:
+            self.cache_hits += 1
+            job = TrainingJob(kind, key, dataset_hash, cfg_hash, None)
+            job.status, job.stage, job.progress, job.cached = DONE, "cached", 1.0, True
+            job.result = cached
+            job.started_at = job.finished_at = job.submitted_at
+            self._remember(job)
+            return job
+
+        if self._queue.qsize() >= self.max_depth:
+            self.rejected += 1
+            raise QueueFull(self.retry_after)
+
+        job = TrainingJob(kind, key, dataset_hash, cfg_hash, run)
+        self.submitted += 1
+        self._inflight[key] = job
+        self._remember(job)
+        self._queue.put_nowait(job)
+        return job
+
+    @property
+    def retry_after(self) -> int:
+        """Roughly how long until a queue slot frees up"""
+        return max(1, math.ceil(self._avg_run_s / self.workers))
+
+    # ---------- lookup ----------
+
+    def get(self, job_id: str) -> TrainingJob:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFound(f"Unknown job: {job_id}")
+        return job
+
+    def recent(self) -> list:
+        return list(reversed(self._jobs.values()))
+
+    async def wait(self, job_id: str) -> TrainingJob:
+        async for _ in self.watch(job_id):
+            pass
+        return self.get(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[dict]:
+        """Yields a snapshot now and after every change, ending on DONE/FAILED"""
+        job = self.get(job_id)
+        while True:
+            changed = job.changed
+            yield job.snapshot()
+            if job.status in FINAL_STATES:
+                return
+            await changed.wait()
+
+    # ---------- workers ----------
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        # New loop (tests, restart): jobs queued on the old one are gone
+        self._loop = loop
+        self._inflight.clear()
+        self._queue = asyncio.Queue()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._execute(job)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job: TrainingJob) -> None:
+        loop = asyncio.get_running_loop()
+
+        def report(fraction: float, stage: str) -> None:
+            loop.call_soon_threadsafe(self._update, job, RUNNING, fraction, stage)
+
+        job.started_at = time.time()
+        self._update(job, RUNNING, 0.0, "starting")
+        try:
+            result = await asyncio.to_thread(job.run, report)
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.finished_at = time.time()
+            self.failed += 1
+            self._inflight.pop(job.key, None)
+            self._update(job, FAILED, job.progress, "failed")
+            return
+        finally:
+            # The runner closes over the request payload (X_train / X_eval lists);
+            # finished jobs stay in history, their payloads must not
+            job.run = None
+
+        job.result = result
+        job.finished_at = time.time()
+        self._avg_run_s = 0.8 * self._avg_run_s + 0.2 * (job.finished_at - job.started_at)
+        await asyncio.to_thread(self._write_index, job.key, result)
+        self.completed += 1
+        self._inflight.pop(job.key, None)
+        self._update(job, DONE, 1.0, "done")
+
+    def _update(self, job: TrainingJob, status: str, progress: float, stage: str) -> None:
+        if job.status in FINAL_STATES:
+            # A late report() from the thread must not reopen a finished job
+            return
+        job.status, job.progress, job.stage = status, progress, stage
+        changed, job.changed = job.changed, asyncio.Event()
+        changed.set()
+
+    def _remember(self, job: TrainingJob) -> None:
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_history:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.status not in FINAL_STATES:
+                break
+            self._jobs.popitem(last=False)
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ---------- artifact index ----------
+
+    def _index_path(self, key: str) -> str:
+        return os.path.join(self.index_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _read_index(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._index_path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        result = entry.get("result") or {}
+        path = artifact_path(result)
+        if entry.get("key") != key or (path and not os.path.exists(path)):
+            # Artifact was deleted: train again
+            return None
+        return result
+
+    def _write_index(self, key: str, result: dict) -> None:
+        os.makedirs(self.index_dir, exist_ok=True)
+        path = self._index_path(key)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"key": key, "savedAt": time.time(), "result": result}, f)
+        os.replace(tmp, path)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "maxDepth": self.max_depth,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": sum(1 for job in self._inflight.values() if job.status == RUNNING),
+            "submitted": self.submitted,
+            "cacheHits": self.cache_hits,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
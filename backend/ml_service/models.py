@@ -0,0 +1,208 @@
+"""
+Vectorized linear models for market and actor scoring
+
+Both models are a single matrix product over a (rows, features) batch:
+logits = transform(X) @ weights + bias, then a row-wise softmax. The
+baselines reproduce the Node fallbacks (market_predict.service.ts and
+actor_predict.service.ts) so Python and fallback scores line up.
+
+Artifacts carry weights, bias, log_scale, features, classes, kind and
+version, as one .npz (no pickle) or a version directory of memory-mapped
+.npy files (see registry.py). to_portable() is the same model as plain
+JSON for in-process scoring outside Python (src/core/ml/portable_model.ts).
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# Column order of MarketPredictRequest.features / ActorPredictRequest.features
+MARKET_FEATURES = ("exchangePressure", "accZoneStrength", "distZoneStrength", "corridorsEntropy")
+ACTOR_FEATURES = (
+    "netFlowUsd",
+    "inflowUsd",
+    "outflowUsd",
+    "hubScore",
+    "pagerank",
+    "brokerScore",
+    "kCore",
+    "entropyOut",
+    "exchangeExposure",
+    "corridorDensity",
+)
+MARKET_CLASSES = ("UP", "DOWN")
+ACTOR_CLASSES = ("SMART", "NEUTRAL", "NOISY")
+
+# Market signal thresholds, same as the Node fallback
+BUY_THRESHOLD = 0.6
+SELL_THRESHOLD = 0.4
+
+PORTABLE_FORMAT = "linear-softmax/v1"
+
+
+def softmax(z: np.ndarray) -> np.ndarray:
+    """Row-wise, max-shifted for stability"""
+    e = np.exp(z - z.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class LinearModel:
+    def __init__(
+        self,
+        kind: str,
+        version: str,
+        features: Sequence[str],
+        classes: Sequence[str],
+        weights: np.ndarray,
+        bias: np.ndarray,
+        log_scale: Optional[np.ndarray] = None,
+    ):
+        self.kind = kind
+        self.version = version
+        self.features = tuple(features)
+        self.classes = tuple(classes)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        if log_scale is None:
+            log_scale = np.zeros(len(self.features), dtype=bool)
+        self.log_scale = np.asarray(log_scale, dtype=bool)
+
+        if self.weights.shape != (len(self.features), len(self.classes)):
+            raise ValueError(
+                f"{kind} weights shape {self.weights.shape} != ({len(self.features)}, {len(self.classes)})"
+            )
+        if self.bias.shape != (len(self.classes),):
+            raise ValueError(f"{kind} bias shape {self.bias.shape} != ({len(self.classes)},)")
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Signed log1p on heavy-tailed (USD) columns, NaN/inf -> 0"""
+        X = np.nan_to_num(np.asarray(X, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+        if self.log_scale.any():
+            X = X.copy()
+            cols = X[:, self.log_scale]
+            X[:, self.log_scale] = np.sign(cols) * np.log1p(np.abs(cols))
+        return X
+
+    def logits(self, X: np.ndarray) -> np.ndarray:
+        return self.transform(X) @ self.weights + self.bias
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return softmax(self.logits(X))
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            kind=np.array(self.kind),
+            version=np.array(self.version),
+            features=np.array(self.features),
+            classes=np.array(self.classes),
+            weights=self.weights,
+            bias=self.bias,
+            log_scale=self.log_scale,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LinearModel":
+        with np.load(path, allow_pickle=False) as data:
+            return cls.from_arrays(data)
+
+    @classmethod
+    def from_arrays(cls, data) -> "LinearModel":
+        return cls(
+            kind=str(data["kind"]),
+            version=str(data["version"]),
+            features=[str(f) for f in data["features"]],
+            classes=[str(c) for c in data["classes"]],
+            weights=data["weights"],
+            bias=data["bias"],
+            log_scale=data["log_scale"] if "log_scale" in data else None,
+        )
+
+    def info(self) -> dict:
+        return {
+            "kind": self.kind,
+            "version": self.version,
+            "features": list(self.features),
+            "classes": list(self.classes),
+        }
+
+    def to_portable(self) -> dict:
+        """
+        JSON-safe copy: weights as [feature][class] lists. Python floats
+        serialize with repr, so a JSON round trip is bit-exact.
+        """
+        return {
+            "format": PORTABLE_FORMAT,
+            **self.info(),
+            "weights": np.asarray(self.weights, dtype=np.float64).tolist(),
+            "bias": np.asarray(self.bias, dtype=np.float64).tolist(),
+            "logScale": self.log_scale.tolist(),
+            "thresholds": {"buy": BUY_THRESHOLD, "sell": SELL_THRESHOLD},
+        }
+
+    @classmethod
+    def from_portable(cls, data: dict) -> "LinearModel":
+        if data.get("format") != PORTABLE_FORMAT:
+            raise ValueError(f"Unsupported portable format: {data.get('format')!r}")
+        return cls(
+            kind=data["kind"],
+            version=data["version"],
+            features=data["features"],
+            classes=data["classes"],
+            weights=data["weights"],
+            bias=data["bias"],
+            log_scale=data.get("logScale"),
+        )
+
+
+def baseline_market_model() -> LinearModel:
+    """
+    Node fallback: raw = -0.4*ep + 0.35*(acc - dist) + 0.1*(0.5 - entropy),
+    pUp = sigmoid(2*raw) == softmax([2*raw, 0])[0]
+    """
+    raw = np.array([-0.4, 0.35, -0.35, -0.1])
+    weights = np.stack([2 * raw, np.zeros(4)], axis=1)
+    bias = np.array([2 * 0.05, 0.0])
+    return LinearModel("market", "baseline_v1", MARKET_FEATURES, MARKET_CLASSES, weights, bias)
+
+
+def baseline_actor_model() -> LinearModel:
+    """
+    Node fallback shape: z = w.x + b, logits [z, 0, -z]. USD flows are
+    log-scaled so whales do not saturate the softmax.
+    """
+    w = np.array([0.5, 0.3, -0.2, 0.4, 0.6, 0.3, 0.2, -0.3, -0.6, 0.4]) * 0.2
+    weights = np.stack([w, np.zeros_like(w), -w], axis=1)
+    bias = np.array([-0.1, 0.0, 0.1])
+    log_scale = np.array([f.endswith("Usd") for f in ACTOR_FEATURES])
+    return LinearModel("actor", "baseline_v1", ACTOR_FEATURES, ACTOR_CLASSES, weights, bias, log_scale)
+
+
+BASELINES = {"market": baseline_market_model, "actor": baseline_actor_model}
+
+
+# ---------- scoring (whole batch at once) ----------
+
+def score_market(model: LinearModel, X: np.ndarray) -> Dict[str, np.ndarray]:
+    z = model.logits(X)
+    probs = softmax(z)
+    p_up = probs[:, 0]
+    signal = np.where(p_up >= BUY_THRESHOLD, 1, np.where(p_up <= SELL_THRESHOLD, -1, 0)).astype(np.int8)
+    return {
+        "pUp": np.round(p_up, 4),
+        "pDown": np.round(1.0 - p_up, 4),
+        "confidence": np.round(np.minimum(1.0, np.abs(z[:, 0] - z[:, 1])), 4),
+        "signal": signal,
+    }
+
+
+def score_actor(model: LinearModel, X: np.ndarray) -> Dict[str, np.ndarray]:
+    probs = model.predict_proba(X)
+    top2 = np.partition(probs, -2, axis=1)[:, -2:]
+    return {
+        "probs": np.round(probs, 4),
+        "label": probs.argmax(axis=1).astype(np.int16),
+        "confidence": np.round(top2[:, 1] - top2[:, 0], 4),
+    }
+
+
+SIGNAL_NAMES = {1: "BUY", -1: "SELL", 0: "NEUTRAL"}
@@ -0,0 +1,119 @@
+"""
+Parallel variant training over one shared copy of the dataset
+
+The dataset is decoded once in the service process into a single
+SharedMemory block (float64 feature matrix followed by int64 labels).
+Pool workers attach to it in their initializer and build zero-copy,
+read-only NumPy views, so N workers cost one copy of the data, not N.
+Results are yielded as each (feature pack, seed) job finishes.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from typing import AsyncIterator, List, Optional, Sequence
+
+import numpy as np
+
+from .datasets import Dataset
+from .training import train_variant
+
+# Per worker process: the attached block and its views
+_worker: dict = {}
+
+
+class SharedDataset:
+    def __init__(self, X: np.ndarray, labels: np.ndarray):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        labels = np.ascontiguousarray(labels, dtype=np.int64)
+        self.shape = X.shape
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, X.nbytes + labels.nbytes))
+        np.ndarray(X.shape, dtype=np.float64, buffer=self.shm.buf)[:] = X
+        np.ndarray(labels.shape, dtype=np.int64, buffer=self.shm.buf, offset=X.nbytes)[:] = labels
+
+    @property
+    def spec(self) -> tuple:
+        return self.shm.name, self.shape
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(spec: tuple, features: Sequence[str]) -> None:
+    name, shape = spec
+    shm = shared_memory.SharedMemory(name=name)
+    X = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    labels = np.ndarray((shape[0],), dtype=np.int64, buffer=shm.buf, offset=X.nbytes)
+    X.flags.writeable = False
+    labels.flags.writeable = False
+    _worker.update(shm=shm, X=X, labels=labels, features=list(features))
+
+
+def _train_job(features: Sequence[str], seed: int, task: str, version: str, iterations: int) -> dict:
+    return train_variant(_worker["X"], _worker["labels"], _worker["features"], features, seed, task, version, iterations)
+
+
+class ParallelTrainer:
+    def __init__(self, max_workers: Optional[int] = None, start_method: str = "spawn", max_batches: int = 1):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.start_method = start_method
+        # Concurrent batches would oversubscribe the CPUs; extra ones wait
+        self._slots = max(1, max_batches)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.batches_run = 0
+        self.jobs_run = 0
+        self.active_batches = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._slots)
+        return self._semaphore
+
+    async def run(self, dataset: Dataset, jobs: List[dict], task: str, iterations: int = 300) -> AsyncIterator[dict]:
+        """
+        jobs: [{"featurePack", "features", "seed", "version"}]
+        Yields {"job": job, "result": dict} or {"job": job, "error": str}
+        in completion order.
+        """
+        async with self._get_semaphore():
+            self.active_batches += 1
+            features = dataset.feature_names
+            shared = SharedDataset(dataset.matrix(features), dataset.labels)
+            pool = ProcessPoolExecutor(
+                max_workers=min(self.max_workers, len(jobs)) or 1,
+                mp_context=get_context(self.start_method),
+                initializer=_attach,
+                initargs=(shared.spec, features),
+            )
+            pending = {}
+            try:
+                for job in jobs:
+                    future = pool.submit(_train_job, job["features"], job["seed"], task, job["version"], iterations)
+                    pending[asyncio.wrap_future(future)] = job
+                while pending:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        job = pending.pop(future)
+                        self.jobs_run += 1
+                        try:
+                            outcome = {"job": job, "result": future.result()}
+                        except Exception as e:
+                            outcome = {"job": job, "error": str(e)}
+                        yield outcome
+            finally:
+                for future in pending:
+                    future.cancel()
+                pool.shutdown(wait=False, cancel_futures=True)
+                shared.close()
+                self.active_batches -= 1
+                self.batches_run += 1
+
+    def stats(self) -> dict:
+        return {
+            "maxWorkers": self.max_workers,
+            "startMethod": self.start_method,
+            "activeBatches": self.active_batches,
+            "batchesRun": self.batches_run,
+            "jobsRun": self.jobs_run,
+        }
@@ -0,0 +1,232 @@
+"""
+Model registry with hot-swap for the ML service
+
+Layout under ML_MODEL_DIR (one directory per kind, one per version):
+    market/<version>/weights.npy, bias.npy, log_scale.npy, meta.json
+    market/ACTIVE            <- optional, holds the version to serve
+    market.npz               <- legacy single artifact, still accepted
+
+.npy weights are opened with mmap_mode="r", so loading a version is a
+few page mappings rather than a read + copy, and several versions can
+stay resident cheaply (LRU, the active one is never evicted).
+
+Switching is a single dict assignment: a request grabs active(kind) once
+and scores with that object, so in-flight requests finish on the old
+version while new ones see the new one. Loading and pre-warming run in a
+worker thread under a lock that only reloads take; /predict never waits.
+Mirrors the Node active_model_pointer: the previous version is kept for
+instant rollback. Versions are immutable: publish a new version name
+rather than overwriting one that may already be resident.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from .models import BASELINES, LinearModel
+
+ACTIVE_FILE = "ACTIVE"
+BASELINE_VERSION = "baseline_v1"
+
+
+class ModelNotFound(LookupError):
+    """Requested model version has no artifact"""
+
+
+def save_version(model: LinearModel, model_dir: str) -> str:
+    """Write model as <model_dir>/<kind>/<version>/ (.npy + meta.json)"""
+    path = os.path.join(model_dir, model.kind, model.version)
+    tmp = path + ".tmp"
+    os.makedirs(tmp, exist_ok=True)
+    np.save(os.path.join(tmp, "weights.npy"), np.ascontiguousarray(model.weights, dtype=np.float64))
+    np.save(os.path.join(tmp, "bias.npy"), np.ascontiguousarray(model.bias, dtype=np.float64))
+    np.save(os.path.join(tmp, "log_scale.npy"), model.log_scale)
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(model.info(), f)
+    # Readers never see a half-written version
+    os.replace(tmp, path)
+    return path
+
+
+def load_version_dir(path: str) -> LinearModel:
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    log_scale_path = os.path.join(path, "log_scale.npy")
+    return LinearModel(
+        kind=meta["kind"],
+        version=meta["version"],
+        features=meta["features"],
+        classes=meta["classes"],
+        weights=np.load(os.path.join(path, "weights.npy"), mmap_mode="r"),
+        bias=np.load(os.path.join(path, "bias.npy"), mmap_mode="r"),
+        log_scale=np.load(log_scale_path) if os.path.exists(log_scale_path) else None,
+    )
+
+
+def warm(model: LinearModel) -> None:
+    """Fault in mapped pages and run one batch so the first request is not cold"""
+    float(np.asarray(model.weights).sum() + np.asarray(model.bias).sum())
+    model.predict_proba(np.zeros((64, len(model.features))))
+
+
+class ModelRegistry:
+    def __init__(self, model_dir: str, max_resident: int = 3):
+        self.model_dir = model_dir
+        self.max_resident = max(1, max_resident)
+        self._resident: Dict[str, "OrderedDict[str, LinearModel]"] = {kind: OrderedDict() for kind in BASELINES}
+        self._active: Dict[str, LinearModel] = {}
+        self._previous: Dict[str, Optional[str]] = {kind: None for kind in BASELINES}
+        self._lock: Optional[asyncio.Lock] = None
+        self.reloads = 0
+        self.last_reload: Optional[dict] = None
+
+        # Serve baselines until the first reload, so startup never blocks
+        for kind, baseline in BASELINES.items():
+            model = baseline()
+            self._resident[kind][model.version] = model
+            self._active[kind] = model
+
+    # ---------- hot path ----------
+
+    def active(self, kind: str) -> LinearModel:
+        return self._active[kind]
+
+    # ---------- discovery ----------
+
+    def available(self, kind: str) -> list:
+        versions = []
+        kind_dir = os.path.join(self.model_dir, kind)
+        if os.path.isdir(kind_dir):
+            for entry in sorted(os.listdir(kind_dir)):
+                if entry.endswith(".tmp"):
+                    continue
+                if os.path.isfile(os.path.join(kind_dir, entry, "meta.json")):
+                    versions.append(entry)
+                elif entry.endswith(".npz"):
+                    versions.append(entry[:-4])
+        return versions
+
+    def target_version(self, kind: str) -> str:
+        """ACTIVE file, else newest version on disk, else legacy <kind>.npz, else baseline"""
+        pointer = os.path.join(self.model_dir, kind, ACTIVE_FILE)
+        if os.path.isfile(pointer):
+            with open(pointer) as f:
+                version = f.read().strip()
+            if version:
+                return version
+        versions = self.available(kind)
+        if versions:
+            return versions[-1]
+        if os.path.isfile(os.path.join(self.model_dir, f"{kind}.npz")):
+            return f"{kind}.npz"
+        return BASELINE_VERSION
+
+    def _load(self, kind: str, version: str) -> LinearModel:
+        if version == BASELINE_VERSION:
+            return BASELINES[kind]()
+        if version == f"{kind}.npz":
+            return LinearModel.load(os.path.join(self.model_dir, version))
+        path = os.path.join(self.model_dir, kind, version)
+        if os.path.isfile(os.path.join(path, "meta.json")):
+            return load_version_dir(path)
+        if os.path.isfile(path + ".npz"):
+            return LinearModel.load(path + ".npz")
+        raise ModelNotFound(f"No artifact for {kind}/{version}")
+
+    # ---------- switching ----------
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def activate(self, kind: str, version: str) -> dict:
+        """Load (if needed), pre-warm, then swap the active pointer"""
+        if kind not in self._resident:
+            raise ModelNotFound(f"Unknown model kind: {kind}")
+        async with self._get_lock():
+            return await self._activate(kind, version)
+
+    async def _activate(self, kind: str, version: str) -> dict:
+        started = time.perf_counter()
+        resident = self._resident[kind]
+        model = resident.get(version)
+        loaded = model is None
+        if loaded:
+            model = await asyncio.to_thread(self._load, kind, version)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        warm_started = time.perf_counter()
+        await asyncio.to_thread(warm, model)
+        warm_ms = (time.perf_counter() - warm_started) * 1000
+
+        previous = self._active[kind]
+        resident[model.version] = model
+        resident.move_to_end(model.version)
+        self._active[kind] = model  # the swap
+        if previous.version != model.version:
+            self._previous[kind] = previous.version
+        self._evict(kind)
+        return {
+            "version": model.version,
+            "previous": self._previous[kind],
+            "changed": previous is not model,
+            "loaded": loaded,
+            "loadMs": round(load_ms, 2),
+            "warmMs": round(warm_ms, 2),
+        }
+
+    async def rollback(self, kind: str) -> dict:
+        previous = self._previous.get(kind)
+        if previous is None:
+            raise ModelNotFound(f"No previous {kind} model to roll back to")
+        return await self.activate(kind, previous)
+
+    async def reload(self, kind: Optional[str] = None) -> dict:
+        """Re-resolve the target version of one or all kinds from disk"""
+        if kind is not None and kind not in self._resident:
+            raise ModelNotFound(f"Unknown model kind: {kind}")
+        started = time.perf_counter()
+        kinds = [kind] if kind else list(self._resident)
+        results = {}
+        async with self._get_lock():
+            for k in kinds:
+                version = self.target_version(k)
+                try:
+                    results[k] = await self._activate(k, version)
+                except (ModelNotFound, OSError, KeyError, ValueError) as e:
+                    # Keep serving the current model
+                    results[k] = {"version": self._active[k].version, "error": f"{version}: {e}"}
+        self.reloads += 1
+        self.last_reload = {"at": time.time(), "tookMs": round((time.perf_counter() - started) * 1000, 2)}
+        return results
+
+    def _evict(self, kind: str) -> None:
+        resident = self._resident[kind]
+        active = self._active[kind].version
+        keep = {active, self._previous[kind]}
+        for version in list(resident):
+            if len(resident) <= self.max_resident:
+                break
+            if version not in keep:
+                del resident[version]
+
+    def stats(self) -> dict:
+        return {
+            "modelDir": self.model_dir,
+            "maxResident": self.max_resident,
+            "reloads": self.reloads,
+            "lastReload": self.last_reload,
+            "models": {
+                kind: {
+                    "active": self._active[kind].version,
+                    "previous": self._previous[kind],
+                    "resident": list(self._resident[kind]),
+                }
+                for kind in self._resident
+            },
+        }
@@ -0,0 +1,219 @@
+"""
+Active + shadow dual inference with rolling disagreement stats
+
+Shadow models are registered per kind (market / actor) and scored on the
+same batch as the active model: the request's feature matrix is built
+once over the union of every model's features, NaN-cleaned once, and
+each model reads its own columns out of it. Per-model latency is the
+time of its own matrix product + softmax.
+
+Every dual call also records, per (active version, shadow version), how
+many rows were scored, how many top labels differed and the total
+variation distance between the two probability vectors. Counts go into
+hourly buckets, so any window (1h .. 14d, the shadow monitor windows) is
+a sum over the newest buckets. Buckets are flushed to one JSON file so a
+restart does not reset the 7d / 14d windows.
+
+The registered shadow ids are kept in <root>/shadows.json; the models
+themselves are resolved through evaluation.ModelResolver (v3 shadow
+artifacts or registry versions).
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .evaluation import ModelResolver
+from .models import LinearModel, softmax
+
+STAT_BUCKET_SEC = 3600
+WINDOWS = {"1h": 3600, "24h": 86400, "7d": 7 * 86400, "14d": 14 * 86400}
+FLUSH_INTERVAL_SEC = 60
+
+
+class ShadowError(ValueError):
+    """Shadow model cannot be compared with the active one"""
+
+
+# ---------- scoring ----------
+
+def union_features(models: Sequence[LinearModel]) -> Tuple[str, ...]:
+    """Every model's features, first-seen order (active model first)"""
+    return tuple(OrderedDict.fromkeys(f for model in models for f in model.features))
+
+
+def score_models(models: Sequence[LinearModel], X: np.ndarray, features: Sequence[str]) -> List[tuple]:
+    """
+    X: (rows, len(features)) already NaN-cleaned. Returns (probs, latency ms)
+    per model, in order.
+    """
+    position = {name: j for j, name in enumerate(features)}
+    out = []
+    for model in models:
+        started = time.perf_counter()
+        cols = X[:, [position[f] for f in model.features]]
+        probs = softmax(model.transform(cols) @ model.weights + model.bias)
+        out.append((probs, (time.perf_counter() - started) * 1000))
+    return out
+
+
+def compare(active: np.ndarray, shadow: np.ndarray) -> dict:
+    """Row-level disagreement between two (rows, classes) probability matrices"""
+    tvd = 0.5 * np.abs(active - shadow).sum(axis=1)
+    return {
+        "rows": int(len(tvd)),
+        "disagree": int((active.argmax(axis=1) != shadow.argmax(axis=1)).sum()),
+        "tvdSum": float(tvd.sum()),
+        "tvdMax": float(tvd.max()) if len(tvd) else 0.0,
+    }
+
+
+# ---------- registered shadows ----------
+
+class ShadowSet:
+    def __init__(self, root: str, resolver: ModelResolver):
+        self.path = os.path.join(root, "shadows.json")
+        self.resolver = resolver
+        self._models: Dict[str, "OrderedDict[str, LinearModel]"] = {}
+
+    def ids(self) -> Dict[str, List[str]]:
+        return {kind: list(models) for kind, models in self._models.items()}
+
+    def models(self, kind: str) -> List[LinearModel]:
+        return list(self._models.get(kind, {}).values())
+
+    def register(self, kind: str, model_id: str, active: LinearModel) -> LinearModel:
+        """Blocking (loads the artifact). Shadows must predict the active model's classes"""
+        model, _ = self.resolver.resolve(kind, model_id)
+        if model.kind != kind:
+            raise ShadowError(f"{model_id} is a {model.kind} model, not {kind}")
+        if model.classes != active.classes:
+            raise ShadowError(f"{model_id} classes {list(model.classes)} != active {list(active.classes)}")
+        self._models.setdefault(kind, OrderedDict())[model_id] = model
+        self._save()
+        return model
+
+    def remove(self, kind: str, model_id: str) -> bool:
+        removed = self._models.get(kind, {}).pop(model_id, None) is not None
+        if removed:
+            self._save()
+        return removed
+
+    def restore(self, active: Dict[str, LinearModel]) -> Dict[str, List[str]]:
+        """Blocking: re-register the saved ids; ones that no longer load are dropped"""
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        dropped = {}
+        for kind, model_ids in saved.items():
+            for model_id in model_ids:
+                try:
+                    self.register(kind, model_id, active[kind])
+                except (LookupError, ValueError, OSError) as e:
+                    dropped.setdefault(kind, []).append(f"{model_id}: {e}")
+        return dropped
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.ids(), f)
+        os.replace(self.path + ".tmp", self.path)
+
+
+# ---------- rolling disagreement ----------
+
+class DisagreementStats:
+    """
+    Hourly buckets per (kind, active, shadow):
+    {bucketTs: [rows, disagree, tvdSum, tvdMax]}. Only the longest window
+    is kept.
+    """
+
+    def __init__(self, path: Optional[str] = None, bucket_sec: int = STAT_BUCKET_SEC):
+        self.path = path
+        self.bucket_sec = bucket_sec
+        self.retention = max(WINDOWS.values())
+        self._pairs: Dict[tuple, Dict[int, list]] = {}
+        self._flushed_at = 0.0
+        if path:
+            self._load()
+
+    def record(self, kind: str, active: str, shadow: str, result: dict, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        bucket = int(now) // self.bucket_sec * self.bucket_sec
+        buckets = self._pairs.setdefault((kind, active, shadow), {})
+        cell = buckets.setdefault(bucket, [0, 0, 0.0, 0.0])
+        cell[0] += result["rows"]
+        cell[1] += result["disagree"]
+        cell[2] += result["tvdSum"]
+        cell[3] = max(cell[3], result["tvdMax"])
+        self._prune(now)
+        if self.path and now - self._flushed_at >= FLUSH_INTERVAL_SEC:
+            self.flush(now)
+
+    def window(self, kind: str, seconds: int, now: Optional[float] = None) -> List[dict]:
+        """One entry per (active, shadow) pair with rows in [now - seconds, now]"""
+        now = time.time() if now is None else now
+        since = int(now) - seconds
+        out = []
+        for (pair_kind, active, shadow), buckets in sorted(self._pairs.items()):
+            if pair_kind != kind:
+                continue
+            # A bucket counts when any part of it is inside the window
+            cells = [c for ts, c in buckets.items() if ts + self.bucket_sec > since]
+            rows = sum(c[0] for c in cells)
+            if not rows:
+                continue
+            out.append({
+                "activeVersion": active,
+                "shadowVersion": shadow,
+                "rows": rows,
+                "disagreements": sum(c[1] for c in cells),
+                "disagreementRate": round(sum(c[1] for c in cells) / rows, 6),
+                "meanTvd": round(sum(c[2] for c in cells) / rows, 6),
+                "maxTvd": round(max(c[3] for c in cells), 6),
+            })
+        return out
+
+    def summary(self, kind: str, now: Optional[float] = None) -> Dict[str, List[dict]]:
+        return {name: self.window(kind, seconds, now) for name, seconds in WINDOWS.items()}
+
+    def _prune(self, now: float) -> None:
+        oldest = int(now) - self.retention - self.bucket_sec
+        for key in list(self._pairs):
+            buckets = self._pairs[key]
+            for ts in [ts for ts in buckets if ts < oldest]:
+                del buckets[ts]
+            if not buckets:
+                del self._pairs[key]
+
+    def flush(self, now: Optional[float] = None) -> None:
+        if not self.path:
+            return
+        data = [
+            {"kind": kind, "active": active, "shadow": shadow, "buckets": {str(ts): c for ts, c in buckets.items()}}
+            for (kind, active, shadow), buckets in self._pairs.items()
+        ]
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(self.path + ".tmp", self.path)
+        self._flushed_at = time.time() if now is None else now
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for entry in data:
+            key = (entry["kind"], entry["active"], entry["shadow"])
+            self._pairs[key] = {int(ts): list(c) for ts, c in entry["buckets"].items()}
+
+    def stats(self) -> dict:
+        return {"pairs": len(self._pairs), "buckets": sum(len(b) for b in self._pairs.values())}
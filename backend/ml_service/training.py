@@ -0,0 +1,261 @@
+"""
+Vectorized training for v3 shadow models
+
+Multinomial logistic regression by full-batch gradient descent on the
+standardized feature matrix; the standardization is folded back into the
+weights so the result is a plain LinearModel the registry can serve.
+The seed controls the train/holdout split, which is what stability runs
+vary. Feature packs mirror src/core/ml_v3/types/feature_packs.ts.
+"""
+import hashlib
+import os
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from .models import LinearModel, softmax
+from .registry import save_version
+
+CEX_FEATURES = [
+    "cex_pressure_5m", "cex_pressure_1h", "cex_pressure_1d",
+    "cex_in_delta", "cex_out_delta", "cex_spike_level", "cex_spike_direction",
+]
+ZONES_FEATURES = ["zone_persistence_7d", "zone_persistence_30d", "zone_decay_score", "zone_quality_score"]
+CORRIDORS_FEATURES = [
+    "corridor_persistence_7d", "corridor_persistence_30d", "corridor_repeat_rate", "corridor_entropy",
+    "corridor_concentration", "corridor_net_flow_trend", "corridor_quality_score",
+]
+DEX_FEATURES = [
+    "dex_liquidity_net_1h", "dex_liquidity_net_24h", "dex_lp_spike_level", "dex_lp_spike_direction",
+    "dex_depth_index", "dex_thin_liquidity_share", "dex_price_confidence_avg", "dex_universe_coverage",
+]
+FEATURE_PACKS = {
+    "PACK_A": CEX_FEATURES + ZONES_FEATURES + CORRIDORS_FEATURES,
+    "PACK_A_PLUS_DEX": CEX_FEATURES + ZONES_FEATURES + CORRIDORS_FEATURES + DEX_FEATURES,
+    "PACK_A_MINUS_CEX": ZONES_FEATURES + CORRIDORS_FEATURES,
+    "PACK_A_MINUS_CORRIDORS": CEX_FEATURES + ZONES_FEATURES,
+    "PACK_A_MINUS_ZONES": CEX_FEATURES + CORRIDORS_FEATURES,
+}
+# What train_etap5 actually fits, whatever "algorithm" the payload asks for
+ETAP5_TRAINER = "logreg"
+
+
+class TrainingError(ValueError):
+    """Training request cannot be satisfied (bad pack, too few rows, ...)"""
+
+
+def pack_features(pack: str, available: Optional[Sequence[str]] = None) -> list:
+    if pack in FEATURE_PACKS:
+        return list(FEATURE_PACKS[pack])
+    if pack == "ALL" and available is not None:
+        return list(available)
+    raise TrainingError(f"Unknown feature pack: {pack}")
+
+
+# ---------- metrics ----------
+
+def confusion_matrix(y_true: np.ndarray, y_pred: np.ndarray, n_classes: int) -> np.ndarray:
+    """(true, pred) counts via one bincount"""
+    return np.bincount(y_true * n_classes + y_pred, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+
+def classification_metrics(cm: np.ndarray) -> Dict[str, float]:
+    """
+    Binary: precision/recall/F1 of class 1 (the positive label).
+    Multi-class: macro averages. Empty denominators count as 0.
+    """
+    cm = np.asarray(cm, dtype=np.float64)
+    total = cm.sum()
+    tp = np.diag(cm)
+    pred = cm.sum(axis=0)
+    true = cm.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(pred > 0, tp / pred, 0.0)
+        recall = np.where(true > 0, tp / true, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    if cm.shape[0] == 2:
+        p, r, f = precision[1], recall[1], f1[1]
+        fp_rate = cm[0, 1] / true[0] if true[0] else 0.0
+    else:
+        p, r, f = precision.mean(), recall.mean(), f1.mean()
+        fp_rate = float(np.mean(np.where(total - true > 0, (pred - tp) / np.maximum(total - true, 1), 0.0)))
+    return {
+        "accuracy": float(tp.sum() / total) if total else 0.0,
+        "precision": float(p),
+        "recall": float(r),
+        "f1": float(f),
+        "fpRate": float(fp_rate),
+    }
+
+
+# ---------- training ----------
+
+def split_indices(rows: int, seed: int, holdout: float = 0.2):
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(rows)
+    n_test = max(1, int(rows * holdout))
+    return order[n_test:], order[:n_test]
+
+
+def fit_logreg(
+    X: np.ndarray,
+    y: np.ndarray,
+    n_classes: int,
+    iterations: int = 300,
+    learning_rate: float = 0.5,
+    l2: float = 1e-3,
+    sample_weight: Optional[np.ndarray] = None,
+    progress: Optional[Callable[[float], None]] = None,
+):
+    """
+    Returns (weights, bias) in the original feature space.
+    sample_weight scales each row's loss (normalized to mean 1);
+    progress(fraction) is called about every 5% of the iterations.
+    """
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    Z = (X - mean) / std
+    Y = np.eye(n_classes)[y]
+    n = len(Z)
+    sw = None
+    if sample_weight is not None:
+        sw = np.asarray(sample_weight, dtype=np.float64)
+        sw = (sw / sw.mean())[:, None]
+
+    W = np.zeros((Z.shape[1], n_classes))
+    b = np.zeros(n_classes)
+    every = max(1, iterations // 20)
+    for i in range(iterations):
+        G = softmax(Z @ W + b) - Y
+        if sw is not None:
+            G *= sw
+        W -= learning_rate * (Z.T @ G / n + l2 * W)
+        b -= learning_rate * G.mean(axis=0)
+        if progress is not None and (i + 1) % every == 0:
+            progress((i + 1) / iterations)
+
+    weights = W / std[:, None]
+    bias = b - (mean / std) @ W
+    return weights, bias
+
+
+def train_variant(
+    X_all: np.ndarray,
+    labels: np.ndarray,
+    all_features: Sequence[str],
+    features: Sequence[str],
+    seed: int,
+    task: str,
+    version: str,
+    iterations: int = 300,
+    progress: Optional[Callable[[float], None]] = None,
+) -> dict:
+    """
+    Train one (feature pack, seed) variant on columns of X_all.
+    Returns the model arrays and holdout metrics (picklable, for pools).
+    """
+    started = time.perf_counter()
+    index = {name: i for i, name in enumerate(all_features)}
+    missing = [f for f in features if f not in index]
+    if missing:
+        raise TrainingError(f"Dataset is missing features: {missing}")
+    X = X_all[:, [index[f] for f in features]]
+
+    classes, y = np.unique(labels, return_inverse=True)
+    if len(classes) < 2:
+        raise TrainingError("Need at least two label classes")
+    if len(y) < 10:
+        raise TrainingError(f"Need at least 10 rows, got {len(y)}")
+
+    train_idx, test_idx = split_indices(len(y), seed)
+    weights, bias = fit_logreg(X[train_idx], y[train_idx], len(classes), iterations=iterations, progress=progress)
+    model = LinearModel(task, version, features, [str(c) for c in classes], weights, bias)
+    pred = model.predict_proba(X[test_idx]).argmax(axis=1)
+    cm = confusion_matrix(y[test_idx], pred, len(classes))
+    return {
+        "model": model,
+        "metrics": classification_metrics(cm),
+        "confusion": cm.tolist(),
+        "trainRows": int(len(train_idx)),
+        "testRows": int(len(test_idx)),
+        "trainMs": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def train_etap5(
+    payload: dict,
+    model_dir: str,
+    progress: Optional[Callable[[float, str], None]] = None,
+) -> dict:
+    """
+    Binary candidate model for the self-learning loop (model_trainer.service.ts).
+    payload: X_train, y_train, sample_weights_train, X_eval, y_eval,
+    feature_names, horizon, class_weight, hyperparameters, model_id.
+    Always ETAP5_TRAINER (logistic regression); "lightgbm" requests are trained
+    the same way and the result says so in "algorithm".
+    Returns metrics on the eval split and the artifact location under model_dir.
+    """
+    report = progress or (lambda fraction, stage: None)
+    started = time.perf_counter()
+    X_train = np.asarray(payload["X_train"], dtype=np.float64)
+    y_train = np.asarray(payload["y_train"], dtype=np.int64)
+    X_eval = np.asarray(payload["X_eval"], dtype=np.float64)
+    y_eval = np.asarray(payload["y_eval"], dtype=np.int64)
+    features = list(payload["feature_names"])
+    if X_train.ndim != 2 or X_train.shape[1] != len(features) or len(X_train) != len(y_train):
+        raise TrainingError(f"X_train {X_train.shape} does not match y_train / feature_names")
+    if len(X_eval) and (X_eval.ndim != 2 or X_eval.shape[1] != len(features) or len(X_eval) != len(y_eval)):
+        raise TrainingError(f"X_eval {X_eval.shape} does not match y_eval / feature_names")
+    if set(np.unique(y_train).tolist()) != {0, 1}:
+        raise TrainingError("y_train must contain both classes 0 and 1")
+
+    sample_weights = payload.get("sample_weights_train")
+    weights = np.ones(len(y_train)) if sample_weights is None else np.asarray(sample_weights, dtype=np.float64)
+    if len(weights) != len(y_train):
+        raise TrainingError("sample_weights_train does not match y_train")
+    class_weight = payload.get("class_weight") or {}
+    weights = weights * np.array([float(class_weight.get(str(c), 1.0)) for c in (0, 1)])[y_train]
+
+    hyper = payload.get("hyperparameters") or {}
+    iterations = int(min(hyper.get("max_iter", 300), 2000))
+    # sklearn's C: mean loss + ||w||^2 / (2 C n)
+    l2 = 1.0 / (float(hyper.get("C", 1.0)) * len(y_train))
+
+    report(0.05, "fitting")
+    W, b = fit_logreg(
+        X_train, y_train, 2, iterations=iterations, l2=l2, sample_weight=weights,
+        progress=lambda f: report(0.05 + 0.85 * f, "fitting"),
+    )
+    model_id = str(payload.get("model_id") or f"etap5_{int(time.time() * 1000)}")
+    model = LinearModel(f"etap5_{payload.get('horizon', '7d')}", model_id, features, ["0", "1"], W, b)
+
+    report(0.92, "evaluating")
+    metrics = {}
+    train_pred = model.predict_proba(X_train).argmax(axis=1)
+    metrics["trainAccuracy"] = float((train_pred == y_train).mean())
+    if len(y_eval):
+        cm = confusion_matrix(y_eval, model.predict_proba(X_eval).argmax(axis=1), 2)
+        metrics.update(classification_metrics(cm))
+        metrics["confusion"] = cm.tolist()
+
+    report(0.97, "saving")
+    path = save_version(model, model_dir)
+    digest = hashlib.sha256()
+    size = 0
+    for name in sorted(os.listdir(path)):
+        with open(os.path.join(path, name), "rb") as f:
+            data = f.read()
+        size += len(data)
+        digest.update(data)
+    return {
+        "model_id": model_id,
+        "algorithm": ETAP5_TRAINER,
+        "requested_algorithm": payload.get("algorithm", "logreg"),
+        "metrics": metrics,
+        "artifact_path": path,
+        "artifact_size": size,
+        "artifact_hash": digest.hexdigest(),
+        "train_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
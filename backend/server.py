@@ -3,18 +3,38 @@ FastAPI proxy with WebSocket support for Node.js backend
 Auto-starts Node.js backend if not running
 """
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import httpx
 import websockets
 import os
 import asyncio
 import subprocess
+import signal
 import socket
+import time
 from dotenv import load_dotenv
 
-# Load .env file
-load_dotenv('/app/backend/.env')
+from gateway.admission import AdmissionController, Shed
+from gateway.config import env_float, env_int, env_str
+from gateway.cache import CachedResponse, ResponseCache, etag_matches, make_cache_key, make_etag
+from gateway.compression import CompressionPolicy, encoded_headers, with_vary
+from gateway.metrics import GatewayMetrics, MetricsMiddleware, gauge_lines, process_usage
+from gateway.streaming import (
+    BodyTooLarge,
+    StreamPolicy,
+    forward_request_headers,
+    has_request_body,
+    limited_body,
+    raw_response_headers,
+)
+from gateway.upstream import UpstreamPool
+from gateway.workers import NodeWorker, WorkerPool
+from gateway.ws_hub import WsHub
+
+# Load .env file (GATEWAY_ENV_FILE lets a local test stack point at its own)
+GATEWAY_ENV_FILE = env_str("GATEWAY_ENV_FILE", "/app/backend/.env")
+load_dotenv(GATEWAY_ENV_FILE)
 
 # Debug: log env at startup
 print("[Proxy] COOKIE_ENC_KEY present:", "COOKIE_ENC_KEY" in os.environ)
@@ -23,6 +43,10 @@ print("[Proxy] MONGODB_URI:", os.environ.get("MONGODB_URI", "NOT SET"))
 
 app = FastAPI()
 
+# Prometheus-style metrics; middleware is cheap enough to stay on in prod
+metrics = GatewayMetrics(max_routes=env_int("GATEWAY_METRICS_MAX_ROUTES", 200))
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -31,9 +55,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-NODE_BACKEND_URL = "http://127.0.0.1:8003"
-NODE_WS_URL = "ws://127.0.0.1:8003"
-node_process = None
+NODE_BACKEND_PORT = 8003
+NODE_BACKEND_URL = f"http://127.0.0.1:{NODE_BACKEND_PORT}"
+NODE_BACKEND_DIR = env_str("GATEWAY_NODE_DIR", "/app/backend")
+NODE_LOG_DIR = env_str("GATEWAY_NODE_LOG_DIR", "/var/log/supervisor")
+NODE_HEALTH_PATH = "/api/health"
+
+# Shared keep-alive client for all proxied HTTP traffic
+upstream = UpstreamPool.from_env(NODE_BACKEND_URL)
+stream_policy = StreamPolicy.from_env()
+response_cache = ResponseCache.from_env()
+admission = AdmissionController.from_env()
+compression = CompressionPolicy.from_env()
+# Identity GET bodies up to this size are buffered to get a weak ETag / 304
+ETAG_MAX_BYTES = env_int("GATEWAY_ETAG_MAX_BYTES", 1024 * 1024)
+upstream.on_response = metrics.observe_upstream
+upstream.on_connect = metrics.observe_connect
 
 def is_port_open(port: int) -> bool:
     """Check if a port is already in use"""
@@ -62,23 +99,50 @@ def kill_process_on_port(port: int) -> bool:
         print(f"[Proxy] Error killing process on port {port}: {e}")
     return False
 
-async def start_node_backend():
-    """Start Node.js backend - always with fresh environment"""
-    global node_process
-    
-    # ALWAYS kill existing Node.js process to ensure fresh ENV
-    if is_port_open(8003):
-        print("[Proxy] Killing existing Node.js process to restart with fresh ENV...")
-        kill_process_on_port(8003)
-        await asyncio.sleep(2)  # Wait for port to be released
-    
-    print("[Proxy] Starting Node.js backend with fresh environment...")
-    
-    # Build environment from .env file + current env
+async def wait_ports_free(ports: list, timeout: float = 5.0) -> bool:
+    """Poll with backoff until none of the ports accept connections"""
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        if not any(is_port_open(port) for port in ports):
+            return True
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    return False
+
+def dist_is_stale(dist_entry: str, src_dir: str) -> bool:
+    """True when any TypeScript source is newer than the compiled entry"""
+    built_at = os.path.getmtime(dist_entry)
+    for root, _, files in os.walk(src_dir):
+        for name in files:
+            if name.endswith(".ts") and os.path.getmtime(os.path.join(root, name)) > built_at:
+                return True
+    return False
+
+def resolve_node_command() -> list:
+    """
+    GATEWAY_NODE_MODE:
+      dist - run the prebuilt bundle (yarn build) with plain node
+      tsx  - transpile TypeScript at boot via npx tsx (legacy)
+      auto - dist when it exists and is up to date, else tsx (default)
+    """
+    mode = env_str("GATEWAY_NODE_MODE", "auto").lower()
+    dist_entry = os.path.join(NODE_BACKEND_DIR, "dist", "server-minimal.js")
+    use_dist = mode == "dist"
+    if mode == "auto" and os.path.exists(dist_entry):
+        use_dist = not dist_is_stale(dist_entry, os.path.join(NODE_BACKEND_DIR, "src"))
+        if not use_dist:
+            print("[Proxy] dist/ is older than src/, falling back to tsx (run `yarn build`)")
+    if use_dist:
+        return ["node", "dist/server-minimal.js"]
+    return ["npx", "tsx", "src/server-minimal.ts"]
+
+def build_node_env() -> dict:
+    """Environment for Node.js workers: current env + GATEWAY_ENV_FILE"""
     env = os.environ.copy()
     
     # Explicitly read and set all vars from .env
-    with open('/app/backend/.env', 'r') as f:
+    with open(GATEWAY_ENV_FILE, 'r') as f:
         for line in f:
             line = line.strip()
             if line and not line.startswith('#') and '=' in line:
@@ -87,152 +151,585 @@ async def start_node_backend():
                 value = value.strip().strip('"').strip("'")
                 env[key] = value
     
-    env["PORT"] = "8003"
     env["NODE_OPTIONS"] = "--max-old-space-size=2048"
+    return env
+
+def spawn_node_worker(worker: NodeWorker) -> subprocess.Popen:
+    """Launch one Node.js worker process on worker.port"""
+    env = build_node_env()
+    env["PORT"] = str(worker.port)
+    env["NODE_WORKER_INDEX"] = str(worker.index)
+    # Singleton duties (Telegram polling) run on worker 0 only
+    env["NODE_WORKER_PRIMARY"] = "true" if worker.index == 0 else "false"
     
-    # Log critical env vars being passed
-    print(f"[Proxy] Passing MONGODB_URI to Node.js: {bool(env.get('MONGODB_URI'))}")
-    print(f"[Proxy] MONGODB_URI: {env.get('MONGODB_URI', 'NOT SET')}")
-    print(f"[Proxy] TELEGRAM_BOT_TOKEN present: {bool(env.get('TELEGRAM_BOT_TOKEN'))}")
+    if worker.index == 0:
+        # Log critical env vars being passed
+        print(f"[Proxy] Passing MONGODB_URI to Node.js: {bool(env.get('MONGODB_URI'))}")
+        print(f"[Proxy] MONGODB_URI: {env.get('MONGODB_URI', 'NOT SET')}")
+        print(f"[Proxy] TELEGRAM_BOT_TOKEN present: {bool(env.get('TELEGRAM_BOT_TOKEN'))}")
     
     # Open log files
-    stdout_log = open("/var/log/supervisor/backend-node.out.log", "a")
-    stderr_log = open("/var/log/supervisor/backend-node.err.log", "a")
+    stdout_log = open(os.path.join(NODE_LOG_DIR, "backend-node.out.log"), "a")
+    stderr_log = open(os.path.join(NODE_LOG_DIR, "backend-node.err.log"), "a")
     
-    node_process = subprocess.Popen(
-        ["npx", "tsx", "src/server-minimal.ts"],
-        cwd="/app/backend",
+    return subprocess.Popen(
+        node_command,
+        cwd=NODE_BACKEND_DIR,
         env=env,
         stdout=stdout_log,
         stderr=stderr_log,
         start_new_session=True  # Detach from parent
     )
+
+async def probe_node_health(worker: NodeWorker) -> bool:
+    """Readiness = Node answers its own health route, not just an open port"""
+    try:
+        response = await upstream.client.get(f"{worker.url}{NODE_HEALTH_PATH}", timeout=2.0)
+        return response.status_code == 200
+    except httpx.HTTPError:
+        return False
+
+# Node.js workers on consecutive ports starting at 8003
+node_pool = WorkerPool.from_env(spawn_node_worker, probe_node_health, base_port=NODE_BACKEND_PORT)
+node_command = ["npx", "tsx", "src/server-minimal.ts"]
+
+# Per-phase startup timings (ms), reported under /health
+startup_timings: dict = {}
+node_startup_task = None
+
+def record_phase(name: str, started: float) -> None:
+    startup_timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"[Proxy] Startup phase '{name}': {startup_timings[name]}ms")
+
+async def start_node_backend(boot_started: float):
+    """Start Node.js workers - always with fresh environment"""
+    global node_command
+    
+    # ALWAYS kill existing Node.js processes to ensure fresh ENV
+    t = time.perf_counter()
+    stale_ports = [port for port in node_pool.all_ports if is_port_open(port)]
+    if stale_ports:
+        print("[Proxy] Killing existing Node.js processes to restart with fresh ENV...")
+        for port in stale_ports:
+            kill_process_on_port(port)
+        if not await wait_ports_free(stale_ports):
+            print(f"[Proxy] WARNING: ports {stale_ports} still busy after kill")
+    record_phase("kill_stale", t)
     
-    # Wait for Node.js to start (with retries)
-    for i in range(60):  # Wait up to 60 seconds
-        await asyncio.sleep(1)
-        if is_port_open(8003):
-            print(f"[Proxy] Node.js backend started (PID {node_process.pid}) after {i+1}s")
-            return
+    t = time.perf_counter()
+    node_command = resolve_node_command()
+    record_phase("resolve_command", t)
     
-    print(f"[Proxy] WARNING: Node.js backend may not have started properly (PID {node_process.pid})")
+    print(f"[Proxy] Starting {node_pool.size} Node.js worker(s) via `{' '.join(node_command)}`...")
+    t = time.perf_counter()
+    await node_pool.start()
+    record_phase("workers_ready", t)
+    for worker in node_pool.workers:
+        startup_timings[f"worker_{worker.index}_spawn"] = worker.spawn_ms
+        startup_timings[f"worker_{worker.index}_ready"] = worker.ready_ms
+    record_phase("total", boot_started)
+    print(f"[Proxy] Node.js backend ready on ports {node_pool.ports}")
 
 @app.on_event("startup")
 async def startup():
+    global node_startup_task
+    boot_started = time.perf_counter()
     print("[Proxy] Initializing FastAPI proxy...")
-    await start_node_backend()
-    print("[Proxy] Ready to proxy requests to Node.js backend on port 8003")
+    
+    t = time.perf_counter()
+    await upstream.start()
+    record_phase("upstream_client", t)
+    
+    # Node boots in the background; requests queue in node_pool.acquire_wait
+    # until the first worker passes its health probe
+    node_startup_task = asyncio.create_task(start_node_backend(boot_started))
+    print("[Proxy] Accepting traffic (queued until Node.js is ready)")
+    
+    # `kill -HUP <gateway pid>` triggers a zero-downtime rollout
+    try:
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGHUP, lambda: asyncio.create_task(rolling_restart_node("SIGHUP"))
+        )
+    except (NotImplementedError, RuntimeError):
+        pass
+
+async def rolling_restart_node(reason: str) -> dict:
+    """Blue/green restart of all Node.js workers (fresh .env and build)"""
+    global node_command
+    if node_startup_task is not None and not node_startup_task.done():
+        return {"ok": False, "error": "initial startup still in progress"}
+    print(f"[Proxy] Rolling restart requested ({reason})")
+    node_command = resolve_node_command()
+    result = await node_pool.rolling_restart(
+        drain_timeout=env_float("GATEWAY_NODE_DRAIN_TIMEOUT", 30.0)
+    )
+    print(f"[Proxy] Rolling restart finished: ok={result.get('ok')} in {result.get('duration_ms')}ms")
+    return result
 
 @app.on_event("shutdown")
 async def shutdown():
-    global node_process
     print("[Proxy] Shutting down...")
-    if node_process and node_process.poll() is None:
-        print(f"[Proxy] Terminating Node.js backend (PID {node_process.pid})")
-        node_process.terminate()
-        try:
-            node_process.wait(timeout=10)
-        except subprocess.TimeoutExpired:
-            node_process.kill()
+    if node_startup_task is not None and not node_startup_task.done():
+        node_startup_task.cancel()
+    await node_pool.stop()
+    await upstream.close()
 
-@app.websocket("/ws")
-async def websocket_proxy(websocket: WebSocket):
-    await websocket.accept()
-    try:
-        async with websockets.connect(f"{NODE_WS_URL}/ws") as ws_backend:
-            async def forward_to_client():
-                try:
-                    async for message in ws_backend:
-                        await websocket.send_text(message)
-                except Exception:
-                    pass
+async def sticky_worker(key: str):
+    """Sticky Node.js worker for a WebSocket key, waiting out cold starts"""
+    worker = node_pool.pick_sticky(key)
+    if worker is None:
+        node_pool.release(await node_pool.acquire_wait())
+        worker = node_pool.pick_sticky(key)
+    return worker
 
-            async def forward_to_backend():
-                try:
-                    while True:
-                        data = await websocket.receive_text()
-                        await ws_backend.send(data)
-                except WebSocketDisconnect:
-                    pass
+async def connect_upstream_ws(ws_path: str):
+    """Upstream socket for a hub; one per path, pinned like a client"""
+    worker = await sticky_worker(f"hub:{ws_path}")
+    if worker is None:
+        raise ConnectionError("No healthy Node.js worker")
+    ws = await websockets.connect(
+        f"{worker.ws_url}{ws_path}",
+        ping_interval=WS_PING_INTERVAL,
+        ping_timeout=WS_PING_INTERVAL,
+        max_size=WS_MAX_FRAME_BYTES,
+    )
+    return ws, worker
 
-            await asyncio.gather(forward_to_client(), forward_to_backend())
-    except Exception as e:
-        print(f"[WS Proxy] Error: {e}")
-        await websocket.close()
+# "passthrough" keeps one upstream socket per browser; "hub" multiplexes
+# all browsers over one upstream socket per path (ws-gateway.ts protocol)
+WS_MODE = env_str("GATEWAY_WS_MODE", "passthrough").lower()
+WS_PING_INTERVAL = env_float("GATEWAY_WS_PING_INTERVAL", 20.0)
+WS_MAX_FRAME_BYTES = env_int("GATEWAY_WS_MAX_FRAME_BYTES", 4 * 1024 * 1024)
+ws_passthrough = {"sessions": 0, "from_clients": 0, "to_clients": 0}
+ws_hubs = {
+    path: WsHub(path, connect_upstream_ws, queue_size=env_int("GATEWAY_WS_CLIENT_QUEUE", 256))
+    for path in ("/ws", "/api/ws")
+}
 
-@app.websocket("/api/ws")
-async def api_websocket_proxy(websocket: WebSocket):
+async def relay_websocket(websocket: WebSocket, ws_path: str):
+    """Pipe one browser WebSocket to a sticky Node.js worker"""
     await websocket.accept()
+    if WS_MODE == "hub":
+        await ws_hubs[ws_path].serve(websocket)
+        return
+    
+    client_key = websocket.client.host if websocket.client else "anonymous"
+    worker = await sticky_worker(client_key)
+    if worker is None:
+        await websocket.close(code=1013)  # Try again later
+        return
+    
+    worker.ws_sessions += 1
+    ws_passthrough["sessions"] += 1
     try:
-        async with websockets.connect(f"{NODE_WS_URL}/api/ws") as ws_backend:
+        async with websockets.connect(
+            f"{worker.ws_url}{ws_path}",
+            ping_interval=WS_PING_INTERVAL,
+            ping_timeout=WS_PING_INTERVAL,
+            max_size=WS_MAX_FRAME_BYTES,
+        ) as ws_backend:
             async def forward_to_client():
-                try:
-                    async for message in ws_backend:
+                async for message in ws_backend:
+                    ws_passthrough["to_clients"] += 1
+                    if isinstance(message, bytes):
+                        await websocket.send_bytes(message)
+                    else:
                         await websocket.send_text(message)
-                except Exception:
-                    pass
 
             async def forward_to_backend():
-                try:
-                    while True:
-                        data = await websocket.receive_text()
-                        await ws_backend.send(data)
-                except WebSocketDisconnect:
-                    pass
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        return
+                    ws_passthrough["from_clients"] += 1
+                    if message.get("text") is not None:
+                        await ws_backend.send(message["text"])
+                    elif message.get("bytes") is not None:
+                        await ws_backend.send(message["bytes"])
 
-            await asyncio.gather(forward_to_client(), forward_to_backend())
+            # Whichever side finishes first ends the session
+            tasks = [asyncio.create_task(forward_to_client()), asyncio.create_task(forward_to_backend())]
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                if task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+                    print(f"[WS Proxy] Session error: {task.exception()}")
+        try:
+            await websocket.close()
+        except Exception:
+            pass
     except Exception as e:
         print(f"[WS Proxy] Error: {e}")
-        await websocket.close()
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+    finally:
+        worker.ws_sessions -= 1
+        ws_passthrough["sessions"] -= 1
+
+@app.websocket("/ws")
+async def websocket_proxy(websocket: WebSocket):
+    await relay_websocket(websocket, "/ws")
+
+@app.websocket("/api/ws")
+async def api_websocket_proxy(websocket: WebSocket):
+    await relay_websocket(websocket, "/api/ws")
 
 @app.get("/health")
 async def health():
     """Python Gateway health check"""
-    node_healthy = is_port_open(8003)
+    node_healthy = bool(node_pool.healthy_workers())
     return {
         "service": "python-gateway",
         "status": "ok",
-        "node_backend": "connected" if node_healthy else "disconnected"
+        "node_backend": "connected" if node_healthy else "disconnected",
+        "node_workers": node_pool.stats(),
+        "node_command": " ".join(node_command),
+        "startup_timings_ms": startup_timings,
+        "upstream_pool": upstream.stats(),
+        "response_cache": response_cache.stats(),
+        "admission": admission.stats(),
+        "compression": compression.stats(),
+        "websocket": {
+            "mode": WS_MODE,
+            "hubs": {path: hub.stats() for path, hub in ws_hubs.items()},
+        },
     }
 
+@app.post("/gateway/restart")
+async def gateway_restart(request: Request):
+    """Zero-downtime Node.js restart; loopback only unless GATEWAY_ADMIN_TOKEN is set"""
+    token = os.environ.get("GATEWAY_ADMIN_TOKEN")
+    if token:
+        if request.headers.get("x-gateway-token") != token:
+            return JSONResponse(status_code=403, content={"error": "Forbidden"})
+    elif not request.client or request.client.host not in ("127.0.0.1", "::1", "localhost"):
+        return JSONResponse(status_code=403, content={"error": "Forbidden"})
+    
+    result = await rolling_restart_node("api")
+    return JSONResponse(status_code=200 if result.get("ok") else 409, content=result)
+
+def collect_runtime_metrics() -> list:
+    """Scrape-time gauges: pool, cache, WebSocket and Node.js process usage"""
+    lines = []
+    pool = upstream.stats()
+    lines += gauge_lines("gateway_upstream_in_flight", "Upstream requests in flight", [({}, pool["in_flight"])])
+    lines += gauge_lines("gateway_upstream_pool_saturation", "in_flight / max_connections", [({}, pool["saturation"])])
+    lines += gauge_lines("gateway_upstream_connections_open", "Open upstream connections", [({}, pool["connections_open"])])
+    lines += gauge_lines(
+        "gateway_upstream_pool_timeouts_total", "Upstream pool acquire timeouts",
+        [({}, pool["pool_timeouts"])], kind="counter",
+    )
+    
+    gates = [(prefix, gate.stats()) for prefix, gate in admission.gates]
+    lines += gauge_lines(
+        "gateway_admission_active", "Requests holding a route concurrency slot",
+        [({"route": prefix}, g["active"]) for prefix, g in gates],
+    )
+    lines += gauge_lines(
+        "gateway_admission_waiting", "Requests queued for a route concurrency slot",
+        [({"route": prefix}, g["waiting"]) for prefix, g in gates],
+    )
+    lines += gauge_lines(
+        "gateway_admission_shed_total", "Requests shed by admission control",
+        [({"route": prefix, "reason": "queue_full"}, g["shed_queue_full"]) for prefix, g in gates]
+        + [({"route": prefix, "reason": "timeout"}, g["shed_timeout"]) for prefix, g in gates],
+        kind="counter",
+    )
+    
+    cache = response_cache.stats()
+    lines += gauge_lines(
+        "gateway_cache_events_total", "Response cache events",
+        [({"event": k}, cache[k]) for k in ("hits", "stale_hits", "misses", "coalesced", "not_modified", "evictions")],
+        kind="counter",
+    )
+    lines += gauge_lines("gateway_cache_bytes", "Response cache size in bytes", [({}, cache["bytes"])])
+    
+    hub_clients = sum(len(hub.clients) for hub in ws_hubs.values())
+    from_clients = ws_passthrough["from_clients"] + sum(h.counters["messages_from_clients"] for h in ws_hubs.values())
+    to_clients = ws_passthrough["to_clients"] + sum(h.counters["frames_to_clients"] for h in ws_hubs.values())
+    lines += gauge_lines(
+        "gateway_ws_sessions", "Active browser WebSocket sessions",
+        [({"mode": "hub"}, hub_clients), ({"mode": "passthrough"}, ws_passthrough["sessions"])],
+    )
+    lines += gauge_lines(
+        "gateway_ws_messages_total", "WebSocket messages by direction",
+        [({"direction": "in"}, from_clients), ({"direction": "out"}, to_clients)], kind="counter",
+    )
+    lines += gauge_lines(
+        "gateway_ws_messages_per_second", "WebSocket message rate since previous scrape",
+        [
+            ({"direction": "in"}, round(metrics.rates.rate("ws_in", from_clients), 3)),
+            ({"direction": "out"}, round(metrics.rates.rate("ws_out", to_clients), 3)),
+        ],
+    )
+    
+    healthy, rss, cpu = [], [], []
+    for worker in node_pool.workers:
+        labels = {"worker": str(worker.index), "port": str(worker.port)}
+        healthy.append((labels, 1 if worker.healthy else 0))
+        usage = process_usage(worker.pid) if worker.alive() else None
+        if usage:
+            rss.append((labels, usage["rss_bytes"]))
+            cpu.append((labels, round(usage["cpu_seconds"], 2)))
+    lines += gauge_lines("gateway_node_worker_healthy", "Node.js worker in rotation", healthy)
+    lines += gauge_lines("gateway_node_rss_bytes", "Node.js worker RSS (process tree)", rss)
+    lines += gauge_lines("gateway_node_cpu_seconds_total", "Node.js worker CPU time (process tree)", cpu, kind="counter")
+    lines += gauge_lines("gateway_node_queued_requests", "Requests waiting for a ready worker", [({}, node_pool.queued)])
+    return lines
+
+metrics.add_collector(collect_runtime_metrics)
+
+@app.get("/metrics")
+async def gateway_metrics():
+    """Prometheus text exposition"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+async def serve_cached(request: Request, route: str, headers: dict, ttl: float, stale_ttl: float) -> Response:
+    """GET through the in-process SWR cache (buffered, identity-encoded)"""
+    params = request.query_params.multi_items()
+    key = make_cache_key("GET", route, params)
+    
+    async def fetch() -> CachedResponse:
+        fill_headers = {
+            k: v for k, v in headers.items()
+            if k.lower() not in ("if-none-match", "if-modified-since", "accept-encoding")
+        }
+        fill_headers["accept-encoding"] = "identity"
+        gate = admission.gate_for(route)
+        if gate is not None:
+            await gate.acquire()
+        try:
+            worker = await node_pool.acquire_wait()
+            if worker is None:
+                raise httpx.ConnectError("No healthy Node.js worker")
+            try:
+                response = await upstream.send(
+                    upstream.client.build_request(
+                        "GET", f"{worker.url}{route}", headers=fill_headers, params=params,
+                        timeout=upstream.timeout(admission.timeout_for(route)),
+                    )
+                )
+            finally:
+                node_pool.release(worker)
+        finally:
+            if gate is not None:
+                gate.release()
+        cache_control = response.headers.get("cache-control", "")
+        cacheable = (
+            response.status_code == 200
+            and "set-cookie" not in response.headers
+            and "no-store" not in cache_control
+            and "private" not in cache_control
+        )
+        stored_headers = [
+            (k, v) for k, v in raw_response_headers(response.headers)
+            if k not in (b"content-length", b"content-encoding", b"etag")
+        ]
+        return CachedResponse(
+            response.status_code,
+            stored_headers,
+            response.content,
+            cacheable=cacheable,
+            etag=response.headers.get("etag"),
+        )
+    
+    entry, status = await response_cache.get_or_fetch(key, ttl, stale_ttl, fetch)
+    
+    meta_headers = [
+        (b"etag", entry.etag.encode("latin-1")),
+        (b"x-gateway-cache", status.encode("latin-1")),
+        (b"age", str(int(entry.age)).encode("latin-1")),
+    ]
+    if entry.status_code == 200 and etag_matches(request.headers.get("if-none-match"), entry.etag):
+        response_cache.counters["not_modified"] += 1
+        not_modified = Response(status_code=304)
+        not_modified.raw_headers = meta_headers
+        return not_modified
+    
+    body, raw_headers = entry.body, entry.headers + meta_headers
+    entry_headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in entry.headers}
+    encoding = None
+    if compression.applies(entry.status_code, entry_headers, entry.size):
+        encoding = compression.choose(request.headers.get("accept-encoding"))
+    if encoding:
+        body = entry.encoded(encoding, compression.compress)
+        raw_headers = encoded_headers(raw_headers, encoding, len(body))
+    else:
+        raw_headers = with_vary(raw_headers + [(b"content-length", str(entry.size).encode("latin-1"))])
+    cached = Response(content=body, status_code=entry.status_code)
+    cached.raw_headers = raw_headers
+    return cached
+
+def not_modified_response(etag: str, upstream_headers) -> Response:
+    response = Response(status_code=304)
+    response.raw_headers = [(b"etag", etag.encode("latin-1"))] + [
+        (k, v) for k, v in raw_response_headers(upstream_headers)
+        if k in (b"cache-control", b"vary", b"expires", b"last-modified")
+    ]
+    return response
+
+class RelayResponse(StreamingResponse):
+    """
+    StreamingResponse that releases the upstream stream when it is done
+    sending, whatever the outcome. relay() only releases once its generator
+    has been started; a client that disconnects before the first chunk
+    cancels the send task before that, and would otherwise keep the
+    admission slot, the worker's outstanding count and the connection.
+    """
+
+    def __init__(self, body_iter, upstream_response: httpx.Response, status_code: int):
+        super().__init__(body_iter, status_code=status_code)
+        self.upstream_response = upstream_response
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await upstream.release(self.upstream_response)
+
+async def finish_response(request: Request, route: str, response: httpx.Response) -> Response:
+    """
+    Turn an open upstream stream into the client response:
+    - small identity GET 200s are buffered for a weak ETag (304 on match)
+    - otherwise the raw body is relayed chunk by chunk, compressed on the
+      fly when the client accepts it and Node did not encode it already
+    """
+    inm = request.headers.get("if-none-match")
+    if request.method == "GET" and response.status_code == 200:
+        upstream_etag = response.headers.get("etag")
+        if upstream_etag and inm and etag_matches(inm, upstream_etag):
+            await upstream.release(response)
+            return not_modified_response(upstream_etag, response.headers)
+        try:
+            length = int(response.headers["content-length"])
+        except (KeyError, ValueError):
+            length = None
+        if (
+            upstream_etag is None
+            and length is not None and length <= ETAG_MAX_BYTES
+            and "content-encoding" not in response.headers
+        ):
+            try:
+                body = await response.aread()
+            finally:
+                await upstream.release(response)
+            etag = make_etag(body)
+            if inm and etag_matches(inm, etag):
+                return not_modified_response(etag, response.headers)
+            raw_headers = raw_response_headers(response.headers) + [(b"etag", etag.encode("latin-1"))]
+            encoding = None
+            if compression.applies(response.status_code, response.headers, len(body)):
+                encoding = compression.choose(request.headers.get("accept-encoding"))
+            if encoding:
+                body = compression.compress(body, encoding)
+                raw_headers = encoded_headers(raw_headers, encoding, len(body))
+            buffered = Response(content=body, status_code=200)
+            buffered.raw_headers = raw_headers
+            return buffered
+    
+    # Raw (still encoded) body is relayed chunk by chunk, so upstream
+    # content-encoding / content-length stay valid
+    body_iter = upstream.relay(response, stream_policy.chunk_size_for(route))
+    raw_headers = raw_response_headers(response.headers)
+    encoding = None
+    if compression.applies(response.status_code, response.headers):
+        encoding = compression.choose(request.headers.get("accept-encoding"))
+    if encoding:
+        body_iter = compression.compress_stream(body_iter, encoding)
+        raw_headers = encoded_headers(raw_headers, encoding)
+    proxied = RelayResponse(body_iter, response, status_code=response.status_code)
+    proxied.raw_headers = raw_headers
+    return proxied
+
 @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
 async def proxy(request: Request, path: str):
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        url = f"{NODE_BACKEND_URL}/{path}"
+    route = f"/{path}"
+    headers = forward_request_headers(request.headers)
+    
+    max_request_bytes = stream_policy.max_request_bytes_for(route)
+    try:
+        declared = int(request.headers.get("content-length", "0"))
+    except ValueError:
+        declared = 0
+    if max_request_bytes and declared > max_request_bytes:
+        return JSONResponse(
+            status_code=413,
+            content={"error": "Request body too large", "limit": max_request_bytes}
+        )
+    
+    try:
+        cache_policy = response_cache.policy_for(request.method, route, request.headers)
+        if cache_policy is not None:
+            return await serve_cached(request, route, headers, *cache_policy)
         
-        headers = dict(request.headers)
-        headers.pop("host", None)
+        # Request body is streamed to Node as it arrives from the client
+        body = None
+        if has_request_body(request.headers):
+            body = limited_body(request.stream(), max_request_bytes)
         
+        # Bulkhead slot is held until the response body is fully relayed
+        gate = admission.gate_for(route)
+        if gate is not None:
+            await gate.acquire()
         try:
-            if request.method == "GET":
-                response = await client.get(url, headers=headers, params=request.query_params)
-            elif request.method == "POST":
-                body = await request.body()
-                response = await client.post(url, headers=headers, content=body)
-            elif request.method == "PUT":
-                body = await request.body()
-                response = await client.put(url, headers=headers, content=body)
-            elif request.method == "DELETE":
-                response = await client.delete(url, headers=headers)
-            elif request.method == "PATCH":
-                body = await request.body()
-                response = await client.patch(url, headers=headers, content=body)
-            else:
-                response = await client.options(url, headers=headers)
-            
-            return StreamingResponse(
-                iter([response.content]),
-                status_code=response.status_code,
-                headers=dict(response.headers),
-                media_type=response.headers.get("content-type")
-            )
-        except httpx.ConnectError:
-            return JSONResponse(
-                status_code=503,
-                content={"error": "Node.js backend unavailable", "detail": "Backend is starting..."}
-            )
-        except Exception as e:
-            return JSONResponse(
-                status_code=500,
-                content={"error": str(e)}
-            )
+            worker = await node_pool.acquire_wait()
+            if worker is None:
+                raise httpx.ConnectError("No healthy Node.js worker")
+        except BaseException:
+            if gate is not None:
+                gate.release()
+            raise
+        
+        def on_close():
+            node_pool.release(worker)
+            if gate is not None:
+                gate.release()
+        
+        upstream_request = upstream.client.build_request(
+            request.method,
+            f"{worker.url}{route}",
+            headers=headers,
+            params=request.query_params.multi_items(),
+            content=body,
+            timeout=upstream.timeout(admission.timeout_for(route)),
+        )
+        response = await upstream.open_stream(upstream_request, on_close=on_close)
+        try:
+            return await finish_response(request, route, response)
+        except BaseException:
+            await upstream.release(response)
+            raise
+    except BodyTooLarge as e:
+        return JSONResponse(
+            status_code=413,
+            content={"error": "Request body too large", "limit": e.limit}
+        )
+    except Shed as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"error": e.reason, "route": e.route},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except httpx.ConnectError:
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Node.js backend unavailable", "detail": "Backend is starting..."}
+        )
+    except httpx.PoolTimeout:
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Upstream pool exhausted", "detail": "Too many concurrent requests"}
+        )
+    except httpx.TimeoutException:
+        return JSONResponse(
+            status_code=504,
+            content={"error": "Node.js backend timed out", "timeout": admission.timeout_for(route)}
+        )
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
@@ -19,6 +19,7 @@ import { getCexAddresses } from '../market/exchange_pressure.routes.js';
 
 const BUCKET_SEC = 300; // 5 minutes for v3 granularity
 const VERSION = 'V3.0.0';
+const ML_SERVICE_URL = process.env.ML_SERVICE_URL || 'http://localhost:8002';
 
 // Spike detection thresholds
 const SPIKE_THRESHOLD_MEDIUM = 0.15; // 15% deviation
@@ -323,8 +324,39 @@ export async function runMarketFeatureV3Builder(): Promise<{
   return results;
 }
 
+/**
+ * Backfill CEX Pressure v3 for a whole range of buckets.
+ * The Python feature engine reads the transfers once and bulk-upserts every
+ * bucket, instead of 8 countDocuments per bucket here. Zones are not touched.
+ */
+export async function backfillMarketFeaturesV3(
+  network: string,
+  fromTs: number,
+  toTs: number
+): Promise<{ rows: number; written: number; tookMs: number }> {
+  const response = await fetch(`${ML_SERVICE_URL}/api/features/market/bulk`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      network,
+      start: toBucket(fromTs, BUCKET_SEC),
+      end: toTs,
+      bucketSec: BUCKET_SEC,
+      cexAddresses: Array.from(getCexAddresses(network)),
+      write: true,
+    }),
+  });
+  if (!response.ok) {
+    throw new Error(`Feature backfill failed: HTTP ${response.status} ${await response.text()}`);
+  }
+  const data = await response.json();
+  console.log(`[V3 Market Features] ${network}: backfilled ${data.written}/${data.rows} buckets in ${data.tookMs}ms`);
+  return { rows: data.rows, written: data.written, tookMs: data.tookMs };
+}
+
 export default { 
   runMarketFeatureV3Builder, 
+  backfillMarketFeaturesV3,
   buildMarketFeaturesV3,
   buildCexPressureV3,
   buildZonesV3,
@@ -0,0 +1,52 @@
+/**
+ * P3.6: Portable model parity
+ *
+ * Scores the fixture written by backend/tests/test_ml_portable.py and
+ * compares with the Python outputs stored next to it. Python rounds
+ * half-to-even, JS half-up, hence the 1e-4 tolerance on 4-dp values.
+ */
+
+import fs from 'fs';
+import path from 'path';
+import { fileURLToPath } from 'url';
+import { describe, it, expect } from 'vitest';
+
+import { parsePortableModel, scoreActorLocal, scoreMarketLocal } from '../portable_model.js';
+
+const fixture = JSON.parse(
+  fs.readFileSync(path.join(path.dirname(fileURLToPath(import.meta.url)), 'fixtures', 'portable_parity.json'), 'utf-8')
+);
+
+const TOLERANCE = 1.01e-4;
+
+describe('portable model parity with Python', () => {
+  for (const testCase of fixture.cases) {
+    const model = parsePortableModel(testCase.model);
+
+    it(`${model.kind} ${model.version}: ${testCase.rows.length} rows`, () => {
+      testCase.rows.forEach((row: Record<string, number>, i: number) => {
+        const expected = testCase.expected[i];
+        if (model.kind === 'market') {
+          const got = scoreMarketLocal(model, row);
+          expect(Math.abs(got.pUp - expected.pUp)).toBeLessThanOrEqual(TOLERANCE);
+          expect(Math.abs(got.pDown - expected.pDown)).toBeLessThanOrEqual(TOLERANCE);
+          expect(Math.abs(got.confidence - expected.confidence)).toBeLessThanOrEqual(TOLERANCE);
+          expect(got.mlSignal).toBe(expected.mlSignal);
+        } else {
+          const got = scoreActorLocal(model, row);
+          expect(got.label).toBe(expected.label);
+          expect(Math.abs(got.confidence - expected.confidence)).toBeLessThanOrEqual(TOLERANCE);
+          for (const cls of model.classes) {
+            expect(Math.abs(got.probabilities[cls] - expected.probabilities[cls])).toBeLessThanOrEqual(TOLERANCE);
+          }
+        }
+      });
+    });
+  }
+
+  it('rejects unknown formats and mismatched shapes', () => {
+    expect(() => parsePortableModel({ format: 'onnx' })).toThrow();
+    const bad = { ...fixture.cases[0].model, bias: [0] };
+    expect(() => parsePortableModel(bad)).toThrow();
+  });
+});
@@ -6,12 +6,16 @@
  * 
  * P3.5: Uses trained LightGBM model via Python ML service
  * P0.1: Timeout, retry, circuit-breaker, logging
+ * P3.6: In-process scoring with the exported model (portable_model.ts)
+ * batchPredict() / getTopByClass() score all actors in one batch call
  */
 
 import { loadActorModel } from './model_loader.js';
 import { FeatureActorModel } from '../features/feature.models.js';
-import { callActorPredict } from './ml_python_client.js';
+import { callActorPredict, callActorPredictBatch, featureColumns } from './ml_python_client.js';
 import { logActorInference } from './ml_inference_log.model.js';
+import { getPolicy } from './ml_policy.js';
+import { checkPortableModel, getPortableModel, scoreActorLocal, syncPortableModel, type PortableModel } from './portable_model.js';
 import type { ActorFeatures, ActorClass, ActorPrediction } from './ml_inference.types.js';
 
 /**
@@ -100,8 +104,82 @@ function normalizeFeatures(features: ActorFeatures): number[] {
   ];
 }
 
+/**
+ * Neutral prediction for actors without feature data
+ */
+function unknownActorPrediction(network: string, actorId: string, modelVersion: string): ActorPrediction {
+  return {
+    actorId,
+    network,
+    prediction: {
+      class: 'NEUTRAL',
+      score: 0.5,
+      confidence: 0,
+      probs: [0.33, 0.34, 0.33],
+    },
+    featuresUsed: {
+      inflowUsd: 0,
+      outflowUsd: 0,
+      netFlowUsd: 0,
+      roleScore: 0,
+      exchangeExposure: 0,
+      corridorDensity: 0,
+      corridorPersistence: 0,
+      volatility: 0,
+    },
+    modelVersion,
+  };
+}
+
 export class ActorPredictService {
   
+  /**
+   * Score with the exported Python model, in process
+   */
+  private static predictLocal(
+    network: string,
+    actorId: string,
+    featureDoc: any,
+    p35Features: Record<string, number>,
+    portable: PortableModel,
+    wasFallback: boolean,
+    startTs: number
+  ): ActorPrediction {
+    const scores = scoreActorLocal(portable, p35Features);
+    const prediction: ActorPrediction = {
+      actorId,
+      network,
+      prediction: {
+        class: scores.label as ActorClass,
+        score: scores.confidence,
+        confidence: scores.confidence,
+        probs: [
+          scores.probabilities['SMART'] || 0,
+          scores.probabilities['NEUTRAL'] || 0,
+          scores.probabilities['NOISY'] || 0,
+        ],
+      },
+      featuresUsed: extractFeatures(featureDoc),
+      modelVersion: `${portable.version}_local`,
+    };
+    
+    logActorInference({
+      network,
+      actorId,
+      modelVersion: prediction.modelVersion,
+      wasFallback,
+      features: p35Features,
+      result: {
+        label: scores.label,
+        confidence: scores.confidence,
+        probabilities: scores.probabilities,
+      },
+      latencyMs: Date.now() - startTs,
+    });
+    
+    return prediction;
+  }
+  
   /**
    * Predict actor class
    */
@@ -117,31 +195,20 @@ export class ActorPredictService {
     
     if (!featureDoc) {
       // Return neutral prediction for unknown actors
-      return {
-        actorId,
-        network,
-        prediction: {
-          class: 'NEUTRAL',
-          score: 0.5,
-          confidence: 0,
-          probs: [0.33, 0.34, 0.33],
-        },
-        featuresUsed: {
-          inflowUsd: 0,
-          outflowUsd: 0,
-          netFlowUsd: 0,
-          roleScore: 0,
-          exchangeExposure: 0,
-          corridorDensity: 0,
-          corridorPersistence: 0,
-          volatility: 0,
-        },
-        modelVersion: model.version,
-      };
+      return unknownActorPrediction(network, actorId, model.version);
     }
     
     // P3.5 + P0.1: Use Python ML service with timeout/retry/circuit-breaker
     const p35Features = extractP35Features(featureDoc);
+    
+    // P3.6: Exported model, scored here when configured as primary
+    const localMode = getPolicy().localScoring;
+    const portable = localMode === 'off' ? null : getPortableModel('actor');
+    if (portable && localMode === 'primary') {
+      checkPortableModel('actor');
+      return ActorPredictService.predictLocal(network, actorId, featureDoc, p35Features, portable, false, startTs);
+    }
+    
     const mlResult = await callActorPredict({
       network,
       actorId,
@@ -184,10 +251,33 @@ export class ActorPredictService {
         latencyMs: mlResult.latencyMs,
       });
       
+      // Keep the local copy on the version Python serves
+      if (localMode !== 'off') syncPortableModel('actor', prediction.modelVersion);
+      
       return prediction;
     }
     
-    // FALLBACK: Use baseline model
+    return ActorPredictService.predictFallback(network, actorId, featureDoc, p35Features, portable, startTs);
+  }
+  
+  /**
+   * Python unavailable: exported model if we have one, else the baseline
+   */
+  private static predictFallback(
+    network: string,
+    actorId: string,
+    featureDoc: any,
+    p35Features: Record<string, number>,
+    portable: PortableModel | null,
+    startTs: number
+  ): ActorPrediction {
+    // FALLBACK 1: Last exported model, same weights as the service
+    if (portable) {
+      return ActorPredictService.predictLocal(network, actorId, featureDoc, p35Features, portable, true, startTs);
+    }
+    
+    // FALLBACK 2: Use baseline model
+    const model = loadActorModel();
     const features = extractFeatures(featureDoc);
     const x = normalizeFeatures(features);
     
@@ -239,6 +329,83 @@ export class ActorPredictService {
     return fallbackPrediction;
   }
   
+  /**
+   * Score actors whose feature docs are already loaded, with one batch
+   * call instead of one call per actor. Order follows `rows`.
+   */
+  private static async predictMany(
+    network: string,
+    rows: Array<{ actorId: string; featureDoc: any }>
+  ): Promise<ActorPrediction[]> {
+    if (rows.length === 0) return [];
+    const startTs = Date.now();
+    const p35Rows = rows.map(row => extractP35Features(row.featureDoc));
+    
+    const localMode = getPolicy().localScoring;
+    const portable = localMode === 'off' ? null : getPortableModel('actor');
+    if (portable && localMode === 'primary') {
+      checkPortableModel('actor');
+      return rows.map((row, i) => ActorPredictService.predictLocal(
+        network, row.actorId, row.featureDoc, p35Rows[i], portable, false, startTs
+      ));
+    }
+    
+    const mlResult = await callActorPredictBatch({
+      network,
+      ids: rows.map(row => row.actorId),
+      columns: featureColumns(p35Rows),
+    });
+    const data = mlResult.success ? mlResult.data : undefined;
+    if (!data) {
+      return rows.map((row, i) => ActorPredictService.predictFallback(
+        network, row.actorId, row.featureDoc, p35Rows[i], portable, startTs
+      ));
+    }
+    
+    const predictions = rows.map((row, i) => {
+      const probabilities: Record<string, number> = {};
+      for (const cls of data.classes) {
+        probabilities[cls] = data.probabilities[cls][i];
+      }
+      const prediction: ActorPrediction = {
+        actorId: row.actorId,
+        network,
+        prediction: {
+          class: data.label[i],
+          score: data.confidence[i],
+          confidence: data.confidence[i],
+          probs: [
+            probabilities['SMART'] || 0,
+            probabilities['NEUTRAL'] || 0,
+            probabilities['NOISY'] || 0,
+          ],
+        },
+        featuresUsed: extractFeatures(row.featureDoc),
+        modelVersion: data.modelVersion,
+      };
+      
+      logActorInference({
+        network,
+        actorId: row.actorId,
+        modelVersion: prediction.modelVersion,
+        wasFallback: false,
+        features: p35Rows[i],
+        result: {
+          label: data.label[i],
+          confidence: data.confidence[i],
+          probabilities,
+        },
+        latencyMs: mlResult.latencyMs,
+      });
+      
+      return prediction;
+    });
+    
+    if (localMode !== 'off') syncPortableModel('actor', data.modelVersion);
+    
+    return predictions;
+  }
+  
   /**
    * Batch predict for multiple actors
    */
@@ -246,14 +413,30 @@ export class ActorPredictService {
     network: string, 
     actorIds: string[]
   ): Promise<ActorPrediction[]> {
-    const results: ActorPrediction[] = [];
+    const model = loadActorModel();
     
-    for (const actorId of actorIds) {
-      const prediction = await this.predict(network, actorId);
-      results.push(prediction);
+    // Latest feature doc per actor, one query
+    const latest = await FeatureActorModel.aggregate([
+      { $match: { network, actorId: { $in: actorIds.map(id => id.toLowerCase()) } } },
+      { $sort: { bucketTs: -1 } },
+      { $group: { _id: '$actorId', doc: { $first: '$$ROOT' } } },
+    ]);
+    const docs = new Map<string, any>();
+    for (const entry of latest) {
+      docs.set(entry._id, entry.doc);
     }
     
-    return results;
+    const rows = actorIds
+      .filter(actorId => docs.has(actorId.toLowerCase()))
+      .map(actorId => ({ actorId, featureDoc: docs.get(actorId.toLowerCase()) }));
+    const scored = new Map<string, ActorPrediction>();
+    (await this.predictMany(network, rows)).forEach((prediction, i) => {
+      scored.set(rows[i].actorId, prediction);
+    });
+    
+    return actorIds.map(actorId =>
+      scored.get(actorId) || unknownActorPrediction(network, actorId, model.version)
+    );
   }
   
   /**
@@ -280,14 +463,9 @@ export class ActorPredictService {
     }
     
     // Predict and filter
-    const predictions: ActorPrediction[] = [];
-    
-    for (const actorId of uniqueActors.keys()) {
-      const pred = await this.predict(network, actorId);
-      if (pred.prediction.class === targetClass) {
-        predictions.push(pred);
-      }
-    }
+    const rows = Array.from(uniqueActors, ([actorId, featureDoc]) => ({ actorId, featureDoc }));
+    const predictions = (await this.predictMany(network, rows))
+      .filter(pred => pred.prediction.class === targetClass);
     
     // Sort by score and limit
     return predictions
@@ -6,12 +6,22 @@
  * 
  * P3.5: Uses trained LightGBM model via Python ML service
  * P0.1: Timeout, retry, circuit-breaker, logging
+ * P3.6: In-process scoring with the exported model (portable_model.ts),
+ *       as fallback or, with ML_LOCAL_SCORING=primary, instead of the call
+ * predictAll() scores every network in one batch call
  */
 
 import { loadLatestMarketModel } from './model_loader.js';
 import { FeatureMarketModel } from '../features/feature.models.js';
-import { callMarketPredict } from './ml_python_client.js';
+import {
+  callMarketPredict,
+  callMarketPredictBatch,
+  featureColumns,
+  type MarketPredictRequest,
+} from './ml_python_client.js';
 import { logMarketInference } from './ml_inference_log.model.js';
+import { getPolicy } from './ml_policy.js';
+import { checkPortableModel, getPortableModel, scoreMarketLocal, syncPortableModel, type PortableModel } from './portable_model.js';
 import type { MarketPrediction } from './ml_inference.types.js';
 
 /**
@@ -25,8 +35,78 @@ function regimeToBoost(regime: string): number {
   }
 }
 
+type MarketFeatures = MarketPredictRequest['features'];
+
+const NETWORKS = [
+  'ethereum', 'arbitrum', 'optimism', 'base', 
+  'polygon', 'bnb', 'zksync', 'scroll'
+];
+
+/**
+ * Model inputs from a market feature document
+ */
+function extractMarketFeatures(feature: any): MarketFeatures {
+  return {
+    exchangePressure: feature.cexPressure?.pressure?.w24h || 0,
+    accZoneStrength: feature.zones?.accumulationStrength?.w7d || 0.5,
+    distZoneStrength: feature.zones?.distributionStrength?.w7d || 0.5,
+    corridorsEntropy: feature.corridors?.entropy?.w7d || 0.5,
+  };
+}
+
+/**
+ * Neutral prediction when a network has no feature data
+ */
+function neutralPrediction(network: string, timeBucket: number | undefined, modelVersion: string): MarketPrediction {
+  return {
+    network,
+    timeBucket: timeBucket || Math.floor(Date.now() / 1000),
+    pUp: 0.5,
+    pDown: 0.5,
+    confidence: 0,
+    mlSignal: 'NEUTRAL',
+    modelVersion,
+  };
+}
+
 export class MarketPredictService {
   
+  /**
+   * Score with the exported Python model, in process
+   */
+  private static predictLocal(
+    network: string,
+    timeBucket: number,
+    features: Record<string, number>,
+    portable: PortableModel,
+    wasFallback: boolean,
+    startTs: number
+  ): MarketPrediction {
+    const scores = scoreMarketLocal(portable, features);
+    const prediction: MarketPrediction = {
+      network,
+      timeBucket,
+      ...scores,
+      modelVersion: `${portable.version}_local`,
+    };
+    
+    logMarketInference({
+      network,
+      modelVersion: prediction.modelVersion,
+      wasFallback,
+      features,
+      result: {
+        pUp: prediction.pUp,
+        pDown: prediction.pDown,
+        signal: prediction.mlSignal,
+        confidence: prediction.confidence,
+      },
+      latencyMs: Date.now() - startTs,
+    });
+    
+    return prediction;
+  }
+  
   /**
    * Predict market direction for network
    */
@@ -47,30 +127,18 @@ export class MarketPredictService {
     
     if (!feature) {
       // Return neutral prediction when no data
-      return {
-        network,
-        timeBucket: timeBucket || Math.floor(Date.now() / 1000),
-        pUp: 0.5,
-        pDown: 0.5,
-        confidence: 0,
-        mlSignal: 'NEUTRAL',
-        modelVersion: model.version,
-      };
+      return neutralPrediction(network, timeBucket, model.version);
     }
     
-    // Extract features
-    const exchangePressure = feature.cexPressure?.pressure?.w24h || 0;
-    const accStrength = feature.zones?.accumulationStrength?.w7d || 0.5;
-    const distStrength = feature.zones?.distributionStrength?.w7d || 0.5;
-    const corridorEntropy = feature.corridors?.entropy?.w7d || 0.5;
-    const marketRegime = feature.zones?.marketRegime || 'NEUTRAL';
+    const features = extractMarketFeatures(feature);
     
-    const features = {
-      exchangePressure,
-      accZoneStrength: accStrength,
-      distZoneStrength: distStrength,
-      corridorsEntropy: corridorEntropy,
-    };
+    // P3.6: Exported model, scored here when configured as primary
+    const localMode = getPolicy().localScoring;
+    const portable = localMode === 'off' ? null : getPortableModel('market');
+    if (portable && localMode === 'primary') {
+      checkPortableModel('market');
+      return MarketPredictService.predictLocal(network, feature.bucketTs, features, portable, false, startTs);
+    }
     
     // P3.5 + P0.1: Try Python ML service with timeout/retry/circuit-breaker
     const mlResult = await callMarketPredict({
@@ -105,10 +173,39 @@ export class MarketPredictService {
         latencyMs: mlResult.latencyMs,
       });
       
+      // Keep the local copy on the version Python serves
+      if (localMode !== 'off') syncPortableModel('market', prediction.modelVersion);
+      
       return prediction;
     }
     
-    // FALLBACK: Simple baseline model (no Python needed)
+    return MarketPredictService.predictFallback(network, feature, features, portable, model.version, startTs);
+  }
+  
+  /**
+   * Python unavailable: exported model if we have one, else the baseline
+   */
+  private static predictFallback(
+    network: string,
+    feature: any,
+    features: MarketFeatures,
+    portable: PortableModel | null,
+    modelVersion: string,
+    startTs: number
+  ): MarketPrediction {
+    // FALLBACK 1: Last exported model, same weights as the service
+    if (portable) {
+      return MarketPredictService.predictLocal(network, feature.bucketTs, features, portable, true, startTs);
+    }
+    
+    // FALLBACK 2: Simple baseline model (no Python needed)
+    const {
+      exchangePressure,
+      accZoneStrength: accStrength,
+      distZoneStrength: distStrength,
+      corridorsEntropy: corridorEntropy,
+    } = features;
+    const marketRegime = feature.zones?.marketRegime || 'NEUTRAL';
     let rawScore = 0;
     
     // Exchange pressure: negative = buy signal, positive = sell signal
@@ -143,7 +240,7 @@ export class MarketPredictService {
       pDown: Math.round(pDown * 10000) / 10000,
       confidence: Math.round(confidence * 10000) / 10000,
       mlSignal,
-      modelVersion: `${model.version}_fallback`,
+      modelVersion: `${modelVersion}_fallback`,
     };
     
     // Log fallback inference
@@ -165,20 +262,85 @@ export class MarketPredictService {
   }
   
   /**
-   * Get predictions for all networks
+   * Get predictions for all networks (one batch call for all of them)
    */
   static async predictAll(): Promise<Record<string, MarketPrediction>> {
-    const networks = [
-      'ethereum', 'arbitrum', 'optimism', 'base', 
-      'polygon', 'bnb', 'zksync', 'scroll'
-    ];
+    const startTs = Date.now();
+    const model = loadLatestMarketModel();
     
-    const results: Record<string, MarketPrediction> = {};
+    const docs = await Promise.all(NETWORKS.map(network =>
+      FeatureMarketModel.findOne({ network }).sort({ bucketTs: -1 }).lean()
+    ));
+    
+    const byNetwork: Record<string, MarketPrediction> = {};
+    const rows: Array<{ network: string; feature: any; features: MarketFeatures }> = [];
+    NETWORKS.forEach((network, i) => {
+      const feature: any = docs[i];
+      if (feature) {
+        rows.push({ network, feature, features: extractMarketFeatures(feature) });
+      } else {
+        byNetwork[network] = neutralPrediction(network, undefined, model.version);
+      }
+    });
+    
+    const localMode = getPolicy().localScoring;
+    const portable = localMode === 'off' ? null : getPortableModel('market');
     
-    for (const network of networks) {
-      results[network] = await this.predict(network);
+    if (rows.length > 0 && portable && localMode === 'primary') {
+      checkPortableModel('market');
+      for (const row of rows) {
+        byNetwork[row.network] = MarketPredictService.predictLocal(
+          row.network, row.feature.bucketTs, row.features, portable, false, startTs
+        );
+      }
+    } else if (rows.length > 0) {
+      // Networks share one model; 'all' is the drift stream for mixed batches
+      const mlResult = await callMarketPredictBatch({
+        network: 'all',
+        ids: rows.map(row => row.network),
+        columns: featureColumns(rows.map(row => row.features)),
+      });
+      const data = mlResult.success ? mlResult.data : undefined;
+      
+      rows.forEach((row, i) => {
+        if (!data) {
+          byNetwork[row.network] = MarketPredictService.predictFallback(
+            row.network, row.feature, row.features, portable, model.version, startTs
+          );
+          return;
+        }
+        const prediction: MarketPrediction = {
+          network: row.network,
+          timeBucket: row.feature.bucketTs,
+          pUp: data.pUp[i],
+          pDown: data.pDown[i],
+          confidence: data.confidence[i],
+          mlSignal: data.mlSignal[i],
+          modelVersion: data.modelVersion,
+        };
+        logMarketInference({
+          network: row.network,
+          modelVersion: prediction.modelVersion,
+          wasFallback: false,
+          features: row.features,
+          result: {
+            pUp: prediction.pUp,
+            pDown: prediction.pDown,
+            signal: prediction.mlSignal,
+            confidence: prediction.confidence,
+          },
+          latencyMs: mlResult.latencyMs,
+        });
+        byNetwork[row.network] = prediction;
+      });
+      
+      if (data && localMode !== 'off') syncPortableModel('market', data.modelVersion);
     }
     
+    const results: Record<string, MarketPrediction> = {};
+    for (const network of NETWORKS) {
+      results[network] = byNetwork[network];
+    }
     return results;
   }
 }
@@ -18,8 +18,13 @@ export interface MLPolicyConfig {
     maxErrors: number;
     resetAfterSec: number;
   };
+  // In-process scoring with the exported model (portable_model.ts):
+  // off | fallback (only when Python fails) | primary (no network hop)
+  localScoring: LocalScoringMode;
 }
 
+export type LocalScoringMode = 'off' | 'fallback' | 'primary';
+
 export interface CircuitBreakerState {
   open: boolean;
   errorCount: number;
@@ -48,6 +53,7 @@ const defaultPolicy: MLPolicyConfig = {
     maxErrors: parseInt(process.env.ML_CB_MAX_ERRORS || '5', 10),
     resetAfterSec: parseInt(process.env.ML_CB_RESET_SEC || '60', 10),
   },
+  localScoring: (process.env.ML_LOCAL_SCORING as LocalScoringMode) || 'fallback',
 };
 
 // Runtime state (in-memory)
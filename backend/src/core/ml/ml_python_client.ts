@@ -280,6 +280,212 @@ export async function callActorPredict(
   }
 }
 
+// ============================================
+// BATCH PREDICTION (columnar, one round trip)
+// ============================================
+
+export interface BatchPredictRequest {
+  network: string;
+  ids?: string[];
+  // feature name -> one value per row, all columns the same length
+  columns: Record<string, number[]>;
+}
+
+export interface MarketBatchPredictResponse {
+  network: string;
+  count: number;
+  modelVersion: string;
+  ids: string[] | null;
+  pUp: number[];
+  pDown: number[];
+  confidence: number[];
+  mlSignal: Array<'BUY' | 'SELL' | 'NEUTRAL'>;
+}
+
+export interface ActorBatchPredictResponse {
+  network: string;
+  count: number;
+  modelVersion: string;
+  classes: string[];
+  ids: string[] | null;
+  label: Array<'SMART' | 'NEUTRAL' | 'NOISY'>;
+  probabilities: Record<string, number[]>;
+  confidence: number[];
+}
+
+/**
+ * Row-wise feature objects -> BatchPredictRequest columns
+ */
+export function featureColumns(rows: Array<Record<string, number>>): Record<string, number[]> {
+  const columns: Record<string, number[]> = {};
+  for (const name of Object.keys(rows[0] || {})) {
+    columns[name] = rows.map(row => row[name]);
+  }
+  return columns;
+}
+
+// Batches score thousands of rows; allow more than the per-row timeout
+const BATCH_TIMEOUT_MS = 30000;
+
+async function callBatch<T>(path: string, request: BatchPredictRequest): Promise<MLCallResult<T>> {
+  const startTs = Date.now();
+  const policy = getPolicy();
+  
+  if (!shouldUsePython()) {
+    return {
+      success: false,
+      error: 'Circuit breaker open or Python disabled',
+      latencyMs: Date.now() - startTs,
+      usedFallback: true,
+    };
+  }
+  
+  try {
+    const response = await callWithRetry(async () => {
+      return fetchWithTimeout(
+        `${ML_SERVICE_URL}${path}`,
+        {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify(request),
+        },
+        Math.max(policy.timeoutMs, BATCH_TIMEOUT_MS)
+      );
+    }, policy.retry);
+    
+    const latencyMs = Date.now() - startTs;
+    
+    if (!response.ok) {
+      recordMLError();
+      return {
+        success: false,
+        error: `HTTP ${response.status}`,
+        latencyMs,
+        usedFallback: true,
+      };
+    }
+    
+    const data = await response.json() as T;
+    recordMLSuccess(latencyMs);
+    
+    return {
+      success: true,
+      data,
+      latencyMs,
+      usedFallback: false,
+    };
+  } catch (err: any) {
+    const latencyMs = Date.now() - startTs;
+    recordMLError();
+    
+    console.log(`[MLClient] Batch ${path} failed: ${err.message}`);
+    
+    return {
+      success: false,
+      error: err.message,
+      latencyMs,
+      usedFallback: true,
+    };
+  }
+}
+
+export async function callMarketPredictBatch(
+  request: BatchPredictRequest
+): Promise<MLCallResult<MarketBatchPredictResponse>> {
+  const result = await callBatch<MarketBatchPredictResponse>('/api/p35/predict/market/batch', request);
+  if (result.data) setModelVersion('market', result.data.modelVersion);
+  return result;
+}
+
+export async function callActorPredictBatch(
+  request: BatchPredictRequest
+): Promise<MLCallResult<ActorBatchPredictResponse>> {
+  const result = await callBatch<ActorBatchPredictResponse>('/api/p35/predict/actor/batch', request);
+  if (result.data) setModelVersion('actor', result.data.modelVersion);
+  return result;
+}
+
+// ============================================
+// SHADOW DISAGREEMENT
+// ============================================
+
+export interface ShadowDisagreement {
+  activeVersion: string;
+  shadowVersion: string;
+  rows: number;
+  disagreements: number;
+  disagreementRate: number;
+  meanTvd: number;
+  maxTvd: number;
+}
+
+/**
+ * Rolling active-vs-shadow disagreement accumulated by the ML service
+ * from served batches and dual calls. window: 1h | 24h | 7d | 14d
+ */
+export async function getShadowDisagreement(
+  kind: 'market' | 'actor',
+  window: string
+): Promise<ShadowDisagreement[] | null> {
+  try {
+    const response = await fetchWithTimeout(
+      `${ML_SERVICE_URL}/api/p35/shadows/stats?kind=${kind}&window=${encodeURIComponent(window)}`,
+      { method: 'GET' },
+      2000
+    );
+    if (!response.ok) return null;
+    const data = await response.json();
+    return data.pairs as ShadowDisagreement[];
+  } catch {
+    return null;
+  }
+}
+
+export interface FeatureDriftMetrics {
+  psi: number | null;
+  kl: number | null;
+  ks: number | null;
+  referenceRows: number;
+  currentRows: number;
+  referenceMean: number | null;
+  currentMean: number | null;
+  level: 'LOW' | 'MEDIUM' | 'HIGH' | null;
+}
+
+export interface FeatureDriftReport {
+  stream: string;
+  current: { start: number; end: number; windows: number; rows: number };
+  reference: { start: number; end: number; windows: number; rows: number };
+  maxPsi: number | null;
+  level: 'LOW' | 'MEDIUM' | 'HIGH' | null;
+  features: Record<string, FeatureDriftMetrics>;
+}
+
+/**
+ * Feature distribution drift from the ML service's streaming sketches:
+ * the last `window` against the `baseline` before it (e.g. 24h vs 7d)
+ */
+export async function getFeatureDrift(
+  kind: 'market' | 'actor',
+  network: string | null,
+  window: string = '24h',
+  baseline: string = '7d'
+): Promise<FeatureDriftReport | null> {
+  try {
+    const params = new URLSearchParams({ window, baseline });
+    if (network) params.set('network', network);
+    const response = await fetchWithTimeout(
+      `${ML_SERVICE_URL}/api/drift/${kind}?${params}`,
+      { method: 'GET' },
+      5000
+    );
+    if (!response.ok) return null;
+    return (await response.json()) as FeatureDriftReport;
+  } catch {
+    return null;
+  }
+}
+
 // ============================================
 // HEALTH CHECK
 // ============================================
@@ -300,5 +506,9 @@ export async function checkPythonHealth(): Promise<boolean> {
 export default {
   callMarketPredict,
   callActorPredict,
+  callMarketPredictBatch,
+  callActorPredictBatch,
+  getShadowDisagreement,
+  getFeatureDrift,
   checkPythonHealth,
 };
@@ -0,0 +1,234 @@
+/**
+ * P3.6 Portable Model Runtime
+ *
+ * In-process scoring with the models the Python ML service serves:
+ * - Export: GET /api/p35/models/<kind>/export (format linear-softmax/v1)
+ * - Math: logits = transform(x) · W + b, row softmax (ml_service/models.py)
+ * - Parity: __tests__/portable_model.parity.test.ts scores the same
+ *   fixture Python checks in tests/test_ml_portable.py
+ *
+ * The last export is kept in memory and in models/portable/<kind>.json,
+ * so scoring keeps working through ML service restarts and Node restarts.
+ */
+
+import fs from 'fs';
+import path from 'path';
+
+const ML_SERVICE_URL = process.env.ML_SERVICE_URL || 'http://localhost:8002';
+const EXPORT_TIMEOUT_MS = 5000;
+// Primary mode never calls Python, so the export is re-checked on a TTL
+const EXPORT_CHECK_MS = parseInt(process.env.ML_PORTABLE_CHECK_SEC || '60', 10) * 1000;
+
+export const PORTABLE_FORMAT = 'linear-softmax/v1';
+
+export type PortableKind = 'market' | 'actor';
+
+export interface PortableModel {
+  format: string;
+  kind: PortableKind;
+  version: string;
+  hash?: string;
+  features: string[];
+  classes: string[];
+  weights: number[][];      // [feature][class]
+  bias: number[];
+  logScale: boolean[];
+  thresholds: { buy: number; sell: number };
+}
+
+// ============================================
+// VALIDATION
+// ============================================
+
+export function parsePortableModel(data: any): PortableModel {
+  if (!data || data.format !== PORTABLE_FORMAT) {
+    throw new Error(`Unsupported portable model format: ${data?.format}`);
+  }
+  const nFeatures = data.features?.length ?? 0;
+  const nClasses = data.classes?.length ?? 0;
+  if (
+    !Array.isArray(data.weights) ||
+    data.weights.length !== nFeatures ||
+    data.weights.some((row: number[]) => !Array.isArray(row) || row.length !== nClasses)
+  ) {
+    throw new Error(`${data.kind} weights do not match (${nFeatures}, ${nClasses})`);
+  }
+  if (!Array.isArray(data.bias) || data.bias.length !== nClasses) {
+    throw new Error(`${data.kind} bias does not match ${nClasses} classes`);
+  }
+  return {
+    ...data,
+    logScale: Array.isArray(data.logScale) ? data.logScale : new Array(nFeatures).fill(false),
+  } as PortableModel;
+}
+
+// ============================================
+// SCORING (same math as ml_service/models.py)
+// ============================================
+
+/**
+ * Missing features score as 0; NaN/inf -> 0; signed log1p on log-scaled columns
+ */
+export function logitsOf(model: PortableModel, features: Record<string, number>): number[] {
+  const z = model.bias.slice();
+  for (let i = 0; i < model.features.length; i++) {
+    let x = features[model.features[i]];
+    if (typeof x !== 'number' || !Number.isFinite(x)) x = 0;
+    if (model.logScale[i]) x = Math.sign(x) * Math.log1p(Math.abs(x));
+    if (x === 0) continue;
+    const row = model.weights[i];
+    for (let j = 0; j < z.length; j++) z[j] += x * row[j];
+  }
+  return z;
+}
+
+export function softmax(z: number[]): number[] {
+  const max = Math.max(...z);
+  const e = z.map(v => Math.exp(v - max));
+  const sum = e.reduce((a, b) => a + b, 0);
+  return e.map(v => v / sum);
+}
+
+const round4 = (x: number) => Math.round(x * 10000) / 10000;
+
+export function scoreMarketLocal(model: PortableModel, features: Record<string, number>): {
+  pUp: number;
+  pDown: number;
+  confidence: number;
+  mlSignal: 'BUY' | 'SELL' | 'NEUTRAL';
+} {
+  const z = logitsOf(model, features);
+  const pUp = softmax(z)[0];
+  let mlSignal: 'BUY' | 'SELL' | 'NEUTRAL' = 'NEUTRAL';
+  if (pUp >= model.thresholds.buy) mlSignal = 'BUY';
+  else if (pUp <= model.thresholds.sell) mlSignal = 'SELL';
+  return {
+    pUp: round4(pUp),
+    pDown: round4(1 - pUp),
+    confidence: round4(Math.min(1, Math.abs(z[0] - z[1]))),
+    mlSignal,
+  };
+}
+
+export function scoreActorLocal(model: PortableModel, features: Record<string, number>): {
+  label: string;
+  probabilities: Record<string, number>;
+  confidence: number;
+} {
+  const probs = softmax(logitsOf(model, features));
+  const order = probs.map((p, j) => j).sort((a, b) => probs[b] - probs[a]);
+  const probabilities: Record<string, number> = {};
+  model.classes.forEach((cls, j) => { probabilities[cls] = round4(probs[j]); });
+  return {
+    label: model.classes[order[0]],
+    probabilities,
+    confidence: round4(probs[order[0]] - (order.length > 1 ? probs[order[1]] : 0)),
+  };
+}
+
+// ============================================
+// CACHE (memory -> disk -> ML service export)
+// ============================================
+
+const loaded: Partial<Record<PortableKind, PortableModel>> = {};
+const refreshing: Partial<Record<PortableKind, Promise<PortableModel | null>>> = {};
+const checkedAt: Partial<Record<PortableKind, number>> = {};
+
+function cachePath(kind: PortableKind): string {
+  return path.join(process.cwd(), 'models', 'portable', `${kind}.json`);
+}
+
+/**
+ * Last exported model, or null if none was ever fetched
+ */
+export function getPortableModel(kind: PortableKind): PortableModel | null {
+  if (loaded[kind]) return loaded[kind]!;
+  const file = cachePath(kind);
+  if (!fs.existsSync(file)) return null;
+  try {
+    loaded[kind] = parsePortableModel(JSON.parse(fs.readFileSync(file, 'utf-8')));
+    console.log(`[P3 ML] Loaded portable ${kind} model ${loaded[kind]!.version} from disk`);
+    return loaded[kind]!;
+  } catch (err: any) {
+    console.log(`[P3 ML] Ignoring portable ${kind} cache: ${err.message}`);
+    return null;
+  }
+}
+
+/**
+ * Fetch the active model from the ML service (conditional on its hash)
+ */
+export async function refreshPortableModel(kind: PortableKind): Promise<PortableModel | null> {
+  if (refreshing[kind]) return refreshing[kind]!;
+
+  checkedAt[kind] = Date.now();
+  refreshing[kind] = (async () => {
+    const current = getPortableModel(kind);
+    const controller = new AbortController();
+    const timeoutId = setTimeout(() => controller.abort(), EXPORT_TIMEOUT_MS);
+    try {
+      const response = await fetch(`${ML_SERVICE_URL}/api/p35/models/${kind}/export`, {
+        headers: current?.hash ? { 'If-None-Match': `"${current.hash}"` } : {},
+        signal: controller.signal,
+      });
+      if (response.status === 304) return current;
+      if (!response.ok) return current;
+
+      const model = parsePortableModel(await response.json());
+      const file = cachePath(kind);
+      fs.mkdirSync(path.dirname(file), { recursive: true });
+      fs.writeFileSync(`${file}.tmp`, JSON.stringify(model));
+      fs.renameSync(`${file}.tmp`, file);
+      loaded[kind] = model;
+      console.log(`[P3 ML] Portable ${kind} model updated to ${model.version}`);
+      return model;
+    } catch (err: any) {
+      console.log(`[P3 ML] Portable ${kind} export failed: ${err.message}`);
+      return current;
+    } finally {
+      clearTimeout(timeoutId);
+      delete refreshing[kind];
+    }
+  })();
+
+  return refreshing[kind]!;
+}
+
+/**
+ * Called with the version the ML service just answered with; re-exports
+ * in the background when the local copy is a different version
+ */
+export function syncPortableModel(kind: PortableKind, servedVersion: string): void {
+  const current = loaded[kind] ?? getPortableModel(kind);
+  if (current?.version === servedVersion) return;
+  void refreshPortableModel(kind);
+}
+
+/**
+ * Called when scoring without the ML service; re-exports in the background
+ * once the last check is older than ML_PORTABLE_CHECK_SEC, so promotions,
+ * reloads and rollbacks reach primary mode (unchanged hash -> 304)
+ */
+export function checkPortableModel(kind: PortableKind): void {
+  if (Date.now() - (checkedAt[kind] ?? 0) < EXPORT_CHECK_MS) return;
+  void refreshPortableModel(kind);
+}
+
+export function getPortableStatus(): Record<PortableKind, { version: string; hash?: string } | null> {
+  const status = (kind: PortableKind) => {
+    const model = getPortableModel(kind);
+    return model ? { version: model.version, hash: model.hash } : null;
+  };
+  return { market: status('market'), actor: status('actor') };
+}
+
+export default {
+  parsePortableModel,
+  scoreMarketLocal,
+  scoreActorLocal,
+  getPortableModel,
+  refreshPortableModel,
+  syncPortableModel,
+  checkPortableModel,
+  getPortableStatus,
+};
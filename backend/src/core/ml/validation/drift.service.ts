@@ -2,6 +2,8 @@
  * Drift Detection Service - ML v2.1 STEP 2
  * 
  * Detects model degradation by comparing accuracy windows.
+ * Feature distribution drift (PSI per feature) comes from the streaming
+ * sketches kept by the Python ML service, see runFeatureDriftDetection.
  */
 
 import { AccuracySnapshotModel, IAccuracySnapshot } from './accuracy_snapshot.model.js';
@@ -11,6 +13,8 @@ import {
   DriftSeverity,
   DriftAction 
 } from './drift_event.model.js';
+import { getFeatureDrift } from '../ml_python_client.js';
+import { getModelStatus } from '../ml_policy.js';
 
 // ============================================
 // CONFIG - DRIFT THRESHOLDS
@@ -70,6 +74,7 @@ export async function detectDrift(
   const recentDrift = await DriftEventModel.findOne({
     network: current.network,
     modelVersion: current.modelVersion,
+    metric: 'accuracy',
     severity,
     createdAt: { $gte: new Date(Date.now() - 12 * 60 * 60 * 1000) },
   });
@@ -131,7 +136,8 @@ export async function runDriftDetection(
 }
 
 /**
- * Run drift detection for all networks
+ * Run drift detection for all networks, plus feature drift on the 'all'
+ * stream that mixed-network batches (predictAll) are observed under
  */
 export async function runAllDriftDetection(): Promise<{
   checked: number;
@@ -145,9 +151,67 @@ export async function runAllDriftDetection(): Promise<{
     if (event) drifts++;
   }
   
+  for (const network of new Set([...networks, 'all'])) {
+    try {
+      drifts += (await runFeatureDriftDetection(network)).length;
+    } catch (err: any) {
+      console.error(`[Drift] Feature drift detection failed for ${network}:`, err.message);
+    }
+  }
+  
   return { checked: networks.length, drifts };
 }
 
+/**
+ * Feature distribution drift for one network ('all' = the mixed-network
+ * stream): last 24h against the 7d before it. The ML service answers from
+ * merged hourly sketches, so this does not reload samples. One event per
+ * MEDIUM/HIGH feature, metric 'psi:<feature>'.
+ */
+export async function runFeatureDriftDetection(
+  network: string,
+  kind: 'market' | 'actor' = 'market'
+): Promise<IDriftEvent[]> {
+  const report = await getFeatureDrift(kind, network, '24h', '7d');
+  if (!report) return [];
+
+  const modelVersion = getModelStatus(kind).version;
+  const events: IDriftEvent[] = [];
+
+  for (const [feature, metrics] of Object.entries(report.features)) {
+    if (metrics.psi === null || !metrics.level || metrics.level === 'LOW') continue;
+    const severity = metrics.level as DriftSeverity;
+    const metric = `psi:${feature}`;
+
+    const recentDrift = await DriftEventModel.findOne({
+      network,
+      metric,
+      severity,
+      createdAt: { $gte: new Date(Date.now() - 12 * 60 * 60 * 1000) },
+    });
+    if (recentDrift) continue;
+
+    const event = new DriftEventModel({
+      modelVersion,
+      network,
+      metric,
+      baselineWindow: '7d',
+      currentWindow: '1d',
+      baselineValue: metrics.referenceMean ?? 0,
+      currentValue: metrics.currentMean ?? 0,
+      delta: metrics.psi,
+      severity,
+      actionSuggested: ACTIONS[severity],
+    });
+    await event.save();
+    events.push(event);
+
+    console.log(`[Drift] FEATURE ${network} ${feature} ${severity} (PSI ${metrics.psi.toFixed(3)})`);
+  }
+
+  return events;
+}
+
 /**
  * Get recent drift events
  */
@@ -223,6 +287,7 @@ export default {
   detectDrift,
   runDriftDetection,
   runAllDriftDetection,
+  runFeatureDriftDetection,
   getRecentDrifts,
   acknowledgeDrift,
   getDriftSummary,
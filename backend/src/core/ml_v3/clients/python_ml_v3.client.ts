@@ -26,6 +26,27 @@ export interface EvaluateResponse {
   meta?: Record<string, any>;
 }
 
+export interface EvaluateManyRequest {
+  task: 'market' | 'actor';
+  modelIds: string[];
+  datasetIds: string[];
+}
+
+export interface EvaluateManyResult extends EvaluateResponse {
+  modelId: string;
+  datasetId: string;
+  cached: boolean;           // served from the (model hash, dataset hash) memo
+  confusionMatrix: number[][];
+}
+
+export interface EvaluateManyResponse {
+  results: EvaluateManyResult[];
+  errors: Array<{ modelId?: string; datasetId?: string; error: string; message: string }>;
+  computed: number;
+  cached: number;
+  tookMs: number;
+}
+
 export class PythonMLV3Client {
   constructor(
     private baseUrl: string,
@@ -33,10 +54,34 @@ export class PythonMLV3Client {
   ) {}
 
   async evaluate(req: EvaluateRequest): Promise<EvaluateResponse> {
-    const url = `${this.baseUrl}/api/v3/evaluate`;
+    return this.post<EvaluateResponse>('/api/v3/evaluate', req);
+  }
+
+  /**
+   * Every model on every dataset in one call (cross product).
+   * Pairs evaluated before come back from the ML service's memo.
+   */
+  async evaluateMany(req: EvaluateManyRequest): Promise<EvaluateManyResponse> {
+    return this.post<EvaluateManyResponse>('/api/v3/evaluate/batch', req);
+  }
+
+  /**
+   * Find one pair in an evaluateMany response
+   */
+  static pick(res: EvaluateManyResponse, modelId: string, datasetId: string): EvaluateManyResult {
+    const found = res.results.find(r => r.modelId === modelId && r.datasetId === datasetId);
+    if (!found) {
+      const error = res.errors.find(e => e.modelId === modelId || e.datasetId === datasetId);
+      throw new Error(`ML Service error: ${error ? error.message : `no result for ${modelId} on ${datasetId}`}`);
+    }
+    return found;
+  }
+
+  private async post<T>(path: string, body: any): Promise<T> {
+    const url = `${this.baseUrl}${path}`;
     
     try {
-      const { data } = await axios.post(url, req, {
+      const { data } = await axios.post(url, body, {
         timeout: this.timeoutMs,
         headers: {
           'Content-Type': 'application/json',
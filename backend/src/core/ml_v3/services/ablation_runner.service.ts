@@ -39,19 +39,15 @@ export class AblationRunnerService {
     console.log(`  Model B: ${input.modelB.modelId} (${input.modelB.featurePack})`);
     console.log(`  Dataset: ${input.datasetId}`);
 
-    // 1. Evaluate both models on the same dataset
-    const [metricsA, metricsB] = await Promise.all([
-      this.py.evaluate({
-        task: input.task,
-        modelId: input.modelA.modelId,
-        datasetId: input.datasetId,
-      }),
-      this.py.evaluate({
-        task: input.task,
-        modelId: input.modelB.modelId,
-        datasetId: input.datasetId,
-      }),
-    ]);
+    // 1. Evaluate both models on the same dataset (one call; the base model
+    //    is usually memoized from earlier variants)
+    const evaluation = await this.py.evaluateMany({
+      task: input.task,
+      modelIds: [input.modelA.modelId, input.modelB.modelId],
+      datasetIds: [input.datasetId],
+    });
+    const metricsA = PythonMLV3Client.pick(evaluation, input.modelA.modelId, input.datasetId);
+    const metricsB = PythonMLV3Client.pick(evaluation, input.modelB.modelId, input.datasetId);
 
     console.log(`[Ablation Runner] Model A metrics: F1=${metricsA.f1.toFixed(3)}, Acc=${metricsA.accuracy.toFixed(3)}`);
     console.log(`[Ablation Runner] Model B metrics: F1=${metricsB.f1.toFixed(3)}, Acc=${metricsB.accuracy.toFixed(3)}`);
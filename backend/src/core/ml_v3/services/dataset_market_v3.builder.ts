@@ -11,8 +11,10 @@ import { FeatureMarketModel, FeatureCorridorModel } from '../../features/feature
 import { DatasetMarketV3, type IDatasetMarketV3 } from '../models/dataset_market_v3.model.js';
 import { DatasetMarketMeta } from '../models/dataset_market_meta.model.js';
 import { getDexAggregates, type DexAggregates } from './dex_feature_adapter.service.js';
+import axios from 'axios';
 
 const VERSION = 'v3.0-b4';
+const ML_SERVICE_URL = process.env.ML_SERVICE_URL || 'http://localhost:8002';
 
 // Map spike level string to number
 function spikeLevelToNum(level?: string): number {
@@ -162,6 +164,10 @@ export async function buildMarketDatasetV3(network: string): Promise<DatasetBuil
   // 5. Save meta
   await saveDatasetMeta(datasetId, network, result, dexResult.stats || null);
   
+  // 6. Have the ML service materialize it as columnar files once,
+  //    so training / ablation / stability runs map it instead of re-reading rows
+  await materializeOnMlService(datasetId);
+  
   console.log(
     `[Dataset V3] Complete: ${rows.length} rows, ` +
     `dex=${dexResult.available ? 'YES' : 'NO'}, ${durationMs}ms`
@@ -248,6 +254,23 @@ async function saveDatasetMeta(
   });
 }
 
+/**
+ * Best effort: a failure only means the first training run reads Mongo
+ */
+async function materializeOnMlService(datasetId: string): Promise<void> {
+  try {
+    const res = await axios.post(
+      `${ML_SERVICE_URL}/api/v3/datasets/${encodeURIComponent(datasetId)}/materialize`,
+      null,
+      { timeout: 120000 }
+    );
+    console.log(`[Dataset V3] Materialized ${datasetId}: hash=${res.data.datasetHash}, ${res.data.tookMs}ms`);
+  } catch (error: any) {
+    const reason = error.response?.data?.message || error.message;
+    console.warn(`[Dataset V3] Materialize skipped for ${datasetId}: ${reason}`);
+  }
+}
+
 /**
  * Get latest dataset metadata for a network
  */
@@ -81,7 +81,8 @@ const MLModelVersionSchema = new mongoose.Schema({
   
   // ========== HYPERPARAMETERS ==========
   hyperparameters: {
-    algorithm: { type: String, required: true }, // 'logreg', 'lightgbm', etc.
+    algorithm: { type: String, required: true }, // 'logreg', 'lightgbm', etc. - as actually trained
+    requestedAlgorithm: { type: String }, // what the trainer asked for, when the ML service substituted
     classWeight: { type: mongoose.Schema.Types.Mixed },
     regularization: { type: Number },
     maxDepth: { type: Number },
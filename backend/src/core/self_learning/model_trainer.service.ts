@@ -18,8 +18,13 @@ import {
 import { loadTrainingDataset, validateTrainingDataset } from './training_dataset.service.js';
 import { getClassWeights } from './label_builder.service.js';
 import { logSelfLearningEvent } from './audit_helpers.js';
+import { hashTrainConfig } from './train_config_hash.util.js';
 import { env } from '../../config/env.js';
 
+// Training runs as a job on the ML service; we only poll its status
+const TRAIN_JOB_POLL_MS = 2000;
+const TRAIN_JOB_DEADLINE_MS = 30 * 60 * 1000;
+
 export interface TrainModelRequest {
   datasetVersionId: string;
   horizon: '7d' | '30d';
@@ -45,7 +50,7 @@ export interface TrainModelResult {
  */
 export async function trainModel(request: TrainModelRequest): Promise<TrainModelResult> {
   const start = Date.now();
-  const { datasetVersionId, horizon, algorithm = 'lightgbm', triggeredBy = 'scheduler' } = request;
+  const { datasetVersionId, horizon, algorithm = 'logreg', triggeredBy = 'scheduler' } = request;
   
   console.log(`[Model Trainer] ========== TRAINING START ==========`);
   console.log(`[Model Trainer] Dataset: ${datasetVersionId}`);
@@ -79,6 +84,8 @@ export async function trainModel(request: TrainModelRequest): Promise<TrainModel
     // Calculate class weights for imbalance
     const classWeights = getClassWeights(dataset.metadata.labelCounts.train);
     
+    const hyperparameters = request.hyperparameters || getDefaultHyperparameters(algorithm);
+    
     const trainingPayload = {
       // Features and labels
       X_train: dataset.train.X,
@@ -95,11 +102,21 @@ export async function trainModel(request: TrainModelRequest): Promise<TrainModel
       // Hyperparameters
       algorithm,
       class_weight: classWeights,
-      hyperparameters: request.hyperparameters || getDefaultHyperparameters(algorithm),
+      hyperparameters,
       
       // Identifiers
       model_id: modelId,
       dataset_version_id: datasetVersionId,
+      
+      // Idempotency: same dataset + config returns the cached artifact
+      dataset_hash: dataset.metadata.datasetHash,
+      config_hash: hashTrainConfig({
+        algorithm,
+        hyperparameters,
+        class_weight: classWeights,
+        horizon,
+        feature_names: dataset.metadata.featureNames,
+      }),
     };
     
     // ========== LOG TRAINING START ==========
@@ -122,16 +139,11 @@ export async function trainModel(request: TrainModelRequest): Promise<TrainModel
     console.log(`[Model Trainer] Step 3: Calling Python ML service...`);
     
     const mlServiceUrl = env.ML_SERVICE_URL || 'http://localhost:8003';
-    const trainEndpoint = `${mlServiceUrl}/train-etap5`;
+    const trainEndpoint = `${mlServiceUrl}/api/jobs/train-etap5`;
     
     let trainResponse;
     try {
-      const response = await axios.post(trainEndpoint, trainingPayload, {
-        timeout: 300000, // 5 min timeout
-        headers: { 'Content-Type': 'application/json' },
-      });
-      
-      trainResponse = response.data;
+      trainResponse = await runTrainingJob(mlServiceUrl, trainEndpoint, trainingPayload);
       console.log(`[Model Trainer] Training completed`);
       
     } catch (apiError: any) {
@@ -181,11 +193,12 @@ export async function trainModel(request: TrainModelRequest): Promise<TrainModel
         splitRatio: dataset.metadata.splitRatio,
       },
       
-      // Hyperparameters
+      // Hyperparameters (algorithm = what the ML service actually trained)
       hyperparameters: {
-        algorithm,
         classWeight: classWeights,
         ...request.hyperparameters,
+        algorithm: trainResponse.algorithm || algorithm,
+        requestedAlgorithm: algorithm,
       },
       
       // Training metrics
@@ -284,6 +297,36 @@ function getDefaultHyperparameters(algorithm: 'logreg' | 'lightgbm'): any {
   return {};
 }
 
+/**
+ * Submit a training job and poll until it finishes.
+ * A cached result (same dataset + config hash) comes back DONE on submit.
+ */
+async function runTrainingJob(mlServiceUrl: string, submitUrl: string, payload: any): Promise<any> {
+  const submitted = await axios.post(submitUrl, payload, {
+    timeout: 60000, // upload only
+    headers: { 'Content-Type': 'application/json' },
+    maxBodyLength: Infinity,
+  });
+  
+  let job = submitted.data;
+  console.log(`[Model Trainer] Job ${job.jobId}: ${job.status}${job.cached ? ' (cached)' : ''}`);
+  
+  const deadline = Date.now() + TRAIN_JOB_DEADLINE_MS;
+  while (job.status !== 'DONE' && job.status !== 'FAILED') {
+    if (Date.now() > deadline) {
+      throw new Error(`Training job ${job.jobId} still ${job.status} after ${TRAIN_JOB_DEADLINE_MS}ms`);
+    }
+    await new Promise(resolve => setTimeout(resolve, TRAIN_JOB_POLL_MS));
+    const polled = await axios.get(`${mlServiceUrl}/api/jobs/${job.jobId}`, { timeout: 10000 });
+    job = polled.data;
+  }
+  
+  if (job.status === 'FAILED') {
+    throw new Error(job.error || 'Training job failed');
+  }
+  return job.result;
+}
+
 /**
  * Get model by ID
  */
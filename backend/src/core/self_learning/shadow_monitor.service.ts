@@ -28,6 +28,7 @@ import { getActiveModelId, getPointer } from './active_model_pointer.model.js';
 import { MLModelVersionModel } from './ml_model_version.model.js';
 import { autoRollback } from './rollback.service.js';
 import { logSelfLearningEvent } from './audit_helpers.js';
+import { getShadowDisagreement, type ShadowDisagreement } from '../ml/ml_python_client.js';
 import crypto from 'crypto';
 
 // ==================== THRESHOLDS ====================
@@ -69,6 +70,8 @@ export interface MonitorResult {
   shouldAutoRollback: boolean;
   autoRollbackTriggered: boolean;
   consecutiveCritical: number;
+  // Active vs shadow disagreement over the same window, from the ML service (null if unavailable)
+  shadowDisagreement?: ShadowDisagreement[] | null;
   error?: string;
 }
 
@@ -133,7 +136,10 @@ export async function runMonitor(request: MonitorRequest): Promise<MonitorResult
     
     // In production: query actual predictions vs outcomes
     // For now: use model's eval metrics as baseline proxy
-    const metrics = await computeRollingMetrics(horizon, modelId, windowStart, windowEnd);
+    const [metrics, shadowDisagreement] = await Promise.all([
+      computeRollingMetrics(horizon, modelId, windowStart, windowEnd),
+      getShadowDisagreement('market', window),
+    ]);
     
     // ========== STEP 3: COMPARE WITH BASELINE ==========
     
@@ -197,6 +203,7 @@ export async function runMonitor(request: MonitorRequest): Promise<MonitorResult
         metrics,
         consecutiveCritical,
         shouldAutoRollback,
+        shadowDisagreement,
       },
       triggeredBy: 'shadow_monitor',
       severity: decision === 'CRITICAL' ? 'critical' : decision === 'DEGRADED' ? 'warning' : 'info',
@@ -233,6 +240,7 @@ export async function runMonitor(request: MonitorRequest): Promise<MonitorResult
       shouldAutoRollback,
       autoRollbackTriggered,
       consecutiveCritical,
+      shadowDisagreement,
     };
     
   } catch (error: any) {
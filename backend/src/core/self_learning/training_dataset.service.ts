@@ -28,6 +28,7 @@ export interface TrainingDataset {
   };
   metadata: {
     datasetVersionId: string;
+    datasetHash: string;
     horizon: '7d' | '30d';
     featureNames: string[];
     featureCount: number;
@@ -184,6 +185,7 @@ export async function loadTrainingDataset(
     },
     metadata: {
       datasetVersionId,
+      datasetHash: datasetVersion.contentHash,
       horizon,
       featureNames: trainFeatures.featureNames,
       featureCount: trainFeatures.featureNames.length,
@@ -1,7 +1,8 @@
 /**
  * ML Drift Detection Job - ML v2.1 STEP 2
  * 
- * Cron job that checks for model degradation.
+ * Cron job that checks for model degradation (accuracy windows) and
+ * feature distribution drift (ML service sketches).
  * Runs every 12 hours.
  */
 
@@ -39,9 +39,14 @@ async function main(): Promise<void> {
     console.log(`[Server] Environment: ${env.NODE_ENV}`);
     
     // Start Telegram polling for bot commands
-    startTelegramPolling().catch(err => {
-      console.error('[Server] Telegram polling error:', err);
-    });
+    // (gateway worker pools run it on the primary worker only)
+    if (process.env.NODE_WORKER_PRIMARY !== 'false') {
+      startTelegramPolling().catch(err => {
+        console.error('[Server] Telegram polling error:', err);
+      });
+    } else {
+      console.log(`[Server] Worker ${process.env.NODE_WORKER_INDEX}: Telegram polling disabled (non-primary)`);
+    }
   } catch (err) {
     app.log.error(err);
     process.exit(1);
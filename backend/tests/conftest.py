@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Make backend-local Python packages (gateway, ...) importable from tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load benchmark gate (no-op unless a test uses the `benchmarks` fixture)
+pytest_plugins = ("loadtest.pytest_plugin",)
@@ -0,0 +1,116 @@
+"""
+Test Gateway Admission Control - per-route bulkheads
+
+Features tested:
+- Route limits and timeouts parsed from env (longest prefix wins)
+- Requests over the limit queue FIFO and are admitted on release
+- Full queue is shed immediately with 429
+- Queue wait timeout is shed with 503
+- A saturated bulkhead does not affect other routes
+"""
+
+import asyncio
+
+import pytest
+
+from gateway.admission import AdmissionController, RouteGate, Shed
+
+
+class TestAdmission:
+    """Admission control unit tests"""
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("GATEWAY_ROUTE_LIMITS", "/api/admin/*=2:3:1.5,/api/admin/heavy=1")
+        monkeypatch.setenv("GATEWAY_ROUTE_TIMEOUTS", "/api/graph=30")
+        monkeypatch.setenv("GATEWAY_UPSTREAM_READ_TIMEOUT", "45")
+        admission = AdmissionController.from_env()
+        heavy = admission.gate_for("/api/admin/heavy/run")
+        assert (heavy.limit, heavy.max_queue, heavy.queue_wait) == (1, 4, 5.0)
+        admin = admission.gate_for("/api/admin/users")
+        assert (admin.limit, admin.max_queue, admin.queue_wait) == (2, 3, 1.5)
+        assert admission.gate_for("/api/actors") is None
+        assert admission.timeout_for("/api/graph/nodes") == 30
+        assert admission.timeout_for("/api/actors") == 45
+
+    def test_defaults(self, monkeypatch):
+        monkeypatch.delenv("GATEWAY_ROUTE_LIMITS", raising=False)
+        monkeypatch.delenv("GATEWAY_ROUTE_TIMEOUTS", raising=False)
+        admission = AdmissionController.from_env()
+        assert admission.gate_for("/api/v4/twitter/accounts") is not None
+        assert admission.timeout_for("/api/admin/x") == 120
+
+    def test_queue_and_handover(self):
+        async def run():
+            gate = RouteGate("/api/admin", limit=1, max_queue=2, queue_wait=1.0)
+            await gate.acquire()
+            order = []
+
+            async def waiter(name):
+                await gate.acquire()
+                order.append(name)
+
+            tasks = [asyncio.create_task(waiter("a")), asyncio.create_task(waiter("b"))]
+            await asyncio.sleep(0.01)
+            assert gate.stats()["waiting"] == 2
+            gate.release()
+            await asyncio.sleep(0.01)
+            assert order == ["a"] and gate.active == 1
+            gate.release()
+            await asyncio.gather(*tasks)
+            assert order == ["a", "b"]
+            gate.release()
+            assert gate.active == 0 and gate.admitted == 3
+
+        asyncio.run(run())
+
+    def test_queue_full_sheds_429(self):
+        async def run():
+            gate = RouteGate("/api/admin", limit=1, max_queue=0, queue_wait=3.0)
+            await gate.acquire()
+            with pytest.raises(Shed) as e:
+                await gate.acquire()
+            assert e.value.status_code == 429 and e.value.retry_after == 3
+            assert gate.shed_queue_full == 1
+
+        asyncio.run(run())
+
+    def test_wait_timeout_sheds_503(self):
+        async def run():
+            gate = RouteGate("/api/graph", limit=1, max_queue=4, queue_wait=0.05)
+            await gate.acquire()
+            with pytest.raises(Shed) as e:
+                await gate.acquire()
+            assert e.value.status_code == 503 and e.value.retry_after == 1
+            assert gate.stats()["waiting"] == 0 and gate.shed_timeout == 1
+            gate.release()
+            assert gate.active == 0
+
+        asyncio.run(run())
+
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        async def run():
+            gate = RouteGate("/api/graph", limit=1, max_queue=4, queue_wait=5.0)
+            await gate.acquire()
+            task = asyncio.create_task(gate.acquire())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.sleep(0.01)
+            gate.release()
+            assert gate.active == 0
+            await gate.acquire()
+            assert gate.active == 1
+
+        asyncio.run(run())
+
+    def test_bulkheads_are_independent(self, monkeypatch):
+        monkeypatch.setenv("GATEWAY_ROUTE_LIMITS", "/api/admin=1:0")
+
+        async def run():
+            admission = AdmissionController.from_env()
+            await admission.gate_for("/api/admin/a").acquire()
+            with pytest.raises(Shed):
+                await admission.gate_for("/api/admin/b").acquire()
+            # Interactive reads have no gate at all
+            assert admission.gate_for("/api/actors/list") is None
+
+        asyncio.run(run())
@@ -0,0 +1,145 @@
+"""
+Test Gateway Response Cache - SWR + single-flight for hot GET endpoints
+
+Features tested:
+- Query normalization (param order, cache busters)
+- N concurrent misses -> one upstream call
+- Stale entries served while refreshing in background
+- LRU eviction by entry count
+- ETag / If-None-Match -> 304 through the proxy route
+"""
+
+import asyncio
+
+import httpx
+
+import server
+from gateway.cache import CachedResponse, ResponseCache, etag_matches, make_cache_key, parse_cache_routes
+
+
+def _entry(body: bytes = b'{"ok":true}') -> CachedResponse:
+    return CachedResponse(200, [(b"content-type", b"application/json")], body)
+
+
+class TestResponseCache:
+    """Response cache unit tests"""
+
+    def test_key_normalization(self):
+        a = make_cache_key("GET", "/api/graph", [("window", "7d"), ("limit", "50"), ("_", "123")])
+        b = make_cache_key("get", "/api/graph", [("limit", "50"), ("window", "7d")])
+        assert a == b
+        assert a != make_cache_key("GET", "/api/graph", [("window", "24h")])
+        # ?a=1%262 (a="1&2") vs ?a=1&2=
+        assert make_cache_key("GET", "/p", [("a", "1&2")]) != make_cache_key("GET", "/p", [("a", "1"), ("2", "")])
+
+    def test_per_user_requests_bypass(self):
+        cache = ResponseCache(parse_cache_routes("/api/graph=15"))
+        assert cache.policy_for("GET", "/api/graph", {}) == (15.0, 15.0)
+        for headers in ({"authorization": "Bearer t"}, {"cookie": "sid=1"}, {"cache-control": "no-cache"}):
+            assert cache.policy_for("GET", "/api/graph", headers) is None, headers
+        assert cache.counters["bypass"] == 3
+
+    def test_route_parsing(self):
+        routes = parse_cache_routes("/api/graph=15:120,/api/v2/zones=30,/bad=x,/off=0")
+        assert dict(routes) == {"/api/graph": (15.0, 120.0), "/api/v2/zones": (30.0, 30.0)}
+
+    def test_etag_matching(self):
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('W/"abc", "def"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"xyz"', '"abc"')
+        assert not etag_matches(None, '"abc"')
+
+    def test_single_flight_coalesces_concurrent_misses(self):
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return _entry()
+
+        async def run():
+            cache = ResponseCache(routes=[])
+            results = await asyncio.gather(*[cache.get_or_fetch("k", 10, 60, fetch) for _ in range(20)])
+            statuses = sorted(status for _, status in results)
+            return cache, statuses
+
+        cache, statuses = asyncio.run(run())
+        assert calls == 1
+        assert statuses.count("MISS") == 1
+        assert statuses.count("COALESCED") == 19
+        assert cache.stats()["entries"] == 1
+
+    def test_stale_while_revalidate(self):
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return _entry(f"v{calls}".encode())
+
+        async def run():
+            cache = ResponseCache(routes=[])
+            await cache.get_or_fetch("k", 0.01, 60, fetch)
+            await asyncio.sleep(0.02)
+            entry, status = await cache.get_or_fetch("k", 0.01, 60, fetch)
+            assert status == "STALE" and entry.body == b"v1"
+            await asyncio.sleep(0.005)
+            return cache
+
+        cache = asyncio.run(run())
+        assert calls == 2
+        assert cache._entries["k"].body == b"v2"
+        assert cache.counters["revalidations"] == 1
+
+    def test_lru_eviction(self):
+        async def fetch():
+            return _entry()
+
+        async def run():
+            cache = ResponseCache(routes=[], max_entries=2)
+            for key in ("a", "b", "a", "c"):
+                await cache.get_or_fetch(key, 10, 60, fetch)
+            return cache
+
+        cache = asyncio.run(run())
+        assert list(cache._entries) == ["a", "c"]
+        assert cache.counters["evictions"] == 1
+
+    def test_proxy_serves_304_for_matching_etag(self):
+        calls = 0
+
+        async def body():
+            yield b'{"ok":true,"data":{"nodes":[]}}'
+
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            assert request.headers["accept-encoding"] == "identity"
+            return httpx.Response(200, headers={"content-type": "application/json"}, content=body())
+
+        async def run():
+            server.response_cache = ResponseCache(routes=parse_cache_routes("/api/graph=30:60"))
+            server.node_pool.workers[0].healthy = True
+            server.upstream._client = httpx.AsyncClient(
+                base_url=server.upstream.base_url, transport=httpx.MockTransport(handler)
+            )
+            try:
+                transport = httpx.ASGITransport(app=server.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+                    first = await client.get("/api/graph?window=7d")
+                    second = await client.get(
+                        "/api/graph?window=7d&_=1", headers={"if-none-match": first.headers["etag"]}
+                    )
+                    return first, second
+            finally:
+                await server.upstream.close()
+
+        first, second = asyncio.run(run())
+        assert first.status_code == 200
+        assert first.headers["x-gateway-cache"] == "MISS"
+        assert first.json()["ok"] is True
+        assert second.status_code == 304
+        assert second.headers["x-gateway-cache"] == "HIT"
+        assert calls == 1
@@ -0,0 +1,163 @@
+"""
+Test Gateway Compression - negotiated encoding and conditional GETs
+
+Features tested:
+- Accept-Encoding negotiation with q-values
+- Size threshold, content-type and no-transform rules
+- Streamed gzip output decodes to the original body
+- Upstream-encoded bodies pass through untouched
+- Weak ETag + 304 for unchanged GET responses
+"""
+
+import asyncio
+import gzip
+
+import httpx
+
+import server
+from gateway.compression import CompressionPolicy, encoded_headers, parse_accept_encoding
+
+
+async def _stream(data: bytes):
+    yield data
+
+
+def _run_with_upstream(handler, coro_fn):
+    async def run():
+        server.node_pool.workers[0].healthy = True
+        server.upstream._client = httpx.AsyncClient(
+            base_url=server.upstream.base_url, transport=httpx.MockTransport(handler)
+        )
+        try:
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+                return await coro_fn(client)
+        finally:
+            await server.upstream.close()
+    return asyncio.run(run())
+
+
+def _json_handler(payload: bytes, extra_headers=()):
+    def handler(request):
+        return httpx.Response(
+            200,
+            headers=[("content-type", "application/json"), ("content-length", str(len(payload))), *extra_headers],
+            content=_stream(payload),
+        )
+    return handler
+
+
+class TestCompressionPolicy:
+    """Negotiation and eligibility rules"""
+
+    def test_negotiation(self):
+        policy = CompressionPolicy(use_brotli=False)
+        assert parse_accept_encoding("gzip, br;q=0.8") == {"gzip": 1.0, "br": 0.8}
+        assert policy.choose("gzip, deflate") == "gzip"
+        assert policy.choose("gzip;q=0") is None
+        assert policy.choose("*") == "gzip"
+        assert policy.choose("identity") is None
+        assert policy.choose(None) is None
+        assert CompressionPolicy(enabled=False).choose("gzip") is None
+
+    def test_applies(self):
+        policy = CompressionPolicy(min_bytes=100)
+        json_headers = {"content-type": "application/json; charset=utf-8"}
+        assert policy.applies(200, json_headers, 500)
+        assert not policy.applies(200, json_headers, 50)
+        assert policy.applies(200, json_headers)  # unknown length
+        assert not policy.applies(204, json_headers, 500)
+        assert not policy.applies(200, {"content-type": "image/png"}, 500)
+        assert not policy.applies(200, {"content-type": "text/event-stream"}, 500)
+        assert not policy.applies(200, {**json_headers, "content-encoding": "gzip"}, 500)
+        assert not policy.applies(200, {**json_headers, "cache-control": "no-transform"}, 500)
+
+    def test_stream_roundtrip_and_headers(self):
+        policy = CompressionPolicy(use_brotli=False)
+        body = b'{"nodes": [' + b'{"id": 1}, ' * 5000 + b"]}"
+
+        async def chunks():
+            for i in range(0, len(body), 4096):
+                yield body[i:i + 4096]
+
+        async def collect():
+            return b"".join([c async for c in policy.compress_stream(chunks(), "gzip")])
+
+        compressed = asyncio.run(collect())
+        assert gzip.decompress(compressed) == body
+        assert policy.stats()["ratio"] < 0.1
+
+        headers = encoded_headers([(b"content-length", b"9"), (b"vary", b"Origin")], "gzip", 3)
+        assert (b"content-encoding", b"gzip") in headers
+        assert (b"content-length", b"3") in headers
+        assert (b"vary", b"Origin, accept-encoding") in headers
+
+
+class TestGatewayCompression:
+    """End-to-end through the proxy route"""
+
+    def test_compressed_for_gzip_client(self):
+        payload = b'{"items": "' + b"a" * 20_000 + b'"}'
+
+        async def call(client):
+            return await client.get("/api/actors/list", headers={"accept-encoding": "gzip"})
+
+        response = _run_with_upstream(_json_handler(payload), call)
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(payload)
+        assert response.content == payload  # httpx decodes gzip
+
+    def test_small_body_not_compressed(self):
+        async def call(client):
+            return await client.get("/api/actors/list", headers={"accept-encoding": "gzip"})
+
+        response = _run_with_upstream(_json_handler(b'{"ok": true}'), call)
+        assert "content-encoding" not in response.headers
+        assert response.content == b'{"ok": true}'
+
+    def test_upstream_encoding_passed_through(self):
+        payload = gzip.compress(b'{"items": "' + b"a" * 20_000 + b'"}')
+        seen = {}
+
+        def handler(request):
+            seen["accept-encoding"] = request.headers.get("accept-encoding")
+            return httpx.Response(
+                200,
+                headers=[("content-type", "application/json"), ("content-encoding", "gzip")],
+                content=_stream(payload),
+            )
+
+        async def call(client):
+            async with client.stream("GET", "/api/actors/list", headers={"accept-encoding": "gzip"}) as response:
+                return response, b"".join([c async for c in response.aiter_raw()])
+
+        response, raw = _run_with_upstream(handler, call)
+        assert seen["accept-encoding"] == "gzip"
+        assert response.headers["content-encoding"] == "gzip"
+        assert raw == payload  # not decoded and re-encoded
+
+    def test_weak_etag_and_304(self):
+        payload = b'{"actors": [1, 2, 3]}'
+
+        async def call(client):
+            first = await client.get("/api/actors/list")
+            second = await client.get("/api/actors/list", headers={"if-none-match": first.headers["etag"]})
+            changed = await client.get("/api/actors/list", headers={"if-none-match": 'W/"other"'})
+            return first, second, changed
+
+        first, second, changed = _run_with_upstream(_json_handler(payload), call)
+        assert first.headers["etag"].startswith('W/"')
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == first.headers["etag"]
+        assert changed.status_code == 200 and changed.content == payload
+
+    def test_post_is_not_buffered_for_etag(self):
+        async def call(client):
+            return await client.post("/api/actors/list", content=b"{}")
+
+        response = _run_with_upstream(_json_handler(b'{"ok": true}'), call)
+        assert response.status_code == 200
+        assert "etag" not in response.headers
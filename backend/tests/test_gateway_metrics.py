@@ -0,0 +1,92 @@
+"""
+Test Gateway Metrics - Prometheus text exposition
+
+Features tested:
+- Route labels collapse ids to keep cardinality bounded
+- Histogram buckets are cumulative with +Inf/_sum/_count
+- Middleware records status, latency and bytes per route
+- /proc sampling of a process tree
+- /metrics endpoint renders upstream and Node.js worker series
+"""
+
+import asyncio
+import os
+
+import httpx
+
+import server
+from gateway.metrics import OTHER_ROUTE, GatewayMetrics, Histogram, RouteLabels, process_usage, route_label
+
+
+class TestGatewayMetrics:
+    """Metrics unit tests"""
+
+    def test_route_label(self):
+        assert route_label("/api/actors/0x1234567890abcdef/graph") == "/api/actors/:id/graph"
+        assert route_label("/api/alerts/42") == "/api/alerts/:id"
+        assert route_label("/api/graph") == "/api/graph"
+        assert route_label("/api/v4/twitter/runtime/search/more") == "/api/v4/twitter/runtime"
+
+    def test_route_labels_capped(self):
+        labels = RouteLabels(max_routes=3)
+        assert [labels(f"/api/tokens/{s}") for s in ("eth", "btc", "sol")] == [
+            "/api/tokens/eth", "/api/tokens/btc", "/api/tokens/sol"
+        ]
+        assert labels("/api/tokens/pepe") == labels("/api/actors/vitalik") == OTHER_ROUTE
+        assert labels("/api/tokens/eth") == "/api/tokens/eth" and labels.overflow == 2
+
+        m = GatewayMetrics(max_routes=1)
+        m.observe_upstream("/api/graph", 0.01)
+        m.observe_upstream("/api/tokens/eth", 0.01)
+        assert set(m.upstream_response.values) == {("/api/graph",), (OTHER_ROUTE,)}
+        assert "gateway_route_label_overflow_total 1" in m.render()
+
+    def test_histogram_render(self):
+        h = Histogram("t_seconds", "test", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            h.observe("/x", value=value)
+        lines = h.render()
+        assert 't_seconds_bucket{route="/x",le="0.1"} 1' in lines
+        assert 't_seconds_bucket{route="/x",le="1"} 2' in lines
+        assert 't_seconds_bucket{route="/x",le="+Inf"} 3' in lines
+        assert 't_seconds_count{route="/x"} 3' in lines
+
+    def test_error_counters(self):
+        m = GatewayMetrics()
+        m.observe_request("/api/graph", "GET", 503, 0.01, 0, 10)
+        m.observe_request("/api/graph", "GET", 500, 0.01, 0, 10)
+        m.observe_request("/api/graph", "GET", 200, 0.01, 5, 10)
+        assert m.errors.values == {("5xx",): 2, ("503",): 1}
+        assert m.bytes_out.values[("/api/graph",)] == 30
+
+    def test_process_usage_self(self):
+        usage = process_usage(os.getpid())
+        assert usage["rss_bytes"] > 0
+        assert usage["cpu_seconds"] >= 0
+
+    def test_metrics_endpoint(self):
+        async def body():
+            yield b'{"ok":true}'
+
+        def handler(request):
+            return httpx.Response(200, content=body())
+
+        async def run():
+            server.node_pool.workers[0].healthy = True
+            server.upstream._client = httpx.AsyncClient(
+                base_url=server.upstream.base_url, transport=httpx.MockTransport(handler)
+            )
+            server.upstream.on_response = server.metrics.observe_upstream
+            try:
+                transport = httpx.ASGITransport(app=server.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+                    await client.get("/api/connections/accounts")
+                    return (await client.get("/metrics")).text
+            finally:
+                await server.upstream.close()
+
+        text = asyncio.run(run())
+        assert 'gateway_http_requests_total{route="/api/connections/accounts",method="GET",status="200"} 1' in text
+        assert "gateway_upstream_response_seconds_count" in text
+        assert 'gateway_node_worker_healthy{worker="0",port="8003"} 1' in text
+        assert "gateway_ws_messages_per_second" in text
@@ -0,0 +1,168 @@
+"""
+Test Gateway Streaming - chunked relay of request and response bodies
+
+Features tested:
+- Response body relayed in bounded chunks with upstream headers intact
+- Request body streamed to upstream
+- Per-route request body limit returns 413
+- Repeated Set-Cookie headers survive the hop
+- A client that disconnects before the first chunk frees the upstream stream, admission slot and worker
+"""
+
+import asyncio
+
+import httpx
+
+import server
+from gateway.admission import AdmissionController, RouteGate
+from gateway.config import env_route_map, match_route
+from gateway.streaming import StreamPolicy
+
+
+async def _stream(data: bytes):
+    # Generator content keeps MockTransport responses unread, like a real socket
+    yield data
+
+
+def _run_with_upstream(handler, coro_fn, policy=None):
+    async def run():
+        server.node_pool.workers[0].healthy = True
+        server.upstream._client = httpx.AsyncClient(
+            base_url=server.upstream.base_url, transport=httpx.MockTransport(handler)
+        )
+        original_policy = server.stream_policy
+        if policy is not None:
+            server.stream_policy = policy
+        try:
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+                return await coro_fn(client)
+        finally:
+            server.stream_policy = original_policy
+            await server.upstream.close()
+    return asyncio.run(run())
+
+
+class TestGatewayStreaming:
+    """Streaming proxy tests"""
+
+    def test_route_map_longest_prefix(self, monkeypatch):
+        monkeypatch.setenv("X_ROUTES", "/api=1,/api/graph=2,/api/admin/*=3,broken")
+        routes = env_route_map("X_ROUTES", int)
+        assert match_route(routes, "/api/graph/nodes") == 2
+        assert match_route(routes, "/api/admin/ml") == 3
+        assert match_route(routes, "/api/actors") == 1
+        assert match_route(routes, "/health", 0) == 0
+
+    def test_response_streamed_in_chunks(self):
+        payload = b"x" * 300_000
+
+        async def body():
+            for i in range(0, len(payload), 100_000):
+                yield payload[i:i + 100_000]
+
+        def handler(request):
+            return httpx.Response(
+                200,
+                headers=[("content-type", "application/json"), ("set-cookie", "a=1"), ("set-cookie", "b=2")],
+                content=body(),
+            )
+
+        async def call(client):
+            chunks = []
+            headers = {"accept-encoding": "identity"}
+            async with client.stream("GET", "/api/connections/graph?window=7d", headers=headers) as response:
+                async for chunk in response.aiter_raw():
+                    chunks.append(chunk)
+                return response, chunks
+
+        policy = StreamPolicy(chunk_bytes=1024, route_chunk_bytes=[("/api/connections", 64 * 1024)])
+        response, chunks = _run_with_upstream(handler, call, policy)
+        assert response.status_code == 200
+        assert b"".join(chunks) == payload
+        assert response.headers.get_list("set-cookie") == ["a=1", "b=2"]
+        assert server.upstream.in_flight == 0
+
+    def test_relay_respects_chunk_size(self):
+        def handler(request):
+            return httpx.Response(200, content=_stream(b"y" * 200_000))
+
+        async def run():
+            pool = server.upstream.__class__("http://upstream.test")
+            pool._client = httpx.AsyncClient(base_url=pool.base_url, transport=httpx.MockTransport(handler))
+            response = await pool.open_stream(pool.client.build_request("GET", "/api/graph"))
+            assert pool.in_flight == 1
+            sizes = [len(c) async for c in pool.relay(response, 16 * 1024)]
+            assert pool.in_flight == 0
+            await pool.close()
+            return sizes
+
+        sizes = asyncio.run(run())
+        assert sum(sizes) == 200_000
+        assert max(sizes) <= 16 * 1024
+
+    def test_request_body_streamed_upstream(self):
+        seen = {}
+
+        async def handler(request):
+            seen["body"] = await request.aread()
+            seen["query"] = request.url.query
+            return httpx.Response(201, content=_stream(b'{"ok": true}'))
+
+        async def call(client):
+            return await client.post("/api/actors?x=1&x=2", content=b"{\"a\": 1}")
+
+        response = _run_with_upstream(handler, call)
+        assert response.status_code == 201
+        assert seen["body"] == b"{\"a\": 1}"
+        assert seen["query"] == b"x=1&x=2"
+
+    def test_request_body_limit(self):
+        def handler(request):
+            return httpx.Response(200, content=_stream(b""))
+
+        async def call(client):
+            return await client.post("/api/admin/upload", content=b"z" * 2048)
+
+        policy = StreamPolicy(route_max_request_bytes=[("/api/admin", 1024)])
+        response = _run_with_upstream(handler, call, policy)
+        assert response.status_code == 413
+        assert response.json()["limit"] == 1024
+
+    def test_disconnect_before_first_chunk_releases(self, monkeypatch):
+        def handler(request):
+            return httpx.Response(200, content=_stream(b"z" * 200_000))
+
+        gate = RouteGate("/api/graph", 1, 0, 1.0)
+        monkeypatch.setattr(server, "admission", AdmissionController([("/api/graph", gate)], []))
+        sent = []
+
+        async def receive():
+            # Client is already gone: the response never pulls a chunk
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message["type"])
+            await asyncio.sleep(0)
+
+        async def run():
+            server.node_pool.workers[0].healthy = True
+            server.upstream._client = httpx.AsyncClient(
+                base_url=server.upstream.base_url, transport=httpx.MockTransport(handler)
+            )
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "POST", "scheme": "http", "path": "/api/graph/nodes", "raw_path": b"/api/graph/nodes",
+                "root_path": "", "query_string": b"", "headers": [(b"host", b"gateway")],
+                "client": ("127.0.0.1", 1234), "server": ("gateway", 80),
+            }
+            try:
+                await server.app(scope, receive, send)
+                assert [worker.outstanding for worker in server.node_pool.workers] == [0] * len(server.node_pool.workers)
+                return server.upstream.in_flight
+            finally:
+                await server.upstream.close()
+
+        assert asyncio.run(run()) == 0
+        assert "http.response.body" not in sent
+        assert gate.active == 0
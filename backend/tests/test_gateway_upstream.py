@@ -0,0 +1,81 @@
+"""
+Test Gateway Upstream Pool - shared keep-alive client for the Node backend
+
+Features tested:
+- One client instance reused across requests
+- In-flight / peak / saturation counters
+- Connect errors are counted and re-raised
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from gateway.upstream import UpstreamPool
+
+
+def _pool_with_transport(handler, **kwargs) -> UpstreamPool:
+    pool = UpstreamPool("http://upstream.test", **kwargs)
+    pool._client = httpx.AsyncClient(base_url=pool.base_url, transport=httpx.MockTransport(handler))
+    return pool
+
+
+class TestUpstreamPool:
+    """Upstream pool unit tests"""
+
+    def test_client_requires_start(self):
+        pool = UpstreamPool("http://upstream.test")
+        with pytest.raises(RuntimeError):
+            _ = pool.client
+
+    def test_start_and_close_reuse_single_client(self):
+        async def run():
+            pool = UpstreamPool("http://127.0.0.1:1", max_connections=10)
+            await pool.start()
+            first = pool.client
+            await pool.start()
+            assert pool.client is first
+            await pool.close()
+            assert pool.stats()["started"] is False
+        asyncio.run(run())
+
+    def test_in_flight_and_peak_tracking(self):
+        gate = asyncio.Event()
+
+        async def handler(request):
+            await gate.wait()
+            return httpx.Response(200, json={"ok": True})
+
+        async def run():
+            pool = _pool_with_transport(handler, max_connections=4)
+            tasks = [
+                asyncio.create_task(pool.send(pool.client.build_request("GET", "/api/health")))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0.01)
+            stats = pool.stats()
+            assert stats["in_flight"] == 3
+            assert stats["saturation"] == 0.75
+            gate.set()
+            responses = await asyncio.gather(*tasks)
+            assert all(r.status_code == 200 for r in responses)
+            stats = pool.stats()
+            assert stats["in_flight"] == 0
+            assert stats["peak_in_flight"] == 3
+            assert stats["requests_total"] == 3
+            await pool.close()
+        asyncio.run(run())
+
+    def test_connect_errors_counted(self):
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        async def run():
+            pool = _pool_with_transport(handler)
+            with pytest.raises(httpx.ConnectError):
+                await pool.send(pool.client.build_request("GET", "/api/health"))
+            assert pool.stats()["connect_errors"] == 1
+            assert pool.in_flight == 0
+            await pool.close()
+        asyncio.run(run())
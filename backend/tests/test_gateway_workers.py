@@ -0,0 +1,224 @@
+"""
+Test Gateway Worker Pool - supervised Node.js workers with load balancing
+
+Features tested:
+- Least-outstanding-requests selection
+- Sticky (rendezvous) routing for WebSocket keys
+- Crashed worker is detected and restarted
+- Readiness probing with backoff and request queueing during cold start
+- Blue/green rolling restart with drain
+- Worker that crashes mid-rollout is not relaunched once its slot is replaced
+"""
+
+import asyncio
+import subprocess
+import sys
+
+from gateway.workers import WorkerPool
+
+
+def _sleeper(worker):
+    return subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+
+
+async def _always_ready(worker):
+    return True
+
+
+def _pool(size=3, **kwargs) -> WorkerPool:
+    return WorkerPool(_sleeper, _always_ready, size=size, base_port=9100, **kwargs)
+
+
+class TestWorkerPool:
+    """Worker pool unit tests"""
+
+    def test_consecutive_ports(self):
+        assert _pool(size=4).ports == [9100, 9101, 9102, 9103]
+
+    def test_least_outstanding_selection(self):
+        pool = _pool()
+        for w in pool.workers:
+            w.healthy = True
+        pool.workers[0].outstanding = 5
+        pool.workers[1].outstanding = 1
+        pool.workers[2].outstanding = 3
+        assert pool.acquire() is pool.workers[1]
+        assert pool.workers[1].outstanding == 2
+        pool.workers[2].healthy = False
+        pool.workers[1].outstanding = 9
+        assert pool.pick() is pool.workers[0]
+
+    def test_no_healthy_workers(self):
+        pool = _pool()
+        assert pool.acquire() is None
+        assert pool.pick_sticky("10.0.0.1") is None
+
+    def test_sticky_routing_stable_and_minimal_remap(self):
+        pool = _pool(size=4)
+        for w in pool.workers:
+            w.healthy = True
+        keys = [f"10.0.0.{i}" for i in range(200)]
+        before = {k: pool.pick_sticky(k).index for k in keys}
+        assert before == {k: pool.pick_sticky(k).index for k in keys}
+        assert len(set(before.values())) == 4
+
+        pool.workers[2].healthy = False
+        after = {k: pool.pick_sticky(k).index for k in keys}
+        moved = [k for k in keys if before[k] != after[k]]
+        assert all(before[k] == 2 for k in moved)
+
+    def test_crashed_worker_restarted(self):
+        async def run():
+            pool = _pool(size=2, check_interval=0.05, restart_backoff=0)
+            await pool.start()
+            try:
+                victim = pool.workers[1]
+                old_pid = victim.pid
+                victim.process.kill()
+                for _ in range(100):
+                    await asyncio.sleep(0.05)
+                    if victim.healthy and victim.pid != old_pid:
+                        break
+                return victim.pid != old_pid, victim.healthy, victim.restarts, pool.workers[0].restarts
+            finally:
+                await pool.stop(timeout=2)
+
+        replaced, healthy, restarts, untouched = asyncio.run(run())
+        assert replaced and healthy
+        assert restarts == 1
+        assert untouched == 0
+
+    def test_wait_ready_backs_off_until_probe_passes(self):
+        probes = []
+
+        async def ready_on_third(worker):
+            probes.append(worker.index)
+            return len(probes) >= 3
+
+        async def run():
+            pool = WorkerPool(_sleeper, ready_on_third, size=1, base_port=9100, probe_initial=0.01)
+            started = asyncio.get_running_loop().time()
+            await pool.start()
+            elapsed = asyncio.get_running_loop().time() - started
+            try:
+                return pool.workers[0].healthy, elapsed, pool.workers[0].ready_ms
+            finally:
+                await pool.stop(timeout=2)
+
+        healthy, elapsed, ready_ms = asyncio.run(run())
+        assert healthy
+        assert len(probes) == 3
+        assert elapsed < 0.5
+        assert ready_ms is not None
+
+    def test_requests_queue_until_first_worker_ready(self):
+        async def run():
+            pool = _pool(size=1)
+            waiter = asyncio.create_task(pool.acquire_wait(timeout=1.0))
+            await asyncio.sleep(0.02)
+            assert pool.queued == 1
+            pool.set_healthy(pool.workers[0], True)
+            worker = await waiter
+            return worker, pool
+
+        worker, pool = asyncio.run(run())
+        assert worker is pool.workers[0]
+        assert worker.outstanding == 1
+        assert pool.queued == 0
+
+    def test_queue_bounded_and_times_out(self):
+        async def run():
+            pool = _pool(size=1, queue_max=1)
+            first = asyncio.create_task(pool.acquire_wait(timeout=0.05))
+            await asyncio.sleep(0)
+            second = await pool.acquire_wait(timeout=0.05)
+            return await first, second, pool
+
+        first, second, pool = asyncio.run(run())
+        assert first is None and second is None
+        assert pool.queue_rejected == 1
+        assert pool.queue_timeouts == 1
+
+    def test_rolling_restart_switches_ports_and_drains(self):
+        async def run():
+            pool = _pool(size=2, check_interval=60)
+            await pool.start()
+            try:
+                old = list(pool.workers)
+                in_flight = pool.acquire()
+
+                async def finish_request():
+                    await asyncio.sleep(0.1)
+                    pool.release(in_flight)
+
+                asyncio.create_task(finish_request())
+                result = await pool.rolling_restart(drain_timeout=2.0)
+                old_alive = [w.alive() for w in old]
+                new_healthy = [w.healthy for w in pool.workers]
+                return old_alive, in_flight, result, list(pool.workers), new_healthy
+            finally:
+                await pool.stop(timeout=2)
+
+        old_alive, in_flight, result, new, new_healthy = asyncio.run(run())
+        assert result["ok"] is True
+        assert [w.port for w in new] == [9102, 9103]
+        assert all(new_healthy)
+        assert not any(old_alive)
+        drained_slot = result["slots"][in_flight.index]
+        assert drained_slot["drained"] is True
+        assert drained_slot["drain_ms"] >= 50
+
+    def test_rolling_restart_keeps_old_worker_when_replacement_fails(self):
+        launches = []
+
+        async def only_first_launch_ready(worker):
+            launches.append(worker.port)
+            return worker.port == 9100
+
+        async def run():
+            pool = WorkerPool(
+                _sleeper, only_first_launch_ready, size=1, base_port=9100,
+                ready_timeout=0.2, check_interval=60,
+            )
+            await pool.start()
+            try:
+                result = await pool.rolling_restart(drain_timeout=0.1)
+                return result, pool.workers[0].port, pool.workers[0].healthy
+            finally:
+                await pool.stop(timeout=2)
+
+        result, port, healthy = asyncio.run(run())
+        assert result["ok"] is False
+        assert port == 9100 and healthy
+
+    def test_crash_during_rollout_does_not_relaunch_retired_worker(self):
+        spawned = []
+
+        def spawn(worker):
+            spawned.append(worker.port)
+            return _sleeper(worker)
+
+        async def slow_spare(worker):
+            if worker.port == 9101:
+                await asyncio.sleep(0.3)
+            return True
+
+        async def run():
+            pool = WorkerPool(spawn, slow_spare, size=1, base_port=9100, check_interval=0.05, restart_backoff=0)
+            await pool.start()
+            try:
+                old = pool.workers[0]
+                rollout = asyncio.create_task(pool.rolling_restart(drain_timeout=0.1))
+                await asyncio.sleep(0.05)
+                old.process.kill()
+                result = await rollout
+                await asyncio.sleep(0.3)
+                return result, old, list(pool.workers), list(spawned)
+            finally:
+                await pool.stop(timeout=2)
+
+        result, old, workers, spawned = asyncio.run(run())
+        assert result["ok"] is True
+        assert [w.port for w in workers] == [9101]
+        assert spawned == [9100, 9101]
+        assert old.restarts == 0 and not old.alive()
@@ -0,0 +1,197 @@
+"""
+Test Gateway WebSocket Hub - one multiplexed upstream, local fan-out
+
+Features tested:
+- ws-gateway.ts protocol: per-client connected welcome, local pong
+- hello / subscribe / unsubscribe only change that client's categories
+- Upstream is told the union of categories, or everything while a client has none
+- Events reach only clients whose categories match the event type
+- Slow consumers are evicted instead of buffering forever
+"""
+
+import asyncio
+import json
+
+from gateway.ws_hub import CLOSE_SLOW_CONSUMER, WsHub, event_category
+
+
+class FakeUpstream:
+    """Stands in for a websockets client connection"""
+
+    def __init__(self):
+        self.sent = []
+        self.inbox = asyncio.Queue()
+        self.closed = False
+
+    async def send(self, frame):
+        self.sent.append(frame)
+
+    async def close(self):
+        self.closed = True
+        await self.inbox.put(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        frame = await self.inbox.get()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+
+class FakeClient:
+    """Stands in for a Starlette WebSocket"""
+
+    def __init__(self, slow=False):
+        self.incoming = asyncio.Queue()
+        self.received = []
+        self.closed_code = None
+        self.slow = slow
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    def say(self, payload):
+        self.incoming.put_nowait({"type": "websocket.receive", "text": json.dumps(payload)})
+
+    def leave(self):
+        self.incoming.put_nowait({"type": "websocket.disconnect"})
+
+    async def send_text(self, text):
+        if self.slow:
+            await asyncio.sleep(3600)
+        self.received.append(json.loads(text))
+
+    async def send_bytes(self, data):
+        self.received.append(data)
+
+    async def close(self, code=1000):
+        self.closed_code = code
+        self.incoming.put_nowait({"type": "websocket.disconnect"})
+
+
+def _hub(upstream, **kwargs):
+    async def connect(path):
+        return upstream, None
+    return WsHub("/ws", connect, **kwargs)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestWsHub:
+    """WebSocket hub unit tests"""
+
+    def test_event_category(self):
+        assert event_category("bootstrap.progress") == "bootstrap"
+        assert event_category("alert.new") == "alerts"
+        assert event_category("signal.new") == "signals"
+        assert event_category("attribution.suspected") == "attribution"
+        assert event_category("something.else") == "resolver"
+
+    def test_fan_out_by_category(self):
+        async def run():
+            upstream = FakeUpstream()
+            hub = _hub(upstream)
+            a, b, c = FakeClient(), FakeClient(), FakeClient()
+            tasks = [asyncio.create_task(hub.serve(x)) for x in (a, b, c)]
+            await _settle()
+            # Frames as useWebSocket.js sends them
+            a.say({"type": "hello", "subscriptions": ["signals"]})
+            b.say({"type": "hello", "subscriptions": ["alerts"]})
+            b.say({"type": "subscribe", "category": "signals"})
+            c.say({"type": "hello", "subscriptions": ["bootstrap"]})
+            c.say({"type": "ping"})
+            await _settle()
+            synced = hub.stats()["upstream_categories"]
+
+            # Frames as ws-gateway.ts sends them on the shared socket
+            await upstream.inbox.put(json.dumps({"type": "connected", "clientId": "ws_1_abc", "timestamp": 1}))
+            await upstream.inbox.put(json.dumps({"type": "pong", "timestamp": 2}))
+            await upstream.inbox.put(json.dumps({"type": "signal.new", "signalId": "s1", "actor": "x", "action": "buy"}))
+            await upstream.inbox.put(json.dumps({"type": "alert.new", "alertId": "a1", "severity": 2, "message": "m"}))
+            await upstream.inbox.put(json.dumps(
+                {"type": "bootstrap.progress", "dedupKey": "k", "progress": 50, "step": "s", "eta": None}
+            ))
+            await _settle()
+
+            b.say({"type": "unsubscribe", "category": "alerts"})
+            await _settle()
+            unsubscribed = hub.stats()["upstream_categories"]
+            await upstream.inbox.put(json.dumps({"type": "alert.new", "alertId": "a2", "severity": 1, "message": "m"}))
+            await _settle()
+
+            for x in (a, b, c):
+                x.leave()
+            await asyncio.gather(*tasks)
+            return hub, upstream, (synced, unsubscribed), a, b, c
+
+        hub, upstream, (synced, unsubscribed), a, b, c = asyncio.run(run())
+        assert synced == ["alerts", "bootstrap", "signals"]
+        assert unsubscribed == ["bootstrap", "signals"]
+        hellos = [json.loads(f) for f in upstream.sent]
+        assert all(h["type"] == "hello" for h in hellos)
+        assert {"type": "hello", "subscriptions": ["alerts", "bootstrap", "signals"]} in hellos
+
+        types = lambda client: [m["type"] for m in client.received]
+        assert types(a) == ["connected", "signal.new"]
+        assert types(b) == ["connected", "signal.new", "alert.new"]
+        assert types(c) == ["connected", "pong", "bootstrap.progress"]
+        ids = {x.received[0]["clientId"] for x in (a, b, c)}
+        assert len(ids) == 3 and "ws_1_abc" not in ids
+        assert isinstance(c.received[1]["timestamp"], int)
+        assert hub.stats()["clients"] == 0
+        assert upstream.closed
+
+    def test_client_without_categories_keeps_upstream_unfiltered(self):
+        async def run():
+            upstream = FakeUpstream()
+            hub = _hub(upstream)
+            a, b = FakeClient(), FakeClient()
+            tasks = [asyncio.create_task(hub.serve(x)) for x in (a, b)]
+            await _settle()
+            a.say({"type": "hello", "subscriptions": ["alerts"]})
+            await _settle()
+            while_b_wants_all = hub.stats()["upstream_categories"]
+
+            await upstream.inbox.put(json.dumps({"type": "resolver.updated", "input": "x", "status": "ok", "confidence": 1}))
+            await _settle()
+            b.leave()
+            await tasks[1]
+            await _settle()
+            after_b_left = hub.stats()["upstream_categories"]
+            a.leave()
+            await tasks[0]
+            return upstream, while_b_wants_all, after_b_left, a, b
+
+        upstream, while_b_wants_all, after_b_left, a, b = asyncio.run(run())
+        assert while_b_wants_all == []
+        assert after_b_left == ["alerts"]
+        assert [json.loads(f) for f in upstream.sent] == [{"type": "hello", "subscriptions": ["alerts"]}]
+        assert [m["type"] for m in a.received] == ["connected"]
+        assert [m["type"] for m in b.received] == ["connected", "resolver.updated"]
+
+    def test_slow_consumer_evicted(self):
+        async def run():
+            upstream = FakeUpstream()
+            hub = _hub(upstream, queue_size=2)
+            fast, slow = FakeClient(), FakeClient(slow=True)
+            tasks = [asyncio.create_task(hub.serve(x)) for x in (fast, slow)]
+            await _settle()
+            for i in range(6):
+                await upstream.inbox.put(json.dumps({"type": "alert.new", "alertId": str(i), "severity": 1, "message": "m"}))
+                await _settle()
+            await _settle()
+            stats = hub.stats()
+            fast.leave()
+            await asyncio.gather(*tasks)
+            return stats, fast, slow
+
+        stats, fast, slow = asyncio.run(run())
+        assert slow.closed_code == CLOSE_SLOW_CONSUMER
+        assert stats["evictions"] == 1
+        assert stats["clients"] == 1
+        assert [m.get("alertId") for m in fast.received] == [None] + [str(i) for i in range(6)]
@@ -0,0 +1,128 @@
+"""
+Test Load Harness - async load runs and latency reports
+
+Features tested:
+- Profile parsing and open-loop arrival schedules
+- Closed-loop runs report per-endpoint percentiles, error rates, throughput
+- Open-loop latency includes queueing behind a slow server
+- Reports land in the reports dir as load_<timestamp>.json
+"""
+
+import asyncio
+import json
+import random
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from loadtest.catalog import CATALOG, Endpoint, select
+from loadtest.harness import ProfileError, parse_profile, run_load, write_report
+
+
+def _app(delay: float = 0.0, max_concurrent: int = 0):
+    app = FastAPI()
+    gate = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+
+    @app.get("/api/graph")
+    async def graph(window: str = "24h"):
+        if gate:
+            async with gate:
+                await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(delay)
+        return {"ok": True, "window": window}
+
+    @app.post("/api/v4/twitter/runtime/search")
+    async def search(body: dict):
+        return {"ok": True, "data": [{"id": i} for i in range(body["limit"])]}
+
+    @app.get("/api/broken")
+    async def broken():
+        return JSONResponse(status_code=503, content={"ok": False})
+
+    return app
+
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api")
+
+
+ENDPOINTS = [
+    Endpoint("graph", "GET", "/api/graph", params={"window": "7d"}, weight=2),
+    Endpoint("search", "POST", "/api/v4/twitter/runtime/search", json={"keyword": "BTC", "limit": 5}),
+    Endpoint("broken", "GET", "/api/broken"),
+]
+
+
+class TestProfiles:
+    """parse_profile() / catalog"""
+
+    def test_parse_and_arrivals(self):
+        assert parse_profile("closed:16").concurrency == 16
+        rate = parse_profile("rate:50").arrivals(2.0, random.Random(0))
+        assert len(rate) == 99 and rate[0] == pytest.approx(0.02)
+        poisson = parse_profile("poisson:200").arrivals(10.0, random.Random(0))
+        assert abs(len(poisson) - 2000) < 150
+        ramp = parse_profile("ramp:10-100").arrivals(10.0, random.Random(0))
+        assert sum(t < 5 for t in ramp) < sum(t >= 5 for t in ramp)
+        for bad in ("closed:0", "rate:x", "ramp:5", "burst:3"):
+            with pytest.raises(ProfileError):
+                parse_profile(bad)
+
+    def test_catalog_select(self):
+        assert len({e.name for e in CATALOG}) == len(CATALOG)
+        assert [e.path for e in select(["graph_7d", "watchlist_realtime"])] == [
+            "/api/graph", "/api/watchlist/summary/realtime"
+        ]
+        with pytest.raises(KeyError):
+            select(["nope"])
+
+
+class TestRunLoad:
+    """run_load() against an in-process app"""
+
+    def test_closed_loop_report(self, tmp_path):
+        async def run():
+            async with _client(_app(delay=0.002)) as client:
+                return await run_load(ENDPOINTS, parse_profile("closed:8"), 0.5, client=client)
+
+        report = asyncio.run(run())
+        graph, search, broken = (report["endpoints"][n] for n in ("graph", "search", "broken"))
+        assert graph["requests"] > search["requests"] > 0
+        assert graph["errorRate"] == 0 and graph["outcomes"] == {"200": graph["requests"]}
+        assert broken["errorRate"] == 1 and broken["outcomes"] == {"503": broken["requests"]}
+        latency = graph["latencyMs"]
+        assert 2 <= latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+        total = report["total"]
+        assert total["requests"] == sum(e["requests"] for e in report["endpoints"].values())
+        assert total["throughputRps"] > 0 and report["profile"] == {"kind": "closed", "concurrency": 8}
+
+        path = write_report(report, str(tmp_path))
+        assert path.endswith(".json") and "load_" in path
+        with open(path) as f:
+            assert json.load(f)["total"]["requests"] == total["requests"]
+
+    def test_open_loop_counts_queueing(self):
+        # 2 requests at a time, 20ms each: 100 rps capacity, offered 200 rps
+        endpoints = ENDPOINTS[:1]
+
+        async def run(rate):
+            async with _client(_app(delay=0.02, max_concurrent=2)) as client:
+                return await run_load(endpoints, parse_profile(f"rate:{rate}"), 0.5, client=client)
+
+        light, overloaded = asyncio.run(run(20)), asyncio.run(run(200))
+        assert light["endpoints"]["graph"]["requests"] == 9
+        assert overloaded["endpoints"]["graph"]["requests"] == 99
+        assert light["endpoints"]["graph"]["latencyMs"]["p99"] < 100
+        # Backlog grows to ~50 requests: late arrivals wait ~0.5s
+        assert overloaded["endpoints"]["graph"]["latencyMs"]["p99"] > 300
+
+    def test_transport_errors_are_counted(self):
+        report = asyncio.run(run_load(
+            ENDPOINTS[:1], parse_profile("rate:20"), 0.2, base_url="http://127.0.0.1:9", timeout=0.5
+        ))
+        graph = report["endpoints"]["graph"]
+        assert graph["errors"] == graph["requests"] == 3
+        assert all(o.startswith("error:") for o in graph["outcomes"])
@@ -0,0 +1,141 @@
+"""
+Test Load Benchmarks - stored runs and the regression gate
+
+Features tested:
+- Runs round-trip through the store; baseline = pinned run, else previous run
+- Bootstrap CI: same distribution is unchanged, 2x slower is a regression
+- Only hot endpoints gate; cold ones are reported
+- The pytest plugin stores the session's runs and fails the session on a hot regression
+- python -m loadtest.compare report and exit code
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from loadtest.benchmarks import BenchmarkStore, bootstrap_ratio, compare_runs, format_report, gate_failures
+from loadtest.catalog import Endpoint
+from loadtest.harness import Recorder, build_report, parse_profile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = [Endpoint("graph", "GET", "/api/graph"), Endpoint("labels", "GET", "/api/labels")]
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _run(seed, slow=None, minutes=0, errors=0):
+    """Recorder + report: graph ~ lognormal(3, 0.4) ms (x slow[name]), labels 5% of traffic"""
+    rng = np.random.default_rng(seed)
+    slow = slow or {}
+    recorder = Recorder()
+    for name, n in (("graph", 1900), ("labels", 100)):
+        for i, value in enumerate(rng.lognormal(3, 0.4, n) * slow.get(name, 1.0)):
+            failed = name == "graph" and i < errors
+            recorder.record(name, float(value), "500" if failed else "200", failed)
+    report = build_report(ENDPOINTS, parse_profile("closed:4"), recorder, T0 + timedelta(minutes=minutes), 10.0)
+    return report, recorder.latencies
+
+
+class TestStore:
+    """BenchmarkStore"""
+
+    def test_save_load_and_baseline(self, tmp_path):
+        store = BenchmarkStore(str(tmp_path))
+        first = store.save(*_run(0), label="iteration_12")
+        second = store.save(*_run(1, minutes=5))
+        third = store.save(*_run(2, minutes=10), label="iteration_14")
+        assert store.runs() == [first, second, third]
+        loaded = store.load("iteration_12")
+        assert loaded.id == first and loaded.label == "iteration_12"
+        np.testing.assert_allclose(loaded.latencies["graph"], _run(0)[1]["graph"], rtol=1e-6)
+
+        assert store.baseline_for(third) == second and store.baseline_for(first) is None
+        store.pin_baseline("iteration_12")
+        assert store.baseline_for(third) == first and store.baseline_for(first) is None
+        assert store.resolve("latest") == third
+
+
+class TestCompare:
+    """bootstrap_ratio() / compare_runs()"""
+
+    def test_bootstrap_interval(self):
+        rng = np.random.default_rng(0)
+        base, same, slower = (rng.lognormal(3, 0.4, 2000) * f for f in (1, 1, 1.5))
+        point, low, high = bootstrap_ratio(base, same, 95, rng)
+        assert low < 1 < high and high - low < 0.2
+        point, low, high = bootstrap_ratio(base, slower, 95, rng)
+        assert low < point < high and low > 1.3
+
+    def test_hot_regressions_gate(self, tmp_path):
+        store = BenchmarkStore(str(tmp_path))
+        baseline = store.load(store.save(*_run(0)))
+        same = store.load(store.save(*_run(1, minutes=1)))
+        rows = compare_runs(baseline, same)
+        assert {r["status"] for r in rows} == {"unchanged"} and not gate_failures(rows)
+
+        # labels (5% of requests) is not hot: reported but does not gate
+        cold = store.load(store.save(*_run(2, slow={"labels": 2.0}, minutes=2)))
+        rows = compare_runs(baseline, cold)
+        assert {(r["endpoint"], r["metric"]) for r in rows if r["status"] == "regression"} >= {("labels", "p50")}
+        assert not gate_failures(rows)
+        assert gate_failures(compare_runs(baseline, cold, hot=["labels"]))
+
+        hot = store.load(store.save(*_run(3, slow={"graph": 2.0}, minutes=3)))
+        failures = gate_failures(compare_runs(baseline, hot))
+        assert {r["metric"] for r in failures} == {"p50", "p95", "p99"}
+        errors = store.load(store.save(*_run(4, errors=100, minutes=4)))
+        (failure,) = gate_failures(compare_runs(baseline, errors))
+        assert failure["metric"] == "errorRate"
+
+        faster = store.load(store.save(*_run(5, slow={"graph": 0.5}, minutes=5)))
+        text = format_report(baseline, faster, compare_runs(baseline, faster))
+        assert "Top improvements (3)" in text and "graph" in text and "Gate: PASS" in text
+
+
+class TestGate:
+    """loadtest.pytest_plugin and python -m loadtest.compare"""
+
+    def test_session_fails_on_hot_regression(self, tmp_path):
+        (tmp_path / "test_bench.py").write_text(textwrap.dedent(f"""
+            import os
+            import sys
+            sys.path.insert(0, {os.path.join(BACKEND, "tests")!r})
+            from test_loadtest_benchmarks import _run
+
+            class FakeRecorder:
+                def __init__(self, latencies):
+                    self.latencies = latencies
+
+            def test_bench(benchmarks):
+                slow = float(os.environ["BENCH_SLOW"])
+                minutes = int(os.environ["BENCH_MINUTES"])
+                report, latencies = _run(minutes, slow={{"graph": slow}}, minutes=minutes)
+                benchmarks.add(report, FakeRecorder(latencies))
+        """))
+        store = tmp_path / "store"
+        env = {**os.environ, "PYTHONPATH": BACKEND}
+
+        def pytest_run(slow, minutes):
+            return subprocess.run(
+                [sys.executable, "-m", "pytest", "-q", "-p", "loadtest.pytest_plugin", "-p", "no:cacheprovider",
+                 str(tmp_path / "test_bench.py"), "--bench-store", str(store)],
+                cwd=str(tmp_path), env={**env, "BENCH_SLOW": str(slow), "BENCH_MINUTES": str(minutes)},
+                capture_output=True, text=True,
+            )
+
+        first = pytest_run(1.0, 0)
+        assert first.returncode == 0 and "no baseline yet" in first.stdout
+        assert pytest_run(1.0, 1).returncode == 0
+        slow = pytest_run(2.0, 2)
+        assert slow.returncode == 1 and "Gate: FAIL" in slow.stdout
+        assert len(BenchmarkStore(str(store)).runs()) == 3
+
+        compare = subprocess.run(
+            [sys.executable, "-m", "loadtest.compare", "--store", str(store)],
+            cwd=BACKEND, capture_output=True, text=True,
+        )
+        assert compare.returncode == 1 and "Top regressions (3)" in compare.stdout
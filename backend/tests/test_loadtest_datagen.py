@@ -0,0 +1,139 @@
+"""
+Test Data Generator - synthetic data for scale tests
+
+Features tested:
+- Scale parsing (1e6 / 10^6 / 2M) and bounds
+- Exact row counts, deterministic by seed, identical across worker partitions
+- Power-law address activity and exchange hubs
+- Bursty hourly intensity (overdispersed counts)
+- Documents carry the fields the Mongoose models read
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from loadtest import datagen
+from loadtest.datagen import Scale, Universe, generate, parse_count
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def collect(universe, hours=None, reference=True, batch_size=500):
+    out = {}
+    for collection, docs in generate(universe, batch_size, hours, reference):
+        assert 0 < len(docs) <= batch_size
+        out.setdefault(collection, []).extend(docs)
+    return out
+
+
+@pytest.fixture(scope="module")
+def universe():
+    return Universe(Scale(20_000, days=10), seed=7, start=START)
+
+
+@pytest.fixture(scope="module")
+def rows(universe):
+    return collect(universe)
+
+
+class TestScale:
+    """parse_count() and Scale defaults"""
+
+    def test_parse_count(self):
+        assert parse_count("1e6") == parse_count("10^6") == parse_count("1M") == 10 ** 6
+        assert parse_count("250k") == 250_000 and parse_count("1_000") == 1000
+        for bad in ("999", "2e8", "lots"):
+            with pytest.raises(ValueError):
+                parse_count(bad)
+
+    def test_derived(self):
+        scale = Scale(10 ** 7)
+        assert scale.addresses == 500_000 and scale.tweets == 500_000
+        assert scale.actors < scale.addresses and scale.tokens <= 5000
+
+
+class TestGenerate:
+    """generate()"""
+
+    def test_counts(self, universe, rows):
+        assert len(rows["raw_transfers"]) == 20_000
+        assert len(rows["twitter_results"]) == 1000
+        assert len(rows["actors"]) == universe.scale.actors
+        assert len(rows["token_registry"]) == universe.scale.tokens
+        assert len({(d["txHash"], d["logIndex"]) for d in rows["raw_transfers"]}) == 20_000
+        assert len({d["tweetId"] for d in rows["twitter_results"]}) == 1000
+        assert len({(d["entityId"], d["address"]) for d in rows["entity_addresses"]}) == len(rows["entity_addresses"])
+
+    def test_deterministic_and_partitionable(self, universe, rows):
+        again = collect(Universe(Scale(20_000, days=10), seed=7, start=START))
+        key = lambda d: (d["txHash"], d["from"], d["to"], d["amountRaw"], d["blockTime"])
+        assert [key(d) for d in again["raw_transfers"]] == [key(d) for d in rows["raw_transfers"]]
+
+        hours = universe.scale.hours
+        parts = [collect(universe, range(i, hours, 3), reference=(i == 0)) for i in range(3)]
+        merged = sorted(key(d) for p in parts for d in p["raw_transfers"])
+        assert merged == sorted(key(d) for d in rows["raw_transfers"])
+
+        other = collect(Universe(Scale(20_000, days=10), seed=8, start=START), range(0, 24), reference=False)
+        assert other["raw_transfers"][0]["txHash"] != rows["raw_transfers"][0]["txHash"]
+
+    def test_power_law_and_hubs(self, universe, rows):
+        transfers = rows["raw_transfers"]
+        touches = {}
+        for d in transfers:
+            for side in ("from", "to"):
+                touches[d[side]] = touches.get(d[side], 0) + 1
+        counts = np.sort(np.fromiter(touches.values(), dtype=np.int64))[::-1]
+        top = counts[: max(1, universe.scale.addresses // 100)].sum() / counts.sum()
+        assert top > 0.15  # uniform activity would give ~0.01
+
+        exchange = set(universe.address_hex(universe.exchange_addresses))
+        hub_share = np.mean([d["from"] in exchange or d["to"] in exchange for d in transfers])
+        assert datagen.HUB_SHARE <= hub_share < datagen.HUB_SHARE + 0.2
+        assert all(a["type"] == "exchange" for a in rows["actors"][: max(1, universe.scale.actors // 100)])
+
+    def test_bursty(self, universe, rows):
+        hourly = np.zeros(universe.scale.hours)
+        for d in rows["raw_transfers"]:
+            hourly[int((d["blockTime"] - START).total_seconds() // 3600)] += 1
+        assert hourly.var() / hourly.mean() > 5  # Poisson would be ~1
+        assert (universe.hot_token >= 0).any()
+
+    def test_document_shapes(self, rows):
+        transfer = rows["raw_transfers"][0]
+        assert transfer["chain"] == "ethereum" and transfer["source"] == "indexer"
+        assert len(transfer["txHash"]) == 66 and len(transfer["from"]) == 42
+        assert transfer["amountRaw"].isdigit() and transfer["amountUsd"] > 0
+        assert transfer["blockNumber"] >= datagen.GENESIS_BLOCK
+        tweet = rows["twitter_results"][0]
+        assert tweet["ownerType"] == "SYSTEM" and tweet["keyword"] in tweet["text"]
+        assert {"id", "username", "followers"} <= set(tweet["author"])
+        actor = rows["actors"][0]
+        assert actor["coverage"]["band"] in ("High", "Medium", "Low")
+        assert actor["addressStats"]["totalCount"] >= len(actor["addresses"])
+        symbols = [t["symbol"] for t in rows["token_registry"][:3]]
+        assert symbols == ["USDT", "USDC", "WETH"]
+
+    def test_index_keys_exist(self, rows):
+        """Unique-index fields are populated, so the indexes build after the load"""
+        for collection, indexes in datagen.INDEXES.items():
+            doc = rows[collection][0]
+            for keys, options in indexes:
+                if not options.get("unique"):
+                    continue
+                for field, _ in keys:
+                    value = doc
+                    for part in field.split("."):
+                        value = value.get(part) if isinstance(value, dict) else None
+                    assert value is not None or options.get("sparse"), (collection, field)
+
+
+class TestRun:
+    """run() with the dry-run sink"""
+
+    def test_dry_run_workers(self):
+        result = datagen.run(Scale(2000, days=2), workers=2, dry_run=True)
+        assert result["counts"]["raw_transfers"] == 2000
+        assert result["counts"]["token_registry"] == result["scale"]["tokens"]
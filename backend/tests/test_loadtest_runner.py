@@ -0,0 +1,197 @@
+"""
+Test API Runner - concurrent regression checks
+
+Features tested:
+- Parallel groups overlap; --serial runs one check at a time
+- Ordered groups keep their order and state, skip after a failure, still run cleanup
+- Groups sharing a lock never overlap; resources are computed once per run
+- Failures vs errors, per-group wall-clock time, report file
+- The API suite's groups and the ML mode lock
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from loadtest import api_suite
+from loadtest.runner import Suite, format_report, run_suite, write_report
+
+DELAY = 0.1
+
+
+def _app():
+    app = FastAPI()
+    app.state.items = {}
+    app.state.logins = 0
+    app.state.mode = "OFF"
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(DELAY)
+        return {"ok": True}
+
+    @app.post("/login")
+    async def login():
+        app.state.logins += 1
+        await asyncio.sleep(DELAY / 2)
+        return {"token": "t"}
+
+    @app.post("/items")
+    async def create(body: dict):
+        item_id = str(len(app.state.items) + 1)
+        app.state.items[item_id] = body
+        return {"id": item_id}
+
+    @app.delete("/items/{item_id}")
+    async def delete(item_id: str):
+        return {"ok": app.state.items.pop(item_id, None) is not None}
+
+    @app.post("/mode/{mode}")
+    async def set_mode(mode: str):
+        previous, app.state.mode = app.state.mode, mode
+        await asyncio.sleep(DELAY / 2)
+        return {"previous": previous, "mode": app.state.mode}
+
+    return app
+
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api")
+
+
+def _run(suite, app, **kwargs):
+    async def go():
+        async with _client(app) as client:
+            return await run_suite(suite, client=client, **kwargs)
+
+    return asyncio.run(go())
+
+
+def _suite():
+    suite = Suite("demo")
+
+    @suite.resource()
+    async def token(ctx):
+        return (await ctx.client.post("/login")).json()["token"]
+
+    reads = suite.group("reads")
+    for i in range(8):
+        @reads.check(f"slow_{i}")
+        async def slow(ctx):
+            assert await ctx.use("token") == "t"
+            assert (await ctx.client.get("/slow")).json()["ok"] is True
+
+    crud = suite.group("crud", ordered=True)
+
+    @crud.check()
+    async def create(ctx):
+        ctx.state["id"] = (await ctx.client.post("/items", json={"name": "a"})).json()["id"]
+
+    @crud.check()
+    async def delete(ctx):
+        assert (await ctx.client.delete(f"/items/{ctx.state['id']}")).json()["ok"] is True
+
+    for name, mode in (("mode_a", "A"), ("mode_b", "B")):
+        group = suite.group(name, ordered=True, lock="mode")
+
+        @group.check("set")
+        async def set_mode(ctx, mode=mode):
+            data = (await ctx.client.post(f"/mode/{mode}")).json()
+            assert data["previous"] == "OFF", f"mode flow overlapped: saw {data['previous']}"
+
+        @group.check("restore", always=True)
+        async def restore(ctx):
+            await ctx.client.post("/mode/OFF")
+
+    return suite
+
+
+class TestRunner:
+    """run_suite()"""
+
+    def test_concurrent_vs_serial(self):
+        app = _app()
+        report = _run(_suite(), app)
+        assert report["ok"] and report["total"]["passed"] == report["total"]["checks"] == 14
+        reads = next(g for g in report["groups"] if g["name"] == "reads")
+        assert reads["wallMs"] < 3 * DELAY * 1000 < reads["sumMs"]
+        assert report["wallMs"] < report["sumMs"]
+        assert app.state.logins == 1 and app.state.items == {}
+
+        serial = _run(_suite(), _app(), serial=True)
+        assert serial["ok"] and serial["mode"] == "serial"
+        assert serial["wallMs"] >= 8 * DELAY * 1000
+
+    def test_locked_groups_do_not_overlap(self):
+        report = _run(_suite(), _app(), groups=["mode_a", "mode_b"])
+        assert report["ok"], format_report(report)
+        a, b = sorted(report["groups"], key=lambda g: g["startSec"])
+        assert b["startSec"] * 1000 >= a["startSec"] * 1000 + a["wallMs"] - 1
+
+    def test_failure_skips_rest_but_runs_cleanup(self):
+        suite = Suite("failing")
+        flow = suite.group("flow", ordered=True)
+        ran = []
+
+        @flow.check()
+        async def first(ctx):
+            ran.append("first")
+            assert False, "boom"
+
+        @flow.check()
+        async def second(ctx):
+            ran.append("second")
+
+        @flow.check(always=True)
+        async def cleanup(ctx):
+            ran.append("cleanup")
+
+        broken = suite.group("broken")
+
+        @broken.check()
+        async def explodes(ctx):
+            await ctx.client.get("/missing")
+            raise RuntimeError("bad payload")
+
+        report = _run(suite, _app())
+        assert ran == ["first", "cleanup"] and report["ok"] is False
+        checks = {c["name"]: c for g in report["groups"] for c in g["checks"]}
+        assert checks["first"]["status"] == "failed" and checks["first"]["message"] == "boom"
+        assert checks["second"]["status"] == "skipped" and checks["cleanup"]["status"] == "passed"
+        assert checks["explodes"]["status"] == "error" and "RuntimeError" in checks["explodes"]["message"]
+        assert report["total"] == {"checks": 4, "passed": 1, "failed": 1, "error": 1, "skipped": 1}
+        assert "FAIL first" in format_report(report)
+
+    def test_select_and_report_file(self, tmp_path):
+        suite = _suite()
+        with pytest.raises(KeyError):
+            suite.select(["nope"])
+        report = _run(suite, _app(), groups=["reads"])
+        assert [g["name"] for g in report["groups"]] == ["reads"]
+        path = write_report(report, str(tmp_path))
+        assert path.endswith(".json") and json.load(open(path))["type"] == "api"
+
+
+class TestApiSuite:
+    """loadtest.api_suite groups"""
+
+    def test_groups(self):
+        groups = api_suite.suite.groups
+        assert {"connections", "telegram.read", "ml_mode.flow", "twitter_parser.slots"} <= set(groups)
+        assert {g.name for g in api_suite.suite.select(["ml_mode"])} == {
+            "ml_mode.read", "ml_mode.flow", "ml_mode.health_check", "ml_mode.attack_tests"
+        }
+        for group in groups.values():
+            if group.name.startswith("ml_mode.") and group.ordered:
+                assert group.lock == "ml_mode" and group.checks[-1].always
+            names = [c.name for c in group.checks]
+            assert len(names) == len(set(names)), group.name
+        assert api_suite.label("Account").startswith(api_suite.TEST_PREFIX)
+
+    def test_list(self, capsys):
+        assert api_suite.main(["--list", "--group", "twitter_parser"]) == 0
+        out = capsys.readouterr().out
+        assert "twitter_parser.slots  (ordered)" in out and "slot_cleanup  (always)" in out
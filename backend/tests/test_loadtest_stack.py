@@ -0,0 +1,113 @@
+"""
+Test Local Stack - hermetic stand-ins for benchmarks
+
+Features tested:
+- LOCAL_STACK_LATENCY parsing
+- Parser / sentiment / ML mocks answer in the shapes the Node clients read
+- Latency and failure injection, static and retuned at runtime
+- Stack wiring: Node env points at the mocks; missing pieces raise StackError
+- Full gateway + Node stack (skipped unless mongod, uvicorn and node_modules exist)
+"""
+
+import time
+
+import httpx
+import numpy as np
+import pytest
+
+from loadtest import stack as stack_module
+from loadtest.mocks import Latency, parse_latency_spec
+from loadtest.stack import LocalStack, MongoStandIn, StackError
+from ml_service.models import baseline_market_model, score_market
+
+
+class TestLatencySpec:
+    """parse_latency_spec()"""
+
+    def test_parse(self):
+        table = parse_latency_spec("parser:/search=120+40, sentiment=15, ml:/api/p35/predict=3!0.25")
+        ((prefix, search),) = table["parser"]
+        assert prefix == "/search" and (search.base_ms, search.jitter_ms, search.error_rate) == (120, 40, 0)
+        assert table["sentiment"][0][0] == "/" and table["ml"][0][1].error_rate == 0.25
+        assert parse_latency_spec("") == {}
+        with pytest.raises(ValueError):
+            parse_latency_spec("parser=fast")
+
+
+class TestMocks:
+    """mock_services fixture"""
+
+    def test_responses(self, mock_services):
+        parser, sentiment, ml = (mock_services[n].url for n in ("parser", "sentiment", "ml"))
+        search = httpx.post(f"{parser}/search/BTC", json={"limit": 5}).json()
+        tweets = search["data"]["tweets"]
+        assert search["ok"] and len(tweets) == 5 and {"id", "text", "author", "likes"} <= set(tweets[0])
+        assert httpx.post(f"{parser}/search/BTC", json={"limit": 5}).json() == search
+
+        assert httpx.get(f"{sentiment}/health").json()["status"] == "READY"
+        assert httpx.post(f"{sentiment}/predict", json={"text": "BTC to the moon"}).json()["label"] == "POSITIVE"
+        batch = httpx.post(f"{sentiment}/predict-batch", json={"items": [{"id": "a", "text": "rug pull"}]}).json()
+        assert batch["results"] == [{"id": "a", "label": "NEGATIVE", "score": pytest.approx(0.65), "error": None}]
+
+        features = {"exchangePressure": 0.4, "accZoneStrength": 0.7, "distZoneStrength": 0.1, "corridorsEntropy": 0.5}
+        market = httpx.post(f"{ml}/api/p35/predict/market", json={"network": "ethereum", "features": features}).json()
+        model = baseline_market_model()
+        expected = score_market(model, np.array([[features[f] for f in model.features]]))
+        assert market["pUp"] == pytest.approx(float(expected["pUp"][0]))
+        assert market["modelVersion"] == model.version
+        actor = httpx.post(f"{ml}/api/p35/predict/actor", json={"network": "ethereum", "actorId": "a", "features": {}})
+        assert sum(actor.json()["probabilities"].values()) == pytest.approx(1.0)
+        assert httpx.get(f"{ml}/api/nope").status_code == 404
+
+    def test_latency_and_failures(self, mock_services):
+        parser = mock_services["parser"]
+        parser.set_latency("/search", Latency(base_ms=80))
+        started = time.perf_counter()
+        assert httpx.post(f"{parser.url}/search/ETH", json={"limit": 1}).status_code == 200
+        assert time.perf_counter() - started >= 0.08
+        started = time.perf_counter()
+        httpx.get(f"{parser.url}/health")
+        assert time.perf_counter() - started < 0.08
+
+        retuned = httpx.post(f"{parser.url}/__mock/latency", json={"prefix": "/search", "errorRate": 1.0})
+        assert retuned.json()["latency"]["/search"] == {"baseMs": 0.0, "jitterMs": 0.0, "errorRate": 1.0}
+        assert httpx.post(f"{parser.url}/search/ETH", json={"limit": 1}).status_code == 503
+        counts = httpx.get(f"{parser.url}/__mock/stats").json()["counts"]
+        assert counts["/search/(?P<key>[^/]+)"] == 2 and counts["/health"] == 1
+
+
+class TestStackWiring:
+    """LocalStack / MongoStandIn without the gateway"""
+
+    def test_node_env_points_at_mocks(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("LOCAL_STACK_MONGO_URI", "mongodb://127.0.0.1:1/bench")
+        stack = LocalStack(str(tmp_path), latency="sentiment=5", canonical_ports=False)
+        try:
+            stack.start(gateway=False)
+            env = stack.node_env()
+            assert env["TWITTER_PARSER_URL"] == stack.mocks["parser"].url
+            assert env["SENTIMENT_URL"] == stack.mocks["sentiment"].url
+            assert env["ML_SERVICE_URL"] == stack.mocks["ml"].url
+            assert env["MONGODB_URI"] == env["MONGO_URL"] == "mongodb://127.0.0.1:1/bench"
+            assert stack.mocks["sentiment"].latency_for("/predict").base_ms == 5
+        finally:
+            stack.stop()
+        assert stack.mocks == {}
+
+    def test_missing_pieces_raise(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("LOCAL_STACK_MONGO_URI", raising=False)
+        monkeypatch.setattr(stack_module.shutil, "which", lambda name: None)
+        with pytest.raises(StackError, match="mongod"):
+            MongoStandIn(str(tmp_path)).start()
+        monkeypatch.setattr(stack_module, "BACKEND_DIR", str(tmp_path))
+        with pytest.raises(StackError):
+            LocalStack(str(tmp_path), latency="").start_gateway()
+
+
+class TestLocalStack:
+    """Full stack through the gateway"""
+
+    def test_gateway_reaches_node(self, local_stack):
+        health = httpx.get(f"{local_stack.base_url}/health").json()
+        assert health["node_backend"] == "connected"
+        assert httpx.get(f"{local_stack.base_url}/api/health", timeout=10).status_code == 200
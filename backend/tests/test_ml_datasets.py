@@ -0,0 +1,96 @@
+"""
+Test ML Datasets - columnar cache keyed by content hash
+
+Features tested:
+- Datasets are written once per hash and read back memory-mapped
+- datasetId pointers resolve after a restart (new store, same directory)
+- Mapped columns do not count against the in-memory LRU budget
+- Compressed export (npz without pyarrow)
+- /api/v3/datasets upload, info, materialize and export endpoints
+"""
+
+import asyncio
+import os
+
+import httpx
+import numpy as np
+import pytest
+
+import ml_server
+from ml_service.columnar import ColumnarCache, pyarrow
+from ml_service.datasets import Dataset, DatasetNotFound, DatasetStore, is_mapped
+
+
+def _dataset(dataset_id="ds1", rows=100):
+    rng = np.random.default_rng(1)
+    columns = {"cex_pressure_1h": rng.standard_normal(rows), "zone/quality": rng.standard_normal(rows)}
+    return Dataset(dataset_id, columns, (columns["cex_pressure_1h"] > 0).astype(np.int64))
+
+
+class TestColumnarCache:
+    """ColumnarCache and DatasetStore integration"""
+
+    def test_write_once_and_mmap_read(self, tmp_path):
+        cache = ColumnarCache(str(tmp_path))
+        dataset = _dataset()
+        path = cache.write(dataset)
+        cache.write(_dataset("ds1-copy"))
+        assert cache.writes == 1 and cache.lookup("ds1-copy") == dataset.dataset_hash
+
+        loaded = cache.read_id("ds1")
+        assert is_mapped(loaded.columns["zone/quality"]) and is_mapped(loaded.labels)
+        assert loaded.dataset_hash == dataset.dataset_hash == loaded.content_hash()
+        np.testing.assert_array_equal(loaded.matrix(["zone/quality"])[:, 0], dataset.columns["zone/quality"])
+        assert os.path.isfile(os.path.join(path, "cols", "zone_quality.npy"))
+        with pytest.raises(DatasetNotFound):
+            cache.read_id("nope")
+
+    def test_store_survives_restart(self, tmp_path):
+        store = DatasetStore(cache=ColumnarCache(str(tmp_path)))
+        store.put(_dataset())
+        assert store.bytes == 0
+
+        restarted = DatasetStore(cache=ColumnarCache(str(tmp_path)))
+        assert restarted.get("ds1").rows == 100
+        assert restarted.stats()["cache"]["reads"] == 1
+
+    def test_export(self, tmp_path):
+        cache = ColumnarCache(str(tmp_path))
+        dataset = _dataset()
+        cache.write(dataset)
+        path = cache.export(dataset.dataset_hash, "npz")
+        with np.load(path) as data:
+            assert sorted(data.files) == ["cex_pressure_1h", "label", "zone/quality"]
+        if pyarrow is None:
+            with pytest.raises(ValueError):
+                cache.export(dataset.dataset_hash, "parquet")
+
+
+class TestDatasetEndpoints:
+    """/api/v3/datasets"""
+
+    def test_upload_materialize_export(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ml_server, "datasets", DatasetStore(cache=ColumnarCache(str(tmp_path))))
+        dataset = _dataset()
+        columns = {name: values.tolist() for name, values in dataset.columns.items()}
+        columns["label"] = dataset.labels.tolist()
+
+        async def run():
+            transport = httpx.ASGITransport(app=ml_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://ml") as client:
+                uploaded = await client.post("/api/v3/datasets", json={"datasetId": "ds1", "columns": columns})
+                # Forget the in-memory copy: the next lookups must come from disk
+                monkeypatch.setattr(ml_server, "datasets", DatasetStore(cache=ColumnarCache(str(tmp_path))))
+                materialized = await client.post("/api/v3/datasets/ds1/materialize")
+                info = await client.get("/api/v3/datasets/ds1")
+                exported = await client.get("/api/v3/datasets/ds1/export", params={"format": "npz"})
+                bad = await client.get("/api/v3/datasets/ds1/export", params={"format": "csv"})
+                missing = await client.get("/api/v3/datasets/nope")
+                return uploaded, materialized, info, exported, bad, missing
+
+        uploaded, materialized, info, exported, bad, missing = asyncio.run(run())
+        assert uploaded.json()["datasetHash"] == dataset.dataset_hash
+        assert materialized.json()["path"] == str(tmp_path / dataset.dataset_hash)
+        assert info.json()["rows"] == 100
+        assert exported.status_code == 200 and exported.content[:2] == b"PK"
+        assert bad.status_code == 422 and missing.status_code == 404
@@ -0,0 +1,162 @@
+"""
+Test ML Drift - streaming histogram sketches
+
+Features tested:
+- Sketches merge by adding counts, including different feature layouts
+- PSI / KL / KS: ~0 for the same distribution, high for a shifted one
+- Hourly windows persist and a range is answered by merging windows
+- observe() never writes; persist() does, and reads are safe while observing
+- Scored rows feed the sketches; /api/drift/<kind> and /observe
+"""
+
+import asyncio
+import os
+import threading
+
+import httpx
+import numpy as np
+import pytest
+
+import ml_server
+from ml_service.drift import TOTAL_BINS, Sketch, SketchStore, bin_index, compare_sketches
+from ml_service.models import MARKET_FEATURES
+
+HOUR = 3600
+
+
+def _sample(rng, rows, shift=0.0):
+    return np.c_[rng.normal(shift, 1, rows), rng.lognormal(10 + shift, 1, rows)]
+
+
+class TestSketch:
+    """Sketch / compare_sketches"""
+
+    def test_bins_and_merge(self):
+        idx = bin_index(np.array([0.0, -1e30, 1e30, np.nan, np.inf]))
+        assert idx[1] == 0 and idx[2] == TOTAL_BINS - 1 and idx[3] == -1 and idx[4] == TOTAL_BINS - 1
+        rng = np.random.default_rng(0)
+        X = _sample(rng, 1000)
+        whole = Sketch(["x", "usd"])
+        whole.update(X)
+        a, b = Sketch(["x", "usd"]), Sketch(["usd", "x"])
+        a.update(X[:400])
+        b.update(X[400:, ::-1])
+        merged = a.merge(b)
+        np.testing.assert_array_equal(merged.counts, whole.counts)
+        np.testing.assert_allclose(merged.moments, whole.moments)
+        assert merged.rows == 1000
+
+    def test_drift_metrics(self):
+        rng = np.random.default_rng(1)
+        reference, same, shifted = Sketch(["x", "usd"]), Sketch(["x", "usd"]), Sketch(["x", "usd"])
+        reference.update(_sample(rng, 50_000))
+        same.update(_sample(rng, 50_000))
+        shifted.update(_sample(rng, 50_000, shift=1.0))
+
+        stable = compare_sketches(reference, same)
+        assert all(m["psi"] < 0.01 and m["ks"] < 0.02 and m["level"] == "LOW" for m in stable.values())
+        drifted = compare_sketches(reference, shifted)
+        assert all(m["psi"] > 0.25 and m["level"] == "HIGH" for m in drifted.values())
+        # Normal shifted by 1 sigma: KS = 2 * Phi(0.5) - 1 ~ 0.383
+        assert drifted["x"]["ks"] == pytest.approx(0.383, abs=0.02)
+        assert drifted["x"]["kl"] > 0
+
+
+class TestSketchStore:
+    """Hourly windows on disk"""
+
+    def test_windows_persist_and_merge(self, tmp_path):
+        rng = np.random.default_rng(2)
+        store = SketchStore(str(tmp_path))
+        start = 1000 * HOUR
+        for hour in range(5):
+            store.observe("market.ethereum", ["x", "usd"], _sample(rng, 100), now=start + hour * HOUR + 10)
+        store.flush()
+        assert store.windows("market.ethereum") == [start + h * HOUR for h in range(5)]
+
+        restarted = SketchStore(str(tmp_path))
+        merged, used = restarted.merged("market.ethereum", start + HOUR, start + 4 * HOUR)
+        assert used == 3 and merged.rows == 300
+        assert restarted.merged("market.other", 0, start * 2) == (None, 0)
+        assert restarted.streams() == ["market.ethereum"]
+
+    def test_observe_defers_writes_to_persist(self, tmp_path):
+        rng = np.random.default_rng(4)
+        store = SketchStore(str(tmp_path))
+        start = 1000 * HOUR
+        assert store.observe("market.ethereum", ["x", "usd"], _sample(rng, 100), now=start + 10) is False
+        # Rollover: the ended window is pending, still readable, not yet on disk
+        assert store.observe("market.ethereum", ["x", "usd"], _sample(rng, 50), now=start + HOUR + 10) is True
+        assert not os.path.exists(tmp_path / "market.ethereum")
+        assert store.merged("market.ethereum", start, start + 2 * HOUR)[0].rows == 150
+
+        assert store.persist(now=start + HOUR + 20) == 1
+        assert os.listdir(tmp_path / "market.ethereum") == [f"{start}.npz"]
+        assert store.stats()["pendingWindows"] == 0
+        assert store.persist(force=True) == 1  # the open window
+
+    def test_merged_while_observing(self, tmp_path):
+        rng = np.random.default_rng(5)
+        store = SketchStore(str(tmp_path))
+        start = 1000 * HOUR
+        errors, done = [], threading.Event()
+
+        def read():
+            try:
+                while not done.is_set():
+                    merged, _ = store.merged("market.ethereum", 0, start * 2)
+                    if merged is not None:
+                        # A torn copy would have counted more rows for one feature
+                        assert merged.counts[0].sum() == merged.counts[1].sum()
+            except Exception as e:  # noqa: BLE001 - surfaced below
+                errors.append(e)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        for i in range(200):
+            store.observe("market.ethereum", ["x", "usd"], _sample(rng, 20), now=start + (i // 20) * HOUR)
+        done.set()
+        reader.join()
+        assert errors == []
+        assert store.merged("market.ethereum", 0, start * 2)[0].rows == 4000
+
+
+class TestDriftEndpoints:
+    """/api/drift/<kind>"""
+
+    def test_scored_rows_feed_drift(self, tmp_path, monkeypatch):
+        store = SketchStore(str(tmp_path))
+        monkeypatch.setattr(ml_server, "sketches", store)
+        rng = np.random.default_rng(3)
+        now = 2000 * HOUR
+        # Reference hours straight into the store, the current hour through the API
+        for hour in range(1, 4):
+            store.observe("market.ethereum", MARKET_FEATURES, rng.normal(0, 0.3, (500, 4)), now=now - hour * HOUR)
+        current = {name: rng.normal(0.5, 0.3, 500).tolist() for name in MARKET_FEATURES}
+        current["exchangePressure"] = rng.normal(0, 0.3, 500).tolist()
+
+        async def run():
+            transport = httpx.ASGITransport(app=ml_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://ml") as client:
+                scored = await client.post(
+                    "/api/p35/predict/market/batch", json={"network": "ethereum", "columns": current}
+                )
+                observed = await client.post(
+                    "/api/drift/actor/observe", json={"network": "ethereum", "columns": {"hubScore": [1.0, 2.0]}}
+                )
+                report = await client.get(
+                    "/api/drift/market",
+                    params={"network": "ethereum", "start": now - 600, "end": now + HOUR, "baseline": "3h"},
+                )
+                bad = await client.get("/api/drift/market", params={"window": "soon"})
+                return scored, observed, report.json(), bad
+
+        monkeypatch.setattr(ml_server.time, "time", lambda: now + 60)
+        scored, observed, report, bad = asyncio.run(run())
+        assert scored.status_code == 200 and observed.json()["rows"] == 2
+        assert report["current"]["rows"] == 500 and report["reference"]["windows"] == 3
+        features = report["features"]
+        assert features["exchangePressure"]["level"] == "LOW"
+        assert features["accZoneStrength"]["level"] == "HIGH" and report["level"] == "HIGH"
+        assert bad.status_code == 422
+        assert store.windows("actor.ethereum") == [now]
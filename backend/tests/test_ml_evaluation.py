@@ -0,0 +1,113 @@
+"""
+Test ML Evaluation - batched evaluate-many with a persistent memo
+
+Features tested:
+- Stacked evaluation equals per-model predict_proba + confusion_matrix
+- Models with different feature packs in one call
+- Labels outside the model classes are reported, not scored
+- Memo keyed by model hash + dataset hash survives a restart
+- /api/v3/evaluate (client contract) and /api/v3/evaluate/batch
+"""
+
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+import ml_server
+from ml_service.datasets import Dataset, DatasetStore
+from ml_service.evaluation import CHUNK_ROWS, EvaluationMemo, ModelResolver, evaluate_models, model_hash
+from ml_service.registry import save_version
+from ml_service.training import FEATURE_PACKS, classification_metrics, confusion_matrix, train_variant
+
+
+def _dataset(dataset_id="ds1", rows=3000, seed=5):
+    rng = np.random.default_rng(seed)
+    columns = {name: rng.standard_normal(rows) for name in FEATURE_PACKS["PACK_A"]}
+    signal = columns["cex_pressure_1h"] - columns["corridor_entropy"] + 0.5 * rng.standard_normal(rows)
+    return Dataset(dataset_id, columns, (signal > 0).astype(np.int64))
+
+
+def _train(dataset, pack, seed, version):
+    names = dataset.feature_names
+    return train_variant(dataset.matrix(names), dataset.labels, names, FEATURE_PACKS[pack], seed, "market", version, 50)["model"]
+
+
+class TestEvaluateModels:
+    """evaluate_models()"""
+
+    def test_matches_single_model_path(self):
+        dataset = _dataset(rows=CHUNK_ROWS + 500)
+        models = [
+            _train(dataset, "PACK_A", 1, "a1"),
+            _train(dataset, "PACK_A", 2, "a2"),
+            _train(dataset, "PACK_A_MINUS_CEX", 1, "c1"),
+        ]
+        results = evaluate_models(models, dataset)
+        for model, result in zip(models, results):
+            pred = model.predict_proba(dataset.matrix(model.features)).argmax(axis=1)
+            cm = confusion_matrix(dataset.labels, pred, 2)
+            assert result["confusionMatrix"] == cm.tolist()
+            assert result["f1"] == pytest.approx(classification_metrics(cm)["f1"])
+            assert result["rows"] == dataset.rows
+            assert sum(result["confusion"].values()) == dataset.rows
+        assert results[0]["f1"] > results[2]["f1"]
+
+    def test_unknown_labels(self):
+        dataset = _dataset(rows=100)
+        model = _train(dataset, "PACK_A", 1, "a1")
+        three = Dataset("three", dataset.columns, np.arange(100) % 3)
+        assert "not classes" in evaluate_models([model], three)[0]["error"]
+
+    def test_memo_and_resolver(self, tmp_path):
+        dataset = _dataset(rows=200)
+        model = _train(dataset, "PACK_A", 1, "v3.0_pack_a_s1")
+        save_version(model, str(tmp_path / "models" / "v3" / "ethereum"))
+        resolver = ModelResolver([str(tmp_path / "models" / "v3" / "*")])
+        loaded, m_hash = resolver.resolve("market", "v3.0_pack_a_s1")
+        assert m_hash == model_hash(model) == model_hash(loaded)
+
+        memo = EvaluationMemo(str(tmp_path / "memo"))
+        assert memo.get(m_hash, dataset.dataset_hash) is None
+        memo.put(m_hash, dataset.dataset_hash, {"f1": 0.5})
+        assert EvaluationMemo(str(tmp_path / "memo")).get(m_hash, dataset.dataset_hash) == {"f1": 0.5}
+
+
+class TestEvaluateEndpoints:
+    """/api/v3/evaluate and /api/v3/evaluate/batch"""
+
+    def test_batch_cross_product_and_cache(self, tmp_path, monkeypatch):
+        store = DatasetStore()
+        store.put(_dataset("ds1", seed=1))
+        store.put(_dataset("ds2", seed=2))
+        shadow = tmp_path / "v3" / "ethereum"
+        for pack, version in (("PACK_A", "m1"), ("PACK_A_MINUS_CEX", "m2")):
+            save_version(_train(store.get("ds1"), pack, 1, version), str(shadow))
+        monkeypatch.setattr(ml_server, "datasets", store)
+        monkeypatch.setattr(ml_server, "evaluations", EvaluationMemo(str(tmp_path / "memo")))
+        monkeypatch.setattr(ml_server, "model_resolver", ModelResolver([str(tmp_path / "v3" / "*")]))
+
+        async def run():
+            transport = httpx.ASGITransport(app=ml_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://ml") as client:
+                body = {"task": "market", "modelIds": ["m1", "m2", "nope"], "datasetIds": ["ds1", "ds2"]}
+                first = await client.post("/api/v3/evaluate/batch", json=body)
+                second = await client.post("/api/v3/evaluate/batch", json=body)
+                single = await client.post("/api/v3/evaluate", json={"task": "market", "modelId": "m2", "datasetId": "ds2"})
+                missing = await client.post("/api/v3/evaluate", json={"task": "market", "modelId": "m1", "datasetId": "x"})
+                return first.json(), second.json(), single, missing
+
+        first, second, single, missing = asyncio.run(run())
+        assert [(r["modelId"], r["datasetId"]) for r in first["results"]] == [
+            ("m1", "ds1"), ("m1", "ds2"), ("m2", "ds1"), ("m2", "ds2"),
+        ]
+        assert first["computed"] == 4 and first["cached"] == 0
+        assert [e["modelId"] for e in first["errors"]] == ["nope"]
+        assert second["computed"] == 0 and second["cached"] == 4
+        assert [r["f1"] for r in second["results"]] == [r["f1"] for r in first["results"]]
+
+        body = single.json()
+        assert body["meta"]["cached"] and body["f1"] == first["results"][3]["f1"]
+        assert set(body["confusion"]) == {"tp", "fp", "tn", "fn"}
+        assert missing.status_code == 404
@@ -0,0 +1,118 @@
+"""
+Test ML Features - vectorized feature engine over bucketed frames
+
+Features tested:
+- Trailing windows and pressure follow the Node window [bucketTs - W, bucketTs)
+- Hour-over-hour deltas, spike level and direction
+- Bucket entropy and rolling z-scores
+- /api/features/market/bulk with posted events (JSON and binary)
+"""
+
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+import ml_server
+from ml_service.batch import BINARY_CONTENT_TYPE, decode_binary
+from ml_service.features import (
+    FeatureFrameError,
+    bucket_entropy,
+    cex_pressure_v3_docs,
+    exchange_pressure_frame,
+    rolling_zscore,
+    trailing_sum,
+)
+
+CEX = "0xCEX"
+START = 1_700_000_100  # bucket-aligned (multiple of 300)
+
+
+def _events():
+    # Bucket START: 3 deposits over the previous hour, 1 in the last 5 minutes;
+    # 1 withdrawal in the last 5 minutes and 1 two hours back (outside 1h, inside 1d).
+    timestamps = [START - 3000, START - 1200, START - 60, START - 30, START - 7200, START + 10]
+    senders = ["0xa", "0xb", "0xc", CEX, CEX, "0xd"]
+    receivers = [CEX, CEX, CEX, "0xe", "0xf", CEX]
+    return timestamps, senders, receivers
+
+
+class TestFeatureFrame:
+    """exchange_pressure_frame() and helpers"""
+
+    def test_trailing_sum(self):
+        counts = np.array([1.0, 2.0, 3.0, 4.0])
+        np.testing.assert_array_equal(trailing_sum(counts, 2), [0, 1, 3, 5])
+        np.testing.assert_array_equal(trailing_sum(counts, 1, lag=1), [0, 0, 1, 2])
+
+    def test_window_semantics_match_node(self):
+        timestamps, senders, receivers = _events()
+        frame = exchange_pressure_frame(timestamps, senders, receivers, [CEX.lower()], START, START + 600)
+        row = frame.loc[START]
+        # 5m: IN 1, OUT 1; 1h: IN 3, OUT 1; 1d: IN 3, OUT 2. The event at START+10 is not in its own bucket.
+        assert row.cex_pressure_5m == 0
+        assert row.cex_pressure_1h == pytest.approx(0.5)
+        assert row.cex_pressure_1d == pytest.approx(0.2)
+        # IN: nothing the hour before -> 1 by the Node rule; OUT: 1 vs 1 (START - 7200 opens the previous hour)
+        assert row.cex_in_delta == 1 and row.cex_out_delta == 0
+        # |0 - 0.5| >= 0.30 and 5m < 1h -> HIGH / BUY
+        assert row.cex_spike_level == 2 and row.cex_spike_direction == 1
+        assert frame.loc[START + 300].cex_pressure_5m == 1
+
+        bucket_ts, doc = cex_pressure_v3_docs(frame)[0]
+        assert bucket_ts == START
+        assert doc["spikeLevel"] == "HIGH" and doc["spikeDirection"] == "BUY"
+
+    def test_bad_input(self):
+        with pytest.raises(FeatureFrameError):
+            exchange_pressure_frame([], [], [], [CEX], START, START)
+        with pytest.raises(FeatureFrameError):
+            exchange_pressure_frame([START], [], [CEX], [CEX], START, START + 300)
+
+    def test_entropy_and_zscore(self):
+        buckets = np.array([0, 0, 0, 0, 1, 1, 1, 1])
+        keys = np.array(["a", "a", "a", "a", "a", "b", "c", "d"])
+        entropy = bucket_entropy(buckets, keys, 3)
+        assert entropy[0] == 0 and entropy[2] == 0
+        assert entropy[1] == pytest.approx(1.0)
+
+        z = rolling_zscore(np.array([1.0, 1.0, 1.0, 4.0]), window=4)
+        assert z[:3].tolist() == [0.0, 0.0, 0.0]
+        assert z[3] == pytest.approx((4 - 1.75) / np.std([1, 1, 1, 4]))
+
+
+class TestFeatureEndpoint:
+    """/api/features/market/bulk"""
+
+    def test_bulk_from_events(self):
+        timestamps, senders, receivers = _events()
+        body = {
+            "network": "ethereum",
+            "start": START,
+            "end": START + 3600,
+            "cexAddresses": [CEX],
+            "events": {"timestamp": timestamps, "from": senders, "to": receivers},
+        }
+
+        async def run():
+            transport = httpx.ASGITransport(app=ml_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://ml") as client:
+                as_json = await client.post("/api/features/market/bulk", json=body)
+                as_binary = await client.post(
+                    "/api/features/market/bulk", json=body, headers={"Accept": BINARY_CONTENT_TYPE}
+                )
+                bad = await client.post("/api/features/market/bulk", json={**body, "end": START})
+                too_many = await client.post("/api/features/market/bulk", json={**body, "end": START + 10**9})
+                return as_json, as_binary, bad, too_many
+
+        as_json, as_binary, bad, too_many = asyncio.run(run())
+        result = as_json.json()
+        assert result["rows"] == 12 and result["buckets"][0] == START
+        assert result["columns"]["cex_pressure_1h"][0] == pytest.approx(0.5)
+        assert result["written"] == 0
+
+        batch = decode_binary(as_binary.content)
+        assert batch.ids[0] == str(START) and batch.rows == 12
+        np.testing.assert_allclose(batch.columns["cex_pressure_1d"], result["columns"]["cex_pressure_1d"], atol=1e-6)
+        assert bad.status_code == 422 and too_many.status_code == 422
@@ -0,0 +1,189 @@
+"""
+Test ML Training Jobs - async queue, progress and idempotent results
+
+Features tested:
+- Submit returns at once; progress snapshots end in DONE
+- Same dataset + config hash: joins the running job, then hits the cache
+- Deleted artifacts are retrained; failures end in FAILED
+- Queue depth limit raises QueueFull / 429 + Retry-After
+- /api/jobs/train-etap5 polling and SSE, /train-etap5 synchronous path
+"""
+
+import asyncio
+import json
+import os
+import threading
+
+import httpx
+import numpy as np
+import pytest
+
+import ml_server
+from ml_service.jobs import DONE, FAILED, QueueFull, TrainingJobQueue, config_hash
+
+
+def _etap5_payload(rows: int = 400, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((rows, 4))
+    y = (X[:, 0] - X[:, 2] > 0).astype(int)
+    split = int(rows * 0.8)
+    return {
+        "X_train": X[:split].tolist(),
+        "y_train": y[:split].tolist(),
+        "sample_weights_train": [1.0] * split,
+        "X_eval": X[split:].tolist(),
+        "y_eval": y[split:].tolist(),
+        "feature_names": ["f0", "f1", "f2", "f3"],
+        "horizon": "7d",
+        "algorithm": "logreg",
+        "class_weight": {"0": 1.0, "1": 1.0},
+        "hyperparameters": {"C": 1.0, "max_iter": 200},
+        "model_id": "model_7d_test",
+    }
+
+
+def _artifact_run(tmp_path, name):
+    def run(report):
+        report(0.5, "fitting")
+        path = tmp_path / name
+        path.write_text("weights")
+        return {"artifactPath": str(path)}
+    return run
+
+
+class TestJobQueue:
+    """TrainingJobQueue unit tests"""
+
+    def test_config_hash_matches_node_recipe(self):
+        # hashTrainConfig({b: 1, a: {d: 2, c: [3]}}) in train_config_hash.util.ts
+        assert config_hash({"b": 1, "a": {"d": 2, "c": [3]}}) == config_hash({"a": {"c": [3], "d": 2}, "b": 1})
+        assert len(config_hash({})) == 16
+
+    def test_progress_dedup_and_cache(self, tmp_path):
+        release = threading.Event()
+
+        def run(report):
+            report(0.5, "fitting")
+            release.wait(5)
+            path = tmp_path / "artifact"
+            path.write_text("weights")
+            return {"artifactPath": str(path)}
+
+        async def go():
+            queue = TrainingJobQueue(str(tmp_path / "index"))
+            job = queue.submit("v3", "ds", "cfg", run)
+            again = queue.submit("v3", "ds", "cfg", run)
+            assert again is job and job.status == "QUEUED"
+            seen = []
+            watcher = asyncio.ensure_future(_collect(queue.watch(job.job_id), seen))
+            await asyncio.sleep(0.05)
+            release.set()
+            await watcher
+            return queue, job, seen
+
+        queue, job, seen = asyncio.run(go())
+        assert seen[-1]["status"] == DONE and seen[-1]["result"]["artifactPath"].endswith("artifact")
+        assert any(s["stage"] == "fitting" and s["progress"] == 0.5 for s in seen)
+        assert queue.stats()["deduplicated"] == 1
+        assert job.run is None
+
+        async def resubmit():
+            fresh = TrainingJobQueue(str(tmp_path / "index"))
+            cached = fresh.submit("v3", "ds", "cfg", lambda report: pytest.fail("should not retrain"))
+            os.remove(tmp_path / "artifact")
+            retrained = fresh.submit("v3", "ds", "cfg", _artifact_run(tmp_path, "artifact"))
+            await fresh.wait(retrained.job_id)
+            return cached, retrained
+
+        cached, retrained = asyncio.run(resubmit())
+        assert cached.status == DONE and cached.cached and cached.result == job.result
+        assert retrained.status == DONE and not retrained.cached
+
+    def test_failure_and_queue_full(self, tmp_path):
+        release = threading.Event()
+
+        async def go():
+            queue = TrainingJobQueue(str(tmp_path), workers=1, max_depth=1)
+            failing = queue.submit("v3", "ds", "bad", lambda report: 1 / 0)
+            await queue.wait(failing.job_id)
+            blocker = queue.submit("v3", "ds", "a", lambda report: release.wait(5) and {})
+            await asyncio.sleep(0.05)
+            queue.submit("v3", "ds", "b", lambda report: {})
+            with pytest.raises(QueueFull) as exc:
+                queue.submit("v3", "ds", "c", lambda report: {})
+            release.set()
+            await queue.wait(blocker.job_id)
+            await queue.close()
+            return failing, exc.value, queue.stats()
+
+        failing, full, stats = asyncio.run(go())
+        assert failing.status == FAILED and "division by zero" in failing.error and failing.run is None
+        assert full.retry_after >= 1
+        assert stats["rejected"] == 1 and stats["failed"] == 1
+
+
+async def _collect(agen, out):
+    async for item in agen:
+        out.append(item)
+
+
+class TestJobEndpoints:
+    """/api/jobs and /train-etap5"""
+
+    @pytest.fixture(autouse=True)
+    def _isolated(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ml_server, "jobs", TrainingJobQueue(str(tmp_path / "jobs")))
+        monkeypatch.setattr(ml_server, "ML_ETAP5_DIR", str(tmp_path / "etap5"))
+
+    def _call(self, coro_fn):
+        async def run():
+            transport = httpx.ASGITransport(app=ml_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://ml") as client:
+                return await coro_fn(client)
+        return asyncio.run(run())
+
+    def test_submit_poll_and_events(self, tmp_path):
+        async def run(client):
+            submitted = await client.post("/api/jobs/train-etap5", json=_etap5_payload())
+            job_id = submitted.json()["jobId"]
+            events = await client.get(f"/api/jobs/{job_id}/events")
+            polled = await client.get(f"/api/jobs/{job_id}")
+            again = await client.post("/api/jobs/train-etap5", json=_etap5_payload())
+            missing = await client.get("/api/jobs/nope")
+            return submitted, events, polled, again, missing
+
+        submitted, events, polled, again, missing = self._call(run)
+        assert submitted.status_code == 202 and submitted.json()["status"] == "QUEUED"
+        assert events.headers["content-type"].startswith("text/event-stream")
+        blocks = [b for b in events.text.split("\n\n") if b]
+        assert blocks[-1].startswith("event: done")
+        assert any(b.startswith("event: progress") for b in blocks)
+        result = polled.json()["result"]
+        assert polled.json()["status"] == DONE and result["metrics"]["accuracy"] > 0.9
+        assert os.path.isfile(os.path.join(result["artifact_path"], "weights.npy"))
+        assert again.status_code == 200 and again.json()["cached"] and again.json()["result"] == result
+        assert missing.status_code == 404
+
+    def test_sync_etap5_and_bad_payload(self):
+        async def run(client):
+            first = await client.post("/train-etap5", json=_etap5_payload(seed=1))
+            second = await client.post("/train-etap5", json=_etap5_payload(seed=1))
+            bad = await client.post("/train-etap5", json={"X_train": []})
+            return first, second, bad
+
+        first, second, bad = self._call(run)
+        assert first.status_code == 200 and not first.json()["cached"]
+        assert first.json()["artifact_hash"] and first.json()["artifact_size"] > 0
+        assert second.json()["cached"] and second.json()["artifact_path"] == first.json()["artifact_path"]
+        assert bad.status_code == 422
+        assert first.json()["algorithm"] == "logreg"
+
+    def test_etap5_config_hash_names_the_trainer(self):
+        lightgbm = {**_etap5_payload(), "algorithm": "lightgbm", "config_hash": "fromnode"}
+        _, cfg = ml_server.etap5_hashes(lightgbm)
+        assert cfg == config_hash({"config": "fromnode", "trainer": ml_server.ETAP5_TRAINER}) != "fromnode"
+
+    def test_queue_full_is_429(self, monkeypatch):
+        monkeypatch.setattr(ml_server, "jobs", TrainingJobQueue("/nonexistent", max_depth=0))
+        response = self._call(lambda client: client.post("/api/jobs/train-etap5", content=json.dumps(_etap5_payload())))
+        assert response.status_code == 429 and int(response.headers["retry-after"]) >= 1
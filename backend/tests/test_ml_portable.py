@@ -0,0 +1,132 @@
+"""
+Test ML Portable Export - JSON models for in-process scoring in Node
+
+Features tested:
+- to_portable / from_portable JSON round trip is bit-exact
+- Parity fixture shared with src/core/ml/__tests__/portable_model.parity.test.ts
+  matches current Python scoring
+- /api/p35/models/<kind>/export with ETag / 304
+
+Regenerate the fixture after changing the scoring math:
+    UPDATE_PARITY_FIXTURE=1 python -m pytest tests/test_ml_portable.py
+"""
+
+import asyncio
+import json
+import os
+
+import httpx
+import numpy as np
+import pytest
+
+import ml_server
+from ml_service.evaluation import model_hash
+from ml_service.models import (
+    ACTOR_FEATURES,
+    MARKET_FEATURES,
+    LinearModel,
+    baseline_actor_model,
+    baseline_market_model,
+    score_actor,
+    score_market,
+)
+
+FIXTURE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "src", "core", "ml", "__tests__", "fixtures", "portable_parity.json"
+)
+
+
+def _models():
+    rng = np.random.default_rng(19)
+    market = LinearModel(
+        "market", "market_trained", (*MARKET_FEATURES, "netFlowUsd"), ("UP", "DOWN"),
+        rng.normal(0, 1.5, (5, 2)), rng.normal(0, 0.3, 2), [False, False, False, False, True],
+    )
+    actor = LinearModel(
+        "actor", "actor_trained", ACTOR_FEATURES, ("SMART", "NEUTRAL", "NOISY"),
+        rng.normal(0, 0.5, (10, 3)), rng.normal(0, 0.2, 3), [f.endswith("Usd") for f in ACTOR_FEATURES],
+    )
+    return [baseline_market_model(), market, baseline_actor_model(), actor]
+
+
+def _rows(model, rng, n=40):
+    rows = []
+    for i in range(n):
+        row = {}
+        for name in model.features:
+            if i % 7 == 3 and name == model.features[0]:
+                continue  # missing feature scores as 0
+            scale = 1e6 if name.endswith("Usd") else 1.0
+            row[name] = float(rng.normal(0, scale))
+        rows.append(row)
+    return rows
+
+
+def _expected(model, rows):
+    X = np.array([[row.get(name, 0.0) for name in model.features] for row in rows])
+    if model.kind == "market":
+        s = score_market(model, X)
+        return [
+            {"pUp": float(s["pUp"][i]), "pDown": float(s["pDown"][i]), "confidence": float(s["confidence"][i]),
+             "mlSignal": {1: "BUY", -1: "SELL", 0: "NEUTRAL"}[int(s["signal"][i])]}
+            for i in range(len(rows))
+        ]
+    s = score_actor(model, X)
+    return [
+        {"label": model.classes[int(s["label"][i])], "confidence": float(s["confidence"][i]),
+         "probabilities": {c: float(s["probs"][i, j]) for j, c in enumerate(model.classes)}}
+        for i in range(len(rows))
+    ]
+
+
+def build_parity_fixture() -> dict:
+    rng = np.random.default_rng(7)
+    cases = []
+    for model in _models():
+        rows = _rows(model, rng)
+        cases.append({"model": model.to_portable(), "rows": rows, "expected": _expected(model, rows)})
+    return {"cases": cases}
+
+
+class TestPortableExport:
+    """LinearModel.to_portable / from_portable"""
+
+    def test_round_trip_is_exact(self):
+        for model in _models():
+            restored = LinearModel.from_portable(json.loads(json.dumps(model.to_portable())))
+            assert model_hash(restored) == model_hash(model)
+        with pytest.raises(ValueError):
+            LinearModel.from_portable({"format": "onnx"})
+
+    def test_parity_fixture_is_current(self):
+        if os.environ.get("UPDATE_PARITY_FIXTURE"):
+            with open(FIXTURE, "w") as f:
+                json.dump(build_parity_fixture(), f, indent=1)
+                f.write("\n")
+        with open(FIXTURE) as f:
+            fixture = json.load(f)
+        assert fixture == json.loads(json.dumps(build_parity_fixture()))
+        for case in fixture["cases"]:
+            model = LinearModel.from_portable(case["model"])
+            assert _expected(model, case["rows"]) == case["expected"]
+
+
+class TestExportEndpoint:
+    """/api/p35/models/<kind>/export"""
+
+    def test_export_and_not_modified(self):
+        async def run():
+            transport = httpx.ASGITransport(app=ml_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://ml") as client:
+                first = await client.get("/api/p35/models/actor/export")
+                again = await client.get("/api/p35/models/actor/export", headers={"If-None-Match": first.headers["etag"]})
+                unknown = await client.get("/api/p35/models/nope/export")
+                return first, again, unknown
+
+        first, again, unknown = asyncio.run(run())
+        body = first.json()
+        active = ml_server.registry.active("actor")
+        assert body["version"] == active.version and body["hash"] == model_hash(active)
+        assert model_hash(LinearModel.from_portable(body)) == body["hash"]
+        assert again.status_code == 304 and unknown.status_code == 404
+
@@ -0,0 +1,120 @@
+"""
+Test ML Model Registry - versioned artifacts and hot-swap
+
+Features tested:
+- Version directories load with memory-mapped weights
+- ACTIVE pointer wins over the newest version
+- Explicit activate, rollback and bounded resident set
+- Predictions keep flowing while a reload is in progress
+- /api/p35/reload endpoint
+"""
+
+import asyncio
+import os
+
+import httpx
+import numpy as np
+import pytest
+
+import ml_server
+from ml_service.models import baseline_actor_model, baseline_market_model
+from ml_service.registry import ModelNotFound, ModelRegistry, save_version
+
+
+def _publish(model_dir, version, scale=1.0, kind="market"):
+    model = baseline_market_model() if kind == "market" else baseline_actor_model()
+    model.version = version
+    model.weights = model.weights * scale
+    save_version(model, str(model_dir))
+    return model
+
+
+class TestModelRegistry:
+    """Registry unit tests"""
+
+    def test_starts_on_baselines(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        assert registry.active("market").version == "baseline_v1"
+        assert asyncio.run(registry.reload())["market"]["version"] == "baseline_v1"
+
+    def test_reload_newest_and_mmap(self, tmp_path):
+        _publish(tmp_path, "v1")
+        _publish(tmp_path, "v2", scale=2.0)
+        registry = ModelRegistry(str(tmp_path))
+        result = asyncio.run(registry.reload("market"))
+        assert result["market"]["version"] == "v2" and result["market"]["previous"] == "baseline_v1"
+        weights = registry.active("market").weights
+        assert isinstance(weights, np.memmap) or isinstance(weights.base, np.memmap)
+
+    def test_active_pointer(self, tmp_path):
+        _publish(tmp_path, "v1")
+        _publish(tmp_path, "v2")
+        (tmp_path / "market" / "ACTIVE").write_text("v1\n")
+        registry = ModelRegistry(str(tmp_path))
+        asyncio.run(registry.reload())
+        assert registry.active("market").version == "v1"
+        assert registry.available("market") == ["v1", "v2"]
+
+    def test_activate_rollback_and_eviction(self, tmp_path):
+        for i in range(1, 5):
+            _publish(tmp_path, f"v{i}")
+        registry = ModelRegistry(str(tmp_path), max_resident=2)
+
+        async def run():
+            for i in range(1, 5):
+                await registry.activate("market", f"v{i}")
+            assert registry.stats()["models"]["market"]["resident"] == ["v3", "v4"]
+            result = await registry.rollback("market")
+            assert result["version"] == "v3" and not result["loaded"]
+            with pytest.raises(ModelNotFound):
+                await registry.activate("market", "v99")
+            assert registry.active("market").version == "v3"
+
+        asyncio.run(run())
+
+    def test_predictions_not_blocked_by_reload(self, tmp_path):
+        _publish(tmp_path, "v1")
+        registry = ModelRegistry(str(tmp_path))
+        X = np.zeros((10, 4))
+
+        async def run():
+            seen = set()
+
+            async def predict_loop():
+                for _ in range(200):
+                    model = registry.active("market")
+                    model.predict_proba(X)
+                    seen.add(model.version)
+                    await asyncio.sleep(0)
+
+            await asyncio.gather(predict_loop(), registry.reload())
+            return seen
+
+        seen = asyncio.run(run())
+        assert "v1" in seen
+
+
+class TestReloadEndpoint:
+    """POST /api/p35/reload"""
+
+    def test_reload_switch_and_rollback(self, tmp_path, monkeypatch):
+        _publish(tmp_path, "v5", kind="actor")
+        monkeypatch.setattr(ml_server, "registry", ModelRegistry(str(tmp_path)))
+
+        async def run():
+            transport = httpx.ASGITransport(app=ml_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://ml") as client:
+                reloaded = (await client.post("/api/p35/reload")).json()
+                predicted = (await client.post("/api/p35/predict/actor", json={
+                    "network": "ethereum", "actorId": "x", "features": {},
+                })).json()
+                rolled = (await client.post("/api/p35/reload", json={"kind": "actor", "rollback": True})).json()
+                missing = await client.post("/api/p35/reload", json={"kind": "actor", "version": "nope"})
+                return reloaded, predicted, rolled, missing
+
+        reloaded, predicted, rolled, missing = asyncio.run(run())
+        assert reloaded["ok"] and reloaded["models"]["actor"]["version"] == "v5"
+        assert predicted["modelVersion"] == "v5"
+        assert rolled["models"]["actor"]["version"] == "baseline_v1"
+        assert missing.status_code == 404
+        assert os.path.isdir(tmp_path / "actor" / "v5")
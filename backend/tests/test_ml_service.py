@@ -0,0 +1,136 @@
+"""
+Test ML Service - vectorized single and batch prediction
+
+Features tested:
+- Baseline market model matches the Node fallback formula
+- Single-row market/actor endpoints keep the ml_python_client.ts contract
+- Batch endpoints accept columnar JSON and the MLB1 binary format
+- Batch scores equal single-row scores
+- Malformed batches return 422
+"""
+
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+import ml_server
+from ml_service.batch import BINARY_CONTENT_TYPE, Batch, BatchFormatError, decode_binary, encode_binary
+from ml_service.models import ACTOR_FEATURES, MARKET_FEATURES, LinearModel, baseline_market_model
+
+
+def _call(coro_fn):
+    async def run():
+        transport = httpx.ASGITransport(app=ml_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://ml") as client:
+            return await coro_fn(client)
+    return asyncio.run(run())
+
+
+def _actor_columns(rows: int) -> dict:
+    rng = np.random.default_rng(7)
+    return {name: (rng.standard_normal(rows) * (1e5 if name.endswith("Usd") else 1)).tolist() for name in ACTOR_FEATURES}
+
+
+class TestModels:
+    """Model math and artifacts"""
+
+    def test_market_baseline_matches_node_fallback(self):
+        ep, acc, dist, ent = 0.3, 0.5, 0.2, 0.4
+        raw = -ep * 0.4 + (acc - dist) * 0.35 + (0.5 - ent) * 0.1
+        probs = baseline_market_model().predict_proba(np.array([[ep, acc, dist, ent]]))
+        assert abs(probs[0, 0] - 1 / (1 + np.exp(-raw * 2))) < 1e-12
+
+    def test_npz_roundtrip(self, tmp_path):
+        model = baseline_market_model()
+        model.version = "v7"
+        model.save(str(tmp_path / "market.npz"))
+        loaded = LinearModel.load(str(tmp_path / "market.npz"))
+        assert loaded.version == "v7" and loaded.features == MARKET_FEATURES
+        assert np.array_equal(loaded.weights, model.weights)
+
+
+class TestBatchCodec:
+    """Columnar binary format"""
+
+    def test_binary_roundtrip(self):
+        columns = {"a": np.arange(5, dtype=np.float32), "b": np.ones(5, dtype=np.float32)}
+        raw = encode_binary(columns, ["r0", "r1", "r2", "r3", "r4"], {"network": "ethereum"})
+        batch = decode_binary(raw)
+        assert batch.rows == 5 and batch.ids[4] == "r4" and batch.meta == {"network": "ethereum"}
+        assert batch.matrix(["b", "a"])[:, 1].tolist() == [0, 1, 2, 3, 4]
+
+    def test_truncated_and_mismatched(self):
+        raw = encode_binary({"a": np.arange(5)})
+        with pytest.raises(BatchFormatError):
+            decode_binary(raw[:-4])
+        with pytest.raises(BatchFormatError):
+            Batch({"a": np.zeros(2), "b": np.zeros(3)})
+
+
+class TestMLService:
+    """HTTP endpoints"""
+
+    def test_single_market(self):
+        async def call(client):
+            return await client.post("/api/p35/predict/market", json={
+                "network": "ethereum",
+                "features": {"exchangePressure": -0.8, "accZoneStrength": 0.9, "distZoneStrength": 0.1, "corridorsEntropy": 0.2},
+                "timeBucket": 1700000000,
+            })
+
+        data = _call(call).json()
+        assert data["timeBucket"] == 1700000000
+        assert data["mlSignal"] == "BUY" and data["pUp"] > 0.6
+        assert abs(data["pUp"] + data["pDown"] - 1) < 1e-3
+        assert data["modelVersion"] == "baseline_v1"
+
+    def test_batch_json_matches_single(self):
+        columns = _actor_columns(50)
+
+        async def call(client):
+            batch = await client.post("/api/p35/predict/actor/batch", json={
+                "network": "ethereum", "ids": [f"a{i}" for i in range(50)], "columns": columns,
+            })
+            single = await client.post("/api/p35/predict/actor", json={
+                "network": "ethereum", "actorId": "a3",
+                "features": {name: values[3] for name, values in columns.items()},
+            })
+            return batch.json(), single.json()
+
+        batch, single = _call(call)
+        assert batch["count"] == 50 and batch["ids"][3] == "a3"
+        assert batch["label"][3] == single["label"]
+        for cls in batch["classes"]:
+            assert batch["probabilities"][cls][3] == single["probabilities"][cls]
+
+    def test_batch_binary(self):
+        columns = {name: np.asarray(v, dtype=np.float32) for name, v in _actor_columns(1000).items()}
+        body = encode_binary(columns, meta={"network": "ethereum"})
+
+        async def call(client):
+            return await client.post(
+                "/api/p35/predict/actor/batch",
+                content=body,
+                headers={"content-type": BINARY_CONTENT_TYPE, "accept": BINARY_CONTENT_TYPE},
+            )
+
+        response = _call(call)
+        assert response.headers["content-type"] == BINARY_CONTENT_TYPE
+        result = decode_binary(response.content)
+        assert result.rows == 1000 and result.meta["classes"] == ["SMART", "NEUTRAL", "NOISY"]
+        total = result.columns["p_SMART"] + result.columns["p_NEUTRAL"] + result.columns["p_NOISY"]
+        assert np.allclose(total, 1, atol=1e-3)
+
+    def test_bad_batch_is_422(self):
+        async def call(client):
+            missing = await client.post("/api/p35/predict/market/batch", json={"columns": {"exchangePressure": [1]}})
+            garbage = await client.post(
+                "/api/p35/predict/market/batch", content=b"nope", headers={"content-type": BINARY_CONTENT_TYPE}
+            )
+            return missing, garbage
+
+        missing, garbage = _call(call)
+        assert missing.status_code == 422 and "accZoneStrength" in missing.json()["message"]
+        assert garbage.status_code == 422
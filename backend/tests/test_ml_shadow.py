@@ -0,0 +1,148 @@
+"""
+Test ML Shadow - dual inference and rolling disagreement
+
+Features tested:
+- score_models on the union feature matrix equals per-model predict_proba
+- Disagreement windows sum hourly buckets and survive a restart
+- Shadows with other classes are rejected
+- /api/p35/predict/<kind>/dual, /api/p35/shadows and /api/p35/shadows/stats
+- Served /batch requests record disagreement for registered shadows
+"""
+
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+import ml_server
+from ml_service.evaluation import ModelResolver
+from ml_service.models import ACTOR_FEATURES, MARKET_CLASSES, MARKET_FEATURES, LinearModel, baseline_market_model
+from ml_service.registry import save_version
+from ml_service.shadow import DisagreementStats, ShadowError, ShadowSet, compare, score_models, union_features
+
+HOUR = 3600
+
+
+def _shadow_market(version="shadow_m1", seed=3, extra=("netFlowUsd",)):
+    rng = np.random.default_rng(seed)
+    features = (*MARKET_FEATURES[:3], *extra)
+    return LinearModel("market", version, features, MARKET_CLASSES, rng.standard_normal((len(features), 2)), np.zeros(2))
+
+
+class TestShadowScoring:
+    """score_models() / DisagreementStats"""
+
+    def test_union_matrix_matches_per_model(self):
+        models = [baseline_market_model(), _shadow_market()]
+        features = union_features(models)
+        assert features == (*MARKET_FEATURES, "netFlowUsd")
+        X = np.random.default_rng(0).standard_normal((50, len(features)))
+        for model, (probs, latency_ms) in zip(models, score_models(models, X, features)):
+            cols = [features.index(f) for f in model.features]
+            np.testing.assert_allclose(probs, model.predict_proba(X[:, cols]))
+            assert latency_ms >= 0
+
+        result = compare(np.array([[0.9, 0.1], [0.4, 0.6]]), np.array([[0.7, 0.3], [0.6, 0.4]]))
+        assert result["rows"] == 2 and result["disagree"] == 1
+        assert result["tvdSum"] == pytest.approx(0.4) and result["tvdMax"] == pytest.approx(0.2)
+
+    def test_windows_and_restart(self, tmp_path):
+        path = str(tmp_path / "disagreement.json")
+        now = 100 * 86400
+        stats = DisagreementStats(path)
+        stats.record("market", "a1", "s1", {"rows": 1, "disagree": 0, "tvdSum": 0.0, "tvdMax": 0.0}, now - 30 * 86400)
+        stats.record("market", "a1", "s1", {"rows": 10, "disagree": 5, "tvdSum": 1.0, "tvdMax": 0.3}, now - 3 * 86400)
+        stats.record("market", "a1", "s1", {"rows": 10, "disagree": 1, "tvdSum": 1.0, "tvdMax": 0.1}, now)
+        stats.flush(now)
+
+        restarted = DisagreementStats(path)
+        (last_hour,) = restarted.window("market", HOUR, now)
+        assert last_hour["rows"] == 10 and last_hour["disagreementRate"] == pytest.approx(0.1)
+        (week,) = restarted.window("market", 7 * 86400, now)
+        assert week["rows"] == 20 and week["disagreements"] == 6
+        assert week["meanTvd"] == pytest.approx(0.1) and week["maxTvd"] == pytest.approx(0.3)
+        # Older than the 14d retention: pruned on record
+        assert restarted.window("market", 60 * 86400, now)[0]["rows"] == 20
+        assert restarted.window("actor", HOUR, now) == []
+
+    def test_register_rejects_other_classes(self, tmp_path):
+        actor_like = LinearModel("market", "bad", ACTOR_FEATURES, ("A", "B", "C"), np.zeros((10, 3)), np.zeros(3))
+        save_version(actor_like, str(tmp_path / "models"))
+        shadows = ShadowSet(str(tmp_path), ModelResolver([str(tmp_path / "models")]))
+        with pytest.raises(ShadowError):
+            shadows.register("market", "bad", baseline_market_model())
+        assert shadows.ids() == {}
+
+
+class TestDualEndpoints:
+    """/api/p35/predict/<kind>/dual and /api/p35/shadows"""
+
+    def test_dual_predict_and_stats(self, tmp_path, monkeypatch):
+        save_version(_shadow_market("shadow_m1"), str(tmp_path / "v3" / "ethereum"))
+        resolver = ModelResolver([str(tmp_path / "v3" / "*")])
+        monkeypatch.setattr(ml_server, "shadows", ShadowSet(str(tmp_path / "shadow"), resolver))
+        monkeypatch.setattr(ml_server, "disagreement", DisagreementStats(str(tmp_path / "shadow" / "d.json")))
+        rng = np.random.default_rng(1)
+        columns = {name: rng.standard_normal(200).tolist() for name in (*MARKET_FEATURES, "netFlowUsd")}
+
+        async def run():
+            transport = httpx.ASGITransport(app=ml_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://ml") as client:
+                registered = await client.post("/api/p35/shadows", json={"kind": "market", "modelId": "shadow_m1"})
+                missing = await client.post("/api/p35/shadows", json={"kind": "market", "modelId": "nope"})
+                dual = await client.post(
+                    "/api/p35/predict/market/dual", json={"network": "ethereum", "columns": columns}
+                )
+                single = await client.post("/api/p35/predict/market/batch", json={"columns": columns})
+                stats = await client.get("/api/p35/shadows/stats", params={"kind": "market", "window": "1h"})
+                bad_window = await client.get("/api/p35/shadows/stats", params={"window": "2h"})
+                removed = await client.delete("/api/p35/shadows/market/shadow_m1")
+                after = await client.post("/api/p35/predict/market/dual", json={"columns": columns})
+                return registered, missing, dual.json(), single.json(), stats.json(), bad_window, removed, after.json()
+
+        registered, missing, dual, single, stats, bad_window, removed, after = asyncio.run(run())
+        assert registered.status_code == 200 and missing.status_code == 404
+        assert dual["count"] == 200 and dual["classes"] == ["UP", "DOWN"]
+        # Active half is what the single-model batch endpoint returns
+        assert dual["active"]["modelVersion"] == single["modelVersion"]
+        np.testing.assert_allclose(dual["active"]["probabilities"]["UP"], single["pUp"], atol=1e-4)
+
+        (shadow,) = dual["shadows"]
+        assert shadow["modelVersion"] == "shadow_m1" and shadow["latencyMs"] >= 0
+        labels = list(zip(dual["active"]["label"], shadow["label"]))
+        assert shadow["disagreementRate"] == pytest.approx(sum(a != s for a, s in labels) / 200)
+
+        # The /dual call and the served /batch call both count
+        (pair,) = stats["pairs"]
+        assert pair["shadowVersion"] == "shadow_m1" and pair["rows"] == 400
+        assert pair["disagreementRate"] == shadow["disagreementRate"]
+        assert bad_window.status_code == 422
+        assert removed.json()["shadows"] == {"market": []} and after["shadows"] == []
+
+    def test_served_batches_record_disagreement(self, tmp_path, monkeypatch):
+        save_version(_shadow_market("shadow_m1"), str(tmp_path / "v3" / "ethereum"))
+        resolver = ModelResolver([str(tmp_path / "v3" / "*")])
+        monkeypatch.setattr(ml_server, "shadows", ShadowSet(str(tmp_path / "shadow"), resolver))
+        monkeypatch.setattr(ml_server, "disagreement", DisagreementStats(str(tmp_path / "shadow" / "d.json")))
+        rng = np.random.default_rng(2)
+        served = {name: rng.standard_normal(50).tolist() for name in MARKET_FEATURES}
+
+        async def run():
+            transport = httpx.ASGITransport(app=ml_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://ml") as client:
+                without_shadows = await client.post("/api/p35/predict/market/batch", json={"columns": served})
+                await client.post("/api/p35/shadows", json={"kind": "market", "modelId": "shadow_m1"})
+                # The shadow needs netFlowUsd, which this batch lacks: served, not compared
+                lacking = await client.post("/api/p35/predict/market/batch", json={"columns": served})
+                before = (await client.get("/api/p35/shadows/stats", params={"kind": "market", "window": "1h"})).json()
+                full = {**served, "netFlowUsd": rng.standard_normal(50).tolist()}
+                await client.post("/api/p35/predict/market/batch", json={"columns": full})
+                after = (await client.get("/api/p35/shadows/stats", params={"kind": "market", "window": "1h"})).json()
+                return without_shadows, lacking, before, after
+
+        without_shadows, lacking, before, after = asyncio.run(run())
+        assert without_shadows.status_code == 200 and lacking.status_code == 200
+        assert before["pairs"] == []
+        (pair,) = after["pairs"]
+        assert pair["shadowVersion"] == "shadow_m1" and pair["rows"] == 50
@@ -0,0 +1,189 @@
+"""
+Test ML Training - v3 shadow training and parallel batch runs
+
+Features tested:
+- Confusion matrix and binary / multi-class metrics
+- Logistic regression recovers a separable signal
+- Shared-memory parallel trainer yields every (pack, seed) variant
+- /api/v3/datasets upload and /api/v3/train single run
+- /api/v3/train/batch streams one NDJSON line per variant, then a summary
+"""
+
+import asyncio
+import json
+import os
+
+import httpx
+import numpy as np
+import pytest
+
+import ml_server
+from ml_service.datasets import Dataset, DatasetNotFound, DatasetStore
+from ml_service.jobs import TrainingJobQueue
+from ml_service.parallel import ParallelTrainer
+from ml_service.training import (
+    FEATURE_PACKS,
+    TrainingError,
+    classification_metrics,
+    confusion_matrix,
+    fit_logreg,
+    pack_features,
+    train_variant,
+)
+
+
+def _dataset(rows: int = 2000, dataset_id: str = "ds1") -> Dataset:
+    rng = np.random.default_rng(3)
+    columns = {name: rng.standard_normal(rows) for name in FEATURE_PACKS["PACK_A_PLUS_DEX"]}
+    signal = columns["cex_pressure_1h"] + 0.5 * columns["zone_quality_score"] + 0.3 * rng.standard_normal(rows)
+    return Dataset(dataset_id, columns, (signal > 0).astype(np.int64))
+
+
+def _call(coro_fn):
+    async def run():
+        transport = httpx.ASGITransport(app=ml_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://ml") as client:
+            return await coro_fn(client)
+    return asyncio.run(run())
+
+
+class TestMetrics:
+    """Confusion counts and derived metrics"""
+
+    def test_binary_metrics(self):
+        cm = confusion_matrix(np.array([1, 1, 1, 0, 0]), np.array([1, 1, 0, 1, 0]), 2)
+        assert cm.tolist() == [[1, 1], [1, 2]]
+        m = classification_metrics(cm)
+        assert m["accuracy"] == pytest.approx(0.6)
+        assert m["precision"] == pytest.approx(2 / 3)
+        assert m["recall"] == pytest.approx(2 / 3)
+        assert m["fpRate"] == pytest.approx(0.5)
+
+    def test_multiclass_macro_and_empty_class(self):
+        cm = np.array([[2, 0, 0], [0, 0, 0], [1, 0, 1]])
+        m = classification_metrics(cm)
+        assert m["accuracy"] == pytest.approx(0.75)
+        assert m["recall"] == pytest.approx((1 + 0 + 0.5) / 3)
+
+    def test_unknown_pack(self):
+        assert pack_features("ALL", ["a", "b"]) == ["a", "b"]
+        with pytest.raises(TrainingError):
+            pack_features("PACK_Z")
+
+
+class TestTraining:
+    """Single-variant training"""
+
+    def test_fit_logreg_separates(self):
+        rng = np.random.default_rng(0)
+        X = rng.standard_normal((500, 3)) * [1.0, 100.0, 0.01]
+        y = (X[:, 0] > 0).astype(int)
+        weights, bias = fit_logreg(X, y, 2)
+        pred = (X @ weights + bias).argmax(axis=1)
+        assert (pred == y).mean() > 0.95
+
+    def test_train_variant_uses_pack_columns(self):
+        dataset = _dataset()
+        features = dataset.feature_names
+        result = train_variant(dataset.matrix(features), dataset.labels, features, FEATURE_PACKS["PACK_A"], 1, "market", "v")
+        assert list(result["model"].features) == FEATURE_PACKS["PACK_A"]
+        assert result["metrics"]["f1"] > 0.8
+        assert result["trainRows"] + result["testRows"] == dataset.rows
+
+    def test_store_lookup(self):
+        store = DatasetStore()
+        store.put(_dataset())
+        assert store.get("ds1").rows == 2000
+        with pytest.raises(DatasetNotFound):
+            store.get("missing")
+
+
+class TestParallelTrainer:
+    """Process pool over one shared-memory dataset"""
+
+    def test_all_variants_complete(self):
+        dataset = _dataset()
+        jobs = [
+            {"featurePack": pack, "features": FEATURE_PACKS[pack], "seed": seed, "version": f"{pack}_{seed}"}
+            for pack in ("PACK_A", "PACK_A_MINUS_CEX")
+            for seed in (1, 2)
+        ]
+        jobs.append({"featurePack": "BAD", "features": ["nope"], "seed": 1, "version": "bad"})
+        trainer = ParallelTrainer(max_workers=2)
+
+        async def run():
+            return [outcome async for outcome in trainer.run(dataset, jobs, "market", iterations=50)]
+
+        outcomes = asyncio.run(run())
+        assert len(outcomes) == 5
+        errors = [o for o in outcomes if "error" in o]
+        assert [o["job"]["version"] for o in errors] == ["bad"]
+        f1 = {o["job"]["version"]: o["result"]["metrics"]["f1"] for o in outcomes if "result" in o}
+        assert f1["PACK_A_1"] > f1["PACK_A_MINUS_CEX_1"]
+        assert trainer.stats()["jobsRun"] == 5 and trainer.stats()["activeBatches"] == 0
+
+
+class TestTrainEndpoints:
+    """/api/v3/datasets, /api/v3/train, /api/v3/train/batch"""
+
+    @pytest.fixture(autouse=True)
+    def _isolated(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ml_server, "datasets", DatasetStore())
+        monkeypatch.setattr(ml_server, "trainer", ParallelTrainer(max_workers=2))
+        monkeypatch.setattr(ml_server, "ML_SHADOW_DIR", str(tmp_path))
+        monkeypatch.setattr(ml_server, "jobs", TrainingJobQueue(str(tmp_path / "jobs")))
+
+    def _upload(self, client, dataset):
+        columns = {name: values.tolist() for name, values in dataset.columns.items()}
+        columns["label"] = dataset.labels.tolist()
+        return client.post("/api/v3/datasets", json={"datasetId": dataset.dataset_id, "columns": columns})
+
+    def test_upload_and_train(self, tmp_path):
+        async def run(client):
+            uploaded = await self._upload(client, _dataset(500))
+            trained = await client.post("/api/v3/train", json={
+                "task": "market", "network": "ethereum", "datasetId": "ds1", "featurePack": "PACK_A", "seed": 7,
+            })
+            missing = await client.post("/api/v3/train", json={
+                "task": "market", "network": "ethereum", "datasetId": "nope", "featurePack": "PACK_A",
+            })
+            return uploaded, trained, missing
+
+        uploaded, trained, missing = _call(run)
+        assert uploaded.json()["rows"] == 500 and uploaded.json()["classes"] == [0, 1]
+        body = trained.json()
+        assert body["featureCount"] == len(FEATURE_PACKS["PACK_A"])
+        assert body["artifactPath"].startswith(str(tmp_path / "ethereum" / "market"))
+        assert os.path.isfile(os.path.join(body["artifactPath"], "meta.json"))
+        assert missing.status_code == 404
+
+    def test_upload_requires_label(self):
+        response = _call(lambda client: client.post("/api/v3/datasets", json={
+            "datasetId": "x", "columns": {"a": [1.0, 2.0]},
+        }))
+        assert response.status_code == 422
+
+    def test_batch_streams_ndjson(self):
+        async def run(client):
+            await self._upload(client, _dataset())
+            bad = await client.post("/api/v3/train/batch", json={
+                "task": "market", "network": "ethereum", "datasetId": "ds1", "featurePacks": ["PACK_Z"],
+            })
+            response = await client.post("/api/v3/train/batch", json={
+                "task": "market", "network": "ethereum", "datasetId": "ds1",
+                "featurePacks": ["PACK_A", "PACK_A_MINUS_ZONES"], "seeds": [1, 2, 3], "iterations": 50,
+            })
+            return bad, response
+
+        bad, response = _call(run)
+        assert bad.status_code == 422
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        variants, summary = lines[:-1], lines[-1]
+        assert len(variants) == 6 and all(v["ok"] for v in variants)
+        assert {(v["featurePack"], v["seed"]) for v in variants} == {
+            (pack, seed) for pack in ("PACK_A", "PACK_A_MINUS_ZONES") for seed in (1, 2, 3)
+        }
+        assert len({v["modelId"] for v in variants}) == 6
+        assert summary["type"] == "summary" and summary["variants"] == 6 and summary["failed"] == 0
+        assert summary["best"]["f1"] == max(v["metrics"]["f1"] for v in variants)
@@ -4,6 +4,7 @@ Phase 2.3: Telegram Alerts Delivery Testing
 Tests all Telegram notification endpoints and functionality.
 """
 
+import os
 import requests
 import json
 import time
@@ -11,8 +12,8 @@ import sys
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
-# Use production URL from frontend .env
-BACKEND_URL = "https://svetlana-connect.preview.emergentagent.com"
+# Production URL from frontend .env; REACT_APP_BACKEND_URL overrides (python -m loadtest.stack)
+BACKEND_URL = os.environ.get("REACT_APP_BACKEND_URL", "https://svetlana-connect.preview.emergentagent.com").rstrip("/")
 
 class TelegramNotificationsTester:
     def __init__(self):
@@ -392,8 +393,16 @@ class TelegramNotificationsTester:
             'admin_token_obtained': self.admin_token is not None
         }
 
+def run_concurrent() -> int:
+    """Same checks on the concurrent runner: python -m loadtest.api_suite --group telegram"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+    from loadtest.api_suite import main as api_suite_main
+    return api_suite_main(["--base-url", BACKEND_URL, "--group", "telegram", "--verbose"])
+
 def main():
-    """Main test execution"""
+    """Main test execution (--concurrent: run on loadtest.api_suite instead)"""
+    if "--concurrent" in sys.argv[1:]:
+        return run_concurrent()
     tester = TelegramNotificationsTester()
     results = tester.run_all_tests()
     
@@ -4,6 +4,7 @@ Connections Dropdown Testing - Backend API Testing
 Tests backend APIs for Connections dropdown functionality: Influencers and Graph tabs
 """
 
+import os
 import requests
 import json
 import time
@@ -11,8 +12,8 @@ import sys
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
-# Use production URL from frontend .env
-BACKEND_URL = "https://deploy-connect-6.preview.emergentagent.com"
+# Production URL from frontend .env; REACT_APP_BACKEND_URL overrides (python -m loadtest.stack)
+BACKEND_URL = os.environ.get("REACT_APP_BACKEND_URL", "https://deploy-connect-6.preview.emergentagent.com").rstrip("/")
 
 class ConnectionsDropdownTester:
     def __init__(self):
@@ -243,8 +244,16 @@ class ConnectionsDropdownTester:
             'failed_tests': self.failed_tests
         }
 
+def run_concurrent() -> int:
+    """Same checks on the concurrent runner: python -m loadtest.api_suite --group connections"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+    from loadtest.api_suite import main as api_suite_main
+    return api_suite_main(["--base-url", BACKEND_URL, "--group", "connections", "--verbose"])
+
 def main():
-    """Main test execution"""
+    """Main test execution (--concurrent: run on loadtest.api_suite instead)"""
+    if "--concurrent" in sys.argv[1:]:
+        return run_concurrent()
     tester = ConnectionsDropdownTester()
     results = tester.run_all_tests()
     